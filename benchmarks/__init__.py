@@ -0,0 +1,8 @@
+"""
+Benchmarks for the WMI CLI wrapper.
+
+The benchmarks run against an in-process fake of the ``wmi``/``pythoncom``
+modules (see ``fake_wmi``), so they can be executed on any platform:
+    
+    python -m benchmarks.bench_projection
+"""
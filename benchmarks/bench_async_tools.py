@@ -0,0 +1,80 @@
+"""
+Async tool latency benchmark.
+
+Every fake WMI query sleeps for ``--latency`` seconds. The sync agent tools
+are called one after another, then the async tools are awaited together
+with asyncio.gather; with the COM worker pool the async calls overlap and
+the batch takes roughly as long as the slowest tool.
+    
+    python -m benchmarks.bench_async_tools [--latency 0.2]
+"""
+import argparse
+import asyncio
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src import wmi_tools  # noqa: E402
+
+TOOL_NAMES = ["get_cpu_info", "get_disk_info", "get_network_info", "list_services"]
+
+
+def _load_fixtures():
+    fake_wmi.set_instances("Win32_Processor", [{
+        "Name": "Fake CPU", "Manufacturer": "Fake", "NumberOfCores": 8,
+        "NumberOfLogicalProcessors": 16, "MaxClockSpeed": 3600,
+        "CurrentClockSpeed": 3000, "LoadPercentage": 12,
+    }])
+    fake_wmi.set_instances("Win32_LogicalDisk", [{
+        "Name": "C:", "DeviceID": "C:", "DriveType": 3, "FileSystem": "NTFS",
+        "Size": str(512 * 1024 ** 3), "FreeSpace": str(128 * 1024 ** 3),
+    }])
+    fake_wmi.set_instances("Win32_NetworkAdapterConfiguration", [{
+        "Description": "Fake Ethernet", "MACAddress": "00:11:22:33:44:55",
+        "IPAddress": ("10.0.0.2",), "DefaultIPGateway": ("10.0.0.1",),
+        "DHCPEnabled": True, "IPEnabled": True,
+    }])
+    fake_wmi.set_instances("Win32_Service", [
+        {"Name": f"svc{i}", "DisplayName": f"Service {i}", "State": "Running",
+         "StartMode": "Auto", "Status": "OK"}
+        for i in range(30)
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    
+    _load_fixtures()
+    fake_wmi.set_latency(args.latency)
+    
+    sync_tools = {tool.name: tool for tool in wmi_tools.get_wmi_tools()}
+    async_tools = {tool.name: tool for tool in wmi_tools.get_wmi_tools(use_async=True)}
+    
+    start = time.perf_counter()
+    for name in TOOL_NAMES:
+        sync_tools[name]()
+    sequential = time.perf_counter() - start
+    
+    async def run_concurrently():
+        return await asyncio.gather(*(async_tools[name]() for name in TOOL_NAMES))
+    
+    # A new turn: the async tools must not reuse the sync tools' snapshots
+    wmi_tools.begin_turn()
+    start = time.perf_counter()
+    asyncio.run(run_concurrently())
+    concurrent = time.perf_counter() - start
+    
+    print(f"{len(TOOL_NAMES)} tools, {args.latency * 1000:.0f} ms per WMI query")
+    print(f"sequential sync tools: {sequential * 1000:8.1f} ms")
+    print(f"gathered async tools:  {concurrent * 1000:8.1f} ms")
+    overlapped = concurrent < sequential * 0.6
+    print("calls overlapped" if overlapped else "calls did NOT overlap")
+    return 0 if overlapped else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
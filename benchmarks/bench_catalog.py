@@ -0,0 +1,70 @@
+"""
+Class catalog benchmark.
+
+Registers ``--classes`` classes with the fake WMI service (every WMI call
+sleeping ``--latency`` seconds) and runs ``list-classes --filter-text``,
+``class-info --no-sample`` and the agent's query validation three times
+with a fresh SchemaCatalog each time, as separate CLI invocations would:
+first against an empty catalog directory, then against the index the first
+run saved, then after a class was added and the index went stale.
+    
+    python -m benchmarks.bench_catalog [--classes 1000] [--latency 0.05]
+"""
+import argparse
+import tempfile
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.catalog import SchemaCatalog  # noqa: E402
+from src.wmi_cli.convert import SchemaCache  # noqa: E402
+
+
+def workload(directory: str, max_age: float) -> dict:
+    fake_wmi.stats.reset()
+    start = time.perf_counter()
+    catalog = SchemaCatalog(directory=directory, max_age=max_age, schemas=SchemaCache())
+    found = catalog.search("disk")
+    info = catalog.describe("Win32_Process")
+    problems = catalog.validate_query("SELECT Name, ProcessId FROM Win32_Proces")
+    return {
+        "ms": (time.perf_counter() - start) * 1000,
+        "queries": fake_wmi.stats.queries,
+        "definitions": fake_wmi.stats.class_definitions,
+        "found": len(found),
+        "properties": len(info.properties),
+        "problems": len(problems),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--classes", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args(argv)
+    
+    fake_wmi.set_instances("Win32_OperatingSystem", [{"Version": "10.0.22631", "BuildNumber": "22631"}])
+    fake_wmi.set_instances("Win32_Process", fake_wmi.make_processes(10))
+    fake_wmi.set_keys("Win32_Process", ["Handle"])
+    for i in range(args.classes):
+        fake_wmi.set_instances(f"Win32_Fake{i}Disk" if i % 50 == 0 else f"Win32_Fake{i}",
+                               [{"Name": f"fake {i}", "Status": "OK"}])
+    fake_wmi.set_latency(args.latency)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        runs = [("cold (empty catalog)", workload(directory, 3600))]
+        runs.append(("warm (saved index)", workload(directory, 3600)))
+        fake_wmi.set_instances("Win32_FakeNewDisk", [{"Name": "new"}])
+        runs.append(("stale (incremental refresh)", workload(directory, 0)))
+    
+    print(f"{args.classes} classes, fake latency {args.latency * 1000:.0f} ms per call")
+    for label, run in runs:
+        print(f"{label:<28} {run['ms']:8.1f} ms   {run['queries']:3d} queries   "
+              f"{run['definitions']:5d} class definitions read   "
+              f"{run['found']} matches, {run['properties']} properties, {run['problems']} problems")
+
+
+if __name__ == "__main__":
+    main()
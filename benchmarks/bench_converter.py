@@ -0,0 +1,86 @@
+"""
+Object conversion benchmark.
+
+Converts thousands of fake Win32_Process objects with the previous
+dir()-based wmi_object_to_dict and with the schema-aware batch converter.
+Win32_Process methods are registered on the fake, so the old converter
+pays a method lookup (a COM round-trip with real wmi) for each of them.
+    
+    python -m benchmarks.bench_converter [--objects 5000]
+"""
+import argparse
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.convert import objects_to_columns, objects_to_dicts  # noqa: E402
+from src.wmi_cli.wmi_wrapper import WMIWrapper  # noqa: E402
+
+PROCESS_METHODS = [
+    "AttachDebugger", "Create", "GetAvailableVirtualSize", "GetOwner",
+    "GetOwnerSid", "SetPriority", "Terminate",
+]
+
+
+def legacy_wmi_object_to_dict(wmi_object, properties=None):
+    # The converter before the schema-aware fast path
+    if properties is None:
+        properties = [prop for prop in dir(wmi_object) if not prop.startswith('_')]
+    
+    result = {}
+    for prop in properties:
+        try:
+            value = getattr(wmi_object, prop)
+            if callable(value):
+                continue
+            result[prop] = value
+        except Exception:
+            result[prop] = None
+    
+    return result
+
+
+def measure(label: str, convert, objects, repeat: int) -> dict:
+    fake_wmi.stats.reset()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        convert(objects)
+    elapsed = time.perf_counter() - start
+    return {
+        "label": label,
+        "ms": elapsed / repeat * 1000,
+        "attribute_reads": fake_wmi.stats.attribute_reads // repeat,
+        "method_lookups": fake_wmi.stats.method_lookups // repeat,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--objects", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    
+    fake_wmi.set_instances("Win32_Process", fake_wmi.make_processes(args.objects))
+    for method in PROCESS_METHODS:
+        fake_wmi.set_method("Win32_Process", method, lambda values, *a, **kw: 0)
+    objects = WMIWrapper().get_processes()
+    
+    results = [
+        measure("dir() + getattr", lambda objs: [legacy_wmi_object_to_dict(o) for o in objs],
+                objects, args.repeat),
+        measure("objects_to_dicts", objects_to_dicts, objects, args.repeat),
+        measure("objects_to_columns", objects_to_columns, objects, args.repeat),
+    ]
+    
+    print(f"Win32_Process objects: {len(objects)}, methods: {len(PROCESS_METHODS)}")
+    print(f"{'converter':<20}{'ms':>10}{'attribute reads':>18}{'method lookups':>16}")
+    for result in results:
+        print(f"{result['label']:<20}{result['ms']:>10.1f}"
+              f"{result['attribute_reads']:>18}{result['method_lookups']:>16}")
+    print(f"Speedup (dicts): {results[0]['ms'] / max(results[1]['ms'], 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
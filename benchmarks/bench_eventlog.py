@@ -0,0 +1,100 @@
+"""
+Event log benchmark.
+
+Fills the fake WMI service with a ``--records`` record event log, generated
+on the fly like a real provider's, and measures with EventLogReader:
+
+- a full scan of the log, whose memory must stay under ``--max-memory``
+  MB (the script exits 1 otherwise);
+- the last hour of events, bounded in the WQL;
+- tail() after new records were written, which only returns the new ones;
+- a page deep into the log.
+    
+    python -m benchmarks.bench_eventlog [--records 1000000] [--max-memory 64]
+"""
+import argparse
+import datetime
+import sys
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.modules import EventLogReader  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_memory() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def full_scan(reader: EventLogReader) -> dict:
+    if resource is None:
+        import tracemalloc
+        tracemalloc.start()
+    else:
+        before = peak_memory()
+    start = time.perf_counter()
+    count = sum(1 for _ in reader.iter_events(properties=["RecordNumber", "TimeGenerated", "Message"]))
+    elapsed = time.perf_counter() - start
+    if resource is None:
+        grown = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    else:
+        grown = peak_memory() - before
+    return {"count": count, "seconds": elapsed, "memory": grown}
+
+
+def measure(label: str, func) -> None:
+    fake_wmi.stats.reset()
+    start = time.perf_counter()
+    count = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<34} {elapsed:9.1f} ms   {fake_wmi.stats.queries:2d} queries   "
+          f"{fake_wmi.stats.objects:8d} records read   {count} events")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--max-memory", type=float, default=64.0, help="MB")
+    parser.add_argument("--new", type=int, default=100, help="records written before tail()")
+    args = parser.parse_args(argv)
+    
+    log = fake_wmi.FakeEventLog(args.records)
+    fake_wmi.set_instances("Win32_NTLogEvent", log)
+    reader = EventLogReader()
+    
+    hour_ago = log.time_of(len(log)) - datetime.timedelta(hours=1)
+    measure("last hour (since)", lambda: len(list(reader.iter_events(
+        since=hour_ago, properties=["RecordNumber", "Message"]))))
+    measure("last hour, errors only", lambda: len(list(reader.iter_events(
+        since=hour_ago, event_type=1, properties=["RecordNumber", "Message"]))))
+    
+    _, cursor = reader.tail()
+    log.append(args.new)
+    measure(f"tail() after {args.new} new records", lambda: len(reader.tail(
+        since_record=cursor, properties=["Message"])[0]))
+    measure("tail() with nothing new", lambda: len(reader.tail(
+        since_record=cursor + args.new, properties=["Message"])[0]))
+    measure("page of 100 before record N/2", lambda: len(reader.get_events_page(
+        before_record=len(log) // 2, page_size=100, properties=["Message"])["events"]))
+    
+    scan = full_scan(reader)
+    print(f"full scan of {scan['count']} records        {scan['seconds']:9.1f} s    "
+          f"memory grew {scan['memory']:.1f} MB (limit {args.max_memory:.0f} MB)")
+    if scan["memory"] > args.max_memory:
+        print("FAIL: memory is not bounded")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Metrics exporter scrape benchmark.
+
+Starts ``MetricsExporter`` against the fake WMI service on a free port
+and fires concurrent HTTP scrapes at /metrics. Scrapes are served from
+the cached snapshot, so the number of WMI queries the fake service sees
+must not grow with the number of scrapes; the benchmark reports it next
+to the scrape latency and the cost of collecting once per scrape.
+    
+    python -m benchmarks.bench_exporter [--scrapes 200] [--concurrency 16]
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.exporter import MetricsExporter  # noqa: E402
+from src.wmi_cli.wmi_wrapper import WMIWrapper  # noqa: E402
+
+
+def install_fixtures(processes: int):
+    fake_wmi.set_instances("Win32_ComputerSystem", [
+        {"TotalPhysicalMemory": str(16 * 1024 ** 3), "NumberOfLogicalProcessors": 8},
+    ])
+    fake_wmi.set_instances("Win32_OperatingSystem", [{"FreePhysicalMemory": "4000000"}])
+    fake_wmi.set_instances("Win32_LogicalDisk", [
+        {"DeviceID": "C:", "VolumeName": "OS", "FileSystem": "NTFS", "DriveType": 3,
+         "Size": str(500 * 1024 ** 3), "FreeSpace": str(100 * 1024 ** 3)},
+    ])
+    fake_wmi.set_instances("Win32_Service", [
+        {"Name": f"svc{i}", "State": "Running" if i % 3 else "Stopped", "StartMode": "Auto"}
+        for i in range(250)
+    ])
+    fake_wmi.set_instances(
+        "Win32_PerfRawData_PerfProc_Process", fake_wmi.make_perf_processes(processes)
+    )
+    fake_wmi.set_instances(
+        "Win32_PerfRawData_Tcpip_NetworkInterface", fake_wmi.make_network_interfaces()
+    )
+
+
+def scrape(url: str) -> float:
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scrapes", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=300)
+    args = parser.parse_args(argv)
+    
+    install_fixtures(args.processes)
+    exporter = MetricsExporter(wrapper=WMIWrapper(), refresh_interval=3600)
+    server = exporter.make_server("127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    exporter.start()
+    try:
+        body = exporter.snapshot(timeout=30)
+        queries_before = fake_wmi.stats.queries
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            latencies = list(pool.map(scrape, [url] * args.scrapes))
+        queries_after = fake_wmi.stats.queries
+    finally:
+        server.shutdown()
+        server.server_close()
+        exporter.stop()
+    
+    start = time.perf_counter()
+    exporter.collect()
+    collect_ms = (time.perf_counter() - start) * 1000
+    
+    latencies.sort()
+    print(f"Snapshot: {len(body)} bytes, {len(body.splitlines())} lines")
+    print(f"Scrapes: {args.scrapes} x {args.concurrency} concurrent")
+    print(f"WMI queries during scrapes: {queries_after - queries_before}")
+    print(f"Scrape latency ms: p50 {statistics.median(latencies):.2f}, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f}")
+    print(f"One collection (what each scrape would cost without the cache): {collect_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
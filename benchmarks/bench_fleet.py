@@ -0,0 +1,58 @@
+"""
+Fleet query benchmark.
+
+Queries ``--hosts`` simulated computers whose queries take ``--latency``
+seconds, a few of them failing and one hanging for ``--hang`` seconds.
+FleetQuery with one worker (the hosts one after another, as the shell
+loop over ``wmi-cli query --computer`` did) is compared with the default
+bounded parallelism; the concurrent run should take about
+hosts / max_workers * latency plus the timeout, not the hang.
+    
+    python -m benchmarks.bench_fleet [--hosts 64] [--latency 0.05] [--timeout 0.5]
+"""
+import argparse
+import time
+
+from src.wmi_cli.backends import SimulatedBackend
+from src.wmi_cli.fleet import FleetQuery
+
+
+def run(hosts: list, backend: SimulatedBackend, workers: int, timeout: float) -> dict:
+    fleet = FleetQuery(hosts, pool=backend.pool, max_workers=workers, timeout=timeout)
+    start = time.perf_counter()
+    rows = fleet.collect("SELECT * FROM Win32_OperatingSystem")
+    return {
+        "elapsed": time.perf_counter() - start,
+        "rows": len(rows),
+        "failed": sum(1 for s in fleet.summary.failed if not s.timed_out),
+        "timed_out": sum(1 for s in fleet.summary.failed if s.timed_out),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hosts", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    parser.add_argument("--hang", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args(argv)
+    
+    hosts = [f"host{index:03d}" for index in range(args.hosts)]
+    backend = SimulatedBackend(
+        {"Win32_OperatingSystem": [{"Caption": "Fake Windows", "Version": "10.0.22631"}]},
+        latency=args.latency,
+        host_latency={hosts[0]: args.hang},
+        failures={host: "The RPC server is unavailable." for host in hosts[1::16]},
+    )
+    
+    print(f"{args.hosts} hosts, {args.latency * 1000:.0f} ms per query, "
+          f"one host hanging {args.hang:g} s, timeout {args.timeout:g} s")
+    for label, workers in (("serial (1 worker)", 1), (f"concurrent ({args.workers})", args.workers)):
+        result = run(hosts, backend, workers, args.timeout)
+        print(f"{label:<20} {result['elapsed']:6.2f} s   {result['rows']:4d} rows   "
+              f"{result['failed']} failed, {result['timed_out']} timed out")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+ResultFrame memory and filtering benchmark.
+
+Holds the `wmi-cli processes --output-format json` columns for thousands
+of fake Win32_Process instances as a list of dicts and as a ResultFrame,
+reports the bytes each representation holds, and times a high-memory
+filter over live objects, dicts and the frame.
+
+Every property read through COM returns a new Python object, so the size
+of the dicts counts each value separately; the frame stores integers in
+arrays and interns repeated strings.
+    
+    python -m benchmarks.bench_frame [--processes 5000]
+"""
+import argparse
+import sys
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.convert import objects_to_dicts  # noqa: E402
+from src.wmi_cli.wmi_wrapper import WMIWrapper  # noqa: E402
+
+COLUMNS = ["Name", "ProcessId", "ThreadCount", "WorkingSetSize", "CommandLine"]
+MIN_BYTES = 100 * 1024 * 1024
+
+
+def records_size(records) -> int:
+    size = sys.getsizeof(records)
+    for record in records:
+        size += sys.getsizeof(record)
+        size += sum(sys.getsizeof(value) for value in record.values())
+    return size
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+    
+    # Like wmi, the fake returns uint64 properties (WorkingSetSize) as strings
+    fake_wmi.set_instances("Win32_Process", fake_wmi.make_processes(args.processes))
+    wrapper = WMIWrapper()
+    
+    objects = wrapper.get_processes(COLUMNS)
+    records = objects_to_dicts(objects, COLUMNS)
+    frame = wrapper.get_class_frame("Win32_Process", COLUMNS)
+    
+    object_filter = timed(lambda: [
+        p for p in objects if p.WorkingSetSize and int(p.WorkingSetSize) > MIN_BYTES
+    ], args.repeat)
+    record_filter = timed(lambda: [
+        r for r in records if r["WorkingSetSize"] and int(r["WorkingSetSize"]) > MIN_BYTES
+    ], args.repeat)
+    frame_filter = timed(lambda: frame.where("WorkingSetSize", ">", MIN_BYTES), args.repeat)
+    
+    print(f"Win32_Process instances: {args.processes}, columns: {len(COLUMNS)}")
+    print(f"{'representation':<16}{'KiB':>10}{'filter ms':>12}")
+    print(f"{'WMI objects':<16}{'-':>10}{object_filter:>12.2f}")
+    print(f"{'list of dicts':<16}{records_size(records) / 1024:>10.1f}{record_filter:>12.2f}")
+    print(f"{'ResultFrame':<16}{frame.memory_usage() / 1024:>10.1f}{frame_filter:>12.2f}")
+    print(f"Frame dtypes: {frame.dtypes}")
+
+
+if __name__ == "__main__":
+    main()
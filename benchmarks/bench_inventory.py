@@ -0,0 +1,84 @@
+"""
+Inventory collection benchmark.
+
+Every fake WMI query sleeps for ``--latency`` seconds. The default
+inventory sections are collected by SnapshotCollector with one worker
+(the sections one after another, as system-info and HardwareInfo used to
+run) and then with one worker per section; the concurrent run should take
+about as long as its slowest section.
+    
+    python -m benchmarks.bench_inventory [--latency 0.1]
+"""
+import argparse
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.inventory import DEFAULT_SECTIONS, SnapshotCollector  # noqa: E402
+
+
+def _load_fixtures():
+    fake_wmi.set_instances("Win32_OperatingSystem", [{
+        "Caption": "Fake Windows", "Version": "10.0.22631", "OSArchitecture": "64-bit",
+        "FreePhysicalMemory": "4000000", "TotalVisibleMemorySize": "16000000",
+        "LastBootUpTime": "20240101120000.000000+000",
+    }])
+    fake_wmi.set_instances("Win32_ComputerSystem", [{
+        "Name": "FAKE", "Manufacturer": "Fake Inc.", "Model": "Bench",
+        "SystemType": "x64-based PC", "TotalPhysicalMemory": str(16 * 1024 ** 3),
+    }])
+    fake_wmi.set_instances("Win32_BIOS", [{"Version": "1.0", "SerialNumber": "0000"}])
+    fake_wmi.set_instances("Win32_Processor", [{"Name": "Fake CPU", "NumberOfCores": 8}])
+    fake_wmi.set_instances("Win32_PhysicalMemory", [
+        {"BankLabel": f"BANK {i}", "Capacity": str(8 * 1024 ** 3), "Speed": 4800} for i in range(2)
+    ])
+    fake_wmi.set_instances("Win32_LogicalDisk", [
+        {"DeviceID": "C:", "Name": "C:", "DriveType": 3, "FileSystem": "NTFS",
+         "Size": str(512 * 1024 ** 3), "FreeSpace": str(128 * 1024 ** 3)},
+    ])
+    fake_wmi.set_instances("Win32_NetworkAdapterConfiguration", [{
+        "Description": "Fake Ethernet", "MACAddress": "00:11:22:33:44:55",
+        "IPAddress": ("10.0.0.2",), "IPEnabled": True,
+    }])
+    for name in ("Win32_BaseBoard", "Win32_VideoController", "Win32_SoundDevice",
+                 "Win32_USBController", "Win32_Printer", "Win32_Battery"):
+        fake_wmi.set_instances(name, [{"Name": f"{name} 0", "Manufacturer": "Fake", "Status": "OK"}])
+
+
+def run(workers: int) -> dict:
+    fake_wmi.stats.reset()
+    collector = SnapshotCollector(max_workers=workers)
+    start = time.perf_counter()
+    snapshot = collector.collect()
+    elapsed = time.perf_counter() - start
+    slowest = max(snapshot["timings"], key=snapshot["timings"].get)
+    return {
+        "elapsed": elapsed,
+        "queries": fake_wmi.stats.queries,
+        "sum": sum(snapshot["timings"].values()),
+        "slowest": slowest,
+        "slowest_time": snapshot["timings"][slowest],
+        "errors": len(snapshot["errors"]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    
+    _load_fixtures()
+    fake_wmi.set_latency(args.latency)
+    
+    print(f"{len(DEFAULT_SECTIONS)} sections, fake latency {args.latency * 1000:.0f} ms per query")
+    for label, workers in (("serial (1 worker)", 1), ("concurrent", len(DEFAULT_SECTIONS))):
+        result = run(workers)
+        print(f"{label:<20} {result['elapsed']:6.2f} s   {result['queries']:3d} queries   "
+              f"sections took {result['sum']:.2f} s in total, slowest {result['slowest']} "
+              f"{result['slowest_time']:.2f} s, {result['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()
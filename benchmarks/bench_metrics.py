@@ -0,0 +1,88 @@
+"""
+Metrics store size and range query benchmark.
+
+Records a few samples through MetricsRecorder against the fake WMI
+service, then fills a store with a week of 10 second samples for a dozen
+series and reports its size on disk and the time of typical range reads
+(the raw last hour, a day at 1 minute steps and the week at 1 hour steps).
+    
+    python -m benchmarks.bench_metrics [--series 12] [--days 7]
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.metrics import MetricsRecorder, MetricsStore  # noqa: E402
+
+START = 1_700_000_000
+
+
+def install_fixtures():
+    fake_wmi.set_instances("Win32_ComputerSystem", [{"TotalPhysicalMemory": str(16 * 1024 ** 3)}])
+    fake_wmi.set_instances("Win32_OperatingSystem", [{"FreePhysicalMemory": "4000000"}])
+    fake_wmi.set_instances("Win32_Processor", [{"LoadPercentage": 12}, {"LoadPercentage": 30}])
+    fake_wmi.set_instances("Win32_LogicalDisk", [
+        {"DeviceID": "C:", "VolumeName": "OS", "FileSystem": "NTFS", "DriveType": 3,
+         "Size": str(500 * 1024 ** 3), "FreeSpace": str(100 * 1024 ** 3)},
+    ])
+
+
+def timed(func, repeat: int = 20) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    return elapsed, len(result)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--series", type=int, default=12)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--interval", type=int, default=10)
+    args = parser.parse_args(argv)
+    
+    install_fixtures()
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = MetricsRecorder(os.path.join(directory, "recorded"))
+        for tick in range(60):
+            recorder.record(timestamp=START + tick * args.interval)
+        print(f"Recorder: {recorder.samples} samples of {len(recorder.store.series())} series "
+              f"via fake WMI, errors: {sum(recorder.error_counts.values())}")
+        recorder.store.close()
+        
+        store = MetricsStore(os.path.join(directory, "week"))
+        names = [f"series.{index}" for index in range(args.series)]
+        samples = int(args.days * 86400 / args.interval)
+        start = time.perf_counter()
+        for tick in range(samples):
+            store.append(
+                {name: 50 + 50 * math.sin(tick / 360 + index) for index, name in enumerate(names)},
+                START + tick * args.interval,
+            )
+        write_seconds = time.perf_counter() - start
+        end = START + samples * args.interval
+        print(f"Stored {samples} samples x {args.series} series in {write_seconds:.1f}s, "
+              f"{store.size_bytes() / 1024 ** 2:.2f} MiB on disk")
+        
+        queries = [
+            ("last hour, raw", lambda: store.query(names[0], end - 3600, end)),
+            ("last day, 1m step", lambda: store.query(names[0], end - 86400, end, step=60)),
+            ("whole range, 1h step", lambda: store.query(names[0], step=3600)),
+            ("whole range, raw", lambda: store.query(names[0])),
+        ]
+        print(f"{'query':<24}{'points':>8}{'ms':>10}")
+        for label, query in queries:
+            ms, points = timed(query)
+            print(f"{label:<24}{points:>8}{ms:>10.2f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
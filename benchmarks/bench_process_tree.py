@@ -0,0 +1,74 @@
+"""
+Process tree benchmark.
+
+Builds a ProcessTree from ``--processes`` synthetic processes (every WMI
+call sleeping ``--latency`` seconds), times the lookups, then kills the
+largest subtree two levels below the first root, half of it each way:
+
+- the previous way, one query for the PID, then Terminate, one at a time;
+- terminate_processes (used by kill_tree and kill_by_name): one
+  creation-date check, then concurrent Terminate calls by object path.
+    
+    python -m benchmarks.bench_process_tree [--processes 10000] [--latency 0.002]
+"""
+import argparse
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.modules import ProcessManager  # noqa: E402
+
+
+def legacy_terminate(manager: ProcessManager, pid: int):
+    process = manager.wrapper.get_processes(ProcessId=pid)[0]
+    return process.Terminate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=10000)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+    
+    rows = fake_wmi.make_process_tree(args.processes)
+    fake_wmi.simulate_processes(rows)
+    manager = ProcessManager()
+    
+    start = time.perf_counter()
+    tree = manager.get_process_tree()
+    built = time.perf_counter() - start
+    root = max(tree.children(tree.children(tree.roots()[0])[0]), key=lambda pid: len(tree.descendants(pid)))
+    subtree = [root] + tree.descendants(root)
+    print(f"{len(tree)} processes, {len(tree.roots())} roots; tree built in {built * 1000:.1f} ms "
+          f"({fake_wmi.stats.queries} query)")
+    
+    start = time.perf_counter()
+    for pid in tree.processes:
+        tree.ancestors(pid)
+        tree.is_descendant(pid, root)
+        tree.descendants(pid)
+    lookups = time.perf_counter() - start
+    print(f"ancestors + descendants + is_descendant for every process: {lookups * 1000:.1f} ms")
+    
+    fake_wmi.set_latency(args.latency)
+    half = len(subtree) // 2
+    fake_wmi.stats.reset()
+    start = time.perf_counter()
+    for pid in subtree[:half]:
+        legacy_terminate(manager, pid)
+    legacy = time.perf_counter() - start
+    print(f"per-PID terminate_process: {half} processes in {legacy:.2f} s, {fake_wmi.stats.queries} queries")
+    
+    fake_wmi.stats.reset()
+    start = time.perf_counter()
+    results = manager.terminate_processes([tree.get(pid) for pid in subtree[half:]], max_workers=args.workers)
+    bulk = time.perf_counter() - start
+    print(f"terminate_processes:      {len(results)} processes in {bulk:.2f} s, {fake_wmi.stats.queries} queries, "
+          f"{sum(result.ok for result in results)} ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Projection pushdown benchmark.
+
+Compares ``SELECT *`` enumeration of Win32_Process with the projected
+query issued by ``wmi-cli processes`` and reports how many property values
+the fake WMI service had to marshal for each.
+    
+    python -m benchmarks.bench_projection [--processes 450]
+"""
+import argparse
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.wmi_wrapper import WMIWrapper  # noqa: E402
+
+TABLE_COLUMNS = ["Name", "ProcessId", "ThreadCount", "WorkingSetSize"]
+
+
+def _render(processes):
+    # Touch exactly the cells `wmi-cli processes` renders.
+    return [
+        (proc.ProcessId, proc.Name, proc.ThreadCount, proc.WorkingSetSize)
+        for proc in processes
+    ]
+
+
+def measure(wrapper: WMIWrapper, properties, repeat: int) -> dict:
+    fake_wmi.stats.reset()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        _render(wrapper.get_processes(properties))
+    elapsed = time.perf_counter() - start
+    return {
+        "property_fetches": fake_wmi.stats.property_fetches // repeat,
+        "seconds": elapsed / repeat,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=450)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    
+    fake_wmi.set_instances("Win32_Process", fake_wmi.make_processes(args.processes))
+    wrapper = WMIWrapper()
+    
+    full = measure(wrapper, None, args.repeat)
+    projected = measure(wrapper, TABLE_COLUMNS, args.repeat)
+    
+    print(f"Win32_Process instances: {args.processes}")
+    print(f"{'query':<12}{'property fetches':>18}{'ms/query':>12}")
+    for label, result in (("SELECT *", full), ("projected", projected)):
+        print(f"{label:<12}{result['property_fetches']:>18}{result['seconds'] * 1000:>12.2f}")
+    reduction = 1 - projected["property_fetches"] / max(full["property_fetches"], 1)
+    print(f"Property fetch reduction: {reduction:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Session record/replay benchmark.
+
+Records a workload of CLI commands, module calls and agent tools against
+the fake WMI service (every query sleeping ``--latency`` seconds) through
+``RecordingBackend``, then replays it in a fresh interpreter that never
+imports the fake, wmi or pythoncom. The replay runs once with the
+recorded latencies and once with ``latency_scale=0``, which leaves only
+the Python-side cost of the code under test; outputs of the recording and
+both replays must be identical.
+    
+    python -m benchmarks.bench_replay [--latency 0.02] [--processes 300]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+from typer.testing import CliRunner
+
+# Importing the package no longer needs wmi or pythoncom
+from src import wmi_tools
+from src.wmi_cli.backends import RecordingBackend, ReplayBackend
+from src.wmi_cli.cli import app
+from src.wmi_cli.modules import ServiceManager, SystemMonitor
+from src.wmi_cli.pool import set_default_pool
+
+
+def workload() -> List[str]:
+    """Run the recorded code paths; returns their outputs."""
+    outputs = []
+    runner = CliRunner()
+    for args in (
+        ["system-info"],
+        ["services", "--output-format", "json"],
+        ["processes", "--output-format", "json"],
+        ["disks"],
+        ["query", "SELECT Name, ProcessId FROM Win32_Service WHERE State = 'Running'"],
+    ):
+        result = runner.invoke(app, args, env={"COLUMNS": "160"})
+        if result.exit_code:
+            raise RuntimeError(f"wmi-cli {' '.join(args)} failed: {result.output}")
+        outputs.append(result.output)
+    
+    monitor = SystemMonitor()
+    outputs.append(json.dumps(monitor.get_memory_info()))
+    outputs.append(json.dumps(monitor.get_disk_usage()))
+    outputs.append(json.dumps(ServiceManager().list_services(["Name", "State"])))
+    
+    wmi_tools.begin_turn()
+    for tool, kwargs in (
+        (wmi_tools.get_system_info, {}),
+        (wmi_tools.list_services, {"state": "Running"}),
+        (wmi_tools.list_processes, {}),
+    ):
+        outputs.append(tool(**kwargs))
+    return outputs
+
+
+def record(path: str, latency: float, processes: int) -> dict:
+    from . import fake_wmi
+    
+    fake_wmi.install()
+    fake_wmi.set_instances("Win32_OperatingSystem", [{
+        "Caption": "Fake Windows", "Version": "10.0.22631", "OSArchitecture": "64-bit",
+        "BuildNumber": "22631", "FreePhysicalMemory": "4000000",
+        "TotalVisibleMemorySize": "16000000", "LastBootUpTime": "20240101120000.000000+000",
+    }])
+    fake_wmi.set_instances("Win32_ComputerSystem", [{
+        "Name": "FAKE", "Manufacturer": "Fake Inc.", "Model": "Bench", "SystemType": "x64-based PC",
+        "TotalPhysicalMemory": str(16 * 1024 ** 3), "NumberOfLogicalProcessors": 8,
+    }])
+    fake_wmi.set_instances("Win32_BIOS", [{"Version": "1.0", "SerialNumber": "0000"}])
+    fake_wmi.set_instances("Win32_LogicalDisk", [
+        {"DeviceID": "C:", "Name": "C:", "VolumeName": "OS", "FileSystem": "NTFS", "DriveType": 3,
+         "Size": str(500 * 1024 ** 3), "FreeSpace": str(100 * 1024 ** 3)},
+    ])
+    fake_wmi.set_instances("Win32_Service", [
+        {"Name": f"svc{i}", "DisplayName": f"Service {i}", "State": "Running" if i % 3 else "Stopped",
+         "StartMode": "Auto", "Status": "OK", "ProcessId": 1000 + i}
+        for i in range(250)
+    ])
+    fake_wmi.set_instances("Win32_Process", fake_wmi.make_processes(processes))
+    fake_wmi.set_latency(latency)
+    
+    backend = RecordingBackend(path)
+    set_default_pool(backend.pool)
+    start = time.perf_counter()
+    outputs = workload()
+    elapsed = time.perf_counter() - start
+    backend.save()
+    return {"seconds": elapsed, "queries": backend.queries_recorded, "outputs": outputs}
+
+
+def replay(path: str, latency_scale: float) -> dict:
+    start = time.perf_counter()
+    backend = ReplayBackend(path, latency_scale=latency_scale)
+    load = time.perf_counter() - start
+    set_default_pool(backend.pool)
+    start = time.perf_counter()
+    outputs = workload()
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "load_seconds": load,
+        "queries": backend.queries,
+        "misses": backend.misses,
+        "wmi_imported": "wmi" in sys.modules or "pythoncom" in sys.modules,
+        "outputs": outputs,
+    }
+
+
+def replay_subprocess(path: str, latency_scale: float) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_replay",
+         "--replay", path, "--latency-scale", str(latency_scale)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--processes", type=int, default=300)
+    parser.add_argument("--replay", help=argparse.SUPPRESS)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.replay:
+        print(json.dumps(replay(args.replay, args.latency_scale)))
+        return
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.wmi.gz")
+        recorded = record(path, args.latency, args.processes)
+        size = os.path.getsize(path)
+        realistic = replay_subprocess(path, 1.0)
+        overhead = replay_subprocess(path, 0.0)
+    
+    print(f"Recorded: {recorded['queries']} queries in {recorded['seconds'] * 1000:.0f} ms "
+          f"(fake latency {args.latency * 1000:.0f} ms/query), session file {size / 1024:.1f} KiB")
+    for label, run in (("Replay, recorded latency", realistic), ("Replay, latency_scale=0", overhead)):
+        print(f"{label}: {run['seconds'] * 1000:.0f} ms, {run['queries']} queries, "
+              f"{run['misses']} misses, load {run['load_seconds'] * 1000:.1f} ms")
+    print(f"wmi/pythoncom imported during replay: {realistic['wmi_imported'] or overhead['wmi_imported']}")
+    identical = recorded["outputs"] == realistic["outputs"] == overhead["outputs"]
+    print(f"Outputs identical to the recording: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Bulk service control benchmark.
+
+Restarts ``--services`` simulated services, a quarter of them in
+dependency chains, whose state transitions take ``--transition`` seconds
+(every WMI call sleeping ``--latency`` seconds). It compares two
+approaches:
+
+- the previous blind stop-then-start per service, which looks each
+  service up twice and never waits for the stop to finish;
+- ServiceManager.apply, which restarts every service in dependency order.
+    
+    python -m benchmarks.bench_service_control [--services 40] [--transition 0.3]
+"""
+import argparse
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.modules import ServiceManager  # noqa: E402
+
+
+def setup(count: int, transition: float, latency: float) -> fake_wmi.ServiceStateMachine:
+    fake_wmi.clear()
+    rows = fake_wmi.make_services(count, running=1.0)
+    # Chains of four: svc1 depends on svc0, svc2 on svc1, ...
+    dependencies = {
+        f"svc{index}": [f"svc{index - 1}"]
+        for index in range(count // 4) if index % 4
+    }
+    machine = fake_wmi.simulate_services(rows, dependencies, transition=transition)
+    fake_wmi.set_latency(latency)
+    return machine
+
+
+def running(count: int) -> int:
+    fake_wmi.set_latency(0)
+    return sum(1 for row in fake_wmi._instances["win32_service"] if row["State"] == "Running")
+
+
+def blind(manager: ServiceManager, names) -> None:
+    for name in names:
+        service = manager.wrapper.get_services(Name=name)[0]
+        service.StopService()
+        service = manager.wrapper.get_services(Name=name)[0]
+        service.StartService()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", type=int, default=40)
+    parser.add_argument("--transition", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+    names = [f"svc{index}" for index in range(args.services)]
+    
+    setup(args.services, args.transition, args.latency)
+    start = time.perf_counter()
+    blind(ServiceManager(), names)
+    elapsed = time.perf_counter() - start
+    queries = fake_wmi.stats.queries
+    time.sleep(args.transition * 2)
+    print(f"blind stop/start   {elapsed:6.2f} s   {queries:4d} queries   "
+          f"{running(args.services)}/{args.services} running afterwards")
+    
+    setup(args.services, args.transition, args.latency)
+    start = time.perf_counter()
+    results = ServiceManager().apply(dict.fromkeys(names, "restart"), max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+    queries = fake_wmi.stats.queries
+    ok = sum(1 for result in results if result.ok)
+    slowest = max(results, key=lambda result: result.queued + result.elapsed)
+    print(f"apply (restart)    {elapsed:6.2f} s   {queries:4d} queries   "
+          f"{running(args.services)}/{args.services} running afterwards, {ok} ok; "
+          f"slowest {slowest.name}: queued {slowest.queued:.2f} s, {slowest.elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
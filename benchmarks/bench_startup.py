@@ -0,0 +1,193 @@
+"""
+Startup time budget for the wmi-cli and wmi-agent entry points.
+
+Runs each scenario in a fresh interpreter under ``python -X importtime``
+and reports the wall time and the import time spent once the ``src``
+package starts loading. Budgets are multiples of the wall time of
+``python -X importtime -c pass`` on the same machine, so they hold on
+fast and slow machines alike. Exits with status 1 when a scenario exceeds
+its import budget or loads a module it must not need (the agent framework
+for wmi-cli, Rich tables for ``version``, wmi/pythoncom anywhere);
+tests/test_startup.py asserts the same.
+    
+    python -m benchmarks.bench_startup [--runs 5] [--budget-scale 1.0]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLI = "from src.wmi_cli.cli import app; app(prog_name='wmi-cli')"
+AGENT = "from src.cli_agent import cli_main; sys.argv[0] = 'wmi-agent'; cli_main()"
+
+# Needed by no scenario below; wmi/pythoncom load on the first query
+HEAVY = ["agent_framework", "openai", "pydantic", "http.server", "wmi", "pythoncom"]
+
+# (label, entry point, arguments, import budget as a multiple of the
+# baseline interpreter's wall time, forbidden modules)
+SCENARIOS: List[Tuple[str, str, List[str], float, List[str]]] = [
+    ("wmi-cli version", CLI, ["version"], 3.0,
+     HEAVY + ["dotenv", "pygments", "rich.table", "rich.panel", "rich.live", "ctypes",
+              "src.wmi_cli.modules", "src.wmi_cli.frame"]),
+    ("wmi-cli admin-check", CLI, ["admin-check"], 3.0,
+     HEAVY + ["dotenv", "pygments", "rich.table", "rich.live",
+              "src.wmi_cli.modules", "src.wmi_cli.frame"]),
+    # Typer renders help with Rich (tables and pygments included)
+    ("wmi-cli --help", CLI, ["--help"], 5.0, HEAVY + ["dotenv", "src.wmi_cli.modules"]),
+    ("wmi-agent --help", AGENT, ["--help"], 2.0, HEAVY + ["rich"]),
+]
+
+
+@dataclass
+class StartupResult:
+    """Best of several runs of one scenario."""
+    
+    label: str
+    wall: float
+    import_ms: float
+    budget: float
+    modules: Dict[str, float]
+    unexpected: List[str]
+    
+    @property
+    def ok(self) -> bool:
+        return self.import_ms <= self.budget and not self.unexpected
+
+
+# Prints the loaded modules at exit, after the command ran
+PRELUDE = (
+    "import atexit, sys; "
+    "atexit.register(lambda: sys.stderr.write('\\nMODULES ' + ' '.join(sys.modules) + '\\n')); "
+)
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Sum the import time of top-level imports from the first 'src' import on.
+    
+    Returns:
+        (total ms, cumulative ms per top-level module)
+    """
+    total = 0.0
+    modules: Dict[str, float] = {}
+    started = False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        name = name.strip()
+        if name.startswith("src"):
+            started = True
+        if started:
+            ms = int(cumulative) / 1000
+            total += ms
+            modules[name] = modules.get(name, 0.0) + ms
+    return total, modules
+
+
+def run_scenario(code: str, args: List[str]) -> Tuple[float, float, Dict[str, float], List[str]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PRELUDE + code, *args],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall = (time.perf_counter() - start) * 1000
+    if result.returncode:
+        raise RuntimeError(f"{code} {' '.join(args)} failed:\n{result.stderr[-2000:]}")
+    import_ms, modules = parse_importtime(result.stderr)
+    loaded: List[str] = []
+    for line in result.stderr.splitlines():
+        if line.startswith("MODULES "):
+            loaded = line.split()[1:]
+    return wall, import_ms, modules, loaded
+
+
+def check_forbidden(loaded: List[str], forbidden: List[str]) -> List[str]:
+    names = set(loaded)
+    return [
+        module for module in forbidden
+        if module in names or any(name.startswith(module + ".") for name in names)
+    ]
+
+
+def baseline_ms(runs: int = 5) -> float:
+    """Best wall time (ms) of an interpreter that imports nothing."""
+    return min(_baseline_run() for _ in range(runs))
+
+
+def _baseline_run() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], cwd=ROOT, capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def check_startup(
+    runs: int = 5,
+    budget_scale: float = 1.0
+) -> Tuple[float, List[StartupResult]]:
+    """
+    Run every scenario against budgets scaled to the baseline interpreter.
+    
+    Baseline and scenario runs are interleaved so a busy machine slows
+    both alike.
+    
+    Returns:
+        (baseline wall ms, result per scenario)
+    """
+    baselines = []
+    measured: List[list] = [[] for _ in SCENARIOS]
+    for _ in range(runs):
+        baselines.append(_baseline_run())
+        for runs_of, (_, code, cli_args, _, _) in zip(measured, SCENARIOS):
+            runs_of.append(run_scenario(code, cli_args))
+    baseline = min(baselines)
+    
+    results = []
+    for runs_of, (label, _, _, budget, forbidden) in zip(measured, SCENARIOS):
+        best = min(runs_of, key=lambda run: run[1])
+        results.append(StartupResult(
+            label=label,
+            wall=min(run[0] for run in runs_of),
+            import_ms=best[1],
+            budget=budget * baseline * budget_scale,
+            modules=best[2],
+            unexpected=check_forbidden(best[3], forbidden),
+        ))
+    return baseline, results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiply the import budgets (for slower machines)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports to show")
+    args = parser.parse_args(argv)
+    
+    baseline, results = check_startup(args.runs, args.budget_scale)
+    print(f"baseline interpreter {baseline:.1f} ms")
+    failures = 0
+    for result in results:
+        status = "ok" if result.ok else "FAIL"
+        failures += not result.ok
+        print(f"{result.label:<22} wall {result.wall:7.1f} ms   imports {result.import_ms:7.1f} ms "
+              f"(budget {result.budget:.0f} ms)   {status}")
+        slowest = sorted(result.modules.items(), key=lambda item: -item[1])[:args.top]
+        print("    " + ", ".join(f"{name} {ms:.1f}" for name, ms in slowest))
+        if result.unexpected:
+            print(f"    unexpected modules: {', '.join(result.unexpected)}")
+    
+    if failures:
+        print(f"\n{failures} scenario(s) over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
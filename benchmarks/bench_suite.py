@@ -0,0 +1,475 @@
+"""
+Regression benchmark suite.
+
+Times the wrapper, the object converters, every CLI command's rendering,
+every read-only module call and every agent tool against the fake WMI
+service with the collection classes (processes, services, event log,
+accounts...) scaled to each dataset size. Queries have no simulated
+latency, so the numbers are the Python-side cost of each code path.
+
+Results can be saved as a named baseline under benchmarks/baselines/ and
+later runs compared against it; the comparison exits with status 1 when
+a case got slower than the threshold allows. Baselines are only
+comparable on the machine that recorded them, and sub-millisecond cases
+can vary by more than the default threshold on shared or virtual
+machines; rerun flagged cases with --filter and a larger --min-time.
+    
+    python -m benchmarks.bench_suite [--sizes 10,1000,10000] [--filter cli.]
+                                     [--save NAME] [--compare NAME] [--threshold 1.25]
+
+Cases that mutate state (starting services, terminating processes) and
+long-running commands (watch, serve-metrics, fleet-query, top --live)
+are not included.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from . import fake_wmi
+
+fake_wmi.install()
+# Keep the class catalog out of the user's cache directory
+os.environ.setdefault("WMI_CLI_CATALOG_DIR", tempfile.mkdtemp(prefix="wmi-cli-catalog-"))
+
+from typer.testing import CliRunner  # noqa: E402
+
+from src import wmi_tools  # noqa: E402
+from src.wmi_cli import cli  # noqa: E402
+from src.wmi_cli.convert import objects_to_dicts  # noqa: E402
+from src.wmi_cli.modules import (  # noqa: E402
+    EventLogReader,
+    HardwareInfo,
+    NetworkManager,
+    NetworkSampler,
+    ProcessManager,
+    ProcessSampler,
+    SecurityManager,
+    ServiceManager,
+    SystemMonitor,
+)
+from src.wmi_cli.wmi_wrapper import WMIWrapper, wmi_object_to_dict  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_SIZES = [10, 1000, 10000]
+
+Setup = Callable[[int], Callable[[], Any]]
+
+
+@dataclass
+class Case:
+    """A benchmarked code path; setup(size) returns the callable to time."""
+    
+    name: str
+    setup: Setup
+    scaled: bool = True
+
+
+CASES: List[Case] = []
+
+
+def case(name: str, scaled: bool = True) -> Callable[[Setup], Setup]:
+    """Register a benchmark case."""
+    def register(setup: Setup) -> Setup:
+        CASES.append(Case(name, setup, scaled))
+        return setup
+    return register
+
+
+# --- dataset -------------------------------------------------------------
+
+
+def load_dataset(size: int):
+    """Install fixtures with every collection class holding ``size`` instances."""
+    fake_wmi.clear()
+    fake_wmi.set_instances("Win32_OperatingSystem", [{
+        "Caption": "Fake Windows", "Version": "10.0.22631", "OSArchitecture": "64-bit",
+        "BuildNumber": "22631", "FreePhysicalMemory": "4000000",
+        "TotalVisibleMemorySize": "16000000", "LastBootUpTime": "20240101120000.000000+000",
+    }])
+    fake_wmi.set_instances("Win32_ComputerSystem", [{
+        "Name": "FAKE", "Manufacturer": "Fake Inc.", "Model": "Bench", "SystemType": "x64-based PC",
+        "TotalPhysicalMemory": str(16 * 1024 ** 3), "NumberOfLogicalProcessors": 8,
+    }])
+    fake_wmi.set_instances("Win32_BIOS", [{"Version": "1.0", "SerialNumber": "0000"}])
+    fake_wmi.set_instances("Win32_Processor", [{
+        "Name": "Fake CPU", "Manufacturer": "Fake", "NumberOfCores": 4,
+        "NumberOfLogicalProcessors": 8, "MaxClockSpeed": 3000, "CurrentClockSpeed": 2500,
+        "LoadPercentage": 12,
+    }])
+    fake_wmi.set_instances("Win32_PhysicalMemory", [
+        {"BankLabel": f"BANK {i}", "Capacity": str(8 * 1024 ** 3), "Speed": 4800} for i in range(2)
+    ])
+    fake_wmi.set_instances("Win32_LogicalDisk", [
+        {"DeviceID": f"{letter}:", "Name": f"{letter}:", "VolumeName": "Data", "FileSystem": "NTFS",
+         "DriveType": 3, "Size": str(500 * 1024 ** 3), "FreeSpace": str(100 * 1024 ** 3)}
+        for letter in "CDEF"
+    ])
+    fake_wmi.set_instances("Win32_NetworkAdapterConfiguration", [
+        {"Description": f"Adapter {i}", "MACAddress": f"00:11:22:33:44:{i:02d}", "DHCPEnabled": True,
+         "IPAddress": (f"10.0.0.{i + 2}",), "IPSubnet": ("255.0.0.0",),
+         "DefaultIPGateway": ("10.0.0.1",), "DNSServerSearchOrder": ("10.0.0.1",), "IPEnabled": True}
+        for i in range(2)
+    ])
+    fake_wmi.set_instances(
+        "Win32_PerfRawData_Tcpip_NetworkInterface", fake_wmi.make_network_interfaces()
+    )
+    for name in ("Win32_BaseBoard", "Win32_VideoController", "Win32_SoundDevice",
+                 "Win32_USBController", "Win32_Printer", "Win32_Battery"):
+        fake_wmi.set_instances(name, [{"Name": f"{name} 0", "Manufacturer": "Fake", "Status": "OK"}])
+    fake_wmi.set_instances("Win32_NTEventlogFile", [
+        {"LogfileName": log, "NumberOfRecords": size, "FileSize": str(size * 512)}
+        for log in ("Application", "Security", "System")
+    ])
+    
+    fake_wmi.set_instances("Win32_Process", fake_wmi.make_processes(size))
+    fake_wmi.set_instances("Win32_PerfRawData_PerfProc_Process", fake_wmi.make_perf_processes(size))
+    fake_wmi.set_instances("Win32_Service", [
+        {"Name": f"svc{i}", "DisplayName": f"Service {i}", "State": "Running" if i % 3 else "Stopped",
+         "StartMode": "Auto" if i % 2 else "Manual", "Status": "OK", "ProcessId": 1000 + i,
+         "Description": f"Benchmark service {i}", "PathName": f"C:\\Windows\\svc{i}.exe"}
+        for i in range(size)
+    ])
+    fake_wmi.set_instances("Win32_NTLogEvent", [
+        {"Logfile": "System", "RecordNumber": i, "EventType": 1 if i % 3 == 0 else 3,
+         "Type": "Error" if i % 3 == 0 else "Information", "EventCode": 7000 + i % 5,
+         "SourceName": "Service Control Manager", "Message": f"event {i}",
+         "TimeGenerated": "20240101120000.000000-000"}
+        for i in range(size, 0, -1)
+    ])
+    for name in ("Win32_UserAccount", "Win32_Group"):
+        fake_wmi.set_instances(name, [
+            {"Name": f"{name[6:].lower()}{i}", "Domain": "FAKE", "SID": f"S-1-5-21-{i}",
+             "LocalAccount": True, "Disabled": False}
+            for i in range(size)
+        ])
+    fake_wmi.set_instances("Win32_LoggedOnUser", [
+        {"Antecedent": f"user{i}", "Dependent": f"session{i}"} for i in range(size)
+    ])
+    fake_wmi.set_instances("Win32_Share", [
+        {"Name": f"share{i}", "Path": f"C:\\share{i}", "Type": 0} for i in range(size)
+    ])
+    fake_wmi.set_instances("Win32_StartupCommand", [
+        {"Name": f"app{i}", "Command": f"C:\\app{i}.exe", "Location": "HKLM\\Run", "User": "Public"}
+        for i in range(size)
+    ])
+
+
+# --- wrapper and converters ----------------------------------------------
+
+
+@case("wrapper.query")
+def _wrapper_query(size):
+    wrapper = WMIWrapper()
+    return lambda: wrapper.query("SELECT * FROM Win32_Process")
+
+
+@case("wrapper.query.projected")
+def _wrapper_query_projected(size):
+    wrapper = WMIWrapper()
+    return lambda: wrapper.get_processes(["Name", "ProcessId", "WorkingSetSize"])
+
+
+@case("wrapper.iter_query")
+def _wrapper_iter_query(size):
+    wrapper = WMIWrapper()
+    return lambda: sum(1 for _ in wrapper.iter_query("SELECT Name, ProcessId FROM Win32_Process"))
+
+
+@case("wrapper.query_frame")
+def _wrapper_query_frame(size):
+    wrapper = WMIWrapper()
+    return lambda: wrapper.query_frame("SELECT Name, ProcessId, WorkingSetSize FROM Win32_Process")
+
+
+@case("convert.wmi_object_to_dict")
+def _convert_object(size):
+    objects = WMIWrapper().query("SELECT * FROM Win32_Process")
+    return lambda: [wmi_object_to_dict(obj) for obj in objects]
+
+
+@case("convert.objects_to_dicts")
+def _convert_objects(size):
+    objects = WMIWrapper().query("SELECT * FROM Win32_Process")
+    return lambda: objects_to_dicts(objects)
+
+
+@case("cli._display_table")
+def _display_table(size):
+    objects = WMIWrapper().get_services(["Name", "DisplayName", "State", "StartMode", "Status"])
+    
+    def run():
+        with open(os.devnull, "w") as devnull:
+            console, cli.console = cli.console, cli.Console(file=devnull, width=160)
+            try:
+                cli._display_table(objects, "Services")
+            finally:
+                cli.console = console
+    return run
+
+
+# --- CLI commands --------------------------------------------------------
+
+
+def _command(*args: str) -> Setup:
+    def setup(size):
+        runner = CliRunner()
+        
+        def run():
+            result = runner.invoke(cli.app, list(args), env={"COLUMNS": "160"})
+            if result.exit_code:
+                raise RuntimeError(f"wmi-cli {' '.join(args)} failed: {result.output}")
+        return run
+    return setup
+
+
+for _name, _args, _scaled in (
+    ("query", ["query", "SELECT Name, ProcessId, ThreadCount FROM Win32_Process"], True),
+    ("list-classes", ["list-classes"], False),
+    ("class-info", ["class-info", "Win32_Process"], False),
+    ("services", ["services"], True),
+    ("services.json", ["services", "--output-format", "json"], True),
+    ("processes", ["processes"], True),
+    ("ptree", ["ptree", "--output-format", "json"], True),
+    ("events", ["events", "-n", "100"], True),
+    ("top", ["top", "--interval", "0"], True),
+    ("system-info", ["system-info"], False),
+    ("inventory", ["inventory", "--output-format", "json"], False),
+    ("disks", ["disks"], False),
+    ("network", ["network"], False),
+    ("net-stats", ["net-stats", "--interval", "0"], False),
+    ("admin-check", ["admin-check"], False),
+    ("version", ["version"], False),
+):
+    case(f"cli.{_name}", _scaled)(_command(*_args))
+
+
+# --- modules -------------------------------------------------------------
+
+
+def _method(name: str, factory: Callable[[], Any], method: str, *args, scaled: bool = True, **kwargs):
+    def setup(size):
+        bound = getattr(factory(), method)
+        return lambda: bound(*args, **kwargs)
+    case(f"modules.{name}.{method}", scaled)(setup)
+
+
+_method("ServiceManager", ServiceManager, "list_services")
+_method("ServiceManager", ServiceManager, "get_service_status", "svc1")
+_method("ServiceManager", ServiceManager, "get_stopped_auto_services")
+_method("ProcessManager", ProcessManager, "get_process_by_name", "process1.exe")
+_method("ProcessManager", ProcessManager, "get_process_info", 8)
+_method("ProcessManager", ProcessManager, "get_high_memory_processes", 100)
+_method("ProcessManager", ProcessManager, "get_process_frame", ["Name", "ProcessId", "WorkingSetSize"])
+_method("ProcessManager", ProcessManager, "get_high_memory_frame", 100, ["Name", "ProcessId"])
+_method("ProcessManager", ProcessManager, "get_process_tree")
+_method("SystemMonitor", SystemMonitor, "get_cpu_info", scaled=False)
+_method("SystemMonitor", SystemMonitor, "get_memory_info", scaled=False)
+_method("SystemMonitor", SystemMonitor, "get_disk_usage", scaled=False)
+_method("SystemMonitor", SystemMonitor, "get_uptime", scaled=False)
+_method("ProcessSampler", ProcessSampler, "sample")
+
+
+@case("modules.ProcessSampler.top")
+def _sampler_top(size):
+    sampler = ProcessSampler()
+    sampler.sample()
+    sampler.sample()
+    return lambda: sampler.top(20, by="cpu")
+
+
+_method("NetworkManager", NetworkManager, "get_active_adapters", scaled=False)
+_method("NetworkManager", NetworkManager, "get_adapter_by_description", "Adapter 0", scaled=False)
+_method("NetworkManager", NetworkManager, "get_network_statistics", scaled=False)
+_method("NetworkSampler", NetworkSampler, "sample", scaled=False)
+_method("EventLogReader", EventLogReader, "get_event_logs", scaled=False)
+_method("EventLogReader", EventLogReader, "get_recent_events", "System", limit=100)
+_method("EventLogReader", EventLogReader, "get_events_page", "System", before_record=100, page_size=50)
+_method("EventLogReader", EventLogReader, "tail", "System", since_record=1, max_events=1000)
+for _name in ("get_motherboard_info", "get_video_controllers", "get_sound_devices",
+              "get_usb_controllers", "get_printers", "get_battery_status"):
+    _method("HardwareInfo", HardwareInfo, _name, scaled=False)
+for _name in ("get_user_accounts", "get_groups", "get_logged_on_users", "get_shares",
+              "get_startup_programs"):
+    _method("SecurityManager", SecurityManager, _name)
+
+
+# --- agent tools ---------------------------------------------------------
+
+
+def _tool(tool: Any, scaled: bool = True, **kwargs):
+    def setup(size):
+        wmi_tools._init_wmi()
+        
+        def run():
+            # Every call is the first of a new agent turn, with no cached
+            # perf counters (their 1s TTL would make timings bimodal)
+            wmi_tools.begin_turn()
+            wmi_tools._wrapper.cache.invalidate()
+            return tool(**kwargs)
+        return run
+    case(f"tools.{tool.name}", scaled)(setup)
+
+
+_tool(wmi_tools.get_system_info, scaled=False)
+_tool(wmi_tools.get_memory_info, scaled=False)
+_tool(wmi_tools.get_cpu_info, scaled=False)
+_tool(wmi_tools.get_disk_info, scaled=False)
+_tool(wmi_tools.get_network_info, scaled=False)
+_tool(wmi_tools.get_network_throughput, scaled=False)
+_tool(wmi_tools.get_uptime, scaled=False)
+_tool(wmi_tools.check_admin_privileges, scaled=False)
+_tool(wmi_tools.list_services, state="Running")
+_tool(wmi_tools.get_service_status, service_name="svc1")
+_tool(wmi_tools.list_processes)
+_tool(wmi_tools.get_process_performance)
+_tool(wmi_tools.execute_wql_query, query="SELECT Name, ProcessId FROM Win32_Process")
+
+
+# --- runner --------------------------------------------------------------
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    """
+    Time ``func`` like timeit: loops per repeat grow until one repeat takes
+    at least ``min_time``; the per-call min and median over repeats are returned.
+    Like timeit, the garbage collector is disabled while timing.
+    """
+    func()
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(func, repeat, min_time)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - start) / loops)
+    return {"min": min(timings), "median": statistics.median(timings), "loops": loops}
+
+
+def run(sizes: List[int], pattern: Optional[str], repeat: int, min_time: float) -> Dict[str, Dict]:
+    """Run the selected cases; results are keyed 'name' or 'name[size]'."""
+    selected = [c for c in CASES if not pattern or pattern in c.name]
+    results = {}
+    for index, size in enumerate(sizes):
+        cases = [c for c in selected if c.scaled or index == 0]
+        if not cases:
+            continue
+        load_dataset(size)
+        for bench in cases:
+            key = f"{bench.name}[{size}]" if bench.scaled else bench.name
+            results[key] = measure(bench.setup(size), repeat, min_time)
+            print(f"{key:<58} {results[key]['min'] * 1000:>11.3f} ms", flush=True)
+    return results
+
+
+def machine_info() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.machine(),
+    }
+
+
+def baseline_path(name: str) -> str:
+    return name if name.endswith(".json") else os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name: str, results: Dict[str, Dict], sizes: List[int]):
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "sizes": sizes,
+        "results": {key: {k: round(v, 9) for k, v in value.items()} for key, value in sorted(results.items())},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+        f.write("\n")
+    print(f"\nSaved baseline {path}")
+
+
+def compare(name: str, results: Dict[str, Dict], threshold: float) -> int:
+    """Print per-case ratios against a baseline; returns the number of regressions."""
+    with open(baseline_path(name), encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["machine"] != machine_info():
+        print(f"\nWarning: baseline recorded on {baseline['machine']}, ratios are only indicative")
+    
+    regressions = improvements = 0
+    print(f"\n{'case':<58} {'baseline':>11} {'current':>11} {'ratio':>7}")
+    for key, current in results.items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            print(f"{key:<58} {'-':>11} {current['min'] * 1000:>8.3f} ms {'new':>7}")
+            continue
+        ratio = current["min"] / previous["min"] if previous["min"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  SLOWER"
+        elif ratio < 1 / threshold:
+            improvements += 1
+            flag = "  faster"
+        print(f"{key:<58} {previous['min'] * 1000:>8.3f} ms {current['min'] * 1000:>8.3f} ms "
+              f"{ratio:>6.2f}x{flag}")
+    print(f"\n{regressions} regressions, {improvements} improvements (threshold {threshold:g}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated dataset sizes (e.g. 10,1000,50000)")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds per repeat")
+    parser.add_argument("--save", metavar="NAME", help="Save results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Compare results with a baseline")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown ratio reported as a regression")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    args = parser.parse_args(argv)
+    
+    if args.list:
+        for bench in CASES:
+            print(f"{bench.name}{'' if bench.scaled else '  (not scaled)'}")
+        return
+    
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    results = run(sizes, args.filter, args.repeat, args.min_time)
+    if args.save:
+        save_baseline(args.save, results, sizes)
+    if args.compare and compare(args.compare, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
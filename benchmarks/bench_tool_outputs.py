@@ -0,0 +1,339 @@
+"""
+Agent prompt size benchmark for the structured tool results.
+
+Runs a set of canned questions through ``ChatAgent`` with a local stub chat
+client that issues scripted tool calls instead of calling a model, and
+adds up the prompt tokens every model call would have been sent: the
+instructions, the conversation so far, the tool calls and results, and the
+tool schemas. Tokens are estimated as characters / 4.
+
+The baseline is the previous prose tools (reproduced below for the tools
+the questions use), which answer with fixed truncation (20 services, 15
+processes, 5 query results x 10 properties) instead of fields and paging.
+    
+    python -m benchmarks.bench_tool_outputs [--services 250] [--processes 200]
+"""
+import argparse
+import asyncio
+import json
+from typing import Annotated, Dict, List, Optional, Tuple
+
+from pydantic import Field
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from agent_framework import (  # noqa: E402
+    BaseChatClient,
+    ChatAgent,
+    ChatMessage,
+    ChatResponse,
+    FunctionCallContent,
+    ai_function,
+    use_function_invocation,
+)
+
+from src import wmi_tools  # noqa: E402
+from src.agent import WMIAgent  # noqa: E402
+from src.wmi_cli.wmi_wrapper import format_bytes  # noqa: E402
+
+STOPPED_AUTO = "SELECT Name FROM Win32_Service WHERE State = 'Stopped' AND StartMode = 'Auto'"
+LARGEST = "SELECT * FROM Win32_Process WHERE ProcessId = {pid}"
+
+# (question, structured tool call rounds, prose tool call rounds); every
+# round is one model response with the tool calls it makes
+Rounds = List[List[Tuple[str, dict]]]
+QUESTIONS: List[Tuple[str, Rounds, Rounds]] = [
+    ("What's my memory usage?",
+     [[("get_memory_info", {})]],
+     [[("get_memory_info", {})]]),
+    ("What OS and BIOS version is this machine running?",
+     [[("get_system_info", {})]],
+     [[("get_system_info", {})]]),
+    ("Which 5 processes use the most CPU?",
+     [[("get_process_performance", {"limit": 5, "fields": "name,cpu_percent"})]],
+     [[("get_process_performance", {})]]),
+    ("What are the 10 largest processes?",
+     [[("list_processes", {"limit": 10})]],
+     [[("list_processes", {})]]),
+    ("Is the print spooler running?",
+     [[("get_service_status", {"service_name": "Spooler"})]],
+     [[("get_service_status", {"service_name": "Spooler"})]]),
+    ("How much free space is left on my drives?",
+     [[("get_disk_info", {})]],
+     [[("get_disk_info", {})]]),
+    # The prose list stops at 20 services and shows no start mode, so the
+    # model falls back to WQL, which shows 5 results at a time
+    ("Which automatic services are stopped?",
+     [[("list_services", {"state": "Stopped", "fields": "name,start_mode", "limit": 200})]],
+     [[("list_services", {"state": "Stopped"})],
+      [("execute_wql_query", {"query": STOPPED_AUTO})]]),
+    # The prose process list has no command lines and WQL shows the first
+    # 10 properties only
+    ("What command line is the largest process running with?",
+     [[("list_processes", {"limit": 1})],
+      [("execute_wql_query", {"query": LARGEST, "fields": "Name,CommandLine"})]],
+     [[("list_processes", {})],
+      [("execute_wql_query", {"query": LARGEST})]]),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _message_text(message: ChatMessage) -> str:
+    parts = []
+    for content in message.contents:
+        if isinstance(content, FunctionCallContent):
+            parts.append(f"{content.name}({json.dumps(content.arguments)})")
+        elif hasattr(content, "result"):
+            parts.append(str(content.result))
+        elif getattr(content, "text", None):
+            parts.append(content.text)
+    return "\n".join(parts)
+
+
+@use_function_invocation
+class ScriptedChatClient(BaseChatClient):
+    """Chat client that replays scripted tool calls and counts prompt tokens."""
+    
+    def __init__(self, script: Dict[str, Rounds], largest_pid: int, **kwargs):
+        super().__init__(**kwargs)
+        self.script = script
+        self.largest_pid = largest_pid
+        self.prompt_tokens = 0
+        self.schema_tokens = 0
+        self.result_tokens = 0
+        self.calls = 0
+    
+    async def _inner_get_response(self, *, messages, chat_options, **kwargs) -> ChatResponse:
+        self.calls += 1
+        schemas = json.dumps([tool.to_json_schema_spec() for tool in chat_options.tools or []])
+        self.schema_tokens += estimate_tokens(schemas)
+        prompt = schemas + "".join(_message_text(message) for message in messages)
+        # Tool results are counted once here, when they first reach the model
+        if messages[-1].role.value == "tool":
+            self.result_tokens += estimate_tokens(_message_text(messages[-1]))
+        if chat_options.instructions:
+            prompt += chat_options.instructions
+        self.prompt_tokens += estimate_tokens(prompt)
+        
+        question = next(m.text for m in reversed(messages) if m.role.value == "user")
+        done = sum(
+            any(isinstance(content, FunctionCallContent) for content in message.contents)
+            for message in messages
+        )
+        rounds = self.script[question]
+        if done == len(rounds):
+            return ChatResponse(messages=ChatMessage("assistant", text="Done."))
+        calls = [
+            FunctionCallContent(
+                call_id=f"call{done}-{index}", name=name,
+                arguments={key: value.format(pid=self.largest_pid) if isinstance(value, str) else value
+                           for key, value in arguments.items()},
+            )
+            for index, (name, arguments) in enumerate(rounds[done])
+        ]
+        return ChatResponse(messages=ChatMessage("assistant", contents=calls))
+    
+    async def _inner_get_streaming_response(self, *, messages, chat_options, **kwargs):
+        raise NotImplementedError
+        yield
+
+
+# --- the previous prose tools ------------------------------------------------
+
+@ai_function(name="get_memory_info", description="Get memory usage information including total, used, and available memory")
+def legacy_memory_info() -> str:
+    info = wmi_tools._system_mon.get_memory_info()
+    result = "Memory Information:\n"
+    result += f"  Total: {format_bytes(info['total_bytes'])}\n"
+    result += f"  Used: {format_bytes(info['used_bytes'])}\n"
+    result += f"  Free: {format_bytes(info['free_bytes'])}\n"
+    result += f"  Usage: {info['used_percentage']:.1f}%\n"
+    return result
+
+
+@ai_function(name="get_system_info", description="Get detailed system information including OS, hardware, and BIOS details")
+def legacy_system_info() -> str:
+    wrapper = wmi_tools._wrapper
+    os_info = wrapper.get_operating_system(["Caption", "Version", "OSArchitecture"])
+    cs_info = wrapper.get_computer_system(["Name", "Manufacturer", "Model", "TotalPhysicalMemory"])
+    bios_info = wrapper.get_bios(["Version", "SerialNumber"])
+    result = "System Information:\n"
+    result += f"  OS: {os_info.Caption} {os_info.Version}\n"
+    result += f"  Computer: {cs_info.Name}\n"
+    result += f"  Manufacturer: {cs_info.Manufacturer}\n"
+    result += f"  Model: {cs_info.Model}\n"
+    result += f"  Architecture: {os_info.OSArchitecture}\n"
+    result += f"  Memory: {format_bytes(int(cs_info.TotalPhysicalMemory))}\n"
+    result += f"  BIOS: {bios_info.Version}\n"
+    result += f"  Serial Number: {bios_info.SerialNumber}\n"
+    return result
+
+
+@ai_function(name="get_process_performance", description="Get process CPU and memory usage with performance metrics")
+def legacy_process_performance() -> str:
+    wmi_tools._process_sampler.measure(interval=1.0)
+    result = "Process Performance (Top 15 by CPU Usage):\n\n"
+    for i, proc in enumerate(wmi_tools._process_sampler.top(15, by="cpu"), 1):
+        result += f"  {i}. {proc['name']} (PID: {proc['pid']})\n"
+        result += f"     CPU: {proc['cpu_percent'] or 0:.1f}%\n"
+        result += f"     Memory: {proc['working_set'] / (1024 * 1024):.1f} MB\n\n"
+    return result
+
+
+@ai_function(name="list_processes", description="List running processes")
+def legacy_list_processes() -> str:
+    processes = wmi_tools._process_mgr.get_process_frame(["Name", "ProcessId", "WorkingSetSize"])
+    result = "Running Processes (Top 15 by Memory):\n"
+    for i, proc in enumerate(processes.top(15, "WorkingSetSize"), 1):
+        result += f"  {i}. {proc['Name']} (PID: {proc['ProcessId']})\n"
+        result += f"     Memory: {(proc['WorkingSetSize'] or 0) / (1024 * 1024):.1f} MB\n"
+    return result
+
+
+@ai_function(name="list_services", description="List Windows services with optional filtering")
+def legacy_list_services(
+    state: Annotated[Optional[str], Field(description="Filter by state: 'Running' or 'Stopped'")] = None
+) -> str:
+    services = wmi_tools._wrapper.get_services(
+        ["Name", "DisplayName", "State", "StartMode", "Status"], **({"State": state} if state else {})
+    )
+    result = f"Windows Services ({len(services)}):\n"
+    for i, svc in enumerate(services[:20], 1):
+        result += f"  {i}. {svc.Name} - {svc.State}\n"
+        result += f"     Display: {svc.DisplayName}\n"
+    if len(services) > 20:
+        result += f"\n  ... and {len(services) - 20} more services\n"
+    return result
+
+
+@ai_function(name="get_service_status", description="Get status of a specific Windows service")
+def legacy_service_status(
+    service_name: Annotated[str, Field(description="Name of the service to query")]
+) -> str:
+    services = wmi_tools._wrapper.get_services(
+        ["Name", "DisplayName", "State", "StartMode", "Status"], Name=service_name
+    )
+    if not services:
+        return f"Service '{service_name}' not found"
+    svc = services[0]
+    result = f"Service: {svc.Name}\n"
+    result += f"  Display Name: {svc.DisplayName}\n"
+    result += f"  State: {svc.State}\n"
+    result += f"  Start Mode: {svc.StartMode}\n"
+    result += f"  Status: {svc.Status}\n"
+    return result
+
+
+@ai_function(name="get_disk_info", description="Get disk drive information including size, free space, and usage")
+def legacy_disk_info() -> str:
+    result = "Disk Drives:\n"
+    for disk in wmi_tools._wrapper.get_logical_disks(["Name", "Size", "FreeSpace", "FileSystem"], DriveType=3):
+        free_space, total_space = int(disk.FreeSpace), int(disk.Size)
+        result += f"  {disk.Name}:\n"
+        result += f"    Size: {format_bytes(total_space)}\n"
+        result += f"    Free: {format_bytes(free_space)}\n"
+        result += f"    Used: {(total_space - free_space) / total_space * 100:.1f}%\n"
+        result += f"    File System: {disk.FileSystem}\n"
+    return result
+
+
+@ai_function(name="execute_wql_query", description="Execute a custom WQL query")
+def legacy_wql_query(
+    query: Annotated[str, Field(description="WQL query to execute (e.g., 'SELECT * FROM Win32_Service')")]
+) -> str:
+    results = list(wmi_tools._wrapper.iter_query(query, batch_size=6, limit=6))
+    if len(results) > 5:
+        result = "Query Results (more than 5, showing first 5):\n"
+    else:
+        result = f"Query Results ({len(results)} total):\n"
+    for i, item in enumerate(results[:5], 1):
+        result += f"\n  Result {i}:\n"
+        for prop in list(item.properties.keys())[:10]:
+            value = getattr(item, prop)
+            if value is not None:
+                result += f"    {prop}: {value}\n"
+    return result
+
+
+LEGACY_TOOLS = [
+    legacy_memory_info, legacy_system_info, legacy_process_performance, legacy_list_processes,
+    legacy_list_services, legacy_service_status, legacy_disk_info, legacy_wql_query,
+]
+
+
+def install_fixtures(services: int, processes: int):
+    fake_wmi.set_instances("Win32_OperatingSystem", [{
+        "Caption": "Microsoft Windows 11 Pro", "Version": "10.0.22631", "OSArchitecture": "64-bit",
+        "FreePhysicalMemory": "4000000", "LastBootUpTime": "20240101120000.000000+000",
+    }])
+    fake_wmi.set_instances("Win32_ComputerSystem", [{
+        "Name": "WORKSTATION", "Manufacturer": "Contoso", "Model": "Model 15",
+        "TotalPhysicalMemory": str(16 * 1024 ** 3), "NumberOfLogicalProcessors": 8,
+    }])
+    fake_wmi.set_instances("Win32_BIOS", [{"Version": "CONTOSO - 1072009", "SerialNumber": "5CG1234XYZ"}])
+    fake_wmi.set_instances("Win32_LogicalDisk", [
+        {"Name": drive, "DeviceID": drive, "DriveType": 3, "FileSystem": "NTFS",
+         "Size": str(512 * 1024 ** 3), "FreeSpace": str(free * 1024 ** 3)}
+        for drive, free in (("C:", 128), ("D:", 300))
+    ])
+    fake_wmi.set_instances("Win32_Service", [
+        {"Name": "Spooler" if i == 0 else f"Service{i}", "DisplayName": f"Example Service {i}",
+         "State": "Running" if i % 3 else "Stopped", "StartMode": "Auto", "Status": "OK"}
+        for i in range(services)
+    ])
+    fake_wmi.set_instances("Win32_Process", fake_wmi.make_processes(processes))
+    fake_wmi.set_instances(
+        "Win32_PerfRawData_PerfProc_Process", fake_wmi.make_perf_processes(processes)
+    )
+
+
+async def run_questions(tools: list, script: Dict[str, Rounds], largest_pid: int) -> ScriptedChatClient:
+    client = ScriptedChatClient(script, largest_pid)
+    agent = ChatAgent(chat_client=client, instructions=WMIAgent.DEFAULT_INSTRUCTIONS, tools=tools)
+    for question in script:
+        wmi_tools.begin_turn()
+        await agent.run(question)
+    return client
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", type=int, default=250)
+    parser.add_argument("--processes", type=int, default=200)
+    args = parser.parse_args(argv)
+    
+    install_fixtures(args.services, args.processes)
+    wmi_tools._init_wmi()
+    names = {name for _, rounds, _ in QUESTIONS for calls in rounds for name, _ in calls}
+    largest_pid = wmi_tools._process_mgr.get_process_frame(
+        ["ProcessId", "WorkingSetSize"]
+    ).top(1, "WorkingSetSize").column("ProcessId")[0]
+    structured_tools = [tool for tool in wmi_tools.get_wmi_tools() if tool.name in names]
+    
+    results = []
+    for label, tools, index in (("prose tools", LEGACY_TOOLS, 2), ("structured", structured_tools, 1)):
+        script = {question[0]: question[index] for question in QUESTIONS}
+        client = asyncio.run(run_questions(tools, script, largest_pid))
+        results.append((label, client.calls, client.result_tokens, client.schema_tokens,
+                        client.prompt_tokens))
+    
+    print(f"{len(QUESTIONS)} questions, {args.services} services, {args.processes} processes, "
+          f"output budget {wmi_tools.get_output_budget()} bytes")
+    print(f"{'tools':<14}{'model calls':>12}{'tool results':>14}{'tool schemas':>14}"
+          f"{'prompt total':>14}")
+    for label, calls, result_tokens, schema_tokens, prompt_tokens in results:
+        print(f"{label:<14}{calls:>12}{result_tokens:>14}{schema_tokens:>14}{prompt_tokens:>14}")
+    (_, _, old_results, old_schemas, old_total), (_, _, new_results, new_schemas, new_total) = results
+    print(f"Tool result tokens: {(1 - new_results / old_results) * 100:+.1f}% reduction, "
+          f"schema tokens: {new_schemas - old_schemas:+d}, "
+          f"prompt total: {(1 - new_total / old_total) * 100:+.1f}% reduction")
+    print("The prose tools still miss stopped services past the fifth WQL result and the "
+          "command line of the largest process.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Agent turn snapshot sharing benchmark.
+
+Runs a typical multi-tool turn (system info, memory, uptime, CPU, the
+service list and a few service lookups) with every fake WMI query sleeping
+for ``--latency`` seconds. The baseline starts a new turn before each tool
+so nothing is shared, which is how the tools behaved before snapshots;
+the shared turn awaits the async tools together, so tools reading the same
+class wait on one in-flight query instead of issuing their own.
+    
+    python -m benchmarks.bench_tool_snapshots [--latency 0.1]
+"""
+import argparse
+import asyncio
+import time
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src import wmi_tools  # noqa: E402
+
+TURN = [
+    ("get_system_info", {}),
+    ("get_memory_info", {}),
+    ("get_uptime", {}),
+    ("get_cpu_info", {}),
+    ("list_services", {"state": "Running"}),
+    ("get_service_status", {"service_name": "svc1"}),
+    ("get_service_status", {"service_name": "svc2"}),
+    ("get_service_status", {"service_name": "svc3"}),
+]
+
+
+def _load_fixtures():
+    fake_wmi.set_instances("Win32_OperatingSystem", [{
+        "Caption": "Fake Windows", "Version": "10.0.22631", "OSArchitecture": "64-bit",
+        "FreePhysicalMemory": "4000000", "LastBootUpTime": "20240101120000.000000+000",
+    }])
+    fake_wmi.set_instances("Win32_ComputerSystem", [{
+        "Name": "FAKE", "Manufacturer": "Fake", "Model": "Fake", "NumberOfLogicalProcessors": 16,
+        "TotalPhysicalMemory": str(16 * 1024 ** 3),
+    }])
+    fake_wmi.set_instances("Win32_BIOS", [{"Version": "1.0", "SerialNumber": "0000"}])
+    fake_wmi.set_instances("Win32_Processor", [{
+        "Name": "Fake CPU", "Manufacturer": "Fake", "NumberOfCores": 8,
+        "NumberOfLogicalProcessors": 16, "MaxClockSpeed": 3600,
+        "CurrentClockSpeed": 3000, "LoadPercentage": 12,
+    }])
+    fake_wmi.set_instances("Win32_Service", [
+        {"Name": f"svc{i}", "DisplayName": f"Service {i}", "State": "Running",
+         "StartMode": "Auto", "Status": "OK"}
+        for i in range(200)
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    
+    _load_fixtures()
+    fake_wmi.set_latency(args.latency)
+    sync_tools = {tool.name: tool for tool in wmi_tools.get_wmi_tools()}
+    async_tools = {tool.name: tool for tool in wmi_tools.get_wmi_tools(use_async=True)}
+    
+    queries = fake_wmi.stats.queries
+    start = time.perf_counter()
+    for name, kwargs in TURN:
+        wmi_tools.begin_turn()
+        sync_tools[name](**kwargs)
+    unshared = time.perf_counter() - start
+    unshared_queries = fake_wmi.stats.queries - queries
+    
+    async def run_turn():
+        return await asyncio.gather(*(async_tools[name](**kwargs) for name, kwargs in TURN))
+    
+    wmi_tools.begin_turn()
+    queries = fake_wmi.stats.queries
+    start = time.perf_counter()
+    outputs = asyncio.run(run_turn())
+    shared = time.perf_counter() - start
+    shared_queries = fake_wmi.stats.queries - queries
+    
+    errors = [output for output in outputs if '"error"' in output]
+    print(f"{len(TURN)} tool calls, {args.latency * 1000:.0f} ms per WMI query")
+    print(f"{'turn':<28}{'queries':>8}{'ms':>10}")
+    print(f"{'sequential, no sharing':<28}{unshared_queries:>8}{unshared * 1000:>10.1f}")
+    print(f"{'gathered, shared snapshots':<28}{shared_queries:>8}{shared * 1000:>10.1f}")
+    print(f"Cache stats: {wmi_tools.get_cache_stats()}")
+    if errors:
+        print(f"Tool errors: {errors}")
+    return 1 if errors or shared_queries >= unshared_queries else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
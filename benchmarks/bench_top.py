@@ -0,0 +1,109 @@
+"""
+Live top dashboard overhead benchmark.
+
+Simulates ``wmi-cli top --live`` against hundreds of fake processes whose
+raw counters advance one second per refresh, and reports the CPU time each
+refresh costs as a share of the refresh interval. The baseline reruns
+what ``wmi-cli processes`` does every time: a full Win32_Process
+enumeration rendered into a brand-new table.
+
+The dashboard is measured with none, some and all of the processes
+changing their working set on every refresh, since only changed rows are
+reformatted.
+
+CPU time includes the fake WMI service's query evaluation, which the real
+service does out of process, so the figures are an upper bound.
+    
+    python -m benchmarks.bench_top [--processes 500] [--refreshes 30] [--changing 0.1]
+"""
+import argparse
+import io
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from . import fake_wmi
+
+fake_wmi.install()
+
+from src.wmi_cli.convert import objects_to_dicts  # noqa: E402
+from src.wmi_cli.dashboard import ProcessDashboard  # noqa: E402
+from src.wmi_cli.modules import ProcessSampler  # noqa: E402
+from src.wmi_cli.wmi_wrapper import WMIWrapper, format_bytes  # noqa: E402
+
+
+def full_redraw(wrapper: WMIWrapper, console: Console):
+    # The pre-dashboard approach: enumerate everything, draw everything
+    table = Table(title="Running Processes")
+    for column in ("PID", "Name", "Threads", "Memory"):
+        table.add_column(column)
+    for proc in objects_to_dicts(wrapper.get_processes()):
+        table.add_row(
+            str(proc["ProcessId"]), proc["Name"], str(proc["ThreadCount"]),
+            format_bytes(int(proc["WorkingSetSize"])),
+        )
+    console.print(table)
+
+
+def perf_processes(processes: int, tick: int, changing: float) -> list:
+    """Counters after ``tick`` seconds; a ``changing`` share of processes grow their working set."""
+    rows = fake_wmi.make_perf_processes(processes, elapsed=float(tick))
+    # Spread the changing processes over the whole list, so some are in the top N
+    for index, row in enumerate(rows):
+        if index * 37 % 100 < changing * 100:
+            row["WorkingSet"] = str(int(row["WorkingSet"]) + tick * 1024 * 1024)
+    return rows
+
+
+def measure(refresh, processes: int, refreshes: int, changing: float = 0.0) -> float:
+    """Average CPU milliseconds per refresh; counter updates are excluded."""
+    cpu = 0.0
+    for tick in range(refreshes + 1):
+        fake_wmi.set_instances(
+            "Win32_PerfRawData_PerfProc_Process", perf_processes(processes, tick, changing)
+        )
+        start = time.process_time()
+        refresh()
+        if tick:
+            # The first refresh only establishes the baseline sample
+            cpu += time.process_time() - start
+    return cpu / refreshes * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=500)
+    parser.add_argument("--refreshes", type=int, default=30)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--changing", type=float, default=0.1,
+                        help="Share of processes changing on every refresh")
+    args = parser.parse_args(argv)
+    
+    fake_wmi.set_instances("Win32_Process", fake_wmi.make_processes(args.processes))
+    console = Console(file=io.StringIO(), width=120, force_terminal=True)
+    wrapper = WMIWrapper()
+    
+    results = [(
+        "full redraw", "-",
+        measure(lambda: full_redraw(wrapper, console), args.processes, args.refreshes),
+    )]
+    for changing in sorted({0.0, args.changing, 1.0}):
+        dashboard = ProcessDashboard(ProcessSampler(wrapper=wrapper, cpu_count=8), count=20)
+        
+        def live_refresh():
+            dashboard.refresh()
+            console.print(dashboard.render())
+        
+        ms = measure(live_refresh, args.processes, args.refreshes, changing)
+        results.append((f"dashboard {changing:.0%}", str(dashboard.last_diff["changed"]), ms))
+    
+    interval_ms = args.interval * 1000
+    print(f"Processes: {args.processes}, refreshes: {args.refreshes}, interval: {args.interval:g}s")
+    print(f"{'approach':<18}{'changed':>8}{'cpu ms/refresh':>16}{'cpu % of interval':>20}")
+    for label, changed, ms in results:
+        print(f"{label:<18}{changed:>8}{ms:>16.2f}{ms / interval_ms * 100:>19.2f}%")
+
+
+if __name__ == "__main__":
+    main()
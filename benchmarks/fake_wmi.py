@@ -0,0 +1,937 @@
+"""
+In-process fake of the ``wmi`` and ``pythoncom`` modules.
+
+``install()`` registers the fakes in ``sys.modules`` so that ``src.wmi_cli``
+can be imported on machines without WMI. Instances are plain dictionaries
+registered per class; queries are evaluated by a small WQL interpreter and
+every property value handed back to the caller is counted in ``stats`` to
+approximate the cost of marshalling it across COM.
+"""
+import datetime
+import queue
+import re
+import sys
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, List, Optional
+
+
+class FakeStats:
+    """Counters describing the work done by the fake WMI service."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.queries = 0
+        self.objects = 0
+        self.property_fetches = 0
+        self.attribute_reads = 0
+        self.method_lookups = 0
+        self.co_initialize = 0
+        self.co_uninitialize = 0
+        self.class_definitions = 0
+        self.method_calls = 0
+    
+    def record(self, objects: int, properties: int):
+        with self._lock:
+            self.queries += 1
+            self.objects += objects
+            self.property_fetches += properties
+
+
+stats = FakeStats()
+
+_instances: Dict[str, List[Dict[str, Any]]] = {}
+_methods: Dict[str, Dict[str, Callable]] = {}
+_keys: Dict[str, List[str]] = {}
+# Classes are registered case-insensitively; definitions use the given spelling
+_spellings: Dict[str, str] = {}
+_cim_types: Dict[str, Dict[str, int]] = {}
+_latency = {"query": 0.0}
+_services: Optional["ServiceStateMachine"] = None
+
+
+def set_instances(class_name: str, instances: List[Dict[str, Any]]):
+    """Register the instances returned for ``class_name``."""
+    _instances[class_name.lower()] = instances
+    _spellings[class_name.lower()] = class_name
+
+
+def set_method(class_name: str, method_name: str, func: Callable):
+    """Register a method callable as ``func(values, *args, **kwargs)``."""
+    _methods.setdefault(class_name.lower(), {})[method_name] = func
+
+
+def set_keys(class_name: str, keys: List[str]):
+    """Mark ``keys`` as the key properties of ``class_name``'s definition."""
+    _keys[class_name.lower()] = list(keys)
+
+
+def set_cim_types(class_name: str, types: Dict[str, str]):
+    """Declare CIM types (e.g. 'uint64') of properties of ``class_name``."""
+    codes = {name: code for code, name in _CIM_TYPE_NAMES.items()}
+    _cim_types[class_name.lower()] = {name: codes[kind] for name, kind in types.items()}
+
+
+def set_latency(seconds: float):
+    """Sleep ``seconds`` on every query to simulate a slow provider."""
+    _latency["query"] = seconds
+
+
+class x_wmi(Exception):
+    pass
+
+
+class x_wmi_timed_out(x_wmi):
+    pass
+
+
+class FakeWatcher:
+    """Mimics ``wmi._wmi_watcher``: calling it returns the next event."""
+    
+    def __init__(self, wql: str):
+        match = re.search(r"ISA\s+'(\w+)'", wql, re.IGNORECASE) or \
+            re.search(r"FROM\s+(\w+)", wql, re.IGNORECASE)
+        self.class_name = match.group(1).lower()
+        self.events: "queue.Queue[FakeWMIObject]" = queue.Queue()
+    
+    def __call__(self, timeout_ms: int = -1) -> "FakeWMIObject":
+        try:
+            return self.events.get(timeout=None if timeout_ms < 0 else timeout_ms / 1000)
+        except queue.Empty:
+            raise x_wmi_timed_out()
+
+
+_watchers: List[FakeWatcher] = []
+_watchers_lock = threading.Lock()
+
+
+def emit_event(
+    class_name: str,
+    kind: str,
+    values: Dict[str, Any],
+    previous: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Deliver an event to every watcher subscribed to ``class_name``.
+    
+    The WHERE clause of the subscription is not evaluated.
+    
+    Returns:
+        Number of watchers that received the event
+    """
+    with _watchers_lock:
+        targets = [w for w in _watchers if w.class_name == class_name.lower()]
+    for watcher in targets:
+        event = FakeWMIObject(class_name, dict(values))
+        event.__dict__["event_type"] = kind
+        event.__dict__["timestamp"] = time.time()
+        event.__dict__["previous"] = (
+            FakeWMIObject(class_name, dict(previous)) if previous is not None else None
+        )
+        watcher.events.put(event)
+    return len(targets)
+
+
+def clear():
+    """Drop all registered instances, methods and counters."""
+    with _watchers_lock:
+        _watchers.clear()
+    _instances.clear()
+    _methods.clear()
+    _keys.clear()
+    _cim_types.clear()
+    _spellings.clear()
+    _latency["query"] = 0.0
+    global _services
+    _services = None
+    stats.reset()
+
+
+class FakeWMIObject:
+    """A WMI instance carrying only the properties that were selected."""
+    
+    def __init__(self, class_name: str, values: Dict[str, Any]):
+        self.__dict__["_class_name"] = class_name
+        self.__dict__["_values"] = values
+        self.__dict__["properties"] = {name: None for name in values}
+    
+    def __getattr__(self, name: str) -> Any:
+        values = self.__dict__["_values"]
+        if name in values:
+            stats.attribute_reads += 1
+            return values[name]
+        methods = _methods.get(self.__dict__["_class_name"].lower(), {})
+        if name in methods:
+            # wmi builds a _wmi_method here, querying the method signature
+            stats.method_lookups += 1
+            return lambda *args, **kwargs: methods[name](values, *args, **kwargs)
+        raise AttributeError(name)
+    
+    @property
+    def Properties_(self) -> List["_Named"]:
+        """Property definitions as on SWbemObject, with their CIM types."""
+        class_name = self.__dict__["_class_name"]
+        return [
+            _property_definition(class_name, name, value)
+            for name, value in self.__dict__["_values"].items()
+        ]
+    
+    def __dir__(self):
+        methods = _methods.get(self.__dict__["_class_name"].lower(), {})
+        return sorted(list(self.__dict__["_values"]) + list(methods) + ["properties"])
+    
+    def __repr__(self):
+        return f"<FakeWMIObject {self.__dict__['_class_name']}>"
+
+
+class FakeWMIClass:
+    """Mimics ``wmi._wmi_class``: calling it enumerates instances."""
+    
+    def __init__(self, connection: "FakeConnection", class_name: str):
+        self._connection = connection
+        self._class_name = class_name
+    
+    @property
+    def properties(self) -> Dict[str, None]:
+        """Property names of the class definition."""
+        names: Dict[str, None] = {}
+        for row in _instances.get(self._class_name.lower(), []):
+            names.update(dict.fromkeys(row))
+        return names
+    
+    def __call__(self, fields: Optional[List[str]] = None, **where) -> List[FakeWMIObject]:
+        columns = ", ".join(fields) if fields else "*"
+        wql = f"SELECT {columns} FROM {self._class_name}"
+        if where:
+            wql += " WHERE " + " AND ".join(f"{k} = {_literal(v)}" for k, v in where.items())
+        return self._connection.query(wql)
+
+
+def _execute(wql: str):
+    """Lazily evaluate a query, counting each object as it is produced."""
+    if _latency["query"]:
+        time.sleep(_latency["query"])
+    if _services is not None:
+        _services.advance()
+    parsed = parse_wql(wql)
+    rows = _instances.get(parsed["class"].lower(), [])
+    stats.record(0, 0)
+    for row in rows:
+        if parsed["where"] is not None and not parsed["where"](row):
+            continue
+        if parsed["columns"] is None:
+            values = dict(row)
+        else:
+            values = {name: row.get(name) for name in parsed["columns"]}
+        with stats._lock:
+            stats.objects += 1
+            stats.property_fetches += len(values)
+        yield FakeWMIObject(parsed["class"], values)
+
+
+class FakeEnumerator:
+    """Mimics the IEnumVARIANT wrapper returned by ``SWbemObjectSet._NewEnum()``."""
+    
+    def __init__(self, objects):
+        self._objects = objects
+    
+    def Next(self, count: int = 1) -> tuple:
+        batch = []
+        for obj in self._objects:
+            batch.append(obj)
+            if len(batch) >= count:
+                break
+        return tuple(batch)
+
+
+class FakeObjectSet:
+    def __init__(self, wql: str):
+        self._wql = wql
+    
+    def _NewEnum(self) -> FakeEnumerator:
+        return FakeEnumerator(_execute(self._wql))
+
+
+class _Named:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+# CIM type codes of SWbemProperty.CIMType
+_CIM_TYPES = [(bool, 11), (int, 19), (float, 5), (str, 8)]
+_CIM_TYPE_NAMES = {
+    2: "sint16", 3: "sint32", 5: "real64", 8: "string", 11: "boolean", 16: "sint8", 17: "uint8",
+    18: "uint16", 19: "uint32", 20: "sint64", 21: "uint64", 101: "datetime",
+}
+# 64-bit properties the generators below fill with text, as wmi returns them
+_UINT64_PROPERTIES = {
+    "WorkingSetSize", "Size", "FreeSpace", "TotalPhysicalMemory", "FreePhysicalMemory",
+    "PercentProcessorTime", "Timestamp_Sys100NS", "Frequency_Sys100NS", "WorkingSet",
+    "PrivateBytes", "IOReadBytesPersec", "IOWriteBytesPersec", "ElapsedTime", "CurrentBandwidth",
+    "BytesReceivedPersec", "BytesSentPersec", "BytesTotalPersec",
+}
+
+
+def _property_definition(class_name: str, name: str, value: Any) -> _Named:
+    is_array = isinstance(value, tuple)
+    sample = value[0] if is_array and value else value
+    cim_type = _cim_types.get(class_name.lower(), {}).get(name)
+    if cim_type is None and name in _UINT64_PROPERTIES and isinstance(sample, str):
+        cim_type = 21
+    if cim_type is None:
+        cim_type = next((code for kind, code in _CIM_TYPES if isinstance(sample, kind)), 8)
+    return _Named(Name=name, CIMType=cim_type, IsArray=is_array, Qualifiers_=[])
+
+
+def _class_definition(class_name: str) -> _Named:
+    """Build an SWbemObject-like class definition from the registered instances."""
+    key = class_name.lower()
+    rows = _instances[key]
+    keys = _keys.get(key, [])
+    methods = _methods.get(key, {})
+    properties = []
+    names: Dict[str, Any] = {}
+    for row in rows:
+        for name, value in row.items():
+            if names.get(name) is None:
+                names[name] = value
+    for name, value in names.items():
+        prop = _property_definition(class_name, name, value)
+        prop.Qualifiers_ = [_Named(Name="CIMTYPE", Value="")]
+        if name in keys:
+            prop.Qualifiers_.append(_Named(Name="key", Value=True))
+        properties.append(prop)
+    with stats._lock:
+        stats.class_definitions += 1
+    return _Named(
+        Path_=_Named(Class=class_name),
+        Derivation_=("CIM_LogicalElement",) if class_name.startswith("Win32_") else (),
+        Properties_=properties,
+        Methods_=[_Named(Name=name) for name in methods],
+        Qualifiers_=[_Named(Name="dynamic", Value=True)],
+    )
+
+
+class FakeServices:
+    """Mimics the raw ``SWbemServices`` object behind ``wmi.WMI``."""
+    
+    def ExecQuery(self, wql: str, language: str = "WQL", flags: int = 0) -> FakeObjectSet:
+        return FakeObjectSet(wql)
+    
+    def Get(self, path: str, flags: int = 0) -> _Named:
+        """Get a class definition; only registered classes exist."""
+        if _latency["query"]:
+            time.sleep(_latency["query"])
+        for key, rows in _instances.items():
+            if key == path.lower() and rows:
+                return _class_definition(_spellings.get(key, key))
+        raise x_wmi(f"Not found: {path}")
+    
+    def SubclassesOf(self, superclass: str = "", flags: int = 0) -> List[_Named]:
+        """Enumerate the definitions of every registered class."""
+        if _latency["query"]:
+            time.sleep(_latency["query"])
+        return [
+            _class_definition(_spellings.get(key, key))
+            for key, rows in list(_instances.items()) if rows
+        ]
+    
+    
+    def ExecMethod(self, path: str, method: str, in_params: Any = None, flags: int = 0) -> _Named:
+        """Call a method on the instance at ``Class.Key="value"``; returns the out parameters."""
+        if _latency["query"]:
+            time.sleep(_latency["query"])
+        match = re.match(r'^(?:.*:)?(\w+)\.(\w+)=(?:"((?:[^"\\]|\\.)*)"|(\S+))$', path)
+        if not match:
+            raise x_wmi(f"Invalid object path: {path}")
+        class_name, key, quoted, bare = match.groups()
+        value = re.sub(r"\\(.)", r"\1", quoted) if quoted is not None else bare
+        row = next(
+            (row for row in _instances.get(class_name.lower(), [])
+             if str(row.get(key)).lower() == value.lower()),
+            None,
+        )
+        func = _methods.get(class_name.lower(), {}).get(method)
+        if row is None or func is None:
+            raise x_wmi(f"Not found: {path}")
+        with stats._lock:
+            stats.method_calls += 1
+        result = func(row)
+        return _Named(ReturnValue=result[0] if isinstance(result, tuple) else result)
+
+
+class FakeConnection:
+    """Mimics ``wmi.WMI``."""
+    
+    def __init__(self, computer: str = ".", namespace: str = "root\\cimv2", **kwargs):
+        self.computer = computer
+        self.namespace = namespace
+        self._namespace = FakeServices()
+    
+    def query(self, wql: str) -> List[FakeWMIObject]:
+        return list(_execute(wql))
+    
+    def watch_for(self, raw_wql: Optional[str] = None, **kwargs) -> FakeWatcher:
+        watcher = FakeWatcher(raw_wql)
+        with _watchers_lock:
+            _watchers.append(watcher)
+        return watcher
+    
+    def __getattr__(self, name: str) -> FakeWMIClass:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return FakeWMIClass(self, name)
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+# --- minimal WQL interpreter -------------------------------------------------
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<str>'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")"
+    r"|(?P<num>-?\d+(?:\.\d+)?)"
+    r"|(?P<op><>|!=|<=|>=|=|<|>|\(|\)|,|\*)"
+    r"|(?P<name>[A-Za-z_][\w.]*))"
+)
+
+
+def _tokenize(text: str) -> List[tuple]:
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Invalid WQL near: {text[pos:]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "str":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        elif kind == "num":
+            value = float(value) if "." in value else int(value)
+        tokens.append((kind, value))
+    return tokens
+
+
+def _coerce(value: Any, literal: Any) -> tuple:
+    if isinstance(literal, (int, float)) and not isinstance(literal, bool):
+        try:
+            return float(value), float(literal)
+        except (TypeError, ValueError):
+            return str(value), str(literal)
+    if isinstance(literal, bool):
+        return bool(value), literal
+    if isinstance(literal, str) and value is not None:
+        return str(value).lower(), literal.lower()
+    return value, literal
+
+
+def _like(value: Any, pattern: str) -> bool:
+    if value is None:
+        return False
+    regex = ""
+    for char in pattern:
+        if char == "%":
+            regex += ".*"
+        elif char == "_":
+            regex += "."
+        else:
+            regex += re.escape(char)
+    return re.fullmatch(regex, str(value), re.IGNORECASE | re.DOTALL) is not None
+
+
+_COMPARE = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<>": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+class _Parser:
+    def __init__(self, tokens: List[tuple]):
+        self.tokens = tokens
+        self.pos = 0
+    
+    def peek(self, offset: int = 0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+    
+    def keyword(self, word: str) -> bool:
+        kind, value = self.peek()
+        if kind == "name" and value.upper() == word:
+            self.pos += 1
+            return True
+        return False
+    
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+    
+    def expression(self):
+        left = self.conjunction()
+        while self.keyword("OR"):
+            right = self.conjunction()
+            left = (lambda l, r: lambda row: l(row) or r(row))(left, right)
+        return left
+    
+    def conjunction(self):
+        left = self.negation()
+        while self.keyword("AND"):
+            right = self.negation()
+            left = (lambda l, r: lambda row: l(row) and r(row))(left, right)
+        return left
+    
+    def negation(self):
+        if self.keyword("NOT"):
+            inner = self.negation()
+            return lambda row: not inner(row)
+        if self.peek() == ("op", "("):
+            self.take()
+            inner = self.expression()
+            self.take()
+            return inner
+        return self.comparison()
+    
+    def literal(self):
+        kind, value = self.take()
+        if kind == "name" and value.upper() in ("TRUE", "FALSE"):
+            return value.upper() == "TRUE"
+        if kind == "name" and value.upper() == "NULL":
+            return None
+        return value
+    
+    def comparison(self):
+        _, name = self.take()
+        getter = (lambda n: lambda row: row.get(n))(name)
+        if self.keyword("IS"):
+            negate = self.keyword("NOT")
+            self.keyword("NULL")
+            return lambda row: (getter(row) is None) != negate
+        if self.keyword("LIKE"):
+            pattern = self.literal()
+            return lambda row: _like(getter(row), pattern)
+        if self.keyword("ISA"):
+            self.literal()
+            return lambda row: True
+        _, op = self.take()
+        literal = self.literal()
+        compare = _COMPARE[op]
+        
+        def evaluate(row):
+            value = getter(row)
+            if value is None or literal is None:
+                return op in ("=",) and value is literal
+            left, right = _coerce(value, literal)
+            try:
+                return compare(left, right)
+            except TypeError:
+                return False
+        return evaluate
+
+
+def parse_wql(wql: str) -> Dict[str, Any]:
+    """Parse a ``SELECT ... FROM ... [WHERE ...]`` query."""
+    parser = _Parser(_tokenize(wql))
+    if not parser.keyword("SELECT"):
+        raise ValueError(f"Unsupported WQL: {wql}")
+    columns: Optional[List[str]] = []
+    while not parser.keyword("FROM"):
+        kind, value = parser.take()
+        if kind is None:
+            raise ValueError(f"Missing FROM: {wql}")
+        if value == "*":
+            columns = None
+        elif kind == "name" and columns is not None:
+            columns.append(value)
+    _, class_name = parser.take()
+    where = None
+    if parser.keyword("WITHIN"):
+        parser.take()
+    if parser.keyword("WHERE"):
+        where = parser.expression()
+    return {"class": class_name, "columns": columns, "where": where}
+
+
+# --- module installation -----------------------------------------------------
+
+def _make_pythoncom() -> types.ModuleType:
+    module = types.ModuleType("pythoncom")
+    
+    def co_initialize():
+        with stats._lock:
+            stats.co_initialize += 1
+    
+    def co_uninitialize():
+        with stats._lock:
+            stats.co_uninitialize += 1
+    
+    module.COINIT_MULTITHREADED = 0
+    module.CoInitialize = co_initialize
+    module.CoInitializeEx = lambda flags: co_initialize()
+    module.CoUninitialize = co_uninitialize
+    return module
+
+
+def _make_wmi() -> types.ModuleType:
+    module = types.ModuleType("wmi")
+    module.WMI = FakeConnection
+    module._wmi_object = lambda ole_object, *args, **kwargs: ole_object
+    module.x_wmi = x_wmi
+    module.x_wmi_timed_out = x_wmi_timed_out
+    return module
+
+
+def install():
+    """Register the fake ``wmi`` and ``pythoncom`` modules in ``sys.modules``."""
+    sys.modules["wmi"] = _make_wmi()
+    sys.modules["pythoncom"] = _make_pythoncom()
+
+
+# --- synthetic datasets ------------------------------------------------------
+
+class ServiceStateMachine:
+    """
+    Service Control Manager simulation behind Win32_Service.
+    
+    StartService and StopService move a service to Start/Stop Pending and,
+    ``transition`` seconds later, to Running/Stopped (or back to Stopped for
+    services listed in ``failing``). Return values follow Win32_Service:
+    dependencies must be running to start and dependents stopped to stop.
+    """
+    
+    def __init__(
+        self,
+        rows: List[Dict[str, Any]],
+        dependencies: Dict[str, List[str]],
+        transition: float,
+        failing: List[str]
+    ):
+        self.rows = {row["Name"].lower(): row for row in rows}
+        self.antecedents = {name.lower(): [dep.lower() for dep in deps] for name, deps in dependencies.items()}
+        self.transition = transition
+        self.failing = {name.lower() for name in failing}
+        self.pending: Dict[str, tuple] = {}
+        self.controls: List[tuple] = []
+        self._lock = threading.Lock()
+    
+    def advance(self):
+        """Complete the transitions that are due."""
+        now = time.monotonic()
+        with self._lock:
+            for name, (due, state) in list(self.pending.items()):
+                if due <= now:
+                    self.rows[name]["State"] = state
+                    del self.pending[name]
+    
+    def _dependents(self, name: str) -> List[str]:
+        return [other for other, deps in self.antecedents.items() if name in deps]
+    
+    def _control(self, name: str, method: str) -> int:
+        self.advance()
+        with self._lock:
+            row = self.rows[name]
+            self.controls.append((time.monotonic(), row["Name"], method))
+            if name in self.pending:
+                return 5  # Service Cannot Accept Control
+            if method == "StartService":
+                if row["State"] == "Running":
+                    return 10  # Service Already Running
+                if row.get("StartMode") == "Disabled":
+                    return 14  # Service Disabled
+                if any(self.rows[dep]["State"] != "Running" for dep in self.antecedents.get(name, [])):
+                    return 13  # Service Dependency Failure
+                row["State"] = "Start Pending"
+                final = "Stopped" if name in self.failing else "Running"
+            else:
+                if row["State"] == "Stopped":
+                    return 6  # Service Not Active
+                if any(self.rows[dep]["State"] != "Stopped" for dep in self._dependents(name)):
+                    return 3  # Dependent Services Running
+                row["State"] = "Stop Pending"
+                final = "Stopped"
+            self.pending[name] = (time.monotonic() + self.transition, final)
+            return 0
+
+
+def simulate_services(
+    services: List[Dict[str, Any]],
+    dependencies: Optional[Dict[str, List[str]]] = None,
+    transition: float = 0.05,
+    failing: Optional[List[str]] = None
+) -> ServiceStateMachine:
+    """
+    Register Win32_Service rows driven by a ServiceStateMachine.
+    
+    ``dependencies`` maps a service to the services it depends on and is
+    also registered as Win32_DependentService associations.
+    """
+    global _services
+    dependencies = dependencies or {}
+    machine = ServiceStateMachine(services, dependencies, transition, list(failing or []))
+    set_instances("Win32_Service", services)
+    set_instances("Win32_DependentService", [
+        {"Antecedent": _service_path(antecedent), "Dependent": _service_path(dependent)}
+        for dependent, antecedents in dependencies.items() for antecedent in antecedents
+    ])
+    for method in ("StartService", "StopService"):
+        set_method("Win32_Service", method,
+                   lambda values, *args, _method=method: (machine._control(values["Name"].lower(), _method),))
+    _services = machine
+    return machine
+
+
+def _service_path(name: str) -> str:
+    return f'\\\\FAKE\\root\\cimv2:Win32_Service.Name="{name}"'
+
+
+def make_services(count: int, running: float = 0.5) -> List[Dict[str, Any]]:
+    """Build ``count`` Win32_Service rows, the first ``running`` share running."""
+    return [
+        {"Name": f"svc{index}", "DisplayName": f"Service {index}", "StartMode": "Manual",
+         "State": "Running" if index < count * running else "Stopped", "Status": "OK",
+         "ProcessId": 1000 + index, "AcceptStop": True}
+        for index in range(count)
+    ]
+
+
+def make_process_tree(count: int, fanout: int = 4, stale: float = 0.01) -> List[Dict[str, Any]]:
+    """
+    Build ``count`` Win32_Process rows forming a tree.
+    
+    Every process but the first has a parent created before it, except a
+    ``stale`` share whose ParentProcessId was reused by a later process,
+    as happens on Windows after the parent exits.
+    """
+    rows = []
+    every = round(1 / stale) if stale else 0
+    start = datetime.datetime(2024, 1, 1)
+    for index in range(count):
+        pid = 4 + index * 4
+        parent = rows[(index - 1) // fanout]["ProcessId"] if index else 0
+        if every and index > 1 and index % every == 0:
+            parent = 4 + min(count - 1, index + 10) * 4
+        created = start + datetime.timedelta(seconds=index * 7, microseconds=index)
+        created = created.strftime("%Y%m%d%H%M%S.%f") + "+000"
+        rows.append({
+            "ProcessId": pid, "Handle": str(pid), "ParentProcessId": parent,
+            "Name": f"process{index % 50}.exe", "CreationDate": created,
+        })
+    return rows
+
+
+def simulate_processes(rows: List[Dict[str, Any]], protected: Optional[List[str]] = None) -> List[tuple]:
+    """
+    Register Win32_Process rows whose Terminate removes them.
+    
+    Processes named in ``protected`` return Access denied (2). Returns the
+    list that records every (time, ProcessId) terminated.
+    """
+    protected_names = {name.lower() for name in protected or []}
+    terminated: List[tuple] = []
+    lock = threading.Lock()
+    set_instances("Win32_Process", rows)
+    set_keys("Win32_Process", ["Handle"])
+    
+    def terminate(values, *args):
+        if str(values.get("Name", "")).lower() in protected_names:
+            return (2,)
+        with lock:
+            for index, row in enumerate(rows):
+                if row["ProcessId"] == values["ProcessId"]:
+                    del rows[index]
+                    terminated.append((time.monotonic(), row["ProcessId"]))
+                    return (0,)
+        return (9,)
+    
+    set_method("Win32_Process", "Terminate", terminate)
+    return terminated
+
+
+EVENT_TYPES = {1: "Error", 2: "Warning", 3: "Information", 4: "Audit Success", 5: "Audit Failure"}
+
+
+class FakeEventLog:
+    """
+    A Win32_NTLogEvent log of ``count`` records generated on the fly.
+    
+    Records are produced newest first, as the event log provider returns
+    them (oldest first with ``oldest_first``), so a million-record log
+    costs no memory. ``append`` writes new records and ``clear`` empties
+    the log, restarting RecordNumber at 1.
+    """
+    
+    def __init__(
+        self,
+        count: int,
+        logfile: str = "System",
+        spacing: float = 1.0,
+        oldest_first: bool = False
+    ):
+        self.logfile = logfile
+        self.spacing = spacing
+        self.oldest_first = oldest_first
+        self.start = datetime.datetime(2024, 1, 1)
+        self.last = count
+        self._written = 0  # records written before the last clear
+    
+    def __len__(self) -> int:
+        return self.last
+    
+    def __iter__(self):
+        records = range(1, self.last + 1) if self.oldest_first else range(self.last, 0, -1)
+        for record in records:
+            yield self.row(record)
+    
+    def row(self, record: int) -> Dict[str, Any]:
+        """Build the row for RecordNumber ``record``."""
+        event_type = 1 if record % 10 == 0 else 2 if record % 5 == 0 else 3
+        generated = self.start + datetime.timedelta(seconds=(self._written + record) * self.spacing)
+        return {
+            "Logfile": self.logfile, "RecordNumber": record, "EventCode": 1000 + record % 100,
+            "EventType": event_type, "Type": EVENT_TYPES[event_type],
+            "SourceName": f"Source{record % 7}", "ComputerName": "FAKE",
+            "Message": f"Event {record} from Source{record % 7}.",
+            "TimeGenerated": generated.strftime("%Y%m%d%H%M%S.%f") + "+000",
+        }
+    
+    def time_of(self, record: int) -> datetime.datetime:
+        """UTC time at which ``record`` was written."""
+        return (self.start + datetime.timedelta(seconds=(self._written + record) * self.spacing)).replace(
+            tzinfo=datetime.timezone.utc
+        )
+    
+    def append(self, count: int = 1):
+        """Write ``count`` new records."""
+        self.last += count
+    
+    def clear(self):
+        """Empty the log, as Clear-EventLog does."""
+        self._written += self.last
+        self.last = 0
+
+
+PROCESS_PROPERTIES = [
+    "Caption", "CommandLine", "CreationClassName", "CreationDate", "CSCreationClassName",
+    "CSName", "Description", "ExecutablePath", "ExecutionState", "Handle", "HandleCount",
+    "InstallDate", "KernelModeTime", "MaximumWorkingSetSize", "MinimumWorkingSetSize",
+    "Name", "OSCreationClassName", "OSName", "OtherOperationCount", "OtherTransferCount",
+    "PageFaults", "PageFileUsage", "ParentProcessId", "PeakPageFileUsage",
+    "PeakVirtualSize", "PeakWorkingSetSize", "Priority", "PrivatePageCount", "ProcessId",
+    "QuotaNonPagedPoolUsage", "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+    "QuotaPeakPagedPoolUsage", "ReadOperationCount", "ReadTransferCount", "SessionId",
+    "Status", "TerminationDate", "ThreadCount", "UserModeTime", "VirtualSize",
+    "WindowsVersion", "WorkingSetSize", "WriteOperationCount", "WriteTransferCount",
+]
+
+
+def make_processes(count: int) -> List[Dict[str, Any]]:
+    """Build ``count`` Win32_Process rows with every property populated."""
+    rows = []
+    for index in range(count):
+        pid = 4 + index * 4
+        row = {name: f"{name}-{index}" for name in PROCESS_PROPERTIES}
+        row.update({
+            "Name": f"process{index % 50}.exe",
+            "Caption": f"process{index % 50}.exe",
+            "ProcessId": pid,
+            "Handle": str(pid),
+            "ParentProcessId": 4 + (index // 8) * 4 if index else 0,
+            "ThreadCount": 1 + index % 32,
+            "WorkingSetSize": str((index % 200 + 1) * 1024 * 1024),
+            "CommandLine": f"C:\\Program Files\\App{index}\\process{index % 50}.exe --flag",
+            "ExecutablePath": f"C:\\Program Files\\App{index}\\process{index % 50}.exe",
+            "CreationDate": f"20240101{index % 24:02d}0000.000000+000",
+        })
+        rows.append(row)
+    return rows
+
+
+def make_perf_processes(count: int, elapsed: float = 0.0) -> List[Dict[str, Any]]:
+    """
+    Build Win32_PerfRawData_PerfProc_Process rows as seen ``elapsed`` seconds
+    after a common start.
+    
+    Process ``index`` uses ``index % 20`` percent of one core and reads
+    ``index`` KiB/s, so rates computed between two calls are predictable.
+    """
+    ticks = int(elapsed * 10_000_000)
+    rows = []
+    for index in range(count):
+        pid = 4 + index * 4
+        rows.append({
+            "Name": f"process{index}",
+            "IDProcess": pid,
+            "PercentProcessorTime": str(index * 1_000_000 + ticks * (index % 20) // 100),
+            "Timestamp_Sys100NS": str(133_000_000_000_000_000 + ticks),
+            "Frequency_Sys100NS": "10000000",
+            "WorkingSet": str((index % 200 + 1) * 1024 * 1024),
+            "PrivateBytes": str((index % 100 + 1) * 1024 * 1024),
+            "IOReadBytesPersec": str(int(elapsed * index * 1024)),
+            "IOWriteBytesPersec": "0",
+            "ThreadCount": 1 + index % 32,
+            "HandleCount": 10 + index,
+            "CreatingProcessID": 4 + (index - 1) // 4 * 4 if index else 0,
+            # The raw ElapsedTime counter holds the process start time
+            "ElapsedTime": str(132_999_000_000_000_000 + index * 10_000_000),
+        })
+    return rows
+
+
+def make_network_interfaces(elapsed: float = 0.0, start: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build Win32_PerfRawData_Tcpip_NetworkInterface rows as seen ``elapsed``
+    seconds after a common start.
+    
+    The Ethernet interface receives 1 MiB/s and sends 256 KiB/s at 1000
+    packets/s each way; the Wi-Fi interface is idle. ``start`` offsets the
+    32-bit packet counters, e.g. ``2**32 - 500`` to make them wrap.
+    """
+    ticks = int(elapsed * 10_000_000)
+    return [
+        {
+            "Name": "Intel[R] Ethernet Connection",
+            "Timestamp_Sys100NS": str(133_000_000_000_000_000 + ticks),
+            "Frequency_Sys100NS": "10000000",
+            "CurrentBandwidth": "1000000000",
+            "BytesReceivedPersec": str(int(elapsed * 1024 * 1024)),
+            "BytesSentPersec": str(int(elapsed * 256 * 1024)),
+            "BytesTotalPersec": str(int(elapsed * 1280 * 1024)),
+            "PacketsReceivedPersec": (start + int(elapsed * 1000)) % 2 ** 32,
+            "PacketsSentPersec": (start + int(elapsed * 1000)) % 2 ** 32,
+            "PacketsReceivedErrors": int(elapsed),
+            "PacketsOutboundErrors": 0,
+            "PacketsReceivedDiscarded": 0,
+            "PacketsOutboundDiscarded": 0,
+        },
+        {
+            "Name": "Intel[R] Wi-Fi 6 AX201 160MHz",
+            "Timestamp_Sys100NS": str(133_000_000_000_000_000 + ticks),
+            "Frequency_Sys100NS": "10000000",
+            "CurrentBandwidth": "0",
+            "BytesReceivedPersec": "0",
+            "BytesSentPersec": "0",
+            "BytesTotalPersec": "0",
+            "PacketsReceivedPersec": 0,
+            "PacketsSentPersec": 0,
+            "PacketsReceivedErrors": 0,
+            "PacketsOutboundErrors": 0,
+            "PacketsReceivedDiscarded": 0,
+            "PacketsOutboundDiscarded": 0,
+        },
+    ]
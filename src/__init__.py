@@ -4,8 +4,14 @@ WMI Agent - AI-powered Windows Management Instrumentation
 This package provides an AI agent for natural language interaction with Windows WMI.
 """
 
-from .agent import WMIAgent, create_wmi_agent, ProviderType
-from .wmi_tools import get_wmi_tools
+# The agent pulls in agent_framework and its provider SDKs; importing it
+# lazily keeps them out of wmi-cli, which is imported through this package
+_EXPORTS = {
+    "WMIAgent": ".agent",
+    "create_wmi_agent": ".agent",
+    "ProviderType": ".agent",
+    "get_wmi_tools": ".wmi_tools",
+}
 
 __all__ = [
     "WMIAgent",
@@ -13,3 +19,17 @@ __all__ = [
     "ProviderType",
     "get_wmi_tools",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -11,9 +11,7 @@ import os
 from typing import Optional, Literal
 from dotenv import load_dotenv
 from agent_framework import ChatAgent
-from agent_framework.openai import OpenAIChatClient
-from agent_framework.azure import AzureOpenAIChatClient
-from .wmi_tools import get_wmi_tools
+from .wmi_tools import begin_turn, get_cache_stats, get_wmi_tools, set_output_budget
 
 # Load environment variables from .env file
 load_dotenv()
@@ -44,6 +42,9 @@ Your capabilities:
 Guidelines:
 - Always provide clear, concise answers
 - When showing lists, limit to most relevant items
+- Tools return compact JSON; list tools return {"fields": [...], "rows": [[...]]}
+- Request only what you need with fields, limit and sort_by; when a result has
+  next_offset and you need more rows, call the tool again with offset=next_offset
 - Explain technical terms when appropriate
 - For CPU usage by process, use get_process_performance tool which provides CPU percentages
 - For memory-only process listings, use list_processes tool
@@ -59,7 +60,9 @@ Remember: You have direct access to WMI through function tools, so always use th
         model_id: Optional[str] = None,
         endpoint: Optional[str] = None,
         instructions: Optional[str] = None,
-        name: str = "WMI Agent"
+        name: str = "WMI Agent",
+        async_tools: bool = True,
+        tool_output_budget: Optional[int] = None
     ):
         """
         Initialize the WMI Agent
@@ -70,9 +73,14 @@ Remember: You have direct access to WMI through function tools, so always use th
             endpoint: API endpoint (default: from env based on provider)
             instructions: Custom agent instructions (uses default if None)
             name: Agent name
+            async_tools: Use async tools that run WMI calls on a worker pool,
+                so concurrent tool calls overlap and streaming is not blocked
+            tool_output_budget: Largest tool result in bytes (default: from
+                WMI_TOOL_OUTPUT_BUDGET env, or 4000); longer lists are paged
         
         Environment variables:
             AGENT_PROVIDER: Provider to use ("ollama" or "azure", default: "ollama")
+            WMI_TOOL_OUTPUT_BUDGET: Largest tool result in bytes (default: 4000)
             
             For Ollama:
                 OLLAMA_MODEL: Model name (default: "gpt-oss:120b")
@@ -91,6 +99,9 @@ Remember: You have direct access to WMI through function tools, so always use th
         
         self.instructions = instructions or self.DEFAULT_INSTRUCTIONS
         self.name = name
+        self.async_tools = async_tools
+        if tool_output_budget is not None:
+            set_output_budget(tool_output_budget)
         self._agent = None
         
         # Set defaults based on provider
@@ -121,9 +132,12 @@ Remember: You have direct access to WMI through function tools, so always use th
     async def create_agent(self):
         """Create the agent instance based on provider"""
         # Get all WMI tools as standalone functions
-        tools = get_wmi_tools()
+        tools = get_wmi_tools(use_async=self.async_tools)
         
+        # Provider clients are imported on demand; each pulls in its SDK
         if self.provider == "ollama":
+            from agent_framework.openai import OpenAIChatClient
+            
             # Create OpenAI-compatible client for Ollama
             # Note: Ollama doesn't require an API key, but OpenAIChatClient does
             # We provide a dummy key for local Ollama endpoints
@@ -134,6 +148,8 @@ Remember: You have direct access to WMI through function tools, so always use th
             )
         
         elif self.provider == "azure":
+            from agent_framework.azure import AzureOpenAIChatClient
+            
             # Create Azure OpenAI client
             api_key = os.getenv("AZURE_OPENAI_API_KEY")
             if not api_key:
@@ -185,6 +201,8 @@ Remember: You have direct access to WMI through function tools, so always use th
         if not self._agent:
             await self.create_agent()
         
+        # Tools share class snapshots within the turn only
+        begin_turn()
         result = await self._agent.run(message, thread=thread)
         return result.text
     
@@ -202,9 +220,21 @@ Remember: You have direct access to WMI through function tools, so always use th
         if not self._agent:
             await self.create_agent()
         
+        # Tools share class snapshots within the turn only
+        begin_turn()
         async for chunk in self._agent.run_streaming(message, thread=thread):
             yield chunk
     
+    def cache_stats(self) -> dict:
+        """
+        Get statistics of the caches behind the WMI tools
+        
+        Returns:
+            Dictionary with 'snapshots' (hits, misses and coalesced calls of the
+            per-turn class snapshots) and 'results' (the WMI result cache)
+        """
+        return get_cache_stats()
+    
     async def close(self):
         """Close the agent and cleanup resources"""
         # ChatAgent doesn't have a close method, so we just clear the reference
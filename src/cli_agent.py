@@ -8,8 +8,16 @@ Supports multiple providers: Ollama (local) and Azure AI Foundry (cloud).
 import asyncio
 import sys
 import os
-from typing import Optional
-from .agent import create_wmi_agent, ProviderType
+from typing import TYPE_CHECKING, Optional
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from .agent import ProviderType
+
+# The agent module (agent framework, provider SDKs) is imported when the
+# agent is initialized, so --help and argument errors return immediately
+load_dotenv()
 
 
 class WMIAgentCLI:
@@ -17,7 +25,7 @@ class WMIAgentCLI:
     
     def __init__(
         self,
-        provider: Optional[ProviderType] = None,
+        provider: Optional["ProviderType"] = None,
         model_id: Optional[str] = None,
         endpoint: Optional[str] = None
     ):
@@ -45,6 +53,8 @@ class WMIAgentCLI:
         print()
         
         try:
+            from .agent import create_wmi_agent
+            
             self.agent = await create_wmi_agent(
                 provider=self.provider,
                 model_id=self.model_id,
@@ -77,6 +87,7 @@ class WMIAgentCLI:
         print("  /exit    - Exit the CLI")
         print("  /quit    - Exit the CLI")
         print("  /clear   - Clear the screen")
+        print("  /stats   - Show WMI tool cache statistics")
         print("\nExample Queries:")
         print("  - What's my current memory usage?")
         print("  - Show me running services")
@@ -124,6 +135,11 @@ class WMIAgentCLI:
                         import os
                         os.system('cls' if sys.platform == 'win32' else 'clear')
                         continue
+                    elif command == '/stats':
+                        for name, stats in self.agent.cache_stats().items():
+                            values = ", ".join(f"{key}: {value}" for key, value in stats.items())
+                            print(f"  {name}: {values}")
+                        continue
                     else:
                         print(f"Unknown command: {user_input}")
                         print("Type /help for available commands")
@@ -0,0 +1,167 @@
+"""
+Asyncio front end for WMIWrapper.
+
+WMI calls block, so AsyncWMIWrapper runs them on a dedicated thread pool
+whose threads are COM-initialized (multithreaded apartment) by the
+connection pool. Several queries can therefore be awaited concurrently
+without stalling the event loop. Results are detached on the worker that
+fetched them, so no COM object reaches the event-loop thread.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Union
+
+from .cache import ResultCache
+from .convert import DetachedObject, detach_objects
+from .pool import WMIConnectionPool
+from .wmi_wrapper import WMIWrapper
+from .wql import Query
+
+
+def _detached(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call a WMIWrapper getter and detach its result, on the calling thread."""
+    result = func(*args, **kwargs)
+    if isinstance(result, list):
+        return detach_objects(result)
+    return detach_objects([result])[0] if result is not None else None
+
+
+class AsyncWMIWrapper:
+    """Async counterpart of WMIWrapper."""
+    
+    def __init__(
+        self,
+        computer: str = ".",
+        namespace: str = "root\\cimv2",
+        cache: Optional[ResultCache] = None,
+        pool: Optional[WMIConnectionPool] = None,
+        max_workers: int = 4,
+        wrapper: Optional[WMIWrapper] = None
+    ):
+        """
+        Initialize the async wrapper.
+        
+        Args:
+            computer: Computer name or '.' for local machine
+            namespace: WMI namespace (default: root\\cimv2)
+            cache: Optional result cache
+            pool: Connection pool (default: the process-wide pool)
+            max_workers: Number of COM worker threads
+            wrapper: Existing WMIWrapper to run on the workers (overrides
+                computer, namespace, cache and pool)
+        """
+        self.wrapper = wrapper or WMIWrapper(
+            computer=computer, namespace=namespace, cache=cache, pool=pool
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="wmi-com",
+            initializer=self.wrapper.pool.initialize_thread,
+            initargs=(True,),
+        )
+    
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on a COM worker thread.
+        
+        Use this for work that calls WMI methods or reads properties the
+        query did not select: COM objects must not leave their thread, so
+        keep them inside func and return plain values.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+    
+    async def query(self, wql_query: Union[str, Query]) -> List[DetachedObject]:
+        """Execute a WQL query."""
+        return await self.run(_detached, self.wrapper.query, wql_query)
+    
+    async def get_class(
+        self,
+        class_name: str,
+        properties: Optional[List[str]] = None,
+        **kwargs
+    ) -> List[DetachedObject]:
+        """Get instances of a WMI class."""
+        return await self.run(_detached, self.wrapper.get_class, class_name, properties, **kwargs)
+    
+    async def get_services(
+        self,
+        properties: Optional[List[str]] = None,
+        **filters
+    ) -> List[DetachedObject]:
+        """Get Windows services."""
+        return await self.run(_detached, self.wrapper.get_services, properties, **filters)
+    
+    async def get_processes(
+        self,
+        properties: Optional[List[str]] = None,
+        **filters
+    ) -> List[DetachedObject]:
+        """Get running processes."""
+        return await self.run(_detached, self.wrapper.get_processes, properties, **filters)
+    
+    async def get_operating_system(
+        self,
+        properties: Optional[List[str]] = None
+    ) -> Optional[DetachedObject]:
+        """Get operating system information."""
+        return await self.run(_detached, self.wrapper.get_operating_system, properties)
+    
+    async def get_computer_system(
+        self,
+        properties: Optional[List[str]] = None
+    ) -> Optional[DetachedObject]:
+        """Get computer system information."""
+        return await self.run(_detached, self.wrapper.get_computer_system, properties)
+    
+    async def get_logical_disks(
+        self,
+        properties: Optional[List[str]] = None,
+        **filters
+    ) -> List[DetachedObject]:
+        """Get logical disk drives."""
+        return await self.run(_detached, self.wrapper.get_logical_disks, properties, **filters)
+    
+    async def get_network_adapters(
+        self,
+        properties: Optional[List[str]] = None,
+        **filters
+    ) -> List[DetachedObject]:
+        """Get network adapter configuration."""
+        return await self.run(_detached, self.wrapper.get_network_adapters, properties, **filters)
+    
+    async def get_bios(self, properties: Optional[List[str]] = None) -> Optional[DetachedObject]:
+        """Get BIOS information."""
+        return await self.run(_detached, self.wrapper.get_bios, properties)
+    
+    async def get_processor(self, properties: Optional[List[str]] = None) -> List[DetachedObject]:
+        """Get processor information."""
+        return await self.run(_detached, self.wrapper.get_processor, properties)
+    
+    async def get_physical_memory(
+        self,
+        properties: Optional[List[str]] = None
+    ) -> List[DetachedObject]:
+        """Get physical memory information."""
+        return await self.run(_detached, self.wrapper.get_physical_memory, properties)
+    
+    async def list_classes(self) -> List[str]:
+        """List all available WMI classes in the current namespace."""
+        return await self.run(self.wrapper.list_classes)
+    
+    async def get_class_properties(self, class_name: str) -> List[str]:
+        """Get properties of a WMI class."""
+        return await self.run(self.wrapper.get_class_properties, class_name)
+    
+    def close(self, wait: bool = False):
+        """Shut down the worker threads."""
+        self._executor.shutdown(wait=wait)
+    
+    async def __aenter__(self) -> "AsyncWMIWrapper":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self.close()
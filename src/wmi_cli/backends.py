@@ -0,0 +1,453 @@
+"""
+Pluggable WMI backends: live COM, recording and offline replay.
+
+A backend supplies the connections and per-thread COM setup behind a
+connection pool, so WMIWrapper and everything built on it (the CLI,
+modules, agent tools) run unchanged against any of them:
+
+- ComBackend talks to WMI through the wmi and pythoncom packages.
+- RecordingBackend wraps another backend and captures every query's
+  results and latency into a session file.
+- ReplayBackend serves a session file without WMI (e.g. on Linux CI),
+  sleeping the recorded latencies so timings stay realistic.
+- SimulatedBackend stands in for a set of computers with per-host latency
+  and failures, e.g. to exercise fleet queries.
+
+Setting WMI_CLI_RECORD or WMI_CLI_REPLAY to a session file path makes the
+process-wide pool use a recording or replay backend.
+"""
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import normalize_wql, query_class
+from .convert import DetachedObject, object_to_dict, property_types
+from .pool import WMIConnectionPool, _co_initialize, _co_uninitialize, _connect
+
+SESSION_FORMAT = "wmi-cli-session"
+SESSION_VERSION = 1
+
+QueryKey = Tuple[str, str, str]
+
+
+def _query_key(computer: str, namespace: str, wql: str) -> QueryKey:
+    return computer.lower(), namespace.lower(), normalize_wql(wql)
+
+
+def _to_json(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, (bytes, bytearray)):
+        return list(value)
+    return str(value)
+
+
+def _from_json(value: Any) -> Any:
+    # wmi returns array properties as tuples
+    if isinstance(value, list):
+        return tuple(_from_json(item) for item in value)
+    return value
+
+
+class WMIBackend:
+    """Supplies connections and per-thread COM setup to a connection pool."""
+    
+    def __init__(self):
+        self._pool: Optional[WMIConnectionPool] = None
+        self._pool_lock = threading.Lock()
+    
+    def connect(self, computer: str, namespace: str) -> Any:
+        """Create a connection for the calling thread."""
+        raise NotImplementedError
+    
+    def initialize_thread(self, multithreaded: bool = False):
+        """Prepare the calling thread (COM initialization for live WMI)."""
+    
+    def release_thread(self):
+        """Undo initialize_thread for the calling thread."""
+    
+    @property
+    def pool(self) -> WMIConnectionPool:
+        """Connection pool using this backend (created on first use)."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = WMIConnectionPool(
+                    connect=self.connect,
+                    co_initialize=self.initialize_thread,
+                    co_uninitialize=self.release_thread,
+                )
+            return self._pool
+
+
+class ComBackend(WMIBackend):
+    """Live WMI through the wmi and pythoncom packages (imported on first use)."""
+    
+    def connect(self, computer: str, namespace: str) -> Any:
+        return _connect(computer, namespace)
+    
+    def initialize_thread(self, multithreaded: bool = False):
+        _co_initialize(multithreaded)
+    
+    def release_thread(self):
+        _co_uninitialize()
+
+
+class _Session:
+    """Query results and class definitions of a recorded session."""
+    
+    def __init__(self):
+        self.queries: Dict[QueryKey, List[Dict[str, Any]]] = {}
+        self.classes: Dict[Tuple[str, str], List[str]] = {}
+        self.order: List[QueryKey] = []
+    
+    def add(self, key: QueryKey, entry: Dict[str, Any]):
+        self.queries.setdefault(key, []).append(entry)
+        self.order.append(key)
+    
+    def save(self, path: str):
+        # Entries keep their own layouts and types; gzip absorbs the
+        # repetition across snapshots of one query
+        queries = []
+        positions = {key: 0 for key in self.queries}
+        for key in self.order:
+            entry = self.queries[key][positions[key]]
+            positions[key] += 1
+            queries.append({
+                "computer": key[0], "namespace": key[1], "wql": key[2], **entry
+            })
+        data = {
+            "format": SESSION_FORMAT,
+            "version": SESSION_VERSION,
+            "queries": queries,
+            "classes": [
+                {"namespace": namespace, "class": name, "properties": properties}
+                for (namespace, name), properties in self.classes.items()
+            ],
+        }
+        temp = f"{path}.tmp"
+        with gzip.open(temp, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp, path)
+    
+    @classmethod
+    def load(cls, path: str) -> "_Session":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != SESSION_FORMAT or data.get("version") != SESSION_VERSION:
+            raise ValueError(f"{path} is not a version {SESSION_VERSION} WMI session file")
+        session = cls()
+        for entry in data["queries"]:
+            key = (entry.pop("computer"), entry.pop("namespace"), entry.pop("wql"))
+            session.add(key, entry)
+        for entry in data["classes"]:
+            session.classes[(entry["namespace"], entry["class"].lower())] = entry["properties"]
+        return session
+
+
+def _encode_results(objects: List[Any]) -> Dict[str, Any]:
+    layouts: List[List[str]] = []
+    # CIM types per layout, so replayed uint64 text is typed as when recorded
+    types: List[Dict[str, str]] = []
+    index: Dict[Tuple[str, ...], int] = {}
+    rows = []
+    for obj in objects:
+        values = object_to_dict(obj)
+        names = tuple(values)
+        layout = index.get(names)
+        if layout is None:
+            layout = index[names] = len(layouts)
+            layouts.append(list(names))
+            types.append(property_types(obj))
+        rows.append([layout] + [_to_json(value) for value in values.values()])
+    return {"layouts": layouts, "types": types, "rows": rows}
+
+
+class _RecordingConnection:
+    """Proxy of a live connection that records query results."""
+    
+    def __init__(self, backend: "RecordingBackend", connection: Any, computer: str, namespace: str):
+        self._backend = backend
+        self._connection = connection
+        self._computer = computer
+        self._namespace_name = namespace
+    
+    def query(self, wql: str) -> List[Any]:
+        start = time.perf_counter()
+        results = list(self._connection.query(wql))
+        latency = time.perf_counter() - start
+        self._backend.record(
+            _query_key(self._computer, self._namespace_name, wql), results, latency
+        )
+        return results
+    
+    def __getattr__(self, name: str) -> Any:
+        # Hide the raw SWbemServices (_namespace and friends) so streaming
+        # queries go through query() and are recorded too
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = getattr(self._connection, name)
+        properties = getattr(value, "properties", None)
+        if isinstance(properties, dict):
+            self._backend.record_class(self._namespace_name, name, list(properties))
+        return value
+
+
+class RecordingBackend(WMIBackend):
+    """
+    Records the query results of another backend into a session file.
+    
+    Results are materialized and every property is read while recording, so
+    streaming queries are not streamed and recording costs extra COM reads.
+    Method calls and event subscriptions are passed through unrecorded.
+    """
+    
+    def __init__(self, path: str, backend: Optional[WMIBackend] = None):
+        """
+        Initialize the recorder.
+        
+        Args:
+            path: Session file to write (gzip-compressed JSON)
+            backend: Backend to record (default: live COM)
+        """
+        super().__init__()
+        self.path = path
+        self.backend = backend or ComBackend()
+        self.queries_recorded = 0
+        self._session = _Session()
+        self._lock = threading.Lock()
+    
+    def connect(self, computer: str, namespace: str) -> Any:
+        return _RecordingConnection(self, self.backend.connect(computer, namespace), computer, namespace)
+    
+    def initialize_thread(self, multithreaded: bool = False):
+        self.backend.initialize_thread(multithreaded)
+    
+    def release_thread(self):
+        self.backend.release_thread()
+    
+    def record(self, key: QueryKey, results: List[Any], latency: float):
+        """Add one query's results to the session."""
+        entry = {"latency": round(latency, 6), **_encode_results(results)}
+        with self._lock:
+            self._session.add(key, entry)
+            self.queries_recorded += 1
+    
+    def record_class(self, namespace: str, class_name: str, properties: List[str]):
+        """Add a class definition's property names to the session."""
+        with self._lock:
+            self._session.classes[(namespace.lower(), class_name.lower())] = properties
+    
+    def save(self):
+        """Write everything recorded so far to the session file."""
+        with self._lock:
+            self._session.save(self.path)
+    
+    def __enter__(self) -> "RecordingBackend":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.save()
+
+
+class ReplayObject(DetachedObject):
+    """A recorded WMI instance: property values by attribute, names in .properties."""
+    
+    __slots__ = ()
+    
+    def __repr__(self) -> str:
+        return f"<ReplayObject {self._values!r}>"
+
+
+class _ReplayClass:
+    def __init__(self, properties: List[str]):
+        self.properties = dict.fromkeys(properties)
+
+
+class _ReplayConnection:
+    def __init__(self, backend: "ReplayBackend", computer: str, namespace: str):
+        self._backend = backend
+        self._computer = computer
+        self._namespace_name = namespace
+    
+    def query(self, wql: str) -> List[ReplayObject]:
+        return self._backend.replay(_query_key(self._computer, self._namespace_name, wql), wql)
+    
+    def watch_for(self, *args, **kwargs):
+        raise NotImplementedError("Event subscriptions cannot be replayed")
+    
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _ReplayClass(self._backend.class_properties(self._namespace_name, name))
+
+
+class ReplayBackend(WMIBackend):
+    """
+    Serves a recorded session without WMI.
+    
+    Each query returns its recorded snapshots in order, so repeated samples
+    of performance counters advance as they did while recording; the last
+    snapshot is repeated once they run out (or the sequence restarts with
+    loop=True). Queries that were not recorded raise LookupError.
+    """
+    
+    def __init__(self, path: str, latency_scale: float = 1.0, loop: bool = False):
+        """
+        Initialize the replay.
+        
+        Args:
+            path: Session file written by RecordingBackend
+            latency_scale: Multiplier for the recorded query latencies
+                (0 measures only the Python-side overhead)
+            loop: Restart a query's snapshots from the first once exhausted
+        """
+        super().__init__()
+        self.path = path
+        self.latency_scale = latency_scale
+        self.loop = loop
+        self.queries = 0
+        self.misses = 0
+        self._session = _Session.load(path)
+        self._positions: Dict[QueryKey, int] = {}
+        self._decoded: Dict[Tuple[QueryKey, int], List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+    
+    def connect(self, computer: str, namespace: str) -> Any:
+        return _ReplayConnection(self, computer, namespace)
+    
+    def _next_snapshot(self, key: QueryKey, wql: str) -> Tuple[int, Dict[str, Any]]:
+        snapshots = self._session.queries.get(key)
+        with self._lock:
+            self.queries += 1
+            if not snapshots:
+                self.misses += 1
+                raise LookupError(f"No recorded result for query: {wql}")
+            position = self._positions.get(key, 0)
+            if position >= len(snapshots):
+                position = 0 if self.loop else len(snapshots) - 1
+            self._positions[key] = position + 1
+        return position, snapshots[position]
+    
+    def replay(self, key: QueryKey, wql: str) -> List[ReplayObject]:
+        """Get the next recorded result of a query, after its recorded latency."""
+        position, snapshot = self._next_snapshot(key, wql)
+        if self.latency_scale:
+            time.sleep(snapshot["latency"] * self.latency_scale)
+        # Decode each snapshot once; every call still gets fresh objects
+        decoded = self._decoded.get((key, position))
+        if decoded is None:
+            layouts = snapshot["layouts"]
+            # Sessions recorded before types were kept replay untyped
+            types = snapshot.get("types") or [{}] * len(layouts)
+            decoded = [
+                (
+                    dict(zip(layouts[row[0]], [_from_json(value) for value in row[1:]])),
+                    types[row[0]],
+                )
+                for row in snapshot["rows"]
+            ]
+            self._decoded[(key, position)] = decoded
+        return [ReplayObject(dict(values), types) for values, types in decoded]
+    
+    def class_properties(self, namespace: str, class_name: str) -> List[str]:
+        """Property names of a class: its recorded definition, else those seen in results."""
+        properties = self._session.classes.get((namespace.lower(), class_name.lower()))
+        if properties is not None:
+            return list(properties)
+        names: Dict[str, None] = {}
+        for (_, key_namespace, wql), snapshots in self._session.queries.items():
+            if key_namespace == namespace.lower() and query_class(wql) == class_name.lower():
+                for snapshot in snapshots:
+                    for layout in snapshot["layouts"]:
+                        names.update(dict.fromkeys(layout))
+        if not names:
+            raise LookupError(f"No recorded definition of class: {class_name}")
+        return list(names)
+    
+    def reset(self):
+        """Replay every query from its first snapshot again."""
+        with self._lock:
+            self._positions.clear()
+
+
+class _SimulatedConnection:
+    def __init__(self, backend: "SimulatedBackend", computer: str):
+        self._backend = backend
+        self._computer = computer
+    
+    def query(self, wql: str) -> List[ReplayObject]:
+        return self._backend.answer(self._computer, wql)
+
+
+class SimulatedBackend(WMIBackend):
+    """
+    Stand-in for a set of computers without WMI.
+    
+    Every computer serves the given instances of a class for any query on
+    it (WHERE clauses are not evaluated), after sleeping its latency.
+    Computers listed in failures raise instead of answering.
+    """
+    
+    def __init__(
+        self,
+        instances: Dict[str, List[Dict[str, Any]]],
+        latency: float = 0.0,
+        host_latency: Optional[Dict[str, float]] = None,
+        failures: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the simulation.
+        
+        Args:
+            instances: Class name -> property values of its instances
+            latency: Seconds every query takes
+            host_latency: Computer name -> seconds, overriding latency
+            failures: Computer name -> error message its queries raise
+        """
+        super().__init__()
+        self.instances = {name.lower(): rows for name, rows in instances.items()}
+        self.latency = latency
+        self.host_latency = {host.lower(): seconds for host, seconds in (host_latency or {}).items()}
+        self.failures = {host.lower(): message for host, message in (failures or {}).items()}
+        self.queries = 0
+        self._lock = threading.Lock()
+    
+    def connect(self, computer: str, namespace: str) -> Any:
+        return _SimulatedConnection(self, computer)
+    
+    def answer(self, computer: str, wql: str) -> List[ReplayObject]:
+        """Get the result of a query on a computer, after its latency."""
+        host = computer.lower()
+        with self._lock:
+            self.queries += 1
+        time.sleep(self.host_latency.get(host, self.latency))
+        if host in self.failures:
+            raise RuntimeError(self.failures[host])
+        return [ReplayObject(dict(values)) for values in self.instances.get(query_class(wql).lower(), [])]
+
+
+def backend_from_env() -> Optional[WMIBackend]:
+    """
+    Create the backend selected by WMI_CLI_REPLAY or WMI_CLI_RECORD.
+    
+    A recording backend created this way saves its session at exit.
+    
+    Returns:
+        The backend, or None for live WMI
+    """
+    replay = os.getenv("WMI_CLI_REPLAY")
+    if replay:
+        scale = float(os.getenv("WMI_CLI_REPLAY_LATENCY", "1"))
+        return ReplayBackend(replay, latency_scale=scale)
+    record = os.getenv("WMI_CLI_RECORD")
+    if record:
+        backend = RecordingBackend(record)
+        atexit.register(backend.save)
+        return backend
+    return None
@@ -0,0 +1,316 @@
+"""
+Result caching for WMI queries.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .convert import detach_objects
+
+# (class name pattern, TTL in seconds). None never expires, 0 disables caching.
+DEFAULT_TTLS: List[Tuple[str, Optional[float]]] = [
+    ("Win32_BIOS", None),
+    ("Win32_ComputerSystem", None),
+    ("Win32_PerfFormattedData_*", 2.0),
+    ("Win32_PerfRawData_*", 1.0),
+]
+
+_QUOTED = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")")
+_SPACE_AROUND = re.compile(r"\s*([,=<>()!*])\s*")
+_FROM = re.compile(r"\bfrom\s+(\w+)", re.IGNORECASE)
+
+
+def normalize_wql(wql: str) -> str:
+    """
+    Normalize a WQL query for use as a cache key.
+    
+    Keywords and identifiers are case-folded and whitespace is collapsed;
+    quoted literals are kept verbatim.
+    
+    Args:
+        wql: WQL query string
+    
+    Returns:
+        Normalized query string
+    """
+    parts = _QUOTED.split(wql.strip())
+    for i in range(0, len(parts), 2):
+        text = " ".join(parts[i].split()).lower()
+        parts[i] = _SPACE_AROUND.sub(r"\1", text)
+    return "".join(parts)
+
+
+def query_class(wql: str) -> str:
+    """Return the class name in the FROM clause of a query ('' if none)."""
+    match = _FROM.search(wql)
+    return match.group(1) if match else ""
+
+
+class ResultCache:
+    """
+    LRU cache of query results with per-class TTLs.
+    
+    Entries are keyed on (computer, namespace, normalized WQL) so local and
+    remote connections never share results. Results are stored as
+    DetachedObjects copied on the thread that ran the query: live COM
+    objects must not be used from other threads' apartments.
+    """
+    
+    def __init__(
+        self,
+        ttls: Optional[Sequence[Tuple[str, Optional[float]]]] = None,
+        default_ttl: Optional[float] = 0,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttls: (class name pattern, TTL seconds) rules, first match wins.
+                Patterns are case-insensitive fnmatch globs. Defaults to
+                DEFAULT_TTLS.
+            default_ttl: TTL for classes matching no rule (0 = not cached,
+                None = never expires)
+            max_entries: Maximum number of cached queries before the least
+                recently used entry is evicted
+            clock: Monotonic time source
+        """
+        self.ttls = [(p.lower(), ttl) for p, ttl in (DEFAULT_TTLS if ttls is None else ttls)]
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def ttl_for(self, class_name: str) -> Optional[float]:
+        """Get the TTL that applies to a class."""
+        name = class_name.lower()
+        for pattern, ttl in self.ttls:
+            if fnmatchcase(name, pattern):
+                return ttl
+        return self.default_ttl
+    
+    @staticmethod
+    def make_key(computer: str, namespace: str, wql: str) -> Tuple[str, str, str]:
+        """Build the cache key for a query."""
+        return (computer.lower(), namespace.lower(), normalize_wql(wql))
+    
+    def get(self, computer: str, namespace: str, wql: str) -> Optional[List[Any]]:
+        """
+        Look up cached results.
+        
+        Returns:
+            A copy of the cached result list (DetachedObjects), or None on
+            a miss
+        """
+        key = self.make_key(computer, namespace, wql)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, _, results = entry
+                if expires is None or self._clock() < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(results)
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+    
+    def put(self, computer: str, namespace: str, wql: str, results: List[Any]) -> List[Any]:
+        """
+        Store results if the queried class is cacheable.
+        
+        Must be called on the thread that fetched the results, which are
+        detached there.
+        
+        Returns:
+            A copy of the stored result list (DetachedObjects), or results
+            unchanged if the class is not cached
+        """
+        class_name = query_class(wql)
+        ttl = self.ttl_for(class_name)
+        if ttl is not None and ttl <= 0:
+            return results
+        key = self.make_key(computer, namespace, wql)
+        results = detach_objects(results)
+        expires = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            self._entries[key] = (expires, class_name.lower(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return list(results)
+    
+    def invalidate(
+        self,
+        class_name: Optional[str] = None,
+        computer: Optional[str] = None,
+        namespace: Optional[str] = None
+    ) -> int:
+        """
+        Drop cached entries.
+        
+        Args:
+            class_name: Only drop queries against this class
+            computer: Only drop queries against this computer
+            namespace: Only drop queries against this namespace
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [
+                key for key, (_, cls, _) in self._entries.items()
+                if (class_name is None or cls == class_name.lower())
+                and (computer is None or key[0] == computer.lower())
+                and (namespace is None or key[1] == namespace.lower())
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+    
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+            }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Flight:
+    """A load in progress that other callers wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SnapshotCache:
+    """
+    Short-lived shared snapshots with single-flight loading.
+    
+    The first caller for a key runs the loader; callers asking for the same
+    key while it runs wait for that result instead of starting their own
+    WMI round-trip. Results are then shared until they expire or the cache
+    is invalidated (e.g. at the start of each agent turn).
+    """
+    
+    def __init__(self, ttl: Optional[float] = 5.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl: Seconds a snapshot is reused (None until invalidated)
+            clock: Monotonic time source
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: Dict[Any, Tuple[Optional[float], Any]] = {}
+        self._inflight: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+    
+    def get(self, key: Any, loader: Callable[[], Any]) -> Any:
+        """
+        Get the snapshot for a key, loading it at most once at a time.
+        
+        Args:
+            key: Hashable snapshot key
+            loader: Called without arguments to load the snapshot
+        
+        Returns:
+            The snapshot (shared between callers; do not modify it)
+        
+        Raises:
+            Exception: Whatever the loader raised, for every waiting caller
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or self._clock() < expires:
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if flight.error is None:
+                    expires = None if self.ttl is None else self._clock() + self.ttl
+                    self._entries[key] = (expires, flight.value)
+            flight.done.set()
+        return flight.value
+    
+    def invalidate(self, key: Any = None) -> int:
+        """
+        Drop snapshots; loads in progress are not affected.
+        
+        Args:
+            key: Only drop this key (None for all)
+        
+        Returns:
+            Number of snapshots removed
+        """
+        with self._lock:
+            if key is None:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            return 1 if self._entries.pop(key, None) is not None else 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss/coalesced counters and the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "entries": len(self._entries),
+                "in_flight": len(self._inflight),
+            }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,461 @@
+"""
+Persistent catalog of WMI class definitions.
+
+Enumerating ``meta_class`` returns every class with its full definition
+and takes seconds on a typical root\\cimv2. SchemaCatalog keeps the class
+names and the definitions it has read (property types, key properties,
+qualifiers, methods) in an index file per (computer, namespace), so
+``list-classes`` and ``class-info`` answer from disk. Definitions are
+read from the class object itself (SWbemServices.Get), never from
+instances, and only when first asked for.
+
+The index is refreshed incrementally once it is older than max_age: the
+class names are enumerated again, definitions of removed classes are
+dropped and new ones are read on demand. The OS build is checked on first
+use; a change discards the index, since updates replace providers and
+their classes.
+"""
+import difflib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .convert import CIM_TYPES, SchemaCache, get_default_schema_cache
+from .wmi_wrapper import WMIWrapper
+
+CATALOG_FORMAT = "wmi-cli-catalog"
+CATALOG_VERSION = 1
+DEFAULT_MAX_AGE = 24 * 3600.0
+
+# SWbemServices flags: wbemFlagReturnImmediately | wbemFlagForwardOnly
+_ENUM_FLAGS = 0x10 | 0x20
+
+_SELECT = re.compile(r"^\s*SELECT\s+(.+?)\s+FROM\s+(\w+)", re.IGNORECASE | re.DOTALL)
+
+
+@dataclass
+class PropertyInfo:
+    """A property of a class definition."""
+    
+    name: str
+    type: Optional[str] = None  # CIM type, '[]' suffix for arrays; None if unknown
+    key: bool = False
+    qualifiers: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ClassInfo:
+    """A WMI class definition."""
+    
+    name: str
+    superclass: Optional[str] = None
+    derivation: List[str] = field(default_factory=list)
+    properties: List[PropertyInfo] = field(default_factory=list)
+    methods: List[str] = field(default_factory=list)
+    qualifiers: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def property_names(self) -> List[str]:
+        return [prop.name for prop in self.properties]
+    
+    @property
+    def keys(self) -> List[str]:
+        """Names of the key properties."""
+        return [prop.name for prop in self.properties if prop.key]
+    
+    def get_property(self, name: str) -> Optional[PropertyInfo]:
+        """Find a property by name (case-insensitive)."""
+        lowered = name.lower()
+        return next((prop for prop in self.properties if prop.name.lower() == lowered), None)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ClassInfo":
+        data = dict(data)
+        data["properties"] = [PropertyInfo(**prop) for prop in data.get("properties", [])]
+        return cls(**data)
+
+
+def _plain(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return str(value)
+
+
+def _qualifiers(items: Any) -> Dict[str, Any]:
+    result = {}
+    for qualifier in items or ():
+        # CIMTYPE repeats the property type
+        if qualifier.Name == "CIMTYPE":
+            continue
+        try:
+            result[qualifier.Name] = _plain(qualifier.Value)
+        except Exception:
+            continue
+    return result
+
+
+def describe_class_object(obj: Any) -> ClassInfo:
+    """
+    Read a class definition from a raw SWbemObject class object.
+    
+    Args:
+        obj: Class object from SWbemServices.Get or SubclassesOf
+    
+    Returns:
+        The class definition
+    """
+    properties = []
+    for prop in obj.Properties_:
+        qualifiers = _qualifiers(prop.Qualifiers_)
+        cim_type = CIM_TYPES.get(prop.CIMType, str(prop.CIMType))
+        properties.append(PropertyInfo(
+            name=prop.Name,
+            type=cim_type + "[]" if prop.IsArray else cim_type,
+            key=bool(qualifiers.get("key")),
+            qualifiers=qualifiers,
+        ))
+    derivation = [str(name) for name in (obj.Derivation_ or ())]
+    return ClassInfo(
+        name=str(obj.Path_.Class),
+        superclass=derivation[0] if derivation else None,
+        derivation=derivation,
+        properties=properties,
+        methods=[method.Name for method in obj.Methods_],
+        qualifiers=_qualifiers(obj.Qualifiers_),
+    )
+
+
+def default_catalog_dir() -> str:
+    """Directory of the index files (WMI_CLI_CATALOG_DIR overrides it)."""
+    configured = os.getenv("WMI_CLI_CATALOG_DIR")
+    if configured:
+        return configured
+    base = os.getenv("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "wmi-cli", "catalog")
+
+
+def _file_name(computer: str, namespace: str) -> str:
+    host = "localhost" if computer in (".", "") else computer
+    name = f"{host}__{namespace}".lower()
+    return re.sub(r"[^\w.-]+", "_", name) + ".json"
+
+
+class SchemaCatalog:
+    """Class names and definitions of one namespace, persisted on disk."""
+    
+    def __init__(
+        self,
+        computer: str = ".",
+        namespace: str = "root\\cimv2",
+        wrapper: Optional[WMIWrapper] = None,
+        directory: Optional[str] = None,
+        max_age: Optional[float] = DEFAULT_MAX_AGE,
+        schemas: Optional[SchemaCache] = None
+    ):
+        """
+        Initialize the catalog.
+        
+        Args:
+            computer: Computer name or '.' for local machine
+            namespace: WMI namespace
+            wrapper: Existing wrapper to use (its computer and namespace win)
+            directory: Directory of the index files (default:
+                default_catalog_dir())
+            max_age: Seconds before the class list is refreshed (None
+                refreshes only on request)
+            schemas: Property name cache filled from loaded definitions
+                (default: the process-wide cache)
+        """
+        self.wrapper = wrapper or WMIWrapper(computer=computer, namespace=namespace)
+        self.computer = self.wrapper.computer
+        self.namespace = self.wrapper.namespace
+        self.path = os.path.join(directory or default_catalog_dir(),
+                                 _file_name(self.computer, self.namespace))
+        self.max_age = max_age
+        self.schemas = schemas if schemas is not None else get_default_schema_cache()
+        self.build: Optional[str] = None
+        self.updated: Optional[float] = None
+        self._names: Dict[str, str] = {}
+        self._classes: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._refreshed = False
+        self._lock = threading.RLock()
+    
+    # --- persistence -----------------------------------------------------
+    
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("format") != CATALOG_FORMAT or data.get("version") != CATALOG_VERSION:
+            return
+        self.build = data.get("build")
+        self.updated = data.get("updated")
+        self._names = {name.lower(): name for name in data.get("classes", [])}
+        self._classes = data.get("definitions", {})
+    
+    def save(self):
+        """Write the index file."""
+        with self._lock:
+            data = {
+                "format": CATALOG_FORMAT,
+                "version": CATALOG_VERSION,
+                "computer": self.computer,
+                "namespace": self.namespace,
+                "build": self.build,
+                "updated": self.updated,
+                "classes": sorted(self._names.values()),
+                "definitions": self._classes,
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp = f"{self.path}.tmp"
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp, self.path)
+    
+    def forget(self, class_name: str):
+        """Drop a class definition so the next describe() reads it again."""
+        with self._lock:
+            self._load()
+            self._classes.pop(class_name.lower(), None)
+            self.schemas.invalidate(self.computer, self.namespace, class_name)
+    
+    def clear(self):
+        """Forget every class and delete the index file."""
+        with self._lock:
+            self._loaded = True
+            self.build = self.updated = None
+            self._names.clear()
+            self._classes.clear()
+            self.schemas.invalidate(self.computer, self.namespace)
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+    
+    # --- reading from WMI ------------------------------------------------
+    
+    def _os_build(self) -> Optional[str]:
+        try:
+            os_wrapper = WMIWrapper(computer=self.computer, pool=self.wrapper.pool)
+            system = os_wrapper.get_operating_system(["Version", "BuildNumber"])
+        except Exception:
+            return None
+        if system is None:
+            return None
+        return str(getattr(system, "Version", None) or getattr(system, "BuildNumber", None))
+    
+    def _enumerate(self) -> List[str]:
+        conn = self.wrapper.get_connection()
+        services = getattr(conn, "_namespace", None)
+        if services is not None and hasattr(services, "SubclassesOf"):
+            return [str(obj.Path_.Class) for obj in services.SubclassesOf("", _ENUM_FLAGS)]
+        return [str(obj.Path_.Class) for obj in conn.query("SELECT * FROM meta_class")]
+    
+    def _read_definition(self, class_name: str) -> ClassInfo:
+        conn = self.wrapper.get_connection()
+        services = getattr(conn, "_namespace", None)
+        if services is not None and hasattr(services, "Get"):
+            try:
+                return describe_class_object(services.Get(class_name))
+            except Exception as e:
+                raise ValueError(f"Class '{class_name}' not found in {self.namespace}: {e}")
+        # wmi class wrappers only expose property and method names
+        cls = getattr(conn, class_name)
+        methods = getattr(cls, "methods", None)
+        return ClassInfo(
+            name=class_name,
+            properties=[PropertyInfo(name) for name in cls.properties],
+            methods=list(methods) if isinstance(methods, dict) else [],
+        )
+    
+    # --- public API ------------------------------------------------------
+    
+    def refresh(self, full: bool = False) -> Dict[str, int]:
+        """
+        Re-enumerate the classes and update the index.
+        
+        Args:
+            full: Also read every class definition that is not indexed yet
+        
+        Returns:
+            Counts of added, removed and described classes and the total
+        """
+        with self._lock:
+            self._load()
+            return self._refresh(self._os_build(), full)
+    
+    def _refresh(self, build: Optional[str], full: bool = False) -> Dict[str, int]:
+        # An OS build change invalidates every definition read before it
+        if build is not None and self.build is not None and build != self.build:
+            self._names.clear()
+            self._classes.clear()
+            self.schemas.invalidate(self.computer, self.namespace)
+        self.build = build or self.build
+        names = {name.lower(): name for name in self._enumerate()}
+        added = [key for key in names if key not in self._names]
+        removed = [key for key in self._names if key not in names]
+        for key in removed:
+            self._classes.pop(key, None)
+            self.schemas.invalidate(self.computer, self.namespace, key)
+        self._names = names
+        self.updated = time.time()
+        self._refreshed = True
+        described = 0
+        if full:
+            for key, name in names.items():
+                if key not in self._classes:
+                    try:
+                        self._store(self._read_definition(name))
+                        described += 1
+                    except Exception:
+                        continue
+        self.save()
+        return {"added": len(added), "removed": len(removed),
+                "described": described, "total": len(names)}
+    
+    def _ensure_fresh(self):
+        # Check the OS build and refresh at most once per catalog object
+        self._load()
+        if self._refreshed:
+            return
+        build = self._os_build()
+        stale = self.max_age is not None and (
+            self.updated is None or time.time() - self.updated > self.max_age
+        )
+        if not self._names or stale or (build is not None and build != self.build):
+            self._refresh(build)
+        else:
+            self._refreshed = True
+    
+    def _store(self, info: ClassInfo):
+        self._classes[info.name.lower()] = asdict(info)
+        self._names.setdefault(info.name.lower(), info.name)
+        self.schemas.put(self.computer, self.namespace, info.name, info.property_names)
+    
+    def list_classes(self) -> List[str]:
+        """Get the sorted class names (refreshing the index when stale)."""
+        with self._lock:
+            self._ensure_fresh()
+            return sorted(self._names.values())
+    
+    def has_class(self, class_name: str) -> bool:
+        """Check whether the namespace has a class."""
+        with self._lock:
+            self._ensure_fresh()
+            return class_name.lower() in self._names
+    
+    def describe(self, class_name: str) -> ClassInfo:
+        """
+        Get a class definition, reading it from WMI on first use.
+        
+        Like the other lookups, the first call checks the OS build and
+        refreshes the index when it is stale.
+        
+        Args:
+            class_name: Name of the WMI class
+        
+        Returns:
+            The class definition
+        
+        Raises:
+            ValueError: If the class does not exist
+        """
+        with self._lock:
+            self._ensure_fresh()
+            cached = self._classes.get(class_name.lower())
+            if cached is not None:
+                info = ClassInfo.from_dict(cached)
+                self.schemas.put(self.computer, self.namespace, info.name, info.property_names)
+                return info
+            info = self._read_definition(class_name)
+            self._store(info)
+            self.save()
+            return info
+    
+    def search(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Find classes whose name contains text (case-insensitive).
+        
+        Names starting with the text come first, then by match position and
+        length; use suggest() for misspelled names.
+        
+        Args:
+            text: Text to look for
+            limit: Maximum number of names to return
+        
+        Returns:
+            Matching class names, best first
+        """
+        needle = text.lower()
+        with self._lock:
+            self._ensure_fresh()
+            matches = []
+            for key, name in self._names.items():
+                position = key.find(needle)
+                if position >= 0:
+                    matches.append((position, len(key), key, name))
+        matches.sort()
+        return [name for *_, name in matches[:limit]]
+    
+    def suggest(self, text: str, limit: int = 5) -> List[str]:
+        """
+        Find class names similar to a possibly misspelled one.
+        
+        Args:
+            text: Class name as typed
+            limit: Maximum number of suggestions
+        
+        Returns:
+            Similar class names, most similar first
+        """
+        with self._lock:
+            self._ensure_fresh()
+            names = dict(self._names)
+        close = difflib.get_close_matches(text.lower(), list(names), n=limit, cutoff=0.75)
+        return [names[key] for key in close]
+    
+    def validate_query(self, wql: str) -> List[str]:
+        """
+        Check the class and selected properties of a SELECT query.
+        
+        Event, association and system class queries are not checked.
+        
+        Args:
+            wql: WQL query
+        
+        Returns:
+            Problems found, with suggestions (empty if the query looks valid)
+        """
+        match = _SELECT.match(wql)
+        if not match:
+            return []
+        columns, class_name = match.group(1), match.group(2)
+        if class_name.startswith("__") or "__" in columns:
+            return []
+        if not self.has_class(class_name):
+            suggestions = self.suggest(class_name)
+            hint = f" (did you mean {', '.join(suggestions)}?)" if suggestions else ""
+            return [f"Unknown class '{class_name}' in {self.namespace}{hint}"]
+        if columns.strip() == "*":
+            return []
+        info = self.describe(class_name)
+        known = {name.lower(): name for name in info.property_names}
+        problems = []
+        for column in (c.strip() for c in columns.split(",")):
+            if column and column.lower() not in known:
+                close = difflib.get_close_matches(column.lower(), list(known), n=3, cutoff=0.6)
+                hint = f" (did you mean {', '.join(known[k] for k in close)}?)" if close else ""
+                problems.append(f"Unknown property '{column}' of {info.name}{hint}")
+        return problems
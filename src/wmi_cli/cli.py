@@ -1,18 +1,20 @@
 """
 Command-line interface for WMI operations.
 """
+import itertools
 import json
 import sys
-from typing import Optional, List
+import time
+from typing import TYPE_CHECKING, Optional, List, Union
 
 import typer
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.syntax import Syntax
 
 from .wmi_wrapper import WMIWrapper, is_admin, format_bytes, wmi_object_to_dict
 
+if TYPE_CHECKING:
+    from .frame import ResultFrame
+
 app = typer.Typer(
     name="wmi-cli",
     help="Windows Management Instrumentation (WMI) CLI wrapper",
@@ -25,8 +27,9 @@ console = Console()
 def query(
     wql: str = typer.Argument(..., help="WQL query to execute"),
     namespace: str = typer.Option("root\\cimv2", help="WMI namespace"),
-    output_format: str = typer.Option("table", help="Output format: table, json, raw"),
+    output_format: str = typer.Option("table", help="Output format: table, json, csv, raw"),
     computer: str = typer.Option(".", help="Computer name (. for local)"),
+    limit: Optional[int] = typer.Option(None, help="Stop after this many results"),
 ):
     """
     Execute a raw WQL query.
@@ -37,58 +40,30 @@ def query(
     """
     try:
         wrapper = WMIWrapper(computer=computer, namespace=namespace)
-        results = wrapper.query(wql)
         
-        if not results:
+        if output_format == "raw":
+            # Stream results; the limit stops enumeration early
+            results = wrapper.iter_query(wql, limit=limit)
+            first_obj = next(results, None)
+            if first_obj is None:
+                console.print("[yellow]No results found[/yellow]")
+                return
+            for obj in itertools.chain([first_obj], results):
+                console.print(obj)
+            return
+        
+        # Convert while enumerating; rendering never touches COM again
+        frame = wrapper.query_frame(wql, limit=limit)
+        if not frame:
             console.print("[yellow]No results found[/yellow]")
             return
         
         if output_format == "json":
-            # Try to extract real property values
-            output = []
-            for obj in results:
-                try:
-                    # Try to get actual WMI properties
-                    item_dict = {}
-                    for prop_name in obj.properties:
-                        try:
-                            item_dict[prop_name] = getattr(obj, prop_name)
-                        except:
-                            item_dict[prop_name] = None
-                    output.append(item_dict)
-                except:
-                    # Fallback to standard conversion
-                    output.append(wmi_object_to_dict(obj))
-            console.print(json.dumps(output, indent=2, default=str))
-        elif output_format == "table":
-            # For table output, show actual properties
-            if results:
-                try:
-                    # Get actual properties from first object
-                    first_obj = results[0]
-                    properties = [p for p in first_obj.properties][:10]  # Limit to 10 columns
-                    
-                    table = Table(title=f"Query Results")
-                    for prop in properties:
-                        table.add_column(prop, style="cyan")
-                    
-                    for obj in results:
-                        row = []
-                        for prop in properties:
-                            try:
-                                value = getattr(obj, prop)
-                                row.append(str(value) if value is not None else "N/A")
-                            except:
-                                row.append("N/A")
-                        table.add_row(*row)
-                    
-                    console.print(table)
-                except:
-                    # Fallback to old method
-                    _display_table(results, f"Query Results: {wql}")
+            console.print(frame.to_json())
+        elif output_format == "csv":
+            sys.stdout.write(frame.to_csv())
         else:
-            for obj in results:
-                console.print(obj)
+            _display_table(frame, "Query Results")
                 
     except Exception as e:
         console.print(f"[red]Error executing query: {e}[/red]")
@@ -101,16 +76,29 @@ def query(
 def list_classes(
     namespace: str = typer.Option("root\\cimv2", help="WMI namespace"),
     filter_text: Optional[str] = typer.Option(None, help="Filter class names"),
+    computer: str = typer.Option(".", help="Computer name (. for local)"),
+    refresh: bool = typer.Option(False, "--refresh", help="Re-enumerate classes instead of using the catalog"),
 ):
     """List all available WMI classes."""
+    from rich.table import Table
+    from .catalog import SchemaCatalog
+    
     try:
-        wrapper = WMIWrapper(namespace=namespace)
-        classes = wrapper.list_classes()
+        catalog = SchemaCatalog(computer=computer, namespace=namespace)
+        if refresh:
+            catalog.refresh()
         
         if filter_text:
-            classes = [c for c in classes if filter_text.lower() in c.lower()]
+            classes = catalog.search(filter_text)
+        else:
+            classes = catalog.list_classes()
         
-        classes.sort()
+        if not classes:
+            suggestions = catalog.suggest(filter_text) if filter_text else []
+            console.print(f"[yellow]No classes match '{filter_text}'[/yellow]")
+            if suggestions:
+                console.print(f"Did you mean: {', '.join(suggestions)}")
+            return
         
         table = Table(title=f"WMI Classes in {namespace}")
         table.add_column("Class Name", style="cyan")
@@ -130,27 +118,52 @@ def list_classes(
 def class_info(
     class_name: str = typer.Argument(..., help="WMI class name"),
     namespace: str = typer.Option("root\\cimv2", help="WMI namespace"),
+    computer: str = typer.Option(".", help="Computer name (. for local)"),
+    sample: bool = typer.Option(True, help="Show a sample instance"),
+    refresh: bool = typer.Option(False, "--refresh", help="Re-read the definition instead of using the catalog"),
 ):
     """Get information about a WMI class (properties and sample instance)."""
+    from rich.table import Table
+    from .catalog import SchemaCatalog
+    
     try:
-        wrapper = WMIWrapper(namespace=namespace)
-        properties = wrapper.get_class_properties(class_name)
+        wrapper = WMIWrapper(computer=computer, namespace=namespace)
+        catalog = SchemaCatalog(wrapper=wrapper)
+        if refresh:
+            catalog.forget(class_name)
+        try:
+            info = catalog.describe(class_name)
+        except ValueError as e:
+            suggestions = catalog.suggest(class_name)
+            if suggestions:
+                raise ValueError(f"{e} (did you mean {', '.join(suggestions)}?)")
+            raise
         
-        if not properties:
-            console.print(f"[yellow]No instances found for class {class_name}[/yellow]")
+        if not info.properties:
+            console.print(f"[yellow]No properties found for class {info.name}[/yellow]")
             return
         
-        table = Table(title=f"Properties of {class_name}")
+        title = f"Properties of {info.name}"
+        if info.superclass:
+            title += f" ({info.superclass})"
+        table = Table(title=title)
         table.add_column("Property", style="cyan")
+        table.add_column("Type")
+        table.add_column("Key", justify="center")
         
-        for prop in sorted(properties):
-            table.add_row(prop)
+        for prop in sorted(info.properties, key=lambda p: p.name):
+            table.add_row(prop.name, prop.type or "", "yes" if prop.key else "")
         
         console.print(table)
-        console.print(f"\n[green]Total: {len(properties)} properties[/green]")
+        console.print(f"\n[green]Total: {len(info.properties)} properties[/green]")
+        if info.methods:
+            console.print(f"[bold]Methods:[/bold] {', '.join(sorted(info.methods))}")
+        
+        if not sample:
+            return
         
         # Show a sample instance
-        instances = wrapper.get_class(class_name)
+        instances = list(wrapper.iter_class(info.name, batch_size=1, limit=1))
         if instances:
             console.print("\n[bold]Sample Instance:[/bold]")
             sample_data = wmi_object_to_dict(instances[0])
@@ -169,6 +182,9 @@ def services(
     output_format: str = typer.Option("table", help="Output format: table, json"),
 ):
     """List Windows services."""
+    from rich.table import Table
+    from .convert import objects_to_dicts
+    
     try:
         wrapper = WMIWrapper()
         filters = {}
@@ -179,15 +195,15 @@ def services(
         if start_mode:
             filters["StartMode"] = start_mode
         
-        results = wrapper.get_services(**filters)
+        columns = ["Name", "DisplayName", "State", "StartMode", "Status"]
+        results = wrapper.get_services(columns, **filters)
         
         if not results:
             console.print("[yellow]No services found matching criteria[/yellow]")
             return
         
         if output_format == "json":
-            output = [wmi_object_to_dict(svc, ["Name", "DisplayName", "State", "StartMode", "Status"]) 
-                     for svc in results]
+            output = objects_to_dicts(results, columns)
             console.print(json.dumps(output, indent=2, default=str))
         else:
             table = Table(title="Windows Services")
@@ -214,28 +230,91 @@ def services(
         raise typer.Exit(1)
 
 
+@app.command()
+def services_ctl(
+    action: str = typer.Argument(..., help="Action: start, stop, restart"),
+    names: List[str] = typer.Argument(..., help="Service names (NAME=ACTION overrides the action)"),
+    computer: str = typer.Option(".", help="Computer name (. for local)"),
+    max_workers: int = typer.Option(8, help="Maximum number of services controlled at once"),
+    timeout: float = typer.Option(30.0, help="Seconds each service may take to stop or start"),
+    output_format: str = typer.Option("table", help="Output format: table, json"),
+):
+    """Start, stop or restart services concurrently, in dependency order."""
+    from dataclasses import asdict
+    from .modules import ServiceManager
+    
+    try:
+        actions = {}
+        for name in names:
+            name, _, override = name.partition("=")
+            actions[name] = override or action
+        results = ServiceManager(computer=computer).apply(
+            actions, max_workers=max_workers, timeout=timeout
+        )
+    except Exception as e:
+        console.print(f"[red]Error controlling services: {e}[/red]")
+        raise typer.Exit(1)
+    
+    if output_format == "json":
+        console.print(json.dumps([asdict(result) for result in results], indent=2, default=str))
+    else:
+        from rich.table import Table
+        
+        table = Table(title="Service Control")
+        table.add_column("Name", style="cyan")
+        table.add_column("Action")
+        table.add_column("Result")
+        table.add_column("State", style="yellow")
+        table.add_column("Queued", justify="right")
+        table.add_column("Time", justify="right")
+        table.add_column("Error", style="red")
+        
+        for result in results:
+            table.add_row(
+                result.name,
+                result.action,
+                "[green]ok[/green]" if result.ok else "[red]failed[/red]",
+                result.state or "",
+                f"{result.queued:.2f}s",
+                f"{result.elapsed:.2f}s",
+                result.error or "",
+            )
+        
+        console.print(table)
+    
+    failed = sum(1 for result in results if not result.ok)
+    if failed:
+        console.print(f"[red]{failed} of {len(results)} services failed[/red]")
+        raise typer.Exit(1)
+
+
 @app.command()
 def processes(
     name: Optional[str] = typer.Option(None, help="Filter by process name"),
-    output_format: str = typer.Option("table", help="Output format: table, json"),
+    output_format: str = typer.Option("table", help="Output format: table, json, csv"),
 ):
     """List running processes."""
+    from rich.table import Table
+    
     try:
         wrapper = WMIWrapper()
         filters = {}
         if name:
             filters["Name"] = name
         
-        results = wrapper.get_processes(**filters)
+        columns = ["Name", "ProcessId", "ThreadCount", "WorkingSetSize"]
+        if output_format in ("json", "csv"):
+            columns.append("CommandLine")
+        results = wrapper.get_class_frame("Win32_Process", columns, **filters)
         
         if not results:
             console.print("[yellow]No processes found[/yellow]")
             return
         
         if output_format == "json":
-            output = [wmi_object_to_dict(proc, ["Name", "ProcessId", "ThreadCount", "WorkingSetSize", "CommandLine"]) 
-                     for proc in results]
-            console.print(json.dumps(output, indent=2, default=str))
+            console.print(results.to_json())
+        elif output_format == "csv":
+            sys.stdout.write(results.to_csv())
         else:
             table = Table(title="Running Processes")
             table.add_column("PID", style="cyan")
@@ -244,11 +323,11 @@ def processes(
             table.add_column("Memory", style="green")
             
             for proc in results:
-                memory = format_bytes(int(proc.WorkingSetSize)) if proc.WorkingSetSize else "N/A"
+                memory = format_bytes(proc["WorkingSetSize"]) if proc["WorkingSetSize"] else "N/A"
                 table.add_row(
-                    str(proc.ProcessId),
-                    proc.Name,
-                    str(proc.ThreadCount) if proc.ThreadCount else "N/A",
+                    str(proc["ProcessId"]),
+                    proc["Name"],
+                    str(proc["ThreadCount"]) if proc["ThreadCount"] else "N/A",
                     memory,
                 )
             
@@ -260,22 +339,178 @@ def processes(
         raise typer.Exit(1)
 
 
+@app.command()
+def ptree(
+    pid: Optional[int] = typer.Argument(None, help="Show only this process and its descendants"),
+    name: Optional[str] = typer.Option(None, help="Show processes matching this name pattern (e.g. 'chrome*') and their descendants"),
+    depth: Optional[int] = typer.Option(None, help="Maximum depth shown"),
+    kill: bool = typer.Option(False, "--kill", help="Terminate the selected processes and all their descendants (needs PID or --name; ignores --depth)"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Do not ask before terminating"),
+    computer: str = typer.Option(".", help="Computer name (. for local)"),
+    max_workers: int = typer.Option(8, help="Maximum number of processes terminated at once"),
+    output_format: str = typer.Option("tree", help="Output format: tree, json"),
+):
+    """Show the process tree, optionally terminating a subtree."""
+    from .modules import ProcessManager
+    
+    if kill and pid is None and not name:
+        # Without a selection the tree holds every process on the machine
+        console.print("[red]Error: --kill needs a PID or --name[/red]")
+        raise typer.Exit(1)
+    
+    try:
+        manager = ProcessManager(computer=computer)
+        tree = manager.get_process_tree()
+        if pid is not None:
+            if pid not in tree:
+                console.print(f"[red]Error: process {pid} not found[/red]")
+                raise typer.Exit(1)
+            roots = [pid]
+        elif name:
+            roots = tree.find(name)
+            if not roots:
+                console.print(f"[yellow]No processes match '{name}'[/yellow]")
+                return
+        else:
+            roots = None
+        shown = [(p, d) for p, d in tree.walk(roots) if depth is None or d <= depth]
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[red]Error reading processes: {e}[/red]")
+        raise typer.Exit(1)
+    
+    if output_format == "json":
+        console.print(json.dumps([
+            {"pid": p, "parent": tree.parent(p), "name": tree.get(p).get("Name"), "depth": d}
+            for p, d in shown
+        ], indent=2))
+    else:
+        from rich.tree import Tree
+        
+        title = "Processes" if computer == "." else f"Processes on {computer}"
+        top = Tree(f"[bold]{title}[/bold]", guide_style="dim")
+        branches = [top]
+        for p, d in shown:
+            del branches[d + 1:]
+            label = f"[cyan]{tree.get(p).get('Name')}[/cyan] ({p})"
+            branches.append(branches[-1].add(label))
+        console.print(top)
+        console.print(f"\n[green]Total: {len(shown)} processes[/green]")
+    
+    if not kill:
+        return
+    # --depth only limits the display; never leave deeper descendants orphaned
+    targets = [p for p, _ in tree.walk(roots)]
+    if not yes and not typer.confirm(f"Terminate {len(targets)} processes?"):
+        raise typer.Exit(1)
+    results = manager.terminate_processes([tree.get(p) for p in targets], max_workers=max_workers)
+    failed = [result for result in results if not result.ok]
+    console.print(f"[green]Terminated {len(results) - len(failed)} processes[/green]")
+    for result in failed:
+        console.print(f"[red]{result.name} ({result.pid}): {result.error}[/red]")
+    if failed:
+        raise typer.Exit(1)
+
+
+@app.command()
+def top(
+    count: int = typer.Option(20, "--count", "-n", help="Number of processes to show"),
+    sort: str = typer.Option("cpu", help="Sort by: cpu, memory, io"),
+    interval: float = typer.Option(1.0, help="Seconds between counter samples (refresh interval with --live)"),
+    live: bool = typer.Option(False, "--live", help="Keep refreshing until Ctrl+C"),
+    iterations: int = typer.Option(0, help="Stop --live after this many refreshes (0 for no limit)"),
+    computer: str = typer.Option(".", help="Computer name"),
+    output_format: str = typer.Option("table", help="Output format: table, json"),
+):
+    """Show the busiest processes by CPU, memory or IO rate."""
+    from rich.table import Table
+    from .modules import ProcessSampler
+    
+    try:
+        sampler = ProcessSampler(computer=computer)
+        if live:
+            from rich.live import Live
+            from .dashboard import ProcessDashboard
+            
+            dashboard = ProcessDashboard(sampler, count=count, sort=sort)
+            dashboard.refresh()
+            # Redraw only after a refresh; Rich's auto-refresh thread would
+            # re-render the unchanged table several times per second
+            with Live(dashboard.render(), console=console, auto_refresh=False) as display:
+                try:
+                    while not iterations or dashboard.refreshes < iterations:
+                        time.sleep(interval)
+                        dashboard.refresh()
+                        display.update(dashboard.render(), refresh=True)
+                except KeyboardInterrupt:
+                    pass
+            return
+        
+        sampler.measure(interval=interval)
+        results = sampler.top(count, by=sort)
+        
+        if output_format == "json":
+            console.print(json.dumps(results, indent=2))
+            return
+        
+        table = Table(title=f"Top Processes ({sort})")
+        table.add_column("PID", style="cyan")
+        table.add_column("Name", style="white")
+        table.add_column("CPU %", style="yellow", justify="right")
+        table.add_column("Memory", style="green", justify="right")
+        table.add_column("IO/s", style="magenta", justify="right")
+        
+        for proc in results:
+            table.add_row(
+                str(proc["pid"]),
+                proc["name"],
+                f"{proc['cpu_percent']:.1f}" if proc["cpu_percent"] is not None else "N/A",
+                format_bytes(proc["working_set"]),
+                format_bytes(proc["io_bytes_per_sec"]) if proc["io_bytes_per_sec"] is not None else "N/A",
+            )
+        
+        console.print(table)
+        console.print(f"\n[green]{len(sampler.stats())} processes sampled over {interval:g}s[/green]")
+        
+    except Exception as e:
+        console.print(f"[red]Error sampling processes: {e}[/red]")
+        raise typer.Exit(1)
+
+
 @app.command()
 def system_info(
     output_format: str = typer.Option("table", help="Output format: table, json"),
 ):
     """Display system information."""
+    from rich.table import Table
+    from .inventory import SnapshotCollector, class_section
+    
     try:
-        wrapper = WMIWrapper()
-        os_info = wrapper.get_operating_system()
-        cs_info = wrapper.get_computer_system()
-        bios_info = wrapper.get_bios()
+        if output_format == "json":
+            os_columns = cs_columns = bios_columns = None
+        else:
+            os_columns = ["Caption", "Version", "OSArchitecture"]
+            cs_columns = ["Name", "Manufacturer", "Model", "SystemType", "TotalPhysicalMemory"]
+            bios_columns = ["Version", "SerialNumber"]
+        # The three classes are queried concurrently
+        snapshot = SnapshotCollector({
+            "operating_system": class_section("Win32_OperatingSystem", os_columns, single=True),
+            "computer_system": class_section("Win32_ComputerSystem", cs_columns, single=True),
+            "bios": class_section("Win32_BIOS", bios_columns, single=True),
+        }, max_workers=3).collect()
+        if snapshot["errors"]:
+            errors = snapshot["errors"]
+            raise RuntimeError("; ".join(f"{name}: {error}" for name, error in errors.items()))
+        os_info = snapshot["sections"]["operating_system"]
+        cs_info = snapshot["sections"]["computer_system"]
+        bios_info = snapshot["sections"]["bios"]
         
         if output_format == "json":
             output = {
-                "operating_system": wmi_object_to_dict(os_info),
-                "computer_system": wmi_object_to_dict(cs_info),
-                "bios": wmi_object_to_dict(bios_info),
+                "operating_system": os_info,
+                "computer_system": cs_info,
+                "bios": bios_info,
             }
             console.print(json.dumps(output, indent=2, default=str))
         else:
@@ -283,16 +518,22 @@ def system_info(
             table.add_column("Property", style="cyan bold")
             table.add_column("Value", style="white")
             
-            table.add_row("Computer Name", cs_info.Name)
-            table.add_row("Manufacturer", cs_info.Manufacturer)
-            table.add_row("Model", cs_info.Model)
-            table.add_row("OS Name", os_info.Caption)
-            table.add_row("OS Version", os_info.Version)
-            table.add_row("OS Architecture", os_info.OSArchitecture)
-            table.add_row("System Type", cs_info.SystemType)
-            table.add_row("Total Physical Memory", format_bytes(int(cs_info.TotalPhysicalMemory)))
-            table.add_row("BIOS Version", bios_info.Version if bios_info else "N/A")
-            table.add_row("Serial Number", bios_info.SerialNumber if bios_info else "N/A")
+            # A class with no instance leaves its section None
+            def value(info, name):
+                found = (info or {}).get(name)
+                return "N/A" if found is None else str(found)
+            
+            memory = (cs_info or {}).get("TotalPhysicalMemory")
+            table.add_row("Computer Name", value(cs_info, "Name"))
+            table.add_row("Manufacturer", value(cs_info, "Manufacturer"))
+            table.add_row("Model", value(cs_info, "Model"))
+            table.add_row("OS Name", value(os_info, "Caption"))
+            table.add_row("OS Version", value(os_info, "Version"))
+            table.add_row("OS Architecture", value(os_info, "OSArchitecture"))
+            table.add_row("System Type", value(cs_info, "SystemType"))
+            table.add_row("Total Physical Memory", format_bytes(int(memory)) if memory else "N/A")
+            table.add_row("BIOS Version", value(bios_info, "Version"))
+            table.add_row("Serial Number", value(bios_info, "SerialNumber"))
             
             console.print(table)
             
@@ -301,27 +542,89 @@ def system_info(
         raise typer.Exit(1)
 
 
+@app.command()
+def inventory(
+    sections: Optional[str] = typer.Option(None, help="Comma-separated sections to collect (default: all)"),
+    computer: str = typer.Option(".", help="Computer name (. for local)"),
+    max_workers: int = typer.Option(8, help="Maximum number of sections collected at once"),
+    timeout: float = typer.Option(60.0, help="Seconds allowed per section"),
+    output_format: str = typer.Option("table", help="Output format: table, json"),
+):
+    """
+    Collect a hardware and system inventory, querying its sections concurrently.
+    
+    Example: wmi-cli inventory --sections operating_system,processors,disks --output-format json
+    """
+    from .inventory import DEFAULT_SECTIONS, SnapshotCollector
+    
+    names = [name.strip() for name in sections.split(",")] if sections else list(DEFAULT_SECTIONS)
+    unknown = [name for name in names if name not in DEFAULT_SECTIONS]
+    if unknown:
+        console.print(
+            f"[red]Unknown section(s): {', '.join(unknown)}. "
+            f"Available: {', '.join(DEFAULT_SECTIONS)}[/red]"
+        )
+        raise typer.Exit(1)
+    
+    try:
+        collector = SnapshotCollector(
+            {name: DEFAULT_SECTIONS[name] for name in names},
+            computer=computer,
+            max_workers=max_workers,
+            timeout=timeout,
+        )
+        snapshot = collector.collect()
+    except Exception as e:
+        console.print(f"[red]Error collecting inventory: {e}[/red]")
+        raise typer.Exit(1)
+    
+    if output_format == "json":
+        print(json.dumps(snapshot, indent=2, default=str))
+    else:
+        from rich.table import Table
+        
+        table = Table(title=f"Inventory ({snapshot['computer']})")
+        table.add_column("Section", style="cyan")
+        table.add_column("Items", justify="right")
+        table.add_column("Time", justify="right")
+        table.add_column("Status")
+        for name in snapshot["sections"]:
+            result = collector.results[name]
+            status = "[green]ok[/green]" if result.ok else f"[red]{result.error}[/red]"
+            table.add_row(name, str(result.items), f"{result.elapsed * 1000:.0f} ms", status)
+        table.caption = (
+            f"Collected in {snapshot['elapsed']:.2f}s "
+            f"(sections took {sum(snapshot['timings'].values()):.2f}s in total)"
+        )
+        console.print(table)
+    if len(snapshot["errors"]) == len(names):
+        raise typer.Exit(1)
+
+
 @app.command()
 def disks(
     drive_type: Optional[int] = typer.Option(None, help="Filter by drive type (3=Local, 4=Network, 5=CD-ROM)"),
     output_format: str = typer.Option("table", help="Output format: table, json"),
 ):
     """List disk drives."""
+    from rich.table import Table
+    from .convert import objects_to_dicts
+    
     try:
         wrapper = WMIWrapper()
         filters = {}
         if drive_type is not None:
             filters["DriveType"] = drive_type
         
-        results = wrapper.get_logical_disks(**filters)
+        columns = ["DeviceID", "VolumeName", "DriveType", "FileSystem", "Size", "FreeSpace"]
+        results = wrapper.get_logical_disks(columns, **filters)
         
         if not results:
             console.print("[yellow]No disks found[/yellow]")
             return
         
         if output_format == "json":
-            output = [wmi_object_to_dict(disk, ["DeviceID", "VolumeName", "DriveType", "FileSystem", 
-                                                "Size", "FreeSpace"]) for disk in results]
+            output = objects_to_dicts(results, columns)
             console.print(json.dumps(output, indent=2, default=str))
         else:
             table = Table(title="Disk Drives")
@@ -371,16 +674,25 @@ def network(
     output_format: str = typer.Option("table", help="Output format: table, json"),
 ):
     """Display network adapter configuration."""
+    from rich.table import Table
+    from .convert import objects_to_dicts
+    
     try:
         wrapper = WMIWrapper()
-        results = wrapper.get_network_adapters(IPEnabled=True)
+        columns = None
+        if output_format != "json":
+            columns = [
+                "Description", "MACAddress", "DHCPEnabled", "IPAddress",
+                "IPSubnet", "DefaultIPGateway", "DNSServerSearchOrder",
+            ]
+        results = wrapper.get_network_adapters(columns, IPEnabled=True)
         
         if not results:
             console.print("[yellow]No enabled network adapters found[/yellow]")
             return
         
         if output_format == "json":
-            output = [wmi_object_to_dict(adapter) for adapter in results]
+            output = objects_to_dicts(results)
             console.print(json.dumps(output, indent=2, default=str))
         else:
             for adapter in results:
@@ -415,9 +727,403 @@ def network(
         raise typer.Exit(1)
 
 
+@app.command()
+def net_stats(
+    interval: float = typer.Option(1.0, help="Seconds between counter samples"),
+    count: int = typer.Option(1, "--count", "-n", help="Number of reports (0 for no limit)"),
+    computer: str = typer.Option(".", help="Computer name"),
+    show_idle: bool = typer.Option(False, "--show-idle", help="Include interfaces with no traffic"),
+    output_format: str = typer.Option("table", help="Output format: table, json"),
+):
+    """Show network throughput per interface."""
+    from rich.table import Table
+    from .modules import NetworkSampler
+    
+    try:
+        sampler = NetworkSampler(computer=computer)
+        sampler.sample()
+        reports = 0
+        while not count or reports < count:
+            time.sleep(interval)
+            results = sampler.sample()
+            reports += 1
+            if not show_idle:
+                results = [r for r in results if r["bytes_total_per_sec"] or r["packets_received_per_sec"]]
+            
+            if output_format == "json":
+                console.print(json.dumps(results, indent=2))
+                continue
+            
+            table = Table(title=f"Network Throughput ({interval:g}s)")
+            table.add_column("Interface", style="cyan")
+            table.add_column("Received/s", style="green", justify="right")
+            table.add_column("Sent/s", style="green", justify="right")
+            table.add_column("Packets in/s", justify="right")
+            table.add_column("Packets out/s", justify="right")
+            table.add_column("Errors/s", style="red", justify="right")
+            table.add_column("Utilization", style="yellow", justify="right")
+            
+            for iface in results:
+                utilization = iface["utilization_percent"]
+                table.add_row(
+                    iface["name"],
+                    format_bytes(iface["bytes_received_per_sec"]),
+                    format_bytes(iface["bytes_sent_per_sec"]),
+                    f"{iface['packets_received_per_sec']:.0f}",
+                    f"{iface['packets_sent_per_sec']:.0f}",
+                    f"{iface['errors_per_sec']:.1f}",
+                    f"{utilization:.1f}%" if utilization is not None else "N/A",
+                )
+            
+            console.print(table)
+            
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        console.print(f"[red]Error sampling network counters: {e}[/red]")
+        raise typer.Exit(1)
+
+
+@app.command()
+def serve_metrics(
+    port: int = typer.Option(9182, help="Port to listen on"),
+    host: str = typer.Option("127.0.0.1", help="Address to bind (0.0.0.0 for all interfaces)"),
+    refresh_interval: float = typer.Option(15.0, help="Seconds between WMI collections"),
+    top_processes: int = typer.Option(20, help="Processes exported per sort key (CPU, memory)"),
+    computer: str = typer.Option(".", help="Computer name"),
+):
+    """Serve memory, disk, process, service and network metrics for Prometheus."""
+    from .exporter import MetricsExporter
+    
+    try:
+        exporter = MetricsExporter(
+            computer=computer, refresh_interval=refresh_interval, top_processes=top_processes
+        )
+        server = exporter.make_server(host, port)
+    except Exception as e:
+        console.print(f"[red]Error starting exporter: {e}[/red]")
+        raise typer.Exit(1)
+    
+    bound_host, bound_port = server.server_address[:2]
+    console.print(f"[green]Serving metrics on http://{bound_host}:{bound_port}/metrics "
+                  f"(refresh every {refresh_interval:g}s, Ctrl+C to stop)[/green]")
+    exporter.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        exporter.stop()
+
+
+@app.command()
+def fleet_query(
+    wql: str = typer.Argument(..., help="WQL query to execute on every host"),
+    hosts: str = typer.Option(..., help="File with one computer name per line"),
+    namespace: str = typer.Option("root\\cimv2", help="WMI namespace"),
+    max_workers: int = typer.Option(16, help="Maximum number of hosts queried at once"),
+    timeout: float = typer.Option(30.0, help="Per-host timeout in seconds"),
+    output_format: str = typer.Option("table", help="Output format: table, json, jsonl"),
+):
+    """Execute a WQL query against many computers concurrently."""
+    from rich.table import Table
+    
+    from .fleet import FleetQuery, read_hosts_file
+    
+    try:
+        host_list = read_hosts_file(hosts)
+        if not host_list:
+            console.print(f"[yellow]No hosts found in {hosts}[/yellow]")
+            return
+        
+        fleet = FleetQuery(host_list, namespace=namespace, max_workers=max_workers, timeout=timeout)
+        rows = []
+        for row in fleet.run(wql):
+            if output_format == "jsonl":
+                # Stream rows as each host completes
+                print(json.dumps(row.to_dict(), default=str), flush=True)
+            else:
+                rows.append(row.to_dict())
+        
+        if output_format == "json":
+            console.print(json.dumps(rows, indent=2, default=str))
+        elif output_format == "table" and rows:
+            columns = list(rows[0].keys())[:10]
+            table = Table(title=f"Fleet Query Results ({len(host_list)} hosts)")
+            for column in columns:
+                table.add_column(column, style="cyan")
+            for row in rows:
+                table.add_row(*[str(row.get(c)) if row.get(c) is not None else "N/A" for c in columns])
+            console.print(table)
+        
+        # Report on stderr so streamed output stays machine-readable
+        summary = fleet.summary
+        err_console = Console(stderr=True)
+        err_console.print(
+            f"[green]{len(summary.succeeded)} hosts succeeded[/green], "
+            f"[red]{len(summary.failed)} failed[/red]"
+        )
+        for status in summary.failed:
+            err_console.print(f"[red]  {status.host}: {status.error}[/red]")
+        if summary.failed and not summary.succeeded:
+            raise typer.Exit(1)
+            
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[red]Error running fleet query: {e}[/red]")
+        raise typer.Exit(1)
+
+
+@app.command()
+def watch(
+    class_name: str = typer.Argument(
+        ..., help="WMI class to watch (e.g. Win32_Service, Win32_ProcessStartTrace)"
+    ),
+    kind: str = typer.Option(
+        "operation", help="Event kind: creation, modification, deletion, operation, trace"
+    ),
+    within: float = typer.Option(2.0, help="WMI polling interval for classes without an event provider"),
+    filters: List[str] = typer.Option([], "--filter", help="Instance filter NAME=VALUE (repeatable)"),
+    changed: List[str] = typer.Option([], help="Only report modifications changing this property (repeatable)"),
+    properties: Optional[str] = typer.Option(None, help="Comma-separated properties to report"),
+    coalesce: float = typer.Option(0.0, help="Seconds to merge repeated events for the same instance"),
+    max_pending: int = typer.Option(1000, help="Maximum number of buffered events"),
+    count: Optional[int] = typer.Option(None, help="Exit after this many events"),
+    duration: Optional[float] = typer.Option(None, help="Exit after this many seconds"),
+    namespace: str = typer.Option("root\\cimv2", help="WMI namespace"),
+    computer: str = typer.Option(".", help="Computer name (. for local)"),
+    output_format: str = typer.Option("text", help="Output format: text, jsonl"),
+):
+    """
+    Watch WMI events instead of polling.
+    
+    Example: report services that stop
+        wmi-cli watch Win32_Service --kind modification --changed State --filter State=Stopped
+    """
+    from .events import DEFAULT_KEY_PROPERTIES, WMIEventWatcher, target_condition
+    from .wql import Field, all_of
+    
+    try:
+        equals = dict(_parse_assignment(item) for item in filters)
+        columns = [p.strip() for p in properties.split(",")] if properties else None
+        watcher = WMIEventWatcher(
+            WMIWrapper(computer=computer, namespace=namespace),
+            max_pending=max_pending,
+            coalesce_window=coalesce,
+        )
+        if kind == "trace":
+            condition = all_of(*(Field(k) == v for k, v in equals.items())) if equals else None
+            watcher.watch_trace(class_name, condition, columns)
+        else:
+            watcher.watch_instances(
+                class_name,
+                kind=kind,
+                within=within,
+                condition=target_condition(**equals) if equals else None,
+                changed=changed or None,
+                properties=columns,
+            )
+        
+        err_console = Console(stderr=True)
+        err_console.print(f"[cyan]Watching {class_name} ({kind}), press Ctrl+C to stop[/cyan]")
+        deadline = time.monotonic() + duration if duration else None
+        seen = 0
+        watcher.start()
+        try:
+            while count is None or seen < count:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                event = watcher.get(timeout=min(remaining, 0.5) if remaining else 0.5)
+                if event is None:
+                    if not watcher.running:
+                        break
+                    continue
+                seen += 1
+                if output_format == "jsonl":
+                    print(json.dumps({
+                        "time": event.timestamp,
+                        "kind": event.kind,
+                        "class": event.class_name,
+                        "count": event.count,
+                        "data": event.data,
+                        "previous": event.previous,
+                    }, default=str), flush=True)
+                else:
+                    console.print(_format_event(event, DEFAULT_KEY_PROPERTIES, columns))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.stop()
+        
+        stats = watcher.stats()
+        err_console.print(
+            f"[green]{stats['delivered']} events[/green] "
+            f"({stats['coalesced']} coalesced, {stats['dropped']} dropped)"
+        )
+        for source, error in watcher.errors:
+            err_console.print(f"[red]  {source}: {error}[/red]")
+        if watcher.errors and not seen:
+            raise typer.Exit(1)
+            
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[red]Error watching events: {e}[/red]")
+        raise typer.Exit(1)
+
+
+def _parse_assignment(text: str) -> tuple:
+    """Parse NAME=VALUE, converting integers and booleans."""
+    name, sep, value = text.partition("=")
+    if not sep or not name.strip():
+        raise typer.BadParameter(f"Expected NAME=VALUE, got {text!r}")
+    value = value.strip()
+    if value.lower() in ("true", "false"):
+        return name.strip(), value.lower() == "true"
+    if value.lstrip("-").isdigit():
+        return name.strip(), int(value)
+    return name.strip(), value
+
+
+def _format_event(event, key_properties, columns: Optional[List[str]]) -> str:
+    """One-line description of an event for text output."""
+    stamp = time.strftime("%H:%M:%S", time.localtime(event.timestamp))
+    parts = [f"[dim]{stamp}[/dim]", f"[bold]{event.kind.upper()}[/bold]", event.class_name]
+    identity = next((k for k in key_properties if event.data.get(k) is not None), None)
+    if identity:
+        parts.append(f"{identity}={event.data[identity]}")
+    changes = event.changes()
+    if changes:
+        parts.extend(f"{name}: {old} -> [yellow]{new}[/yellow]" for name, (old, new) in changes.items())
+    else:
+        names = columns or [k for k in event.data if k != identity][:4]
+        parts.extend(f"{name}={event.data.get(name)}" for name in names if name != identity)
+    if event.count > 1:
+        parts.append(f"(x{event.count})")
+    return " ".join(parts)
+
+
+@app.command()
+def events(
+    log: str = typer.Argument("System", help="Event log name (System, Application, Security)"),
+    since: Optional[str] = typer.Option(None, help="Only events after this time: 30m, 2h, 1d or an ISO date"),
+    until: Optional[str] = typer.Option(None, help="Only events before this time: 30m, 2h, 1d or an ISO date"),
+    event_type: Optional[int] = typer.Option(
+        None, "--type", help="1=Error, 2=Warning, 3=Information, 4=Audit Success, 5=Audit Failure"
+    ),
+    limit: int = typer.Option(20, "--limit", "-n", help="Number of recent events to show"),
+    follow: bool = typer.Option(False, "--follow", "-f", help="Keep printing new events"),
+    interval: float = typer.Option(2.0, help="Seconds between polls with --follow"),
+    bookmark: Optional[str] = typer.Option(
+        None, help="Bookmark file: --follow resumes after the last event it printed"
+    ),
+    properties: Optional[str] = typer.Option(None, help="Comma-separated properties (jsonl output)"),
+    duration: Optional[float] = typer.Option(None, help="Exit --follow after this many seconds"),
+    computer: str = typer.Option(".", help="Computer name (. for local)"),
+    output_format: str = typer.Option("text", help="Output format: text, jsonl"),
+):
+    """
+    Show recent event log entries, oldest first, optionally following new ones.
+    
+    Example: follow system errors, resuming where the last run stopped
+        wmi-cli events System --type 1 --follow --bookmark system.bookmark
+    """
+    from .modules import EventLogBookmark, EventLogReader
+    
+    columns = [p.strip() for p in properties.split(",")] if properties else None
+    if columns is None or output_format == "text":
+        columns = list(dict.fromkeys(_EVENT_COLUMNS + (columns or [])))
+    # --follow starts after the newest record shown, so read RecordNumber
+    # even when the output leaves it out
+    selected = columns if not follow or "RecordNumber" in columns else ["RecordNumber"] + columns
+    try:
+        reader = EventLogReader(wrapper=WMIWrapper(computer=computer))
+        marks = EventLogBookmark(bookmark) if bookmark else None
+        start = marks.get(log, computer) if marks and follow else None
+        
+        shown = 0
+        if start is None:
+            recent = list(reader.iter_events(
+                log, since=_parse_time(since), until=_parse_time(until), event_type=event_type,
+                properties=selected, limit=limit, batch_size=min(max(limit, 1), 256)
+            ))
+            for event in reversed(recent):
+                _print_log_event(event, columns, output_format)
+            shown = len(recent)
+            if follow:
+                if until is None and recent:
+                    start = max(event["RecordNumber"] for event in recent)
+                else:
+                    start = reader.tail(log)[1]
+        if not follow:
+            return
+        
+        err_console = Console(stderr=True)
+        err_console.print(f"[cyan]Following {log} after record {start}, press Ctrl+C to stop[/cyan]")
+        try:
+            for event in reader.follow(
+                log, since_record=start, interval=interval, event_type=event_type,
+                properties=selected, bookmark=marks, duration=duration
+            ):
+                _print_log_event(event, columns, output_format)
+                shown += 1
+        except KeyboardInterrupt:
+            pass
+        err_console.print(f"[green]{shown} events[/green]")
+    except typer.BadParameter:
+        raise
+    except Exception as e:
+        console.print(f"[red]Error reading event log: {e}[/red]")
+        raise typer.Exit(1)
+
+
+_EVENT_COLUMNS = ["RecordNumber", "TimeGenerated", "EventType", "Type", "SourceName", "EventCode", "Message"]
+
+_EVENT_STYLES = {1: "red", 2: "yellow", 5: "red"}
+
+
+def _parse_time(text: Optional[str]):
+    """Parse 30s/15m/2h/7d (that long ago) or an ISO date into a datetime."""
+    import datetime
+    
+    if not text:
+        return None
+    units = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+    amount = text[:-1]
+    if text[-1:].lower() in units and amount.replace(".", "", 1).isdigit():
+        delta = datetime.timedelta(**{units[text[-1].lower()]: float(amount)})
+        return datetime.datetime.now(datetime.timezone.utc) - delta
+    try:
+        return datetime.datetime.fromisoformat(text)
+    except ValueError:
+        raise typer.BadParameter(f"Expected 30m, 2h, 1d or an ISO date, got {text!r}")
+
+
+def _print_log_event(event: dict, columns: List[str], output_format: str):
+    """Print one event log entry as JSON or one line of text."""
+    if output_format == "jsonl":
+        print(json.dumps({name: event.get(name) for name in columns}, default=str), flush=True)
+        return
+    from .wql import parse_dmtf
+    
+    generated = parse_dmtf(event.get("TimeGenerated"))
+    stamp = generated.astimezone().strftime("%Y-%m-%d %H:%M:%S") if generated else "-"
+    message = (event.get("Message") or "").strip().splitlines()
+    console.print(
+        f"{stamp}  {event.get('Type') or '-':<13} {event.get('SourceName')} [{event.get('EventCode')}]  "
+        f"{message[0] if message else ''}",
+        style=_EVENT_STYLES.get(event.get("EventType")), markup=False, highlight=False, soft_wrap=True,
+    )
+
+
 @app.command()
 def admin_check():
     """Check if running with administrator privileges."""
+    from rich.panel import Panel
+    
     if is_admin():
         console.print(Panel.fit(
             "[green]✓ Running with administrator privileges[/green]",
@@ -438,41 +1144,34 @@ def version():
     console.print(f"[cyan]wmi-cli version {__version__}[/cyan]")
 
 
-def _display_table(results: List, title: str = "Results"):
-    """Helper to display WMI results as a table."""
+def _display_table(results: Union[List, "ResultFrame"], title: str = "Results"):
+    """Helper to display WMI results (objects or a ResultFrame) as a table."""
+    from rich.table import Table
+    from .frame import ResultFrame
+    
     if not results:
         return
     
-    # Get properties from first object
-    sample = results[0]
-    properties = []
-    for prop in dir(sample):
-        if prop.startswith('_'):
-            continue
-        try:
-            value = getattr(sample, prop)
-            if not callable(value):
-                properties.append(prop)
-        except:
-            continue
+    if isinstance(results, ResultFrame):
+        # Limit to reasonable number of columns
+        frame = results.select(results.columns[:10])
+        table = Table(title=title)
+        for prop in frame.columns:
+            table.add_column(prop, style="cyan")
+        for row in frame:
+            table.add_row(*(str(v) if v is not None else "N/A" for v in row.values()))
+        console.print(table)
+        return
     
-    # Limit to reasonable number of columns
-    if len(properties) > 10:
-        properties = properties[:10]
+    from .convert import objects_to_dicts, property_names
     
+    # Limit to reasonable number of columns
+    properties = property_names(results[0])[:10]
     table = Table(title=title)
     for prop in properties:
         table.add_column(prop, style="cyan")
-    
-    for obj in results:
-        row = []
-        for prop in properties:
-            try:
-                value = getattr(obj, prop)
-                row.append(str(value) if value is not None else "N/A")
-            except:
-                row.append("N/A")
-        table.add_row(*row)
+    for row in objects_to_dicts(results, properties):
+        table.add_row(*(str(v) if v is not None else "N/A" for v in row.values()))
     
     console.print(table)
 
@@ -0,0 +1,324 @@
+"""
+Conversion of WMI objects to plain Python data.
+
+wmi objects list the names of their properties in ``obj.properties``.
+Reading that dictionary is much cheaper than ``dir()``, which also returns
+every method of the class; calling getattr on a method name makes wmi
+build a method wrapper, costing several COM round-trips per method and
+object.
+"""
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# SWbemProperty.CIMType codes
+CIM_TYPES: Dict[int, str] = {
+    2: "sint16", 3: "sint32", 4: "real32", 5: "real64", 8: "string", 11: "boolean",
+    13: "object", 16: "sint8", 17: "uint8", 18: "uint16", 19: "uint32", 20: "sint64",
+    21: "uint64", 101: "datetime", 102: "reference", 103: "char16",
+}
+
+
+def property_names(wmi_object: Any) -> Tuple[str, ...]:
+    """
+    Get the names of the properties carried by a WMI object.
+    
+    Args:
+        wmi_object: WMI object instance
+    
+    Returns:
+        Property names, without methods
+    """
+    props = getattr(wmi_object, "properties", None)
+    if isinstance(props, dict):
+        return tuple(props)
+    # Not a wmi object: fall back to scanning its public attributes
+    names = []
+    for name in dir(wmi_object):
+        if name.startswith("_"):
+            continue
+        try:
+            if callable(getattr(wmi_object, name)):
+                continue
+        except Exception:
+            pass
+        names.append(name)
+    return tuple(names)
+
+
+class DetachedObject:
+    """
+    Property values copied out of a WMI object.
+    
+    COM objects belong to the apartment of the thread that fetched them; a
+    detached copy can be shared between threads and outlives the
+    connection. It reads like a wmi object (attributes, ``properties``)
+    but has no methods.
+    """
+    
+    __slots__ = ("properties", "_values", "_types")
+    
+    def __init__(self, values: Dict[str, Any], types: Optional[Dict[str, str]] = None):
+        self._values = values
+        self._types = types or {}
+        self.properties = dict.fromkeys(values)
+    
+    def __getattr__(self, name: str) -> Any:
+        values = self._values
+        if name in values:
+            return values[name]
+        # WMI property names are case-insensitive
+        lowered = name.lower()
+        for key, value in values.items():
+            if key.lower() == lowered:
+                return value
+        raise AttributeError(name)
+    
+    def __repr__(self) -> str:
+        return f"<DetachedObject {self._values!r}>"
+
+
+def detach_objects(objects: Iterable[Any]) -> List[DetachedObject]:
+    """
+    Copy WMI objects into DetachedObjects, on the thread that fetched them.
+    
+    Args:
+        objects: WMI object instances
+    
+    Returns:
+        One detached copy per object, sharing the first object's property types
+    """
+    objects = list(objects)
+    if not objects:
+        return []
+    types = property_types(objects[0])
+    return [
+        obj if isinstance(obj, DetachedObject) else DetachedObject(values, types)
+        for obj, values in zip(objects, objects_to_dicts(objects))
+    ]
+
+
+def property_types(wmi_object: Any) -> Dict[str, str]:
+    """
+    Get the CIM types of the properties carried by a WMI object.
+    
+    The types come with the object (SWbemObject.Properties_), so no query
+    is made.
+    
+    Args:
+        wmi_object: WMI object instance
+    
+    Returns:
+        Property name -> CIM type ('[]' suffix for arrays); empty when the
+        object carries no type information (e.g. replayed objects)
+    """
+    if isinstance(wmi_object, DetachedObject):
+        return dict(wmi_object._types)
+    ole_object = getattr(wmi_object, "ole_object", wmi_object)
+    types = {}
+    try:
+        for prop in ole_object.Properties_:
+            cim_type = CIM_TYPES.get(prop.CIMType, str(prop.CIMType))
+            types[str(prop.Name)] = cim_type + "[]" if prop.IsArray else cim_type
+    except Exception:
+        return {}
+    return types
+
+
+def _layouts(
+    objects: Iterable[Any],
+    properties: Optional[Sequence[str]] = None
+) -> Iterator[Tuple[Any, Tuple[str, ...]]]:
+    """Pair each object with its property names, resolved once per layout."""
+    if properties is not None:
+        names = tuple(properties)
+        for obj in objects:
+            yield obj, names
+        return
+    
+    names: Tuple[str, ...] = ()
+    keys = None
+    for obj in objects:
+        props = getattr(obj, "properties", None)
+        if not isinstance(props, dict):
+            yield obj, property_names(obj)
+            continue
+        # A result set usually shares one layout; only subclass instances
+        # (e.g. SELECT * FROM CIM_LogicalDevice) differ
+        if keys is None or props.keys() != keys:
+            names = tuple(props)
+            keys = props.keys()
+        yield obj, names
+
+
+def _read(wmi_object: Any, name: str) -> Any:
+    try:
+        return getattr(wmi_object, name)
+    except Exception:
+        return None
+
+
+def object_to_dict(wmi_object: Any, properties: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Convert a WMI object to a dictionary.
+    
+    Args:
+        wmi_object: WMI object instance
+        properties: Properties to include (None for all)
+    
+    Returns:
+        Dictionary of property values
+    """
+    names = property_names(wmi_object) if properties is None else properties
+    return {name: _read(wmi_object, name) for name in names}
+
+
+def objects_to_dicts(
+    objects: Iterable[Any],
+    properties: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Convert WMI objects to dictionaries.
+    
+    Args:
+        objects: WMI object instances
+        properties: Properties to include (None for all)
+    
+    Returns:
+        One dictionary of property values per object
+    """
+    return [
+        {name: _read(obj, name) for name in names}
+        for obj, names in _layouts(objects, properties)
+    ]
+
+
+def objects_to_columns(
+    objects: Iterable[Any],
+    properties: Optional[Sequence[str]] = None
+) -> Dict[str, List[Any]]:
+    """
+    Convert WMI objects to column arrays.
+    
+    Args:
+        objects: WMI object instances
+        properties: Columns to include (None for every property seen)
+    
+    Returns:
+        Mapping of property name to a list with one value per object;
+        objects lacking a property get None in that column
+    """
+    columns: Dict[str, List[Any]] = {name: [] for name in properties or ()}
+    count = 0
+    for obj, names in _layouts(objects, properties):
+        for name in names:
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = [None] * count
+            column.append(_read(obj, name))
+        count += 1
+        for column in columns.values():
+            if len(column) < count:
+                column.append(None)
+    return columns
+
+
+class SchemaCache:
+    """
+    Property names of WMI class definitions, keyed by (computer, namespace, class).
+    
+    For callers that know only the class: get_class_properties and the
+    schema catalog. The converters above take names from each object's own
+    properties, which follow the query's projection and the instance's
+    subclass; a per-class list would be wrong for both. Hosts are kept
+    apart because their OS builds, and so their classes, may differ.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schemas: Dict[Tuple[str, str, str], Tuple[str, ...]] = {}
+    
+    @staticmethod
+    def make_key(computer: str, namespace: str, class_name: str) -> Tuple[str, str, str]:
+        return (computer.lower(), namespace.lower(), class_name.lower())
+    
+    def get(self, computer: str, namespace: str, class_name: str) -> Optional[Tuple[str, ...]]:
+        """Return the cached property names, or None if unknown."""
+        with self._lock:
+            return self._schemas.get(self.make_key(computer, namespace, class_name))
+    
+    def put(
+        self,
+        computer: str,
+        namespace: str,
+        class_name: str,
+        names: Iterable[str]
+    ) -> Tuple[str, ...]:
+        """Store the property names of a class definition."""
+        names = tuple(names)
+        with self._lock:
+            self._schemas[self.make_key(computer, namespace, class_name)] = names
+        return names
+    
+    def get_or_load(
+        self,
+        computer: str,
+        namespace: str,
+        class_name: str,
+        loader: Callable[[], Iterable[str]]
+    ) -> Tuple[str, ...]:
+        """
+        Return the property names of a class, calling loader on a miss.
+        
+        Args:
+            computer: Computer name or '.' for local machine
+            namespace: WMI namespace
+            class_name: Name of the WMI class
+            loader: Returns the property names of the class definition
+        
+        Returns:
+            Property names of the class
+        """
+        names = self.get(computer, namespace, class_name)
+        if names is None:
+            names = self.put(computer, namespace, class_name, loader())
+        return names
+    
+    def invalidate(
+        self,
+        computer: Optional[str] = None,
+        namespace: Optional[str] = None,
+        class_name: Optional[str] = None
+    ) -> int:
+        """
+        Drop cached schemas.
+        
+        Args:
+            computer: Only drop schemas read from this computer
+            namespace: Only drop schemas from this namespace
+            class_name: Only drop schemas of this class
+        
+        Returns:
+            Number of schemas removed
+        """
+        wanted = (computer, namespace, class_name)
+        with self._lock:
+            stale = [
+                key for key in self._schemas
+                if all(part is None or key[i] == part.lower() for i, part in enumerate(wanted))
+            ]
+            for key in stale:
+                del self._schemas[key]
+        return len(stale)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._schemas)
+
+
+_default_schemas = SchemaCache()
+
+
+def get_default_schema_cache() -> SchemaCache:
+    """Return the process-wide schema cache."""
+    return _default_schemas
@@ -0,0 +1,109 @@
+"""
+Live process dashboard for ``wmi-cli top --live``.
+
+Each refresh is one projected query of the raw process counters (through
+ProcessSampler) instead of a full Win32_Process enumeration. The snapshot
+is diffed against the previous one by PID, and table cells are only
+reformatted for processes whose values changed.
+"""
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from rich.table import Table
+from rich.text import Text
+
+from .modules import ProcessSampler
+from .wmi_wrapper import format_bytes
+
+Cells = Tuple[Text, ...]
+
+
+class ProcessDashboard:
+    """Incrementally refreshed top-N process table."""
+    
+    def __init__(self, sampler: ProcessSampler, count: int = 20, sort: str = "cpu"):
+        """
+        Initialize the dashboard.
+        
+        Args:
+            sampler: Sampler providing the process statistics
+            count: Number of processes shown
+            sort: Sort key: cpu, memory or io
+        """
+        if sort not in ProcessSampler.SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort} (use {', '.join(ProcessSampler.SORT_KEYS)})")
+        self.sampler = sampler
+        self.count = count
+        self.sort = sort
+        self.refreshes = 0
+        self._values: Dict[int, Tuple[Any, ...]] = {}
+        self._cells: Dict[int, Cells] = {}
+        self._new: Set[int] = set()
+        self._top: List[Dict[str, Any]] = []
+        self._total = 0
+        self.last_diff = {"new": 0, "exited": 0, "changed": 0}
+    
+    def refresh(self) -> Dict[str, int]:
+        """
+        Sample the counters and diff against the previous snapshot.
+        
+        Returns:
+            Number of new, exited and changed processes
+        """
+        stats = self.sampler.sample()
+        current: Dict[int, Tuple[Any, ...]] = {}
+        changed = 0
+        for proc in stats:
+            pid = proc["pid"]
+            values = (proc["name"], proc["cpu_percent"], proc["working_set"], proc["io_bytes_per_sec"])
+            current[pid] = values
+            previous = self._values.get(pid)
+            if previous is not None and previous != values:
+                changed += 1
+                self._cells.pop(pid, None)
+        
+        new = current.keys() - self._values.keys() if self.refreshes else set()
+        exited = self._values.keys() - current.keys()
+        for pid in exited:
+            self._cells.pop(pid, None)
+        
+        self._values = current
+        self._new = new
+        self._total = len(stats)
+        self._top = self.sampler.top(self.count, by=self.sort)
+        self.refreshes += 1
+        self.last_diff = {"new": len(new), "exited": len(exited), "changed": changed}
+        return self.last_diff
+    
+    def _row(self, proc: Dict[str, Any]) -> Cells:
+        pid = proc["pid"]
+        cells = self._cells.get(pid)
+        if cells is None:
+            cpu = proc["cpu_percent"]
+            io = proc["io_bytes_per_sec"]
+            cells = self._cells[pid] = (
+                Text(str(pid), style="cyan"),
+                Text(proc["name"] or ""),
+                Text("..." if cpu is None else f"{cpu:.1f}", style="yellow", justify="right"),
+                Text(format_bytes(proc["working_set"]), style="green", justify="right"),
+                Text("..." if io is None else format_bytes(io), style="magenta", justify="right"),
+            )
+        return cells
+    
+    def render(self, title: Optional[str] = None) -> Table:
+        """Build the table for the latest snapshot."""
+        table = Table(title=title or f"Top Processes ({self.sort})", expand=False)
+        table.add_column("PID")
+        table.add_column("Name", min_width=16)
+        table.add_column("CPU %", justify="right")
+        table.add_column("Memory", justify="right")
+        table.add_column("IO/s", justify="right")
+        
+        for proc in self._top:
+            table.add_row(*self._row(proc), style="bold" if proc["pid"] in self._new else None)
+        
+        diff = self.last_diff
+        table.caption = (
+            f"{self._total} processes | +{diff['new']} new, -{diff['exited']} exited, "
+            f"{diff['changed']} changed"
+        )
+        return table
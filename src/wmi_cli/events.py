@@ -0,0 +1,550 @@
+"""
+Event-driven monitoring through WMI event subscriptions.
+
+Instead of re-enumerating a class on a timer, WMIEventWatcher subscribes to
+intrinsic events (__InstanceCreationEvent, __InstanceModificationEvent,
+__InstanceDeletionEvent) or extrinsic trace events such as
+Win32_ProcessStartTrace. WMI evaluates the filter and only changed
+instances cross COM.
+
+Each subscription is read on its own COM-initialized thread. Events are
+buffered in a bounded queue (backpressure is configurable) where repeated
+events for the same instance can be coalesced, then handed out through
+callbacks, a blocking iterator or an async iterator.
+"""
+import asyncio
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import (
+    Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+)
+
+from .convert import object_to_dict
+from .wmi_wrapper import WMIWrapper
+from .wql import Condition, Field, all_of, any_of, check_identifier
+
+INSTANCE_EVENT_CLASSES = {
+    "creation": "__InstanceCreationEvent",
+    "modification": "__InstanceModificationEvent",
+    "deletion": "__InstanceDeletionEvent",
+    "operation": "__InstanceOperationEvent",
+}
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# Properties tried, in order, to identify the instance an event is about
+DEFAULT_KEY_PROPERTIES = ("Handle", "DeviceID", "ProcessId", "ProcessID", "Name")
+
+
+@dataclass
+class WMIEvent:
+    """A WMI event converted to plain data."""
+    
+    kind: str
+    class_name: str
+    data: Dict[str, Any]
+    previous: Optional[Dict[str, Any]] = None
+    timestamp: float = field(default_factory=time.time)
+    source: str = ""
+    count: int = 1
+    
+    def changes(self) -> Dict[str, Tuple[Any, Any]]:
+        """Properties whose value differs from the previous instance."""
+        if not self.previous:
+            return {}
+        return {
+            name: (self.previous.get(name), value)
+            for name, value in self.data.items()
+            if name in self.previous and self.previous.get(name) != value
+        }
+
+
+def instance_event_query(
+    class_name: str,
+    kind: str = "operation",
+    within: float = 1.0,
+    condition: Optional[Condition] = None
+) -> str:
+    """
+    Build an intrinsic event query for instances of a class.
+    
+    Args:
+        class_name: WMI class whose instances are watched
+        kind: creation, modification, deletion or operation (all three)
+        within: Polling interval WMI uses for classes without an event
+            provider, in seconds
+        condition: Extra filter on TargetInstance/PreviousInstance properties
+    
+    Returns:
+        WQL event query
+    """
+    if kind not in INSTANCE_EVENT_CLASSES:
+        raise ValueError(f"Unknown event kind: {kind}")
+    check_identifier(class_name)
+    where = f"TargetInstance ISA '{class_name}'"
+    if condition is not None:
+        where += f" AND {condition.render()}"
+    return f"SELECT * FROM {INSTANCE_EVENT_CLASSES[kind]} WITHIN {within:g} WHERE {where}"
+
+
+def trace_event_query(class_name: str, condition: Optional[Condition] = None) -> str:
+    """
+    Build an extrinsic event query (e.g. Win32_ProcessStartTrace).
+    
+    Args:
+        class_name: Extrinsic event class
+        condition: Filter on the event's own properties
+    
+    Returns:
+        WQL event query
+    """
+    wql = f"SELECT * FROM {check_identifier(class_name)}"
+    if condition is not None:
+        wql += f" WHERE {condition.render()}"
+    return wql
+
+
+def changed_condition(properties: Sequence[str]) -> Condition:
+    """Condition matching modifications that change any of properties."""
+    return any_of(*(
+        Field(f"TargetInstance.{name}") != Field(f"PreviousInstance.{name}")
+        for name in properties
+    ))
+
+
+def target_condition(**equals: Any) -> Condition:
+    """Condition on TargetInstance properties, e.g. target_condition(State="Stopped")."""
+    return all_of(*(Field(f"TargetInstance.{name}") == value for name, value in equals.items()))
+
+
+class EventSource:
+    """
+    A stream of events read on a dedicated thread.
+    
+    open() and close() are called on that thread, so COM objects created
+    there never leave it.
+    """
+    
+    name = "source"
+    
+    def open(self):
+        pass
+    
+    def next_event(self, timeout: float) -> Optional[WMIEvent]:
+        """Return the next event, or None if none arrived within timeout seconds."""
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+
+
+class WMIEventSource(EventSource):
+    """Reads a WMI event query through wmi's watch_for()."""
+    
+    def __init__(
+        self,
+        wrapper: WMIWrapper,
+        wql: str,
+        class_name: str,
+        kind: str,
+        properties: Optional[List[str]] = None,
+        name: Optional[str] = None
+    ):
+        """
+        Initialize the source.
+        
+        Args:
+            wrapper: Wrapper whose computer, namespace and pool are used
+            wql: WQL event query
+            class_name: Class reported on the events
+            kind: Event kind reported when WMI does not provide one
+            properties: Instance properties to keep (None for all)
+            name: Label for the source
+        """
+        self.wrapper = wrapper
+        self.wql = wql
+        self.class_name = class_name
+        self.kind = kind
+        self.properties = properties
+        self.name = name or f"{class_name}:{kind}"
+        self._watcher = None
+        self._timed_out: Tuple[type, ...] = ()
+        self._wrap = None
+    
+    def open(self):
+        import wmi
+        
+        self.wrapper.pool.initialize_thread(True)
+        # A subscription lives as long as the thread; don't hold a pool slot
+        conn = self.wrapper.pool.get_connection(self.wrapper.computer, self.wrapper.namespace)
+        self._timed_out = (wmi.x_wmi_timed_out,)
+        self._wrap = getattr(wmi, "_wmi_object", None)
+        self._watcher = conn.watch_for(raw_wql=self.wql)
+    
+    def _to_dict(self, obj: Any) -> Optional[Dict[str, Any]]:
+        if obj is None:
+            return None
+        if not hasattr(obj, "properties") and self._wrap is not None:
+            obj = self._wrap(obj)
+        return object_to_dict(obj, self.properties)
+    
+    def next_event(self, timeout: float) -> Optional[WMIEvent]:
+        try:
+            obj = self._watcher(timeout_ms=max(int(timeout * 1000), 1))
+        except self._timed_out:
+            return None
+        return WMIEvent(
+            kind=getattr(obj, "event_type", None) or self.kind,
+            class_name=self.class_name,
+            data=self._to_dict(obj),
+            previous=self._to_dict(getattr(obj, "previous", None)),
+            source=self.name,
+        )
+    
+    def close(self):
+        self._watcher = None
+        self.wrapper.pool.release_thread()
+
+
+class QueueEventSource(EventSource):
+    """Source fed from Python; use it to drive watchers with synthetic events."""
+    
+    def __init__(self, name: str = "synthetic"):
+        self.name = name
+        self._queue: "queue.Queue[WMIEvent]" = queue.Queue()
+    
+    def emit(
+        self,
+        kind: str,
+        class_name: str,
+        data: Dict[str, Any],
+        previous: Optional[Dict[str, Any]] = None
+    ):
+        """Queue an event for the watcher."""
+        self._queue.put(WMIEvent(kind, class_name, dict(data), previous, source=self.name))
+    
+    def next_event(self, timeout: float) -> Optional[WMIEvent]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class WMIEventWatcher:
+    """Subscribe to WMI events and deliver them with backpressure and coalescing."""
+    
+    def __init__(
+        self,
+        wrapper: Optional[WMIWrapper] = None,
+        max_pending: int = 1000,
+        overflow: str = "drop_oldest",
+        coalesce_window: float = 0.0,
+        poll_interval: float = 0.5
+    ):
+        """
+        Initialize the watcher.
+        
+        Args:
+            wrapper: Wrapper used for WMI subscriptions (default: local machine)
+            max_pending: Maximum number of undelivered events
+            overflow: What to do when the buffer is full: drop_oldest,
+                drop_newest or block (the reader stops pulling from WMI)
+            coalesce_window: Seconds an event is held so that further events
+                for the same instance merge into it (0 merges only events
+                still waiting to be delivered)
+            poll_interval: How often reader threads check for stop()
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+        self.wrapper = wrapper or WMIWrapper()
+        self.max_pending = max(1, max_pending)
+        self.overflow = overflow
+        self.coalesce_window = coalesce_window
+        self.poll_interval = poll_interval
+        self.errors: List[Tuple[str, Exception]] = []
+        
+        self._sources: List[Tuple[EventSource, Optional[Sequence[str]]]] = []
+        self._callbacks: List[Callable[[WMIEvent], Any]] = []
+        self._pending: "OrderedDict[Any, Tuple[WMIEvent, float]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._live_readers = 0
+        self._unique = itertools.count()
+        self._stats = {"received": 0, "delivered": 0, "coalesced": 0, "dropped": 0}
+    
+    # --- subscriptions ---------------------------------------------------
+    
+    def add_source(self, source: EventSource, key: Optional[Sequence[str]] = None) -> EventSource:
+        """
+        Add an event source.
+        
+        Args:
+            source: Source to read
+            key: Properties identifying an instance for coalescing (default:
+                the first of Handle, DeviceID, ProcessId, Name present)
+        
+        Returns:
+            The source
+        """
+        self._sources.append((source, key))
+        if self._threads:
+            self._start_reader(source, key)
+        return source
+    
+    def watch_instances(
+        self,
+        class_name: str,
+        kind: str = "operation",
+        within: float = 1.0,
+        condition: Optional[Condition] = None,
+        changed: Optional[Sequence[str]] = None,
+        properties: Optional[List[str]] = None,
+        key: Optional[Sequence[str]] = None
+    ) -> EventSource:
+        """
+        Watch creation, modification and/or deletion of class instances.
+        
+        Args:
+            class_name: WMI class, e.g. Win32_Service
+            kind: creation, modification, deletion or operation
+            within: WMI polling interval in seconds for classes without an
+                event provider
+            condition: Filter on TargetInstance/PreviousInstance properties
+            changed: Only report modifications changing one of these properties
+            properties: Instance properties to keep (None for all)
+            key: Properties identifying an instance for coalescing
+        
+        Returns:
+            The subscription's source
+        """
+        if changed:
+            extra = changed_condition(changed)
+            condition = extra if condition is None else condition & extra
+        wql = instance_event_query(class_name, kind, within, condition)
+        return self.add_source(WMIEventSource(self.wrapper, wql, class_name, kind, properties), key)
+    
+    def watch_process_starts(
+        self,
+        name: Optional[str] = None,
+        properties: Optional[List[str]] = None
+    ) -> EventSource:
+        """
+        Watch process starts through Win32_ProcessStartTrace (requires admin).
+        
+        Args:
+            name: Only report processes with this executable name
+            properties: Trace properties to keep (None for all)
+        
+        Returns:
+            The subscription's source
+        """
+        condition = Field("ProcessName") == name if name else None
+        return self.watch_trace("Win32_ProcessStartTrace", condition, properties)
+    
+    def watch_trace(
+        self,
+        class_name: str,
+        condition: Optional[Condition] = None,
+        properties: Optional[List[str]] = None
+    ) -> EventSource:
+        """
+        Watch an extrinsic event class such as Win32_ProcessStopTrace.
+        
+        Args:
+            class_name: Extrinsic event class
+            condition: Filter on the event's own properties
+            properties: Event properties to keep (None for all)
+        
+        Returns:
+            The subscription's source
+        """
+        wql = trace_event_query(class_name, condition)
+        source = WMIEventSource(self.wrapper, wql, class_name, "trace", properties)
+        # Every trace event is distinct (a PID may be reused), so never coalesce
+        return self.add_source(source, key=())
+    
+    def subscribe(self, callback: Callable[[WMIEvent], Any]):
+        """Call callback(event) on a dispatcher thread for every delivered event."""
+        self._callbacks.append(callback)
+        if self._threads and len(self._callbacks) == 1:
+            self._start_thread(self._dispatch, "wmi-events-dispatch")
+    
+    # --- lifecycle -------------------------------------------------------
+    
+    def start(self) -> "WMIEventWatcher":
+        """Start reading all sources."""
+        if self._threads:
+            return self
+        self._stopping.clear()
+        for source, key in self._sources:
+            self._start_reader(source, key)
+        if self._callbacks:
+            self._start_thread(self._dispatch, "wmi-events-dispatch")
+        return self
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the readers and wake up any waiting consumer."""
+        self._stopping.set()
+        with self._cond:
+            self._cond.notify_all()
+        wait = timeout if timeout is not None else self.poll_interval * 4
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(wait)
+        self._threads = []
+    
+    def __enter__(self) -> "WMIEventWatcher":
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    @property
+    def running(self) -> bool:
+        """True while at least one reader is alive or events are pending."""
+        with self._cond:
+            return bool(self._pending) or (self._live_readers > 0 and not self._stopping.is_set())
+    
+    def stats(self) -> Dict[str, int]:
+        """Counters: received, delivered, coalesced, dropped and pending."""
+        with self._cond:
+            return dict(self._stats, pending=len(self._pending))
+    
+    def _start_thread(self, target: Callable, name: str, *args):
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+    
+    def _start_reader(self, source: EventSource, key: Optional[Sequence[str]]):
+        with self._cond:
+            self._live_readers += 1
+        self._start_thread(self._read, f"wmi-events-{source.name}", source, key)
+    
+    # --- producer side ---------------------------------------------------
+    
+    def _read(self, source: EventSource, key: Optional[Sequence[str]]):
+        try:
+            source.open()
+            while not self._stopping.is_set():
+                event = source.next_event(self.poll_interval)
+                if event is not None:
+                    self._offer(event, key)
+        except Exception as e:
+            self.errors.append((source.name, e))
+        finally:
+            try:
+                source.close()
+            except Exception as e:
+                self.errors.append((source.name, e))
+            with self._cond:
+                self._live_readers -= 1
+                self._cond.notify_all()
+    
+    def _key(self, event: WMIEvent, key: Optional[Sequence[str]]) -> Any:
+        names = DEFAULT_KEY_PROPERTIES if key is None else key
+        for name in names:
+            if event.data.get(name) is not None:
+                identity = tuple(event.data.get(n) for n in (names if key else (name,)))
+                return (event.source, event.class_name, event.kind, identity)
+        return next(self._unique)
+    
+    def _offer(self, event: WMIEvent, key: Optional[Sequence[str]]):
+        pending_key = self._key(event, key)
+        with self._cond:
+            self._stats["received"] += 1
+            held = self._pending.get(pending_key)
+            if held is not None:
+                merged, ready_at = held
+                merged.data = event.data
+                merged.previous = merged.previous or event.previous
+                merged.timestamp = event.timestamp
+                merged.count += event.count
+                self._stats["coalesced"] += 1
+                return
+            while len(self._pending) >= self.max_pending:
+                if self.overflow == "drop_newest":
+                    self._stats["dropped"] += 1
+                    return
+                if self.overflow == "drop_oldest":
+                    self._pending.popitem(last=False)
+                    self._stats["dropped"] += 1
+                    break
+                if self._stopping.is_set():
+                    return
+                self._cond.wait(self.poll_interval)
+            self._pending[pending_key] = (event, time.monotonic() + self.coalesce_window)
+            self._cond.notify_all()
+    
+    # --- consumer side ---------------------------------------------------
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[WMIEvent]:
+        """
+        Take the oldest deliverable event.
+        
+        Args:
+            timeout: Seconds to wait (None waits until an event arrives or
+                the watcher stops)
+        
+        Returns:
+            The event, or None on timeout/stop
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._pending:
+                    pending_key, (event, ready_at) = next(iter(self._pending.items()))
+                    if ready_at <= now or self._stopping.is_set():
+                        del self._pending[pending_key]
+                        self._stats["delivered"] += 1
+                        self._cond.notify_all()
+                        return event
+                    wait = ready_at - now
+                elif self._stopping.is_set() or (self._live_readers == 0 and self._threads):
+                    return None
+                else:
+                    wait = self.poll_interval
+                if deadline is not None:
+                    if now >= deadline:
+                        return None
+                    wait = min(wait, deadline - now)
+                self._cond.wait(wait)
+    
+    def events(self) -> Iterator[WMIEvent]:
+        """Yield events until stop() is called or every source has ended."""
+        while True:
+            event = self.get(self.poll_interval)
+            if event is not None:
+                yield event
+            elif not self.running:
+                return
+    
+    def __iter__(self) -> Iterator[WMIEvent]:
+        return self.events()
+    
+    async def __aiter__(self) -> AsyncIterator[WMIEvent]:
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await loop.run_in_executor(None, self.get, self.poll_interval)
+            if event is not None:
+                yield event
+            elif not self.running:
+                return
+    
+    def _dispatch(self):
+        while True:
+            event = self.get(self.poll_interval)
+            if event is None:
+                if not self.running:
+                    return
+                continue
+            for callback in list(self._callbacks):
+                try:
+                    callback(event)
+                except Exception as e:
+                    self.errors.append(("callback", e))
@@ -0,0 +1,357 @@
+"""
+Prometheus/OpenMetrics exporter for ``wmi-cli serve-metrics``.
+
+Collection is decoupled from scrapes: a background thread refreshes a
+snapshot every refresh interval and scrapes are served from the cached
+exposition text, so any number of concurrent scrapes costs no WMI
+queries.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .modules import NetworkManager, ServiceManager, SystemMonitor
+from .wmi_wrapper import WMIWrapper
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+@dataclass
+class MetricFamily:
+    """One metric and its samples."""
+    
+    name: str
+    help: str
+    type: str = "gauge"
+    samples: List[Tuple[Dict[str, str], float]] = field(default_factory=list)
+    
+    def add(self, value: Optional[float], **labels: str) -> "MetricFamily":
+        """Add a sample; None values are skipped."""
+        if value is not None:
+            self.samples.append((labels, float(value)))
+        return self
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if value.is_integer() and abs(value) < 2 ** 53 else repr(value)
+
+
+def render_openmetrics(families: List[MetricFamily]) -> str:
+    """
+    Render metric families in the OpenMetrics text format.
+    
+    Args:
+        families: Metric families to render
+    
+    Returns:
+        Exposition text ending with '# EOF'
+    """
+    lines = []
+    for family in families:
+        lines.append(f"# TYPE {family.name} {family.type}")
+        lines.append(f"# HELP {family.name} {_escape(family.help)}")
+        for labels, value in family.samples:
+            if labels:
+                text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{family.name}{{{text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{family.name} {_format_value(value)}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 makes bursts of concurrent scrapes wait on
+    # connection retries
+    request_queue_size = 128
+
+
+class MetricsExporter:
+    """Collects WMI metrics in the background and serves cached snapshots."""
+    
+    def __init__(
+        self,
+        computer: str = ".",
+        wrapper: Optional[WMIWrapper] = None,
+        refresh_interval: float = 15.0,
+        top_processes: int = 20
+    ):
+        """
+        Initialize the exporter.
+        
+        Args:
+            computer: Computer name or '.' for local machine
+            wrapper: Existing wrapper to use
+            refresh_interval: Seconds between background collections
+            top_processes: Processes exported per sort key (CPU and memory)
+        """
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
+        self.refresh_interval = refresh_interval
+        self.top_processes = top_processes
+        self.monitor = SystemMonitor(wrapper=self.wrapper)
+        self.services = ServiceManager(wrapper=self.wrapper)
+        self.process_sampler = self.monitor.get_process_sampler(history=2)
+        self.network_sampler = NetworkManager(wrapper=self.wrapper).get_network_sampler()
+        self.collectors: Dict[str, Callable[[], List[MetricFamily]]] = {
+            "memory": self._collect_memory,
+            "disk": self._collect_disks,
+            "process": self._collect_processes,
+            "service": self._collect_services,
+            "network": self._collect_network,
+        }
+        self.refreshes = 0
+        self.errors: Dict[str, Exception] = {}
+        self._snapshot: Optional[bytes] = None
+        self._snapshot_time: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    # --- collectors ------------------------------------------------------
+    
+    def _collect_memory(self) -> List[MetricFamily]:
+        info = self.monitor.get_memory_info()
+        return [
+            MetricFamily("wmi_memory_total_bytes", "Physical memory").add(info["total_bytes"]),
+            MetricFamily("wmi_memory_used_bytes", "Physical memory in use").add(info["used_bytes"]),
+            MetricFamily("wmi_memory_free_bytes", "Free physical memory").add(info["free_bytes"]),
+            MetricFamily("wmi_memory_used_percent", "Physical memory in use, percent")
+            .add(info["used_percentage"]),
+        ]
+    
+    def _collect_disks(self) -> List[MetricFamily]:
+        size = MetricFamily("wmi_logical_disk_size_bytes", "Size of local logical disks")
+        free = MetricFamily("wmi_logical_disk_free_bytes", "Free space on local logical disks")
+        used = MetricFamily("wmi_logical_disk_used_percent", "Used space on local logical disks, percent")
+        for disk in self.monitor.get_disk_usage():
+            size.add(disk["size_bytes"], volume=disk["device_id"])
+            free.add(disk["free_bytes"], volume=disk["device_id"])
+            used.add(disk["used_percentage"], volume=disk["device_id"])
+        return [size, free, used]
+    
+    def _collect_processes(self) -> List[MetricFamily]:
+        self.process_sampler.sample()
+        # Export the busiest processes only, to bound label cardinality
+        selected = {p["pid"]: p for p in self.process_sampler.top(self.top_processes, by="memory")}
+        selected.update((p["pid"], p) for p in self.process_sampler.top(self.top_processes, by="cpu"))
+        cpu = MetricFamily("wmi_process_cpu_percent", "Process CPU usage, percent of all processors")
+        memory = MetricFamily("wmi_process_working_set_bytes", "Process working set")
+        private = MetricFamily("wmi_process_private_bytes", "Process private bytes")
+        for proc in selected.values():
+            labels = {"pid": str(proc["pid"]), "name": proc["name"] or ""}
+            cpu.add(proc["cpu_percent"], **labels)
+            memory.add(proc["working_set"], **labels)
+            private.add(proc["private_bytes"], **labels)
+        count = MetricFamily("wmi_processes", "Number of processes")
+        count.add(len(self.process_sampler.stats()))
+        return [cpu, memory, private, count]
+    
+    def _collect_services(self) -> List[MetricFamily]:
+        state = MetricFamily("wmi_service_state", "Service state (1 for the current state)")
+        for service in self.services.list_services(["Name", "State", "StartMode"]):
+            state.add(
+                1,
+                name=service["Name"] or "",
+                state=service["State"] or "Unknown",
+                start_mode=service["StartMode"] or "Unknown",
+            )
+        return [state]
+    
+    def _collect_network(self) -> List[MetricFamily]:
+        families = {
+            "bytes_received_per_sec": MetricFamily(
+                "wmi_network_receive_bytes_per_second", "Bytes received per second"),
+            "bytes_sent_per_sec": MetricFamily(
+                "wmi_network_transmit_bytes_per_second", "Bytes sent per second"),
+            "packets_received_per_sec": MetricFamily(
+                "wmi_network_receive_packets_per_second", "Packets received per second"),
+            "packets_sent_per_sec": MetricFamily(
+                "wmi_network_transmit_packets_per_second", "Packets sent per second"),
+            "errors_per_sec": MetricFamily(
+                "wmi_network_errors_per_second", "Inbound and outbound packet errors per second"),
+            "utilization_percent": MetricFamily(
+                "wmi_network_utilization_percent", "Throughput as percent of link bandwidth"),
+        }
+        for iface in self.network_sampler.sample():
+            for key, family in families.items():
+                family.add(iface[key], interface=iface["name"])
+        return list(families.values())
+    
+    # --- snapshots -------------------------------------------------------
+    
+    def collect(self) -> List[MetricFamily]:
+        """Run every collector once; failures are reported as metrics and in errors."""
+        families: List[MetricFamily] = []
+        success = MetricFamily("wmi_exporter_collector_success", "Whether the collector succeeded")
+        duration = MetricFamily(
+            "wmi_exporter_collector_duration_seconds", "Time the collector took"
+        )
+        for name, collector in self.collectors.items():
+            start = time.perf_counter()
+            try:
+                families.extend(collector())
+                self.errors.pop(name, None)
+                ok = 1
+            except Exception as e:
+                self.errors[name] = e
+                ok = 0
+            success.add(ok, collector=name)
+            duration.add(time.perf_counter() - start, collector=name)
+        families.extend([success, duration])
+        return families
+    
+    def refresh(self) -> bytes:
+        """
+        Collect now and replace the cached snapshot.
+        
+        Single flight: a caller arriving while a refresh is in progress
+        waits for it and gets its snapshot instead of collecting again.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            with self._refresh_lock:
+                with self._lock:
+                    if self._snapshot is not None:
+                        return self._snapshot
+                # The refresh in progress failed before taking a snapshot
+                return self._refresh()
+        try:
+            return self._refresh()
+        finally:
+            self._refresh_lock.release()
+    
+    def _refresh(self) -> bytes:
+        families = self.collect()
+        now = time.time()
+        families.append(
+            MetricFamily("wmi_exporter_last_refresh_timestamp_seconds",
+                         "Unix time of the last collection").add(now)
+        )
+        snapshot = render_openmetrics(families).encode("utf-8")
+        with self._lock:
+            self._snapshot = snapshot
+            self._snapshot_time = now
+            self.refreshes += 1
+        self._ready.set()
+        return snapshot
+    
+    def snapshot(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Get the cached exposition text.
+        
+        Waits for the first collection when none has finished yet.
+        
+        Args:
+            timeout: Seconds to wait for the first collection (None waits)
+        
+        Returns:
+            Encoded exposition text, or None if the wait timed out
+        """
+        self._ready.wait(timeout)
+        with self._lock:
+            return self._snapshot
+    
+    @property
+    def snapshot_age(self) -> Optional[float]:
+        """Seconds since the cached snapshot was collected."""
+        with self._lock:
+            return None if self._snapshot_time is None else time.time() - self._snapshot_time
+    
+    # --- background refresh and HTTP -------------------------------------
+    
+    def start(self):
+        """Start refreshing in the background."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="wmi-exporter", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background refresh."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        pool = self.wrapper.pool
+        pool.initialize_thread(True)
+        try:
+            while not self._stopping.is_set():
+                started = time.monotonic()
+                try:
+                    self.refresh()
+                except Exception:
+                    pass
+                self._stopping.wait(max(self.refresh_interval - (time.monotonic() - started), 0))
+        finally:
+            pool.release_thread()
+    
+    def make_server(self, host: str = "127.0.0.1", port: int = 9182) -> ThreadingHTTPServer:
+        """
+        Create an HTTP server exposing /metrics (call serve_forever on it).
+        
+        Args:
+            host: Address to bind
+            port: Port to bind (0 picks a free port)
+        
+        Returns:
+            The server; its server_address has the bound port
+        """
+        exporter = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body = exporter.snapshot(timeout=max(exporter.refresh_interval, 30))
+                    if body is None:
+                        self.send_error(503, "No metrics collected yet")
+                        return
+                    content_type = CONTENT_TYPE
+                elif path == "/":
+                    body = b'<html><body><a href="/metrics">Metrics</a></body></html>\n'
+                    content_type = "text/html; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return _MetricsServer((host, port), Handler)
+    
+    def serve(self, host: str = "127.0.0.1", port: int = 9182):
+        """Refresh in the background and serve /metrics until interrupted."""
+        server = self.make_server(host, port)
+        self.start()
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.stop()
+    
+    def __enter__(self) -> "MetricsExporter":
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
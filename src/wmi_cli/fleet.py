@@ -0,0 +1,166 @@
+"""
+Run one WQL query against many computers concurrently.
+"""
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .convert import objects_to_dicts
+from .pool import WMIConnectionPool, get_default_pool
+from .tasks import run_bounded
+from .wmi_wrapper import WMIWrapper
+
+
+@dataclass
+class HostStatus:
+    """Outcome of the query on one host."""
+    
+    host: str
+    ok: bool = False
+    rows: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    timed_out: bool = False
+
+
+@dataclass
+class FleetRow:
+    """A result row tagged with the host it came from."""
+    
+    host: str
+    data: Dict[str, Any]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The row as one dictionary, "host" first; the tag wins over a property named host."""
+        record = {"host": self.host}
+        record.update((name, value) for name, value in self.data.items() if name.lower() != "host")
+        return record
+
+
+@dataclass
+class FleetSummary:
+    """Per-host outcomes collected while a fleet query runs."""
+    
+    statuses: Dict[str, HostStatus] = field(default_factory=dict)
+    
+    @property
+    def succeeded(self) -> List[HostStatus]:
+        return [s for s in self.statuses.values() if s.ok]
+    
+    @property
+    def failed(self) -> List[HostStatus]:
+        return [s for s in self.statuses.values() if not s.ok]
+
+
+def read_hosts_file(path: str) -> List[str]:
+    """
+    Read host names from a file (one per line, '#' starts a comment).
+    
+    Args:
+        path: Path to the hosts file
+    
+    Returns:
+        Unique host names in file order
+    """
+    hosts = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            host = line.split("#", 1)[0].strip()
+            if host and host.lower() not in seen:
+                seen.add(host.lower())
+                hosts.append(host)
+    return hosts
+
+
+class FleetQuery:
+    """Execute a WQL query on a set of computers with bounded parallelism."""
+    
+    def __init__(
+        self,
+        hosts: Iterable[str],
+        namespace: str = "root\\cimv2",
+        max_workers: int = 16,
+        timeout: Optional[float] = 30.0,
+        pool: Optional[WMIConnectionPool] = None,
+        wrapper_factory: Optional[Callable[[str], WMIWrapper]] = None
+    ):
+        """
+        Initialize the fleet query.
+        
+        Args:
+            hosts: Computer names to query
+            namespace: WMI namespace
+            max_workers: Maximum number of hosts queried at once
+            timeout: Seconds allowed per host, counted from when its query
+                starts (None for no limit)
+            pool: Connection pool for the worker threads
+            wrapper_factory: Called with a host name to build its wrapper
+                (default: WMIWrapper on the pool)
+        """
+        self.hosts = list(hosts)
+        self.namespace = namespace
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.pool = pool or get_default_pool()
+        self.wrapper_factory = wrapper_factory or (
+            lambda host: WMIWrapper(computer=host, namespace=self.namespace, pool=self.pool)
+        )
+        self.summary = FleetSummary()
+    
+    def _query_host(
+        self,
+        host: str,
+        wql: str,
+        properties: Optional[List[str]]
+    ) -> List[Dict[str, Any]]:
+        wrapper = self.wrapper_factory(host)
+        try:
+            # Convert on the worker: COM objects must not leave their thread
+            return objects_to_dicts(wrapper.query(wql), properties)
+        finally:
+            # Workers visit many hosts; keep none of their connections open
+            wrapper.pool.discard(wrapper.computer, wrapper.namespace)
+    
+    def run(self, wql: str, properties: Optional[List[str]] = None) -> Iterator[FleetRow]:
+        """
+        Execute the query and stream rows as hosts complete.
+        
+        Failures and timeouts do not stop the run; they are recorded in
+        self.summary, which is complete once the iterator is exhausted.
+        A host that times out is abandoned on a daemon thread, so it does
+        not delay the end of the run or of the process.
+        
+        Args:
+            wql: WQL query string
+            properties: Properties to include in each row (None for all)
+        
+        Yields:
+            FleetRow for every result row, grouped by host
+        """
+        self.summary = FleetSummary()
+        results = run_bounded(
+            [(host, partial(self._query_host, host, wql, properties)) for host in self.hosts],
+            max_workers=self.max_workers,
+            timeout=self.timeout,
+            # Each worker uninitializes COM when it exits
+            initializer=partial(self.pool.initialize_thread, True),
+            finalizer=self.pool.release_thread,
+            thread_name_prefix="wmi-fleet",
+        )
+        for result in results:
+            self.summary.statuses[result.name] = HostStatus(
+                host=result.name,
+                ok=result.ok,
+                rows=len(result.value) if result.ok else 0,
+                elapsed=result.elapsed,
+                error=result.error,
+                timed_out=result.timed_out,
+            )
+            if result.ok:
+                for row in result.value:
+                    yield FleetRow(host=result.name, data=row)
+    
+    def collect(self, wql: str, properties: Optional[List[str]] = None) -> List[FleetRow]:
+        """Execute the query and return all rows."""
+        return list(self.run(wql, properties))
@@ -0,0 +1,505 @@
+"""
+Columnar result sets.
+
+A ResultFrame holds query results as typed columns instead of live COM
+objects: integer and float columns are backed by ``array`` objects and
+strings are interned, so repeated names and states are stored once.
+Frames can be filtered, sorted, grouped and serialized without going back
+to WMI.
+"""
+import csv
+import heapq
+import io
+import itertools
+import json
+import operator
+import re
+import sys
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Union
+
+from .convert import objects_to_columns, property_types
+
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<>": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_AGGREGATES = ("count", "sum", "min", "max", "mean")
+
+
+# CIM integer types; wmi returns the 64-bit ones as decimal strings
+_INTEGER_TYPES = frozenset({
+    "sint8", "uint8", "sint16", "uint16", "sint32", "uint32", "sint64", "uint64",
+})
+
+
+def _as_int(value: Any, parse_text: bool = False) -> Optional[int]:
+    """
+    Return value as an int64 if it is an integer.
+    
+    With parse_text, canonical integer text (as wmi returns uint64 sizes and
+    counters) is converted too. Only properties typed as integers may be
+    parsed: strings such as Handle or SerialNumber merely look numeric.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        number = value
+    elif parse_text and isinstance(value, str):
+        # Only convert text that round-trips exactly
+        digits = value[1:] if value.startswith("-") else value
+        if not digits.isdigit() or not digits.isascii():
+            return None
+        if len(digits) > 1 and digits[0] == "0":
+            return None
+        number = int(value)
+    else:
+        return None
+    if _INT64_MIN <= number <= _INT64_MAX:
+        return number
+    return None
+
+
+def _infer_kind(values: Sequence[Any], parse_text: bool = False) -> str:
+    kind = None
+    for value in values:
+        if value is None:
+            continue
+        if kind in (None, "int") and _as_int(value, parse_text) is not None:
+            kind = "int"
+        elif kind in (None, "int", "float") and isinstance(value, (int, float)) \
+                and not isinstance(value, bool):
+            kind = "float"
+        elif kind in (None, "str") and isinstance(value, str):
+            kind = "str"
+        else:
+            return "object"
+    return kind or "object"
+
+
+class _Column:
+    """One typed column; ints and floats keep a null mask next to the array."""
+    
+    __slots__ = ("kind", "data", "nulls")
+    
+    def __init__(self, kind: str, data: Union[array, List[Any]], nulls: Optional[bytearray] = None):
+        self.kind = kind
+        self.data = data
+        self.nulls = nulls
+    
+    @classmethod
+    def build(cls, values: Sequence[Any], cim_type: Optional[str] = None) -> "_Column":
+        parse_text = cim_type in _INTEGER_TYPES
+        kind = _infer_kind(values, parse_text)
+        nulls = None
+        if kind in ("int", "float") and any(v is None for v in values):
+            nulls = bytearray(v is None for v in values)
+        if kind == "int":
+            data = array("q", (0 if v is None else _as_int(v, parse_text) for v in values))
+        elif kind == "float":
+            data = array("d", (0.0 if v is None else float(v) for v in values))
+        elif kind == "str":
+            data = [None if v is None else sys.intern(v) for v in values]
+        else:
+            data = list(values)
+        return cls(kind, data, nulls)
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def is_null(self, index: int) -> bool:
+        if self.nulls is not None:
+            return bool(self.nulls[index])
+        return self.data[index] is None
+    
+    def get(self, index: int) -> Any:
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        return self.data[index]
+    
+    def to_list(self) -> List[Any]:
+        if self.nulls is None:
+            return list(self.data)
+        return [None if null else value for value, null in zip(self.data, self.nulls)]
+    
+    def take(self, indices: Sequence[int]) -> "_Column":
+        if isinstance(self.data, array):
+            data = array(self.data.typecode, (self.data[i] for i in indices))
+        else:
+            data = [self.data[i] for i in indices]
+        nulls = None
+        if self.nulls is not None:
+            nulls = bytearray(self.nulls[i] for i in indices)
+        return _Column(self.kind, data, nulls)
+    
+    def present(self) -> List[int]:
+        """Indices of the non-null values."""
+        if self.nulls is not None:
+            return [i for i, null in enumerate(self.nulls) if not null]
+        if self.kind in ("int", "float"):
+            return list(range(len(self.data)))
+        return [i for i, value in enumerate(self.data) if value is not None]
+    
+    def nbytes(self) -> int:
+        size = sys.getsizeof(self.data)
+        if self.nulls is not None:
+            size += sys.getsizeof(self.nulls)
+        if isinstance(self.data, list):
+            seen = set()
+            for value in self.data:
+                if value is not None and id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+        return size
+
+
+def _like(pattern: str) -> "re.Pattern":
+    # WQL LIKE: % matches any run, _ a single character, [] a set
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "%":
+            regex += ".*"
+        elif char == "_":
+            regex += "."
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("^"):
+                    body = "^" + re.escape(body[1:])
+                else:
+                    body = re.escape(body)
+                regex += f"[{body}]"
+                i = end
+        else:
+            regex += re.escape(char)
+        i += 1
+    return re.compile(regex + r"\Z", re.IGNORECASE | re.DOTALL)
+
+
+class ResultFrame:
+    """Query results stored as typed columns."""
+    
+    def __init__(
+        self,
+        columns: Optional[Dict[str, Sequence[Any]]] = None,
+        types: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the frame.
+        
+        Args:
+            columns: Mapping of column name to its values; all columns must
+                have the same length
+            types: CIM type of each column (e.g. 'uint64'). Text is only
+                stored as integers in columns typed as integers; untyped
+                strings stay strings.
+        """
+        types = types or {}
+        self._columns: Dict[str, _Column] = {}
+        self._length = 0
+        for index, (name, values) in enumerate((columns or {}).items()):
+            values = values if isinstance(values, (list, tuple)) else list(values)
+            if index == 0:
+                self._length = len(values)
+            elif len(values) != self._length:
+                raise ValueError(
+                    f"Column {name} has {len(values)} values, expected {self._length}"
+                )
+            self._columns[name] = _Column.build(values, types.get(name))
+    
+    @classmethod
+    def _wrap(cls, columns: Dict[str, _Column], length: int) -> "ResultFrame":
+        frame = cls()
+        frame._columns = columns
+        frame._length = length
+        return frame
+    
+    @classmethod
+    def from_objects(
+        cls,
+        objects: Iterable[Any],
+        properties: Optional[Sequence[str]] = None
+    ) -> "ResultFrame":
+        """
+        Build a frame from WMI objects.
+        
+        Column types are read from the first object's property
+        definitions, so uint64 values that wmi returns as text become
+        integer columns while string properties stay strings.
+        
+        Args:
+            objects: WMI object instances (may be a streaming iterator)
+            properties: Columns to read (None for every property seen)
+        
+        Returns:
+            ResultFrame with one row per object
+        """
+        objects = iter(objects)
+        first = next(objects, None)
+        if first is None:
+            return cls(objects_to_columns((), properties))
+        columns = objects_to_columns(itertools.chain((first,), objects), properties)
+        return cls(columns, property_types(first))
+    
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Dict[str, Any]],
+        columns: Optional[Sequence[str]] = None,
+        types: Optional[Dict[str, str]] = None
+    ) -> "ResultFrame":
+        """
+        Build a frame from dictionaries.
+        
+        Args:
+            records: One dictionary per row
+            columns: Columns to keep (None for every key seen)
+            types: CIM type of each column (see ResultFrame)
+        
+        Returns:
+            ResultFrame with one row per record
+        """
+        records = list(records)
+        if columns is None:
+            names: Dict[str, None] = {}
+            for record in records:
+                names.update(dict.fromkeys(record))
+            columns = list(names)
+        return cls({name: [record.get(name) for record in records] for name in columns}, types)
+    
+    @property
+    def columns(self) -> List[str]:
+        """Column names in order."""
+        return list(self._columns)
+    
+    @property
+    def dtypes(self) -> Dict[str, str]:
+        """Storage kind of each column: int, float, str or object."""
+        return {name: column.kind for name, column in self._columns.items()}
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.rows()
+    
+    def __getitem__(self, name: str) -> List[Any]:
+        return self.column(name)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+    
+    def __repr__(self) -> str:
+        return f"<ResultFrame {self._length} rows x {len(self._columns)} columns>"
+    
+    def _column(self, name: str) -> _Column:
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError(f"No column named {name!r}") from None
+    
+    def column(self, name: str) -> List[Any]:
+        """Get the values of a column."""
+        return self._column(name).to_list()
+    
+    def row(self, index: int) -> Dict[str, Any]:
+        """Get one row as a dictionary."""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return {name: column.get(index) for name, column in self._columns.items()}
+    
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over rows as dictionaries."""
+        names = list(self._columns)
+        for values in zip(*(column.to_list() for column in self._columns.values())):
+            yield dict(zip(names, values))
+    
+    def take(self, indices: Sequence[int]) -> "ResultFrame":
+        """Get a frame with the given rows, in the given order."""
+        return self._wrap(
+            {name: column.take(indices) for name, column in self._columns.items()},
+            len(indices),
+        )
+    
+    def select(self, names: Sequence[str]) -> "ResultFrame":
+        """Get a frame with only the given columns."""
+        return self._wrap({name: self._column(name) for name in names}, self._length)
+    
+    def head(self, n: int = 10) -> "ResultFrame":
+        """Get the first n rows."""
+        return self.take(range(min(n, self._length)))
+    
+    def where(self, name: str, op: str, value: Any) -> "ResultFrame":
+        """
+        Keep rows where a column compares true against a value.
+        
+        Null values never match.
+        
+        Args:
+            name: Column name
+            op: One of =, !=, <>, <, <=, >, >=, like, in
+            value: Value to compare with (a collection for 'in', a WQL
+                pattern for 'like')
+        
+        Returns:
+            Filtered frame
+        """
+        column = self._column(name)
+        op = op.lower()
+        data = column.data
+        if op == "like":
+            match = _like(str(value)).match
+            keep = [i for i in column.present() if match(str(data[i]))]
+        elif op == "in":
+            values = set(value)
+            keep = [i for i in column.present() if data[i] in values]
+        else:
+            compare = _OPERATORS.get(op)
+            if compare is None:
+                raise ValueError(f"Unsupported operator: {op}")
+            if column.kind == "int" and _as_int(value, parse_text=True) is not None:
+                value = _as_int(value, parse_text=True)
+            keep = [i for i in column.present() if compare(data[i], value)]
+        return self.take(keep)
+    
+    def filter(self, predicate: Callable[[Dict[str, Any]], bool]) -> "ResultFrame":
+        """Keep rows for which predicate(row_dict) is true."""
+        return self.take([i for i, row in enumerate(self.rows()) if predicate(row)])
+    
+    def _ordered(self, column: _Column, descending: bool) -> List[int]:
+        present = column.present()
+        try:
+            present.sort(key=column.data.__getitem__, reverse=descending)
+        except TypeError:
+            present.sort(key=lambda i: str(column.data[i]), reverse=descending)
+        return present
+    
+    def sort(self, by: str, descending: bool = False) -> "ResultFrame":
+        """
+        Sort rows by a column; nulls go last.
+        
+        Args:
+            by: Column name
+            descending: Sort from largest to smallest
+        
+        Returns:
+            Sorted frame
+        """
+        column = self._column(by)
+        order = self._ordered(column, descending)
+        present = set(order)
+        order.extend(i for i in range(self._length) if i not in present)
+        return self.take(order)
+    
+    def top(self, n: int, by: str, descending: bool = True) -> "ResultFrame":
+        """
+        Get the n rows with the largest (or smallest) values of a column.
+        
+        Args:
+            n: Number of rows
+            by: Column name
+            descending: Largest first (False for smallest first)
+        
+        Returns:
+            Frame with at most n rows, nulls excluded
+        """
+        column = self._column(by)
+        select = heapq.nlargest if descending else heapq.nsmallest
+        try:
+            order = select(n, column.present(), key=column.data.__getitem__)
+        except TypeError:
+            order = self._ordered(column, descending)[:n]
+        return self.take(order)
+    
+    def group_by(self, by: str, aggregates: Optional[Dict[str, str]] = None) -> "ResultFrame":
+        """
+        Group rows by a column and aggregate other columns.
+        
+        Args:
+            by: Column to group on
+            aggregates: Mapping of column name to count, sum, min, max or
+                mean; each produces a '<column>_<function>' column
+        
+        Returns:
+            Frame with the group key, a 'count' column and the aggregates,
+            one row per group in order of first appearance
+        """
+        aggregates = aggregates or {}
+        for name, function in aggregates.items():
+            self._column(name)
+            if function not in _AGGREGATES:
+                raise ValueError(f"Unsupported aggregate: {function}")
+        
+        key_column = self._column(by)
+        groups: Dict[Any, List[int]] = {}
+        for index in range(self._length):
+            groups.setdefault(key_column.get(index), []).append(index)
+        
+        result: Dict[str, List[Any]] = {by: list(groups), "count": [len(g) for g in groups.values()]}
+        for name, function in aggregates.items():
+            column = self._column(name)
+            values = []
+            for indices in groups.values():
+                present = [column.data[i] for i in indices if not column.is_null(i)]
+                if function == "count":
+                    values.append(len(present))
+                elif not present:
+                    values.append(None)
+                elif function == "sum":
+                    values.append(sum(present))
+                elif function == "min":
+                    values.append(min(present))
+                elif function == "max":
+                    values.append(max(present))
+                else:
+                    values.append(sum(present) / len(present))
+            result[f"{name}_{function}"] = values
+        return ResultFrame(result)
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Get all rows as dictionaries."""
+        return list(self.rows())
+    
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Serialize the rows as a JSON array."""
+        return json.dumps(self.to_dicts(), indent=indent, default=str)
+    
+    def to_csv(self, file: Optional[TextIO] = None) -> Optional[str]:
+        """
+        Serialize the frame as CSV with a header row.
+        
+        Args:
+            file: Writable text file (None to return the CSV as a string)
+        
+        Returns:
+            CSV text when no file is given
+        """
+        out = file if file is not None else io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(self.columns)
+        for values in zip(*(column.to_list() for column in self._columns.values())):
+            writer.writerow(["" if value is None else value for value in values])
+        if file is None:
+            return out.getvalue()
+        return None
+    
+    def memory_usage(self) -> int:
+        """Approximate number of bytes held by the columns."""
+        return sum(column.nbytes() for column in self._columns.values())
@@ -0,0 +1,182 @@
+"""
+Collect a system inventory from many WMI classes concurrently.
+
+Each section (a class, or a manager method from modules) runs on its own
+COM-initialized worker, so collecting the inventory takes about as long
+as its slowest query rather than the sum of all of them.
+"""
+import datetime
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from .convert import objects_to_dicts
+from .modules import HardwareInfo, NetworkManager, SystemMonitor
+from .tasks import run_bounded
+from .wmi_wrapper import WMIWrapper
+
+# A section reads its part of the inventory with the wrapper it is given
+Section = Callable[[WMIWrapper], Any]
+
+
+def class_section(
+    class_name: str,
+    properties: Optional[List[str]] = None,
+    single: bool = False,
+    **filters
+) -> Section:
+    """
+    Section returning the instances of a WMI class as dictionaries.
+    
+    Args:
+        class_name: Name of the WMI class
+        properties: Properties to select (None for all)
+        single: Return only the first instance (None if there is none)
+        **filters: Filter parameters
+    
+    Returns:
+        Section callable
+    """
+    def collect(wrapper: WMIWrapper) -> Any:
+        rows = objects_to_dicts(wrapper.get_class(class_name, properties, **filters), properties)
+        if single:
+            return rows[0] if rows else None
+        return rows
+    return collect
+
+
+def manager_section(manager_class: type, method: str, *args, **kwargs) -> Section:
+    """
+    Section calling a method of a modules manager, e.g. HardwareInfo.get_printers.
+    
+    Args:
+        manager_class: Manager class taking a ``wrapper`` keyword argument
+        method: Name of the method to call
+        *args: Positional arguments for the method
+        **kwargs: Keyword arguments for the method
+    
+    Returns:
+        Section callable
+    """
+    def collect(wrapper: WMIWrapper) -> Any:
+        return getattr(manager_class(wrapper=wrapper), method)(*args, **kwargs)
+    return collect
+
+
+DEFAULT_SECTIONS: Dict[str, Section] = {
+    "operating_system": class_section("Win32_OperatingSystem", single=True),
+    "computer_system": class_section("Win32_ComputerSystem", single=True),
+    "bios": class_section("Win32_BIOS", single=True),
+    "processors": class_section("Win32_Processor"),
+    "physical_memory": class_section("Win32_PhysicalMemory"),
+    "memory_usage": manager_section(SystemMonitor, "get_memory_info"),
+    "uptime": manager_section(SystemMonitor, "get_uptime"),
+    "disks": manager_section(SystemMonitor, "get_disk_usage"),
+    "network_adapters": manager_section(NetworkManager, "get_active_adapters"),
+    "motherboard": manager_section(HardwareInfo, "get_motherboard_info"),
+    "video_controllers": manager_section(HardwareInfo, "get_video_controllers"),
+    "sound_devices": manager_section(HardwareInfo, "get_sound_devices"),
+    "usb_controllers": manager_section(HardwareInfo, "get_usb_controllers"),
+    "printers": manager_section(HardwareInfo, "get_printers"),
+    "battery": manager_section(HardwareInfo, "get_battery_status"),
+}
+
+
+@dataclass
+class SectionResult:
+    """Outcome of one inventory section."""
+    
+    name: str
+    ok: bool = False
+    items: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    timed_out: bool = False
+
+
+class SnapshotCollector:
+    """Run inventory sections concurrently and merge them into one document."""
+    
+    def __init__(
+        self,
+        sections: Optional[Dict[str, Section]] = None,
+        computer: str = ".",
+        namespace: str = "root\\cimv2",
+        max_workers: int = 8,
+        timeout: Optional[float] = 60.0,
+        wrapper: Optional[WMIWrapper] = None
+    ):
+        """
+        Initialize the collector.
+        
+        Args:
+            sections: Section name -> callable taking a WMIWrapper
+                (default: DEFAULT_SECTIONS)
+            computer: Computer name or '.' for local machine
+            namespace: WMI namespace
+            max_workers: Maximum number of sections collected at once
+            timeout: Seconds allowed per section, counted from when it
+                starts (None for no limit)
+            wrapper: Existing WMIWrapper to share between the workers
+                (overrides computer and namespace)
+        """
+        self.sections = dict(DEFAULT_SECTIONS if sections is None else sections)
+        self.wrapper = wrapper or WMIWrapper(computer=computer, namespace=namespace)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.results: Dict[str, SectionResult] = {}
+    
+    def _run(self, section: Section) -> Any:
+        # Sections return plain data: COM objects must not leave their thread
+        return section(self.wrapper)
+    
+    def collect(self) -> Dict[str, Any]:
+        """
+        Collect every section.
+        
+        Failed and timed-out sections do not stop the others; their errors
+        are reported in the document and in self.results. A timed-out
+        section is abandoned on a daemon thread, so it does not delay the
+        end of the collection or of the process.
+        
+        Returns:
+            Dict with "computer", "collected_at" (ISO 8601, UTC), "elapsed"
+            (seconds), "sections" (name -> data, None if it failed),
+            "timings" (name -> seconds) and "errors" (name -> message)
+        """
+        self.results = {}
+        collected_at = datetime.datetime.now(datetime.timezone.utc)
+        start = time.monotonic()
+        data: Dict[str, Any] = {}
+        pool = self.wrapper.pool
+        outcomes = run_bounded(
+            [(name, partial(self._run, section)) for name, section in self.sections.items()],
+            max_workers=self.max_workers,
+            timeout=self.timeout,
+            initializer=partial(pool.initialize_thread, True),
+            finalizer=pool.release_thread,
+            thread_name_prefix="wmi-inventory",
+        )
+        for outcome in outcomes:
+            value = outcome.value
+            items = len(value) if isinstance(value, list) else int(value is not None)
+            self.results[outcome.name] = SectionResult(
+                name=outcome.name,
+                ok=outcome.ok,
+                items=items if outcome.ok else 0,
+                elapsed=outcome.elapsed,
+                error=outcome.error,
+                timed_out=outcome.timed_out,
+            )
+            data[outcome.name] = value
+        
+        names = list(self.sections)
+        return {
+            "computer": self.wrapper.computer,
+            "collected_at": collected_at.isoformat(),
+            "elapsed": round(time.monotonic() - start, 4),
+            "sections": {name: data.get(name) for name in names},
+            "timings": {name: round(self.results[name].elapsed, 4) for name in names},
+            "errors": {name: self.results[name].error for name in names if not self.results[name].ok},
+        }
@@ -0,0 +1,600 @@
+"""
+Time-series history of sampled metrics.
+
+A MetricsStore is a directory of append-only segment files with
+fixed-width records: a uint32 timestamp followed by one float32 per
+series (NaN where a series has no value). Every record shares its
+timestamp across series, so a week of 10 second samples for a dozen
+series takes about 3 MB. The store also keeps 1 minute and 1 hour
+rollups (min, max, mean and sample count per series, about 2 MB more)
+so long ranges are read from a few hundred rows.
+
+Segments are memory-mapped for reads: timestamps are binary searched and
+a series is a strided slice of the rows.
+
+MetricsRecorder samples SystemMonitor on a background thread and appends
+the values to a store.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from .modules import SystemMonitor
+
+_MAGIC = b"WMIMETR1"
+_NAN = float("nan")
+
+# Resolution name -> bucket seconds (0 for raw samples)
+RESOLUTIONS: Dict[str, int] = {"raw": 0, "1m": 60, "1h": 3600}
+ROLLUP_FIELDS = ("min", "max", "mean", "count")
+AGGREGATES = ("mean", "min", "max")
+
+Point = Tuple[int, float]
+
+
+class _Segment:
+    """One segment file: a JSON header followed by fixed-width rows."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"Not a metrics segment: {path}")
+            (length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length).decode("utf-8"))
+        self.resolution: str = header["resolution"]
+        self.series: List[str] = header["series"]
+        self.fields: List[str] = header["fields"]
+        self.offset = _aligned(len(_MAGIC) + 4 + length)
+        self.index = {name: i for i, name in enumerate(self.series)}
+        self.width = 1 + len(self.series) * len(self.fields)
+        self.row_size = self.width * 4
+        self._row = struct.Struct(f"<I{self.width - 1}f")
+        self._append: Optional[Any] = None
+        self._map: Optional[mmap.mmap] = None
+        self._mapped_rows = 0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def create(cls, path: str, resolution: str, series: Sequence[str]) -> "_Segment":
+        fields = ["value"] if resolution == "raw" else list(ROLLUP_FIELDS)
+        header = json.dumps({"resolution": resolution, "series": list(series), "fields": fields})
+        data = header.encode("utf-8")
+        prefix = _MAGIC + struct.pack("<I", len(data)) + data
+        with open(path, "xb") as f:
+            f.write(prefix + b"\0" * (_aligned(len(prefix)) - len(prefix)))
+        return cls(path)
+    
+    def rows(self) -> int:
+        """Number of complete rows on disk."""
+        return max(os.path.getsize(self.path) - self.offset, 0) // self.row_size
+    
+    def append(self, timestamp: int, values: Sequence[float]):
+        if self._append is None:
+            # Drop a partial row left by an interrupted write
+            complete = self.offset + self.rows() * self.row_size
+            self._append = open(self.path, "r+b")
+            self._append.truncate(complete)
+            self._append.seek(complete)
+        self._append.write(self._row.pack(timestamp, *values))
+        self._append.flush()
+    
+    def _mapped(self) -> Tuple[Optional[mmap.mmap], int]:
+        rows = self.rows()
+        if rows != self._mapped_rows or self._map is None:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if rows:
+                with open(self.path, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_rows = rows
+        return self._map, rows
+    
+    def _timestamp(self, buf: mmap.mmap, row: int) -> int:
+        return struct.unpack_from("<I", buf, self.offset + row * self.row_size)[0]
+    
+    def _bisect(self, buf: mmap.mmap, rows: int, timestamp: float) -> int:
+        # First row with a timestamp >= timestamp
+        lo, hi = 0, rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamp(buf, mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def first_timestamp(self) -> Optional[int]:
+        with self._lock:
+            buf, rows = self._mapped()
+            return self._timestamp(buf, 0) if rows else None
+    
+    def last_timestamp(self) -> Optional[int]:
+        with self._lock:
+            buf, rows = self._mapped()
+            return self._timestamp(buf, rows - 1) if rows else None
+    
+    def read(
+        self,
+        name: str,
+        field: str,
+        start: float,
+        end: float,
+        weighted: bool = False
+    ) -> List[tuple]:
+        """
+        Points of one series with start <= timestamp < end, NaNs skipped.
+        
+        With weighted, points are (timestamp, value, samples), where samples
+        is the rollup's sample count (1 for raw rows).
+        """
+        column = self.index.get(name)
+        if column is None:
+            return []
+        with self._lock:
+            buf, rows = self._mapped()
+            if not rows:
+                return []
+            lo = self._bisect(buf, rows, start)
+            hi = self._bisect(buf, rows, end)
+            if lo >= hi:
+                return []
+            chunk = buf[self.offset + lo * self.row_size:self.offset + hi * self.row_size]
+        words = memoryview(chunk)
+        position = 1 + column * len(self.fields) + self.fields.index(field)
+        timestamps = words.cast("I")[::self.width].tolist()
+        floats = words.cast("f")
+        values = floats[position::self.width].tolist()
+        if not weighted:
+            return [(t, v) for t, v in zip(timestamps, values) if v == v]
+        if "count" in self.fields:
+            base = 1 + column * len(self.fields)
+            counts = floats[base + self.fields.index("count")::self.width].tolist()
+        else:
+            counts = [1.0] * len(values)
+        return [(t, v, c) for t, v, c in zip(timestamps, values, counts) if v == v]
+    
+    def read_rows(self, start: float) -> List[Tuple[int, Dict[str, float]]]:
+        """Every row with timestamp >= start, as series -> value."""
+        with self._lock:
+            buf, rows = self._mapped()
+            if not rows:
+                return []
+            lo = self._bisect(buf, rows, start)
+            chunk = buf[self.offset + lo * self.row_size:self.offset + rows * self.row_size]
+        result = []
+        for row in self._row.iter_unpack(chunk):
+            values = {name: row[1 + i] for i, name in enumerate(self.series)}
+            result.append((row[0], values))
+        return result
+    
+    def close(self):
+        with self._lock:
+            if self._append is not None:
+                self._append.close()
+                self._append = None
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+                self._mapped_rows = 0
+
+
+def _aligned(size: int, alignment: int = 16) -> int:
+    return (size + alignment - 1) // alignment * alignment
+
+
+class _Rollup:
+    """Accumulates min/max/mean of each series for the current bucket."""
+    
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.bucket: Optional[int] = None
+        self._acc: Dict[str, List[float]] = {}
+    
+    def add(self, timestamp: int, values: Dict[str, float]) -> Optional[Tuple[int, Dict[str, Tuple[float, ...]]]]:
+        """Add a sample; returns the previous bucket once a new one starts."""
+        bucket = timestamp - timestamp % self.seconds
+        done = None
+        if self.bucket is not None and bucket != self.bucket:
+            done = self.flush()
+        self.bucket = bucket
+        for name, value in values.items():
+            if value is None or value != value:
+                continue
+            acc = self._acc.get(name)
+            if acc is None:
+                self._acc[name] = [value, value, value, 1]
+            else:
+                acc[0] = min(acc[0], value)
+                acc[1] = max(acc[1], value)
+                acc[2] += value
+                acc[3] += 1
+        return done
+    
+    def flush(self) -> Optional[Tuple[int, Dict[str, Tuple[float, ...]]]]:
+        if self.bucket is None or not self._acc:
+            return None
+        result = {name: (acc[0], acc[1], acc[2] / acc[3], acc[3]) for name, acc in self._acc.items()}
+        bucket = self.bucket
+        self._acc = {}
+        return bucket, result
+
+
+class MetricsStore:
+    """Append-only on-disk time series with 1m and 1h rollups."""
+    
+    def __init__(self, path: str):
+        """
+        Open or create a store.
+        
+        Args:
+            path: Directory holding the segment files
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._segments: Dict[str, List[_Segment]] = {resolution: [] for resolution in RESOLUTIONS}
+        for filename in sorted(os.listdir(path)):
+            resolution, _, rest = filename.partition("-")
+            if resolution in RESOLUTIONS and rest.endswith(".seg"):
+                self._segments[resolution].append(_Segment(os.path.join(path, filename)))
+        self._rollups = {
+            resolution: _Rollup(seconds) for resolution, seconds in RESOLUTIONS.items() if seconds
+        }
+        self._last_timestamp = self._latest("raw")
+        self._replay()
+    
+    def _latest(self, resolution: str) -> Optional[int]:
+        segments = self._segments[resolution]
+        for segment in reversed(segments):
+            timestamp = segment.last_timestamp()
+            if timestamp is not None:
+                return timestamp
+        return None
+    
+    def _replay(self):
+        # Rebuild the open rollup buckets from raw rows the rollups don't cover
+        for resolution, rollup in self._rollups.items():
+            written = self._latest(resolution)
+            start = 0 if written is None else written + rollup.seconds
+            for segment in self._segments["raw"]:
+                last = segment.last_timestamp()
+                if last is None or last < start:
+                    continue
+                for timestamp, values in segment.read_rows(start):
+                    self._write_rollup(resolution, rollup.add(timestamp, values))
+    
+    def _writable(self, resolution: str, names: Sequence[str]) -> _Segment:
+        segments = self._segments[resolution]
+        current = segments[-1] if segments else None
+        if current is not None and all(name in current.index for name in names):
+            return current
+        # A new series starts a new segment holding every known series
+        series = list(current.series) if current is not None else []
+        series.extend(sorted(name for name in names if name not in (current.index if current else {})))
+        if current is not None:
+            current.close()
+        number = len(segments) + 1
+        path = os.path.join(self.path, f"{resolution}-{number:06d}.seg")
+        segment = _Segment.create(path, resolution, series)
+        segments.append(segment)
+        return segment
+    
+    def _write_rollup(self, resolution: str, done: Optional[Tuple[int, Dict[str, Tuple[float, ...]]]]):
+        if done is None:
+            return
+        bucket, stats = done
+        segment = self._writable(resolution, list(stats))
+        row: List[float] = []
+        for name in segment.series:
+            row.extend(stats.get(name, (_NAN, _NAN, _NAN, 0)))
+        segment.append(bucket, row)
+    
+    def append(self, values: Dict[str, float], timestamp: Optional[float] = None):
+        """
+        Append one sample of several series.
+        
+        Args:
+            values: Series name -> value (None or NaN for no value)
+            timestamp: Unix time of the sample (default: now); must not be
+                earlier than the previous sample
+        
+        Raises:
+            ValueError: If the timestamp goes backwards
+        """
+        stamp = int(time.time() if timestamp is None else timestamp)
+        values = {name: _NAN if value is None else float(value) for name, value in values.items()}
+        with self._lock:
+            if self._last_timestamp is not None and stamp < self._last_timestamp:
+                raise ValueError(
+                    f"Sample at {stamp} is older than the last sample ({self._last_timestamp})"
+                )
+            segment = self._writable("raw", list(values))
+            segment.append(stamp, [values.get(name, _NAN) for name in segment.series])
+            self._last_timestamp = stamp
+            for resolution, rollup in self._rollups.items():
+                self._write_rollup(resolution, rollup.add(stamp, values))
+    
+    def series(self) -> List[str]:
+        """Names of all recorded series."""
+        with self._lock:
+            names: Dict[str, None] = {}
+            for segment in self._segments["raw"]:
+                names.update(dict.fromkeys(segment.series))
+            return sorted(names)
+    
+    def _read(
+        self,
+        resolution: str,
+        name: str,
+        field: str,
+        start: float,
+        end: float,
+        weighted: bool = False
+    ) -> List[tuple]:
+        points: List[tuple] = []
+        for segment in self._segments[resolution]:
+            points.extend(segment.read(name, field, start, end, weighted))
+        return points
+    
+    def query(
+        self,
+        name: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        step: Optional[int] = None,
+        agg: str = "mean"
+    ) -> List[Point]:
+        """
+        Read a series over a time range.
+        
+        With a step, points are downsampled into step-second buckets; steps
+        of a minute or an hour and longer read the rollups, and the part of
+        the range the rollups don't cover yet is read from finer data.
+        
+        Args:
+            name: Series name
+            start: Unix time of the first sample (None for the beginning)
+            end: Unix time after the last sample (None for no limit)
+            step: Bucket size in seconds (None for raw samples)
+            agg: Aggregate per bucket: mean, min or max
+        
+        Returns:
+            (timestamp, value) pairs in time order; bucketed timestamps are
+            the start of each bucket
+        """
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {agg} (use {', '.join(AGGREGATES)})")
+        start = 0 if start is None else start
+        end = 2 ** 32 if end is None else end
+        with self._lock:
+            if not step:
+                return self._read("raw", name, "value", start, end)
+            # Coarsest usable resolution first
+            resolutions = sorted(
+                (item for item in RESOLUTIONS.items() if item[1] <= step), key=lambda item: -item[1]
+            )
+            points = self._gather(name, agg, start, end, resolutions)
+        return _downsample(points, step, agg)
+    
+    def _gather(
+        self,
+        name: str,
+        agg: str,
+        start: float,
+        end: float,
+        resolutions: List[Tuple[str, int]]
+    ) -> List[tuple]:
+        if start >= end:
+            return []
+        resolution, seconds = resolutions[0]
+        if not seconds:
+            return self._read("raw", name, "value", start, end, weighted=True)
+        # Only buckets entirely inside the range; finer data fills the
+        # head and the tail the rollups don't cover (yet)
+        first = -(-start // seconds) * seconds
+        chunk = [
+            point for point in self._read(resolution, name, agg, first, end, weighted=True)
+            if point[0] + seconds <= end
+        ]
+        if not chunk:
+            return self._gather(name, agg, start, end, resolutions[1:])
+        head = self._gather(name, agg, start, chunk[0][0], resolutions[1:])
+        tail = self._gather(name, agg, chunk[-1][0] + seconds, end, resolutions[1:])
+        return head + chunk + tail
+    
+    def latest(self, name: str) -> Optional[Point]:
+        """The most recent sample of a series."""
+        with self._lock:
+            for segment in reversed(self._segments["raw"]):
+                last = segment.last_timestamp()
+                if last is not None and name in segment.index:
+                    # Usually in the last row; widen to the whole segment if not
+                    points = segment.read(name, "value", last, last + 1) \
+                        or segment.read(name, "value", 0, last + 1)
+                    if points:
+                        return points[-1]
+        return None
+    
+    def size_bytes(self) -> int:
+        """Total size of the segment files."""
+        with self._lock:
+            return sum(
+                os.path.getsize(segment.path)
+                for segments in self._segments.values()
+                for segment in segments
+            )
+    
+    def close(self):
+        """Close the open files; the store can be reopened later."""
+        with self._lock:
+            for segments in self._segments.values():
+                for segment in segments:
+                    segment.close()
+    
+    def __enter__(self) -> "MetricsStore":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _downsample(points: List[tuple], step: int, agg: str) -> List[Point]:
+    # points are (timestamp, value, samples); rollup means are weighted by
+    # their sample counts so mixing resolutions doesn't skew the mean
+    buckets: Dict[int, List[tuple]] = {}
+    for point in points:
+        buckets.setdefault(point[0] - point[0] % step, []).append(point)
+    result = []
+    for bucket, group in buckets.items():
+        if agg == "min":
+            value = min(point[1] for point in group)
+        elif agg == "max":
+            value = max(point[1] for point in group)
+        else:
+            value = math.fsum(point[1] * point[2] for point in group) / math.fsum(point[2] for point in group)
+        result.append((bucket, value))
+    return result
+
+
+def _memory_metrics(monitor: SystemMonitor) -> Dict[str, float]:
+    info = monitor.get_memory_info()
+    return {
+        "memory.used_percent": info["used_percentage"],
+        "memory.used_bytes": info["used_bytes"],
+        "memory.free_bytes": info["free_bytes"],
+    }
+
+
+def _cpu_metrics(monitor: SystemMonitor) -> Dict[str, float]:
+    loads = [
+        cpu["LoadPercentage"] for cpu in monitor.get_cpu_info(["LoadPercentage"])
+        if cpu["LoadPercentage"] is not None
+    ]
+    return {"cpu.load_percent": sum(loads) / len(loads)} if loads else {}
+
+
+def _disk_metrics(monitor: SystemMonitor) -> Dict[str, float]:
+    values = {}
+    for disk in monitor.get_disk_usage():
+        values[f"disk.{disk['device_id']}.used_percent"] = disk["used_percentage"]
+        values[f"disk.{disk['device_id']}.free_bytes"] = disk["free_bytes"]
+    return values
+
+
+DEFAULT_COLLECTORS: Dict[str, Callable[[SystemMonitor], Dict[str, float]]] = {
+    "memory": _memory_metrics,
+    "cpu": _cpu_metrics,
+    "disk": _disk_metrics,
+}
+
+
+class MetricsRecorder:
+    """Periodically samples SystemMonitor into a MetricsStore."""
+    
+    def __init__(
+        self,
+        store: Union[MetricsStore, str],
+        monitor: Optional[SystemMonitor] = None,
+        interval: float = 10.0,
+        collectors: Optional[Dict[str, Callable[[SystemMonitor], Dict[str, float]]]] = None,
+        max_errors: int = 100
+    ):
+        """
+        Initialize the recorder.
+        
+        Args:
+            store: Store or directory to record into
+            monitor: Monitor to sample (default: local machine)
+            interval: Seconds between samples
+            collectors: Name -> function(monitor) returning series values
+                (default: memory, cpu and disk)
+            max_errors: Number of recent errors kept in errors; error_counts
+                counts all of them
+        """
+        self.store = store if isinstance(store, MetricsStore) else MetricsStore(store)
+        self.monitor = monitor or SystemMonitor()
+        self.interval = interval
+        self.collectors = dict(DEFAULT_COLLECTORS if collectors is None else collectors)
+        self.samples = 0
+        # A collector failing on every sample must not grow without bound
+        self.errors: Deque[Tuple[str, Exception]] = deque(maxlen=max_errors)
+        self.error_counts: Dict[str, int] = {}
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def collect(self) -> Dict[str, float]:
+        """Run every collector once; failing collectors are recorded in errors."""
+        values: Dict[str, float] = {}
+        for name, collector in self.collectors.items():
+            try:
+                values.update(collector(self.monitor))
+            except Exception as e:
+                self._error(name, e)
+        return values
+    
+    def _error(self, source: str, error: Exception):
+        self.errors.append((source, error))
+        self.error_counts[source] = self.error_counts.get(source, 0) + 1
+    
+    def record(self, timestamp: Optional[float] = None) -> Dict[str, float]:
+        """Collect one sample and append it to the store."""
+        values = self.collect()
+        if values:
+            self.store.append(values, timestamp)
+            self.samples += 1
+        return values
+    
+    def start(self):
+        """Start sampling on a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="wmi-metrics", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop sampling and wait for the thread to finish."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        pool = self.monitor.wrapper.pool
+        pool.initialize_thread(True)
+        try:
+            next_sample = time.monotonic()
+            while not self._stopping.is_set():
+                try:
+                    self.record()
+                except Exception as e:
+                    self._error("store", e)
+                # Fixed schedule, so slow samples don't make the series drift
+                next_sample += self.interval
+                delay = next_sample - time.monotonic()
+                if delay < 0:
+                    next_sample = time.monotonic()
+                    delay = 0
+                self._stopping.wait(delay)
+        finally:
+            pool.release_thread()
+    
+    @property
+    def running(self) -> bool:
+        """True while the sampling thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def __enter__(self) -> "MetricsRecorder":
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
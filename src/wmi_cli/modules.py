@@ -1,101 +1,730 @@
 """
 Advanced WMI query modules for specific use cases.
 """
-from typing import List, Dict, Any, Optional
+import datetime
+import fnmatch
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import closing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Deque, Iterable, Iterator, Optional, Set, Tuple
+from .convert import object_to_dict, objects_to_dicts
+from .frame import ResultFrame
+from .wql import Field, Query, parse_dmtf
 from .wmi_wrapper import WMIWrapper, wmi_object_to_dict
 
 
+# Win32_Service StartService/StopService return values
+SERVICE_RETURN_CODES = {
+    0: "Success", 1: "Not Supported", 2: "Access Denied", 3: "Dependent Services Running",
+    4: "Invalid Service Control", 5: "Service Cannot Accept Control", 6: "Service Not Active",
+    7: "Service Request Timeout", 8: "Unknown Failure", 9: "Path Not Found",
+    10: "Service Already Running", 11: "Service Database Locked",
+    12: "Service Dependency Deleted", 13: "Service Dependency Failure", 14: "Service Disabled",
+    15: "Service Logon Failed", 16: "Service Marked For Deletion", 17: "Service No Thread",
+    18: "Status Circular Dependency", 19: "Status Duplicate Name", 20: "Status Invalid Name",
+    21: "Status Invalid Parameter", 22: "Status Invalid Service Account",
+    23: "Status Service Exists", 24: "Service Already Paused",
+}
+
+SERVICE_ACTIONS = ("start", "stop", "restart")
+
+# step -> (method, final state, return value meaning "already there")
+_SERVICE_STEPS = {
+    "stop": ("StopService", "Stopped", 6),
+    "start": ("StartService", "Running", 10),
+}
+
+# Above this many names (or PIDs), query every instance instead of OR-ing them
+_MAX_NAME_FILTER = 32
+
+_SERVICE_NAME = re.compile(r'Name="((?:[^"\\]|\\.)*)"', re.IGNORECASE)
+
+
+@dataclass
+class ServiceActionResult:
+    """Outcome of one service's action in ServiceManager.apply."""
+    
+    name: str
+    action: str
+    ok: bool = False
+    state: Optional[str] = None
+    return_value: Optional[int] = None
+    error: Optional[str] = None
+    queued: float = 0.0  # seconds spent waiting for dependencies
+    elapsed: float = 0.0  # seconds from the first control to the final state
+    steps: Dict[str, float] = field(default_factory=dict)  # seconds per stop/start step
+    polls: int = 0
+
+
+def _service_from_path(path: Any) -> Optional[str]:
+    match = _SERVICE_NAME.search(str(path))
+    return re.sub(r"\\(.)", r"\1", match.group(1)) if match else None
+
+
 class ServiceManager:
     """Manage Windows services via WMI."""
     
-    def __init__(self, computer: str = "."):
-        self.wrapper = WMIWrapper(computer=computer)
+    def __init__(self, computer: str = ".", wrapper: Optional[WMIWrapper] = None):
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
     
     def start_service(self, service_name: str) -> tuple:
         """Start a Windows service."""
-        services = self.wrapper.get_services(Name=service_name)
-        if not services:
-            raise ValueError(f"Service '{service_name}' not found")
-        
-        service = services[0]
-        return service.StartService()
+        return (self._control(service_name, "StartService"),)
     
     def stop_service(self, service_name: str) -> tuple:
         """Stop a Windows service."""
-        services = self.wrapper.get_services(Name=service_name)
-        if not services:
-            raise ValueError(f"Service '{service_name}' not found")
-        
-        service = services[0]
-        return service.StopService()
+        return (self._control(service_name, "StopService"),)
     
-    def restart_service(self, service_name: str) -> tuple:
-        """Restart a Windows service."""
-        self.stop_service(service_name)
-        return self.start_service(service_name)
+    def restart_service(self, service_name: str, timeout: Optional[float] = 30.0) -> tuple:
+        """
+        Restart a Windows service, waiting for it to stop before starting it.
+        
+        Services that depend on it are not restarted; stopping fails while
+        they run. Use apply() to restart them together.
+        
+        Returns:
+            (return value of the last control sent,)
+        
+        Raises:
+            RuntimeError: If a control could not be sent, or was accepted
+                but the service did not reach its final state
+        """
+        result = self.apply({service_name: "restart"}, timeout=timeout)[0]
+        if result.error == "Service not found":
+            raise ValueError(f"Service '{service_name}' not found")
+        if not result.ok and not result.return_value:
+            raise RuntimeError(f"Restarting '{service_name}' failed: {result.error}")
+        return (result.return_value,)
     
-    def get_service_status(self, service_name: str) -> Dict[str, Any]:
+    def get_service_status(
+        self,
+        service_name: str,
+        properties: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """Get detailed status of a service."""
-        services = self.wrapper.get_services(Name=service_name)
+        services = self.wrapper.get_services(properties, Name=service_name)
         if not services:
             raise ValueError(f"Service '{service_name}' not found")
         
-        return wmi_object_to_dict(services[0])
+        return wmi_object_to_dict(services[0], properties)
+    
+    def list_services(self, properties: Optional[List[str]] = None, **filters) -> List[Dict[str, Any]]:
+        """Get services as dictionaries."""
+        services = self.wrapper.get_services(properties, **filters)
+        return objects_to_dicts(services, properties)
     
-    def get_stopped_auto_services(self) -> List[Any]:
+    def get_stopped_auto_services(self, properties: Optional[List[str]] = None) -> List[Any]:
         """Get services that are set to start automatically but are stopped."""
-        return self.wrapper.get_services(StartMode="Auto", State="Stopped")
+        return self.wrapper.get_services(properties, StartMode="Auto", State="Stopped")
+    
+    def apply(
+        self,
+        actions: Dict[str, str],
+        max_workers: int = 8,
+        timeout: Optional[float] = 30.0,
+        poll_interval: float = 0.1,
+        max_poll_interval: float = 2.0
+    ) -> List[ServiceActionResult]:
+        """
+        Start, stop or restart many services concurrently.
+        
+        Controls are sent in dependency order (Win32_DependentService): a
+        service stops after the services in the batch that depend on it have
+        stopped and starts after the ones it depends on are running; a
+        restart stops before it starts. Independent services are controlled
+        in parallel. Pending services are polled together, one query per
+        round, backing off from poll_interval to max_poll_interval while no
+        state changes.
+        
+        Args:
+            actions: Service name -> 'start', 'stop' or 'restart'
+            max_workers: Maximum number of controls sent at once
+            timeout: Seconds each step may take to reach its final state
+                (None to wait indefinitely)
+            poll_interval: First delay between state polls in seconds
+            max_poll_interval: Longest delay between state polls in seconds
+        
+        Returns:
+            One result per action, in the order given
+        
+        Raises:
+            ValueError: If an action is not start, stop or restart
+        """
+        for name, action in actions.items():
+            if action.lower() not in SERVICE_ACTIONS:
+                raise ValueError(f"Invalid action '{action}' for {name}: use start, stop or restart")
+        
+        begin = time.monotonic()
+        states = self._service_states(list(actions))
+        results: Dict[str, ServiceActionResult] = {}
+        for name, action in actions.items():
+            key = name.lower()
+            current = states.get(key)
+            if current is None:
+                results[key] = ServiceActionResult(name, action.lower(), error="Service not found")
+            else:
+                results[key] = ServiceActionResult(current[0], action.lower(), state=current[1])
+        
+        # Steps are (service, 'stop' | 'start'); each waits for its prerequisites
+        steps: Dict[Tuple[str, str], Set[Tuple[str, str]]] = {}
+        for key, result in results.items():
+            if result.error is None:
+                if result.action in ("stop", "restart"):
+                    steps[(key, "stop")] = set()
+                if result.action in ("start", "restart"):
+                    steps[(key, "start")] = {(key, "stop")} if result.action == "restart" else set()
+        if steps:
+            for antecedent, dependent in self._dependencies(set(results)):
+                if (antecedent, "stop") in steps and (dependent, "stop") in steps:
+                    steps[(antecedent, "stop")].add((dependent, "stop"))
+                if (antecedent, "start") in steps and (dependent, "start") in steps:
+                    steps[(dependent, "start")].add((antecedent, "start"))
+        
+        self._run_steps(steps, results, begin, max_workers, timeout, poll_interval, max_poll_interval)
+        return [results[name.lower()] for name in actions]
+    
+    def _run_steps(
+        self,
+        steps: Dict[Tuple[str, str], Set[Tuple[str, str]]],
+        results: Dict[str, ServiceActionResult],
+        begin: float,
+        max_workers: int,
+        timeout: Optional[float],
+        poll_interval: float,
+        max_poll_interval: float
+    ):
+        done: Set[Tuple[str, str]] = set()
+        failed: Set[Tuple[str, str]] = set()
+        sending: Dict[Future, Tuple[str, str]] = {}
+        # step -> (time the control was sent, seen a pending state)
+        waiting: Dict[Tuple[str, str], List[Any]] = {}
+        sent_at: Dict[Tuple[str, str], float] = {}
+        delay = poll_interval
+        
+        def finish(step: Tuple[str, str], ok: bool, error: Optional[str] = None):
+            result = results[step[0]]
+            now = time.monotonic()
+            if step in sent_at:
+                result.steps[step[1]] = round(now - sent_at[step], 3)
+                result.elapsed = now - begin - result.queued
+            (done if ok else failed).add(step)
+            if not ok:
+                result.error = result.error or error
+            remaining = [s for s in steps if s[0] == step[0] and s not in done | failed]
+            result.ok = result.error is None and not remaining
+        
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(steps) or 1)),
+            thread_name_prefix="wmi-service",
+        )
+        try:
+            while len(done) + len(failed) < len(steps):
+                progressed = False
+                for step, prerequisites in steps.items():
+                    if step in done or step in failed or step in sent_at:
+                        continue
+                    if prerequisites & failed:
+                        blocked = sorted(results[s[0]].name for s in prerequisites & failed)
+                        finish(step, False, f"Skipped because {', '.join(blocked)} failed")
+                        progressed = True
+                    elif prerequisites <= done:
+                        result = results[step[0]]
+                        sent_at[step] = time.monotonic()
+                        if not result.steps:
+                            result.queued = sent_at[step] - begin
+                        method = _SERVICE_STEPS[step[1]][0]
+                        sending[executor.submit(self._control, result.name, method)] = step
+                
+                if not sending and not waiting and not progressed:
+                    # Only steps whose prerequisites wait on each other are left
+                    for step in steps:
+                        if step not in done and step not in failed:
+                            finish(step, False, "Circular service dependency")
+                    break
+                
+                if sending:
+                    finished, _ = wait(list(sending), timeout=delay if waiting else None,
+                                       return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        step = sending.pop(future)
+                        progressed = True
+                        _, target, already = _SERVICE_STEPS[step[1]]
+                        try:
+                            return_value = future.result()
+                        except Exception as e:
+                            finish(step, False, str(e) or e.__class__.__name__)
+                            continue
+                        results[step[0]].return_value = return_value
+                        if return_value == 0:
+                            waiting[step] = [sent_at[step], False]
+                        elif return_value == already:
+                            results[step[0]].state = target
+                            finish(step, True)
+                        else:
+                            message = SERVICE_RETURN_CODES.get(return_value, "Unknown error")
+                            finish(step, False, f"{message} ({return_value})")
+                elif waiting:
+                    time.sleep(delay)
+                
+                if waiting:
+                    states = self._service_states([results[step[0]].name for step in waiting])
+                    now = time.monotonic()
+                    for step, status in list(waiting.items()):
+                        result = results[step[0]]
+                        result.polls += 1
+                        state = states.get(step[0], (None, None))[1]
+                        target = _SERVICE_STEPS[step[1]][1]
+                        if state != result.state:
+                            progressed = True
+                        result.state = state
+                        if state == target:
+                            del waiting[step]
+                            finish(step, True)
+                            continue
+                        if state is not None and state.endswith("Pending"):
+                            status[1] = True
+                        elif status[1]:
+                            # Left the pending state without reaching the target
+                            del waiting[step]
+                            finish(step, False, f"Service is {state} after {step[1]}")
+                            continue
+                        if timeout is not None and now - status[0] > timeout:
+                            del waiting[step]
+                            finish(step, False, f"Timed out after {timeout:g}s waiting for {target}")
+                delay = poll_interval if progressed else min(delay * 2, max_poll_interval)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _control(self, name: str, method: str) -> int:
+        """Send a control by object path, without querying the service first."""
+        try:
+            return int(self.wrapper.exec_method("Win32_Service", "Name", name, method))
+        except ValueError:
+            raise ValueError(f"Service '{name}' not found")
+    
+    def _service_states(self, names: List[str]) -> Dict[str, Tuple[str, str]]:
+        """Get {lowercase name: (Name, State)} of services in one query."""
+        query = Query("Win32_Service", ["Name", "State"])
+        if len(names) <= _MAX_NAME_FILTER:
+            query.where(Field("Name").isin(names))
+        wanted = {name.lower() for name in names}
+        states = {}
+        for service in self.wrapper.iter_query(query):
+            name = str(service.Name)
+            if name.lower() in wanted:
+                states[name.lower()] = (name, service.State)
+        return states
+    
+    def _dependencies(self, names: Set[str]) -> List[Tuple[str, str]]:
+        """Get (antecedent, dependent) pairs among the named services (lowercase)."""
+        pairs = []
+        for association in self.wrapper.iter_query("SELECT Antecedent, Dependent FROM Win32_DependentService"):
+            # Read the raw reference paths; wmi would fetch each referenced object
+            raw = getattr(association, "ole_object", association)
+            antecedent = _service_from_path(getattr(raw, "Antecedent", ""))
+            dependent = _service_from_path(getattr(raw, "Dependent", ""))
+            if antecedent and dependent and antecedent.lower() in names and dependent.lower() in names:
+                pairs.append((antecedent.lower(), dependent.lower()))
+        return pairs
+
+
+# Win32_Process Terminate return values
+PROCESS_RETURN_CODES = {
+    0: "Successful completion", 2: "Access denied", 3: "Insufficient privilege",
+    8: "Unknown failure", 9: "Path not found", 21: "Invalid parameter",
+}
+
+
+@dataclass
+class ProcessActionResult:
+    """Outcome of terminating one process."""
+    
+    pid: int
+    name: Optional[str] = None
+    ok: bool = False
+    return_value: Optional[int] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+def _created_key(process: Dict[str, Any]) -> Optional[str]:
+    """CreationDate as a sortable string (yyyymmddHHMMSS.ffffff), or None."""
+    created = process.get("CreationDate")
+    return str(created)[:21] if created else None
+
+
+class ProcessTree:
+    """
+    Parent/child index of a process snapshot.
+    
+    Built from one Win32_Process enumeration. Windows keeps a process's
+    ParentProcessId after the parent exits and reuses PIDs, so a parent
+    link only counts when the parent was created before the child; other
+    processes are roots. Processes are numbered depth-first once, so
+    descendants() is a slice of that order and is_descendant() compares
+    two numbers; ancestors() follows parent links. Every lookup costs
+    time proportional to its result.
+    """
+    
+    PROPERTIES = ["ProcessId", "ParentProcessId", "Name", "CreationDate"]
+    
+    def __init__(self, processes: Iterable[Dict[str, Any]]):
+        """
+        Build the index.
+        
+        Args:
+            processes: Process dictionaries with at least ProcessId and
+                ParentProcessId (Name and CreationDate are recommended)
+        """
+        self.processes: Dict[int, Dict[str, Any]] = {}
+        for process in processes:
+            if process.get("ProcessId") is not None:
+                self.processes[int(process["ProcessId"])] = process
+        
+        self._parent: Dict[int, Optional[int]] = {}
+        self._children: Dict[int, List[int]] = {pid: [] for pid in self.processes}
+        for pid in sorted(self.processes):
+            parent = self._valid_parent(pid)
+            self._parent[pid] = parent
+            if parent is not None:
+                self._children[parent].append(pid)
+        
+        self._order: List[int] = []
+        self._span: Dict[int, Tuple[int, int]] = {}
+        self._depth: Dict[int, int] = {}
+        for pid in sorted(self.processes):
+            if self._parent[pid] is None:
+                self._number(pid)
+        for pid in sorted(self.processes):
+            if pid not in self._span:
+                # Equal or missing creation dates allowed a cycle; cut it here
+                self._children[self._parent[pid]].remove(pid)
+                self._parent[pid] = None
+                self._number(pid)
+    
+    def _valid_parent(self, pid: int) -> Optional[int]:
+        parent = self.processes[pid].get("ParentProcessId")
+        if parent is None or int(parent) == pid or int(parent) not in self.processes:
+            return None
+        parent_created = _created_key(self.processes[int(parent)])
+        created = _created_key(self.processes[pid])
+        if parent_created and created and parent_created > created:
+            # The parent exited and its PID now belongs to a newer process
+            return None
+        return int(parent)
+    
+    def _number(self, root: int):
+        """Number the subtree of root depth-first (iteratively; trees can be deep)."""
+        stack: List[Tuple[int, int, bool]] = [(root, 0, False)]
+        while stack:
+            pid, depth, leaving = stack.pop()
+            if leaving:
+                self._span[pid] = (self._span[pid][0], len(self._order))
+                continue
+            self._span[pid] = (len(self._order), len(self._order) + 1)
+            self._depth[pid] = depth
+            self._order.append(pid)
+            stack.append((pid, depth, True))
+            stack.extend((child, depth + 1, False) for child in reversed(self._children[pid]))
+    
+    def __len__(self) -> int:
+        return len(self.processes)
+    
+    def __contains__(self, pid: int) -> bool:
+        return pid in self.processes
+    
+    def get(self, pid: int) -> Optional[Dict[str, Any]]:
+        """Get the process dictionary of a PID."""
+        return self.processes.get(pid)
+    
+    def roots(self) -> List[int]:
+        """PIDs of processes without a (live) parent."""
+        return [pid for pid in self._order if self._parent[pid] is None]
+    
+    def parent(self, pid: int) -> Optional[int]:
+        return self._parent.get(pid)
+    
+    def children(self, pid: int) -> List[int]:
+        return list(self._children.get(pid, ()))
+    
+    def depth(self, pid: int) -> int:
+        """Number of ancestors of a process."""
+        return self._depth[pid]
+    
+    def descendants(self, pid: int) -> List[int]:
+        """PIDs below a process, depth-first (parents before their children)."""
+        start, end = self._span[pid]
+        return self._order[start + 1:end]
+    
+    def ancestors(self, pid: int) -> List[int]:
+        """PIDs above a process, nearest first."""
+        result = []
+        parent = self._parent.get(pid)
+        while parent is not None:
+            result.append(parent)
+            parent = self._parent[parent]
+        return result
+    
+    def is_descendant(self, pid: int, ancestor: int) -> bool:
+        """Check whether pid is below ancestor."""
+        if pid not in self._span or ancestor not in self._span:
+            return False
+        start, end = self._span[ancestor]
+        return start < self._span[pid][0] < end
+    
+    def find(self, pattern: str) -> List[int]:
+        """
+        Find processes by name.
+        
+        Args:
+            pattern: Name or shell-style pattern (e.g. 'chrome*'),
+                case-insensitive
+        
+        Returns:
+            Matching PIDs in depth-first order
+        """
+        pattern = pattern.lower()
+        return [
+            pid for pid in self._order
+            if fnmatch.fnmatchcase(str(self.processes[pid].get("Name") or "").lower(), pattern)
+        ]
+    
+    def walk(self, pids: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (pid, depth) depth-first.
+        
+        Args:
+            pids: Subtrees to walk (default: every root); subtrees nested
+                in an earlier one are not repeated
+        """
+        seen: Set[int] = set()
+        for root in self.roots() if pids is None else pids:
+            if root in seen or root not in self._span:
+                continue
+            start, end = self._span[root]
+            for pid in self._order[start:end]:
+                seen.add(pid)
+                yield pid, self._depth[pid] - self._depth[root]
 
 
 class ProcessManager:
     """Manage processes via WMI."""
     
-    def __init__(self, computer: str = "."):
-        self.wrapper = WMIWrapper(computer=computer)
+    def __init__(self, computer: str = ".", wrapper: Optional[WMIWrapper] = None):
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
     
     def terminate_process(self, process_id: int) -> tuple:
         """Terminate a process by ID."""
-        processes = self.wrapper.get_processes(ProcessId=process_id)
-        if not processes:
+        try:
+            return (self.wrapper.exec_method("Win32_Process", "Handle", str(process_id), "Terminate"),)
+        except ValueError:
+            raise ValueError(f"Process with ID {process_id} not found")
+        
+    def get_process_tree(self) -> ProcessTree:
+        """Build a ProcessTree from one enumeration of Win32_Process."""
+        properties = ProcessTree.PROPERTIES
+        query = Query("Win32_Process", properties)
+        return ProcessTree(objects_to_dicts(self.wrapper.iter_query(query), properties))
+    
+    def terminate_processes(
+        self,
+        processes: Iterable[Dict[str, Any]],
+        max_workers: int = 8
+    ) -> List[ProcessActionResult]:
+        """
+        Terminate processes concurrently, protected against PID reuse.
+        
+        The PIDs and creation dates are checked in one query first; a PID
+        now owned by a process created after the snapshot is left alone.
+        Processes that already exited count as terminated.
+        
+        Args:
+            processes: Process dictionaries with ProcessId and CreationDate
+                (e.g. from ProcessTree.get)
+            max_workers: Maximum number of Terminate calls at once
+        
+        Returns:
+            One result per process, in the order given
+        """
+        processes = list(processes)
+        results = [
+            ProcessActionResult(pid=int(process["ProcessId"]), name=process.get("Name"))
+            for process in processes
+        ]
+        current = self._creation_dates([result.pid for result in results])
+        pending = []
+        for result, process in zip(results, processes):
+            if result.pid not in current:
+                result.ok = True
+                continue
+            expected = _created_key(process)
+            if expected and current[result.pid] and current[result.pid] != expected:
+                result.error = "PID reused by a newer process"
+                continue
+            pending.append(result)
+        if not pending:
+            return results
+        
+        def terminate(result: ProcessActionResult):
+            start = time.monotonic()
+            try:
+                result.return_value = int(self.wrapper.exec_method(
+                    "Win32_Process", "Handle", str(result.pid), "Terminate"
+                ))
+            except ValueError:
+                # Exited since the check
+                result.ok = True
+            except Exception as e:
+                result.error = str(e) or e.__class__.__name__
+            else:
+                result.ok = result.return_value == 0
+                if not result.ok:
+                    message = PROCESS_RETURN_CODES.get(result.return_value, "Unknown error")
+                    result.error = f"{message} ({result.return_value})"
+            result.elapsed = time.monotonic() - start
+        
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(pending))),
+            thread_name_prefix="wmi-terminate",
+        ) as executor:
+            list(executor.map(terminate, pending))
+        return results
+    
+    def kill_tree(
+        self,
+        process_id: int,
+        include_root: bool = True,
+        tree: Optional[ProcessTree] = None,
+        max_workers: int = 8
+    ) -> List[ProcessActionResult]:
+        """
+        Terminate a process and all its descendants.
+        
+        Args:
+            process_id: PID of the root of the tree
+            include_root: Also terminate the root process
+            tree: Snapshot to use (default: a new get_process_tree())
+            max_workers: Maximum number of Terminate calls at once
+        
+        Returns:
+            One result per process, parents before their children
+        
+        Raises:
+            ValueError: If the process does not exist
+        """
+        tree = tree or self.get_process_tree()
+        if process_id not in tree:
             raise ValueError(f"Process with ID {process_id} not found")
+        pids = tree.descendants(process_id)
+        if include_root:
+            pids = [process_id] + pids
+        return self.terminate_processes([tree.get(pid) for pid in pids], max_workers)
+    
+    def kill_by_name(
+        self,
+        pattern: str,
+        include_children: bool = False,
+        tree: Optional[ProcessTree] = None,
+        max_workers: int = 8
+    ) -> List[ProcessActionResult]:
+        """
+        Terminate processes whose name matches a pattern.
         
-        process = processes[0]
-        return process.Terminate()
+        Args:
+            pattern: Name or shell-style pattern (e.g. 'chrome*'), case-insensitive
+            include_children: Also terminate the descendants of matches
+            tree: Snapshot to use (default: a new get_process_tree())
+            max_workers: Maximum number of Terminate calls at once
+        
+        Returns:
+            One result per process, parents before their children
+        """
+        tree = tree or self.get_process_tree()
+        matches = tree.find(pattern)
+        pids = [pid for pid, _ in tree.walk(matches)] if include_children else matches
+        return self.terminate_processes([tree.get(pid) for pid in pids], max_workers)
     
-    def get_process_by_name(self, name: str) -> List[Any]:
+    def _creation_dates(self, pids: List[int]) -> Dict[int, Optional[str]]:
+        """Get {pid: creation key} of the running processes among pids, in one query."""
+        query = Query("Win32_Process", ["ProcessId", "CreationDate"])
+        if len(pids) <= _MAX_NAME_FILTER:
+            query.where(Field("ProcessId").isin(pids))
+        wanted = set(pids)
+        dates = {}
+        for process in self.wrapper.iter_query(query):
+            pid = int(process.ProcessId)
+            if pid in wanted:
+                dates[pid] = _created_key({"CreationDate": process.CreationDate})
+        return dates
+    
+    def get_process_by_name(self, name: str, properties: Optional[List[str]] = None) -> List[Any]:
         """Get all processes by name."""
-        return self.wrapper.get_processes(Name=name)
+        return self.wrapper.get_processes(properties, Name=name)
     
-    def get_process_info(self, process_id: int) -> Dict[str, Any]:
+    def get_process_info(
+        self,
+        process_id: int,
+        properties: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """Get detailed information about a process."""
-        processes = self.wrapper.get_processes(ProcessId=process_id)
+        processes = self.wrapper.get_processes(properties, ProcessId=process_id)
         if not processes:
             raise ValueError(f"Process with ID {process_id} not found")
         
-        return wmi_object_to_dict(processes[0])
+        return wmi_object_to_dict(processes[0], properties)
     
-    def get_high_memory_processes(self, min_memory_mb: int = 100) -> List[Any]:
+    def get_high_memory_processes(
+        self,
+        min_memory_mb: int = 100,
+        properties: Optional[List[str]] = None
+    ) -> List[Any]:
         """Get processes using more than specified memory."""
-        all_processes = self.wrapper.get_processes()
-        min_bytes = min_memory_mb * 1024 * 1024
-        return [p for p in all_processes if p.WorkingSetSize and int(p.WorkingSetSize) > min_bytes]
+        return self.wrapper.query(self._high_memory_query(min_memory_mb, properties))
+    
+    def _high_memory_query(self, min_memory_mb: int, properties: Optional[List[str]]) -> Query:
+        # WMI compares the uint64 WorkingSetSize numerically server-side
+        if properties is not None and "WorkingSetSize" not in properties:
+            properties = list(properties) + ["WorkingSetSize"]
+        return Query("Win32_Process", properties).where(
+            Field("WorkingSetSize") > min_memory_mb * 1024 * 1024
+        )
+    
+    def get_process_frame(self, properties: Optional[List[str]] = None, **filters) -> ResultFrame:
+        """Get running processes as typed columns."""
+        return self.wrapper.get_class_frame("Win32_Process", properties, **filters)
+    
+    def get_high_memory_frame(
+        self,
+        min_memory_mb: int = 100,
+        properties: Optional[List[str]] = None
+    ) -> ResultFrame:
+        """Get processes using more than specified memory, as typed columns."""
+        query = self._high_memory_query(min_memory_mb, properties)
+        return self.wrapper.query_frame(query, query.properties)
 
 
 class SystemMonitor:
     """Monitor system resources and performance."""
     
-    def __init__(self, computer: str = "."):
-        self.wrapper = WMIWrapper(computer=computer)
+    def __init__(self, computer: str = ".", wrapper: Optional[WMIWrapper] = None):
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
     
-    def get_cpu_info(self) -> List[Dict[str, Any]]:
+    def get_cpu_info(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get CPU information."""
-        processors = self.wrapper.get_processor()
-        return [wmi_object_to_dict(p) for p in processors]
+        processors = self.wrapper.get_processor(properties)
+        return objects_to_dicts(processors, properties)
     
     def get_memory_info(self) -> Dict[str, Any]:
         """Get memory information."""
-        cs = self.wrapper.get_computer_system()
-        os_info = self.wrapper.get_operating_system()
+        cs = self.wrapper.get_computer_system(["TotalPhysicalMemory"])
+        os_info = self.wrapper.get_operating_system(["FreePhysicalMemory"])
         
         total_memory = int(cs.TotalPhysicalMemory)
         free_memory = int(os_info.FreePhysicalMemory) * 1024  # Convert KB to bytes
@@ -110,7 +739,13 @@ class SystemMonitor:
     
     def get_disk_usage(self) -> List[Dict[str, Any]]:
         """Get disk usage for all local drives."""
-        disks = self.wrapper.get_logical_disks(DriveType=3)  # Local disks only
+        query = Query(
+            "Win32_LogicalDisk", ["DeviceID", "VolumeName", "FileSystem", "Size", "FreeSpace"]
+        ).where(
+            Field("DriveType") == 3,  # Local disks only
+            Field("Size").is_not_null(),
+        )
+        disks = self.wrapper.query(query)
         
         result = []
         for disk in disks:
@@ -133,7 +768,7 @@ class SystemMonitor:
     
     def get_uptime(self) -> Dict[str, Any]:
         """Get system uptime."""
-        os_info = self.wrapper.get_operating_system()
+        os_info = self.wrapper.get_operating_system(["LastBootUpTime"])
         
         # LastBootUpTime is in WMI datetime format: 20231106120000.000000+000
         from datetime import datetime
@@ -151,132 +786,809 @@ class SystemMonitor:
             "uptime_hours": uptime.seconds // 3600,
             "uptime_minutes": (uptime.seconds % 3600) // 60,
         }
+    
+    def get_process_sampler(self, history: int = 60) -> "ProcessSampler":
+        """Get a ProcessSampler sharing this monitor's wrapper."""
+        return ProcessSampler(wrapper=self.wrapper, history=history)
+
+
+class ProcessSampler:
+    """
+    Per-process CPU, memory and I/O rates computed from raw counters.
+    
+    Win32_PerfFormattedData_PerfProc_Process is slow to enumerate and is a
+    single instantaneous sample. The sampler reads the cheaper
+    Win32_PerfRawData_PerfProc_Process counters and computes rates from
+    the deltas between consecutive samples. It keeps a ring buffer of raw
+    samples per PID, so every refresh costs one projected query.
+    """
+    
+    COUNTERS = [
+        "Name", "IDProcess", "PercentProcessorTime", "Timestamp_Sys100NS",
+        "WorkingSet", "PrivateBytes", "IOReadBytesPersec", "IOWriteBytesPersec",
+        "ThreadCount", "HandleCount", "CreatingProcessID", "ElapsedTime",
+    ]
+    
+    SORT_KEYS = {
+        "cpu": "cpu_percent",
+        "memory": "working_set",
+        "io": "io_bytes_per_sec",
+    }
+    
+    def __init__(
+        self,
+        computer: str = ".",
+        wrapper: Optional[WMIWrapper] = None,
+        history: int = 60,
+        cpu_count: Optional[int] = None
+    ):
+        """
+        Initialize the sampler.
+        
+        Args:
+            computer: Computer name or '.' for local machine
+            wrapper: Existing wrapper to use
+            history: Raw samples kept per process
+            cpu_count: Logical processors used to normalize CPU% (default:
+                read from Win32_ComputerSystem)
+        """
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
+        self.history = max(2, history)
+        self._cpu_count = cpu_count
+        self._samples: Dict[int, Deque[Dict[str, Any]]] = {}
+        self._stats: Dict[int, Dict[str, Any]] = {}
+        self._last_sample: Optional[float] = None
+        self._lock = threading.Lock()
+        self.samples_taken = 0
+    
+    @property
+    def cpu_count(self) -> int:
+        """Number of logical processors."""
+        if self._cpu_count is None:
+            cs = self.wrapper.get_computer_system(["NumberOfLogicalProcessors"])
+            self._cpu_count = max(1, int(cs.NumberOfLogicalProcessors or 1))
+        return self._cpu_count
+    
+    def _read(self) -> List[Dict[str, Any]]:
+        query = Query("Win32_PerfRawData_PerfProc_Process", self.COUNTERS).where(
+            Field("Name") != "_Total", Field("Name") != "Idle"
+        )
+        # iter_query enumerates directly, so the 1s result cache for
+        # Win32_PerfRawData_* never hands back a stale sample
+        rows = objects_to_dicts(self.wrapper.iter_query(query), self.COUNTERS)
+        for row in rows:
+            # wmi returns the uint64 counters as strings
+            for name in self.COUNTERS[1:]:
+                value = row[name]
+                if value is not None:
+                    row[name] = int(value)
+        return rows
+    
+    def sample(self) -> List[Dict[str, Any]]:
+        """
+        Take one sample and update the per-process statistics.
+        
+        Rates (cpu_percent, io_*_per_sec) are None for processes seen for
+        the first time.
+        
+        Returns:
+            Statistics for every running process
+        """
+        cpus = self.cpu_count
+        with self._lock:
+            stats: Dict[int, Dict[str, Any]] = {}
+            for row in self._read():
+                pid = row["IDProcess"]
+                if pid is None:
+                    continue
+                ring = self._samples.get(pid)
+                if ring is None or not _same_process(ring[-1], row):
+                    # New process, or the PID was reused
+                    ring = self._samples[pid] = deque(maxlen=self.history)
+                ring.append(row)
+                previous = ring[-2] if len(ring) > 1 else None
+                stats[pid] = _process_rates(row, previous, cpus)
+            
+            for pid in list(self._samples):
+                if pid not in stats:
+                    del self._samples[pid]
+            self._stats = stats
+            self._last_sample = time.monotonic()
+            self.samples_taken += 1
+        return list(stats.values())
+    
+    def measure(self, interval: float = 1.0, max_age: float = 5.0) -> List[Dict[str, Any]]:
+        """
+        Get statistics covering a recent interval.
+        
+        Samples once if the previous sample is recent enough, otherwise
+        samples twice, interval seconds apart.
+        
+        Args:
+            interval: Seconds between the two samples when a baseline is needed
+            max_age: Oldest baseline sample (seconds) reused for the deltas
+        
+        Returns:
+            Statistics for every running process
+        """
+        if self._last_sample is None or time.monotonic() - self._last_sample > max_age:
+            self.sample()
+            time.sleep(interval)
+        return self.sample()
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """Statistics computed by the latest sample."""
+        return list(self._stats.values())
+    
+    def get_process_stats(self, pid: int) -> Optional[Dict[str, Any]]:
+        """Statistics of one process from the latest sample."""
+        return self._stats.get(pid)
+    
+    def get_history(self, pid: int) -> List[Dict[str, Any]]:
+        """Raw counter samples kept for a process, oldest first."""
+        return list(self._samples.get(pid, ()))
+    
+    def top(self, n: int = 10, by: str = "cpu") -> List[Dict[str, Any]]:
+        """
+        Get the top processes from the latest sample.
+        
+        Args:
+            n: Number of processes
+            by: cpu, memory or io
+        
+        Returns:
+            Up to n process statistics, largest first
+        """
+        key = self.SORT_KEYS.get(by)
+        if key is None:
+            raise ValueError(f"Unknown sort key: {by} (use {', '.join(self.SORT_KEYS)})")
+        return heapq.nlargest(n, self._stats.values(), key=lambda s: s[key] or 0)
+
+
+def _same_process(previous: Dict[str, Any], current: Dict[str, Any]) -> bool:
+    """Check whether two raw samples of one PID come from the same process."""
+    # The raw ElapsedTime is the process start time, fixed for its lifetime.
+    # Instance names are not: chrome#3 becomes chrome#2 when another exits.
+    for name in ("ElapsedTime", "CreatingProcessID"):
+        if previous[name] is not None and current[name] is not None \
+                and previous[name] != current[name]:
+            return False
+    return _instance_base(previous["Name"]) == _instance_base(current["Name"])
+
+
+def _instance_base(name: Optional[str]) -> Optional[str]:
+    """Strip the '#N' suffix perf counters add to repeated instance names."""
+    return name.rsplit("#", 1)[0] if name and "#" in name else name
+
+
+def _process_rates(
+    current: Dict[str, Any],
+    previous: Optional[Dict[str, Any]],
+    cpu_count: int
+) -> Dict[str, Any]:
+    """Compute one process's statistics from two raw samples."""
+    stats = {
+        "pid": current["IDProcess"],
+        "name": current["Name"],
+        "working_set": current["WorkingSet"] or 0,
+        "private_bytes": current["PrivateBytes"] or 0,
+        "threads": current["ThreadCount"],
+        "handles": current["HandleCount"],
+        "cpu_percent": None,
+        "io_read_bytes_per_sec": None,
+        "io_write_bytes_per_sec": None,
+        "io_bytes_per_sec": None,
+    }
+    if previous is None:
+        return stats
+    elapsed = (current["Timestamp_Sys100NS"] or 0) - (previous["Timestamp_Sys100NS"] or 0)
+    if elapsed <= 0:
+        return stats
+    
+    def delta(name: str) -> int:
+        # A negative delta means the counter restarted; count it as idle
+        return max((current[name] or 0) - (previous[name] or 0), 0)
+    
+    # PercentProcessorTime is CPU time in 100ns units, like the timestamp
+    cpu = delta("PercentProcessorTime") / elapsed * 100 / cpu_count
+    seconds = elapsed / 1e7
+    read = delta("IOReadBytesPersec") / seconds
+    write = delta("IOWriteBytesPersec") / seconds
+    stats.update({
+        "cpu_percent": min(cpu, 100.0),
+        "io_read_bytes_per_sec": read,
+        "io_write_bytes_per_sec": write,
+        "io_bytes_per_sec": read + write,
+    })
+    return stats
 
 
 class NetworkManager:
     """Manage network configuration via WMI."""
     
-    def __init__(self, computer: str = "."):
-        self.wrapper = WMIWrapper(computer=computer)
+    def __init__(self, computer: str = ".", wrapper: Optional[WMIWrapper] = None):
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
     
-    def get_active_adapters(self) -> List[Dict[str, Any]]:
+    def get_active_adapters(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get all active network adapters."""
-        adapters = self.wrapper.get_network_adapters(IPEnabled=True)
-        return [wmi_object_to_dict(a) for a in adapters]
+        adapters = self.wrapper.get_network_adapters(properties, IPEnabled=True)
+        return objects_to_dicts(adapters, properties)
     
-    def get_adapter_by_description(self, description: str) -> Optional[Dict[str, Any]]:
+    def get_adapter_by_description(
+        self,
+        description: str,
+        properties: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """Get network adapter by description."""
-        adapters = self.wrapper.get_network_adapters(Description=description, IPEnabled=True)
-        return wmi_object_to_dict(adapters[0]) if adapters else None
+        adapters = self.wrapper.get_network_adapters(
+            properties, Description=description, IPEnabled=True
+        )
+        return wmi_object_to_dict(adapters[0], properties) if adapters else None
+    
+    def get_network_statistics(
+        self,
+        properties: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get raw network counters for all adapters (see NetworkSampler for rates)."""
+        results = self.wrapper.get_class(
+            "Win32_PerfRawData_Tcpip_NetworkInterface", properties or NetworkSampler.COUNTERS
+        )
+        return objects_to_dicts(results, properties or NetworkSampler.COUNTERS)
+    
+    def get_network_sampler(self) -> "NetworkSampler":
+        """Get a NetworkSampler sharing this manager's wrapper."""
+        return NetworkSampler(wrapper=self.wrapper)
+
+
+class NetworkSampler:
+    """
+    Per-interface throughput computed from raw network counters.
+    
+    Keeps the previous raw sample of each interface and turns counter
+    deltas into bytes/s, packets/s and errors/s. Counters that wrap around
+    (32-bit packet counters do within hours on busy links) are unwrapped;
+    a counter that drops for any other reason, e.g. an adapter reset, is
+    treated as restarted from zero.
+    """
+    
+    COUNTERS = [
+        "Name", "Timestamp_Sys100NS", "CurrentBandwidth",
+        "BytesReceivedPersec", "BytesSentPersec",
+        "PacketsReceivedPersec", "PacketsSentPersec",
+        "PacketsReceivedErrors", "PacketsOutboundErrors",
+        "PacketsReceivedDiscarded", "PacketsOutboundDiscarded",
+    ]
+    
+    # Bytes counters are 64-bit bulk counts, the rest 32-bit
+    COUNTER_BITS = {
+        "BytesReceivedPersec": 64,
+        "BytesSentPersec": 64,
+        "PacketsReceivedPersec": 32,
+        "PacketsSentPersec": 32,
+        "PacketsReceivedErrors": 32,
+        "PacketsOutboundErrors": 32,
+        "PacketsReceivedDiscarded": 32,
+        "PacketsOutboundDiscarded": 32,
+    }
+    
+    def __init__(self, computer: str = ".", wrapper: Optional[WMIWrapper] = None):
+        """
+        Initialize the sampler.
+        
+        Args:
+            computer: Computer name or '.' for local machine
+            wrapper: Existing wrapper to use
+        """
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._last_sample: Optional[float] = None
+        self._lock = threading.Lock()
+        self.samples_taken = 0
+    
+    def _read(self) -> List[Dict[str, Any]]:
+        query = Query("Win32_PerfRawData_Tcpip_NetworkInterface", self.COUNTERS)
+        # Enumerate directly; the 1s perf-data cache would repeat samples
+        rows = objects_to_dicts(self.wrapper.iter_query(query), self.COUNTERS)
+        for row in rows:
+            for name in self.COUNTERS[1:]:
+                value = row[name]
+                if value is not None:
+                    row[name] = int(value)
+        return rows
+    
+    def sample(self) -> List[Dict[str, Any]]:
+        """
+        Take one sample and update the per-interface rates.
+        
+        Rates are None for interfaces seen for the first time.
+        
+        Returns:
+            Statistics for every interface
+        """
+        with self._lock:
+            stats: Dict[str, Dict[str, Any]] = {}
+            current: Dict[str, Dict[str, Any]] = {}
+            for row in self._read():
+                name = row["Name"]
+                if name is None:
+                    continue
+                current[name] = row
+                stats[name] = _interface_rates(row, self._previous.get(name), self.COUNTER_BITS)
+            self._previous = current
+            self._stats = stats
+            self._last_sample = time.monotonic()
+            self.samples_taken += 1
+        return list(stats.values())
+    
+    def measure(self, interval: float = 1.0, max_age: float = 5.0) -> List[Dict[str, Any]]:
+        """
+        Get rates covering a recent interval.
+        
+        Samples once if the previous sample is recent enough, otherwise
+        samples twice, interval seconds apart.
+        
+        Args:
+            interval: Seconds between the two samples when a baseline is needed
+            max_age: Oldest baseline sample (seconds) reused for the deltas
+        
+        Returns:
+            Statistics for every interface
+        """
+        if self._last_sample is None or time.monotonic() - self._last_sample > max_age:
+            self.sample()
+            time.sleep(interval)
+        return self.sample()
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """Statistics computed by the latest sample."""
+        return list(self._stats.values())
+    
+    def get_interface_stats(self, name: str) -> Optional[Dict[str, Any]]:
+        """Statistics of one interface from the latest sample."""
+        return self._stats.get(name)
+
+
+def _counter_delta(current: Optional[int], previous: Optional[int], bits: int) -> int:
+    """Increase of a monotonic counter, unwrapping one overflow."""
+    current = current or 0
+    previous = previous or 0
+    if current >= previous:
+        return current - previous
+    wrapped = current + (1 << bits) - previous
+    # An overflow would mean an increase of half the range or more: a reset
+    return wrapped if wrapped < (1 << (bits - 1)) else current
+
+
+def _interface_rates(
+    current: Dict[str, Any],
+    previous: Optional[Dict[str, Any]],
+    bits: Dict[str, int]
+) -> Dict[str, Any]:
+    """Compute one interface's statistics from two raw samples."""
+    stats: Dict[str, Any] = {
+        "name": current["Name"],
+        "bandwidth": current["CurrentBandwidth"],
+        "bytes_received_per_sec": None,
+        "bytes_sent_per_sec": None,
+        "bytes_total_per_sec": None,
+        "packets_received_per_sec": None,
+        "packets_sent_per_sec": None,
+        "errors_per_sec": None,
+        "discards_per_sec": None,
+        "utilization_percent": None,
+    }
+    if previous is None:
+        return stats
+    elapsed = (current["Timestamp_Sys100NS"] or 0) - (previous["Timestamp_Sys100NS"] or 0)
+    if elapsed <= 0:
+        return stats
+    seconds = elapsed / 1e7
     
-    def get_network_statistics(self) -> List[Dict[str, Any]]:
-        """Get network statistics for all adapters."""
-        results = self.wrapper.query(
-            "SELECT * FROM Win32_PerfRawData_Tcpip_NetworkInterface"
+    def rate(*names: str) -> float:
+        return sum(_counter_delta(current[n], previous[n], bits[n]) for n in names) / seconds
+    
+    received = rate("BytesReceivedPersec")
+    sent = rate("BytesSentPersec")
+    stats.update({
+        "bytes_received_per_sec": received,
+        "bytes_sent_per_sec": sent,
+        "bytes_total_per_sec": received + sent,
+        "packets_received_per_sec": rate("PacketsReceivedPersec"),
+        "packets_sent_per_sec": rate("PacketsSentPersec"),
+        "errors_per_sec": rate("PacketsReceivedErrors", "PacketsOutboundErrors"),
+        "discards_per_sec": rate("PacketsReceivedDiscarded", "PacketsOutboundDiscarded"),
+    })
+    if current["CurrentBandwidth"]:
+        # CurrentBandwidth is in bits per second
+        stats["utilization_percent"] = min(
+            (received + sent) * 8 / current["CurrentBandwidth"] * 100, 100.0
         )
-        return [wmi_object_to_dict(r) for r in results]
+    return stats
+
+
+class EventLogBookmark:
+    """
+    Last record read per computer and event log, kept in a JSON file so a
+    collector can resume where it stopped.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._records: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._records = {key: int(value) for key, value in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError):
+            # A damaged bookmark only costs re-reading from the newest record
+            self._records = {}
+    
+    @staticmethod
+    def _key(log_name: str, computer: str) -> str:
+        host = "localhost" if computer in (".", "") else computer
+        return f"{host.lower()}\\{log_name.lower()}"
+    
+    def get(self, log_name: str, computer: str = ".") -> Optional[int]:
+        """Last RecordNumber read from a log, or None if it was never read."""
+        with self._lock:
+            return self._records.get(self._key(log_name, computer))
+    
+    def set(self, log_name: str, record: int, computer: str = "."):
+        """Remember the last RecordNumber read from a log (call save() to persist)."""
+        with self._lock:
+            self._records[self._key(log_name, computer)] = int(record)
+    
+    def save(self):
+        """Write the bookmark file atomically."""
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp = f"{self.path}.tmp"
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(self._records, f, indent=1, sort_keys=True)
+            os.replace(temp, self.path)
 
 
 class EventLogReader:
     """Read Windows Event Logs via WMI."""
     
-    def __init__(self, computer: str = "."):
-        self.wrapper = WMIWrapper(computer=computer)
+    def __init__(self, computer: str = ".", wrapper: Optional[WMIWrapper] = None):
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
     
-    def get_event_logs(self) -> List[Dict[str, Any]]:
+    def get_event_logs(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get list of available event logs."""
-        logs = self.wrapper.query("SELECT * FROM Win32_NTEventlogFile")
-        return [wmi_object_to_dict(log) for log in logs]
+        logs = self.wrapper.get_class("Win32_NTEventlogFile", properties)
+        return objects_to_dicts(logs, properties)
     
     def get_recent_events(
         self,
         log_name: str = "System",
         event_type: Optional[int] = None,
-        limit: int = 100
+        limit: int = 100,
+        properties: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Get recent events from a log.
         
         Args:
             log_name: Name of the log (System, Application, Security)
-            event_type: Filter by type (1=Error, 2=Warning, 3=Information)
+            event_type: Filter by type (1=Error, 2=Warning, 3=Information,
+                4=Audit Success, 5=Audit Failure)
             limit: Maximum number of events to return
+            properties: Event properties to select (None for all)
         """
-        query = f"SELECT * FROM Win32_NTLogEvent WHERE Logfile = '{log_name}'"
+        return list(self.iter_events(
+            log_name, event_type=event_type, properties=properties, limit=limit,
+            batch_size=min(max(limit, 1), 256)
+        ))
+    
+    def iter_events(
+        self,
+        log_name: str = "System",
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        after_record: Optional[int] = None,
+        before_record: Optional[int] = None,
+        event_type: Optional[int] = None,
+        properties: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 256
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream events from a log, newest first.
+        
+        Every bound is sent as WQL, so the events returned do not depend on
+        the order the provider enumerates records in. The event log
+        provider returns records newest first; in that order the
+        enumeration also ends at the first record older than since or
+        after_record.
+        
+        Args:
+            log_name: Name of the log (System, Application, Security)
+            since: Only events generated at or after this time
+            until: Only events generated at or before this time
+            after_record: Only events with a greater RecordNumber
+            before_record: Only events with a smaller RecordNumber
+            event_type: Filter by type (1=Error, 2=Warning, 3=Information,
+                4=Audit Success, 5=Audit Failure)
+            properties: Event properties to select (None for all)
+            limit: Maximum number of events to yield (None for all)
+            batch_size: Number of events fetched from WMI per round-trip
+        
+        Yields:
+            Event dictionaries
+        """
+        if limit is not None and limit <= 0:
+            return
+        
+        columns = properties
+        if properties:
+            # Select what the early stop reads, then leave it out
+            needed = [name for name, used in (
+                ("RecordNumber", after_record is not None),
+                ("TimeGenerated", since is not None),
+            ) if used]
+            columns = list(dict.fromkeys(list(properties) + needed))
+        
+        query = Query("Win32_NTLogEvent", columns).where(Logfile=log_name)
+        if since is not None:
+            if since.tzinfo is None:
+                since = since.astimezone()
+            query.where(Field("TimeGenerated") >= since.astimezone(datetime.timezone.utc))
+        if until is not None:
+            if until.tzinfo is None:
+                until = until.astimezone()
+            query.where(Field("TimeGenerated") <= until.astimezone(datetime.timezone.utc))
+        if after_record is not None:
+            query.where(Field("RecordNumber") > int(after_record))
+        if before_record is not None:
+            query.where(Field("RecordNumber") < int(before_record))
         if event_type:
-            query += f" AND Type = {event_type}"
+            # Type is the display string; EventType holds the numeric code
+            query.where(EventType=int(event_type))
+        
+        count = 0
+        with closing(self.wrapper.iter_query(query, batch_size=batch_size)) as events:
+            for event in events:
+                row = object_to_dict(event, columns)
+                # Only reached if the provider passes on records outside the
+                # lower bounds; newest first, none of the rest can match
+                if after_record is not None and int(row["RecordNumber"] or 0) <= after_record:
+                    break
+                if since is not None:
+                    generated = parse_dmtf(row["TimeGenerated"])
+                    if generated is not None and generated < since:
+                        break
+                if columns is not properties:
+                    row = {name: row[name] for name in properties}
+                yield row
+                count += 1
+                if limit is not None and count >= limit:
+                    break
+    
+    def get_events_page(
+        self,
+        log_name: str = "System",
+        before_record: Optional[int] = None,
+        page_size: int = 100,
+        event_type: Optional[int] = None,
+        properties: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of events, newest first, keyed on RecordNumber.
         
-        events = self.wrapper.query(query)
-        # Limit results
-        events = events[:limit]
+        Args:
+            log_name: Name of the log (System, Application, Security)
+            before_record: next_before_record of the previous page (None for
+                the newest events)
+            page_size: Maximum number of events per page
+            event_type: Filter by type (1=Error, 2=Warning, 3=Information,
+                4=Audit Success, 5=Audit Failure)
+            properties: Event properties to select (None for all)
         
-        return [wmi_object_to_dict(e) for e in events]
+        Returns:
+            Dict with the "events" and the "next_before_record" to pass for
+            the next page (None after the last page)
+        """
+        if properties:
+            properties = list(dict.fromkeys(["RecordNumber"] + list(properties)))
+        events = list(self.iter_events(
+            log_name, before_record=before_record, event_type=event_type,
+            properties=properties, limit=page_size, batch_size=min(max(page_size, 1), 256)
+        ))
+        last = events[-1]["RecordNumber"] if len(events) == page_size else None
+        return {"events": events, "next_before_record": last}
+    
+    def tail(
+        self,
+        log_name: str = "System",
+        since_record: Optional[int] = None,
+        event_type: Optional[int] = None,
+        properties: Optional[List[str]] = None,
+        max_events: Optional[int] = 1000,
+        batch_size: int = 64
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Get the events written after a record, oldest first.
+        
+        Only records newer than since_record are read. At most max_events
+        records are read per call: the oldest ones, so calling again with the
+        returned cursor continues without gaps. A log that was cleared since
+        (since_record no longer exists) is read from the start.
+        
+        Args:
+            log_name: Name of the log (System, Application, Security)
+            since_record: Last RecordNumber already read; None only returns
+                the cursor of the newest record
+            event_type: Filter by type (1=Error, 2=Warning, 3=Information,
+                4=Audit Success, 5=Audit Failure)
+            properties: Event properties to select (None for all)
+            max_events: Maximum number of records to read (None for all)
+            batch_size: Number of events fetched from WMI per round-trip;
+                small, as most polls find few new records
+        
+        Returns:
+            (new events oldest first, RecordNumber to pass as since_record
+            next time)
+        """
+        if properties:
+            extra = ["RecordNumber"] + (["EventType"] if event_type else [])
+            properties = list(dict.fromkeys(extra + list(properties)))
+        if since_record is None:
+            newest = list(self.iter_events(log_name, properties=["RecordNumber"], limit=1, batch_size=1))
+            return [], (newest[0]["RecordNumber"] if newest else 0)
+        
+        # Only the window after since_record is read, oldest max_events first
+        before = since_record + max_events + 1 if max_events else None
+        batch_size = min(max_events, batch_size) if max_events else batch_size
+        records = sorted(
+            self.iter_events(
+                log_name, after_record=since_record, before_record=before,
+                properties=properties, batch_size=batch_size,
+            ),
+            key=lambda event: int(event["RecordNumber"] or 0),
+        )
+        if not records and since_record > 0 and not self._has_record(log_name, since_record):
+            # since_record is gone only if the log was cleared
+            return self.tail(log_name, 0, event_type, properties, max_events, batch_size)
+        cursor = int(records[-1]["RecordNumber"] or 0) if records else since_record
+        # Filtered here so the cursor still moves past events of other types
+        events = [
+            event for event in records
+            if not event_type or event["EventType"] == int(event_type)
+        ]
+        return events, cursor
+    
+    def _has_record(self, log_name: str, record: int) -> bool:
+        """Check whether a log still holds a record."""
+        query = Query("Win32_NTLogEvent", ["RecordNumber"]).where(
+            Logfile=log_name, RecordNumber=int(record)
+        )
+        return any(True for _ in self.wrapper.iter_query(query, batch_size=1, limit=1))
+    
+    def follow(
+        self,
+        log_name: str = "System",
+        since_record: Optional[int] = None,
+        interval: float = 2.0,
+        event_type: Optional[int] = None,
+        properties: Optional[List[str]] = None,
+        bookmark: Optional[EventLogBookmark] = None,
+        duration: Optional[float] = None,
+        max_events: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield new events as they are written, oldest first.
+        
+        Polls tail() every interval seconds, straight away while a backlog
+        remains. The bookmark is saved after each batch has been consumed,
+        so a collector that stops mid-batch reads that batch again.
+        
+        Args:
+            log_name: Name of the log (System, Application, Security)
+            since_record: Last RecordNumber already read (None to resume from
+                the bookmark, or else from the newest record)
+            interval: Seconds between polls
+            event_type: Filter by type (1=Error, 2=Warning, 3=Information,
+                4=Audit Success, 5=Audit Failure)
+            properties: Event properties to select (None for all)
+            bookmark: Bookmark to resume from and update
+            duration: Stop after this many seconds (None to follow forever)
+            max_events: Maximum number of records read per poll
+        
+        Yields:
+            Event dictionaries
+        """
+        computer = self.wrapper.computer
+        if since_record is None and bookmark is not None:
+            since_record = bookmark.get(log_name, computer)
+        deadline = time.monotonic() + duration if duration is not None else None
+        while True:
+            previous = since_record
+            events, since_record = self.tail(log_name, since_record, event_type, properties, max_events)
+            yield from events
+            if bookmark is not None and since_record != previous:
+                bookmark.set(log_name, since_record, computer)
+                bookmark.save()
+            backlog = previous is not None and since_record - max(previous, 0) >= max_events
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            if not backlog:
+                pause = interval if deadline is None else min(interval, max(deadline - time.monotonic(), 0))
+                time.sleep(pause)
 
 
 class HardwareInfo:
     """Get hardware information via WMI."""
     
-    def __init__(self, computer: str = "."):
-        self.wrapper = WMIWrapper(computer=computer)
+    def __init__(self, computer: str = ".", wrapper: Optional[WMIWrapper] = None):
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
     
-    def get_motherboard_info(self) -> Dict[str, Any]:
+    def get_motherboard_info(self, properties: Optional[List[str]] = None) -> Dict[str, Any]:
         """Get motherboard information."""
-        boards = self.wrapper.get_class("Win32_BaseBoard")
-        return wmi_object_to_dict(boards[0]) if boards else {}
+        boards = self.wrapper.get_class("Win32_BaseBoard", properties)
+        return wmi_object_to_dict(boards[0], properties) if boards else {}
     
-    def get_video_controllers(self) -> List[Dict[str, Any]]:
+    def get_video_controllers(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get video controller (GPU) information."""
-        controllers = self.wrapper.get_class("Win32_VideoController")
-        return [wmi_object_to_dict(c) for c in controllers]
+        controllers = self.wrapper.get_class("Win32_VideoController", properties)
+        return objects_to_dicts(controllers, properties)
     
-    def get_sound_devices(self) -> List[Dict[str, Any]]:
+    def get_sound_devices(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get sound device information."""
-        devices = self.wrapper.get_class("Win32_SoundDevice")
-        return [wmi_object_to_dict(d) for d in devices]
+        devices = self.wrapper.get_class("Win32_SoundDevice", properties)
+        return objects_to_dicts(devices, properties)
     
-    def get_usb_controllers(self) -> List[Dict[str, Any]]:
+    def get_usb_controllers(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get USB controller information."""
-        controllers = self.wrapper.get_class("Win32_USBController")
-        return [wmi_object_to_dict(c) for c in controllers]
+        controllers = self.wrapper.get_class("Win32_USBController", properties)
+        return objects_to_dicts(controllers, properties)
     
-    def get_printers(self) -> List[Dict[str, Any]]:
+    def get_printers(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get printer information."""
-        printers = self.wrapper.get_class("Win32_Printer")
-        return [wmi_object_to_dict(p) for p in printers]
+        printers = self.wrapper.get_class("Win32_Printer", properties)
+        return objects_to_dicts(printers, properties)
     
-    def get_battery_status(self) -> Optional[Dict[str, Any]]:
+    def get_battery_status(
+        self,
+        properties: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """Get battery status (for laptops)."""
-        batteries = self.wrapper.get_class("Win32_Battery")
-        return wmi_object_to_dict(batteries[0]) if batteries else None
+        batteries = self.wrapper.get_class("Win32_Battery", properties)
+        return wmi_object_to_dict(batteries[0], properties) if batteries else None
 
 
 class SecurityManager:
     """Security-related WMI queries."""
     
-    def __init__(self, computer: str = "."):
-        self.wrapper = WMIWrapper(computer=computer)
+    def __init__(self, computer: str = ".", wrapper: Optional[WMIWrapper] = None):
+        self.wrapper = wrapper or WMIWrapper(computer=computer)
     
-    def get_user_accounts(self) -> List[Dict[str, Any]]:
+    def get_user_accounts(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get local user accounts."""
-        accounts = self.wrapper.get_class("Win32_UserAccount", LocalAccount=True)
-        return [wmi_object_to_dict(a) for a in accounts]
+        accounts = self.wrapper.get_class("Win32_UserAccount", properties, LocalAccount=True)
+        return objects_to_dicts(accounts, properties)
     
-    def get_groups(self) -> List[Dict[str, Any]]:
+    def get_groups(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get local groups."""
-        groups = self.wrapper.get_class("Win32_Group", LocalAccount=True)
-        return [wmi_object_to_dict(g) for g in groups]
+        groups = self.wrapper.get_class("Win32_Group", properties, LocalAccount=True)
+        return objects_to_dicts(groups, properties)
     
-    def get_logged_on_users(self) -> List[Dict[str, Any]]:
+    def get_logged_on_users(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get currently logged-on users."""
-        users = self.wrapper.get_class("Win32_LoggedOnUser")
-        return [wmi_object_to_dict(u) for u in users]
+        users = self.wrapper.get_class("Win32_LoggedOnUser", properties)
+        return objects_to_dicts(users, properties)
     
-    def get_shares(self) -> List[Dict[str, Any]]:
+    def get_shares(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get network shares."""
-        shares = self.wrapper.get_class("Win32_Share")
-        return [wmi_object_to_dict(s) for s in shares]
+        shares = self.wrapper.get_class("Win32_Share", properties)
+        return objects_to_dicts(shares, properties)
     
-    def get_startup_programs(self) -> List[Dict[str, Any]]:
+    def get_startup_programs(self, properties: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get programs that run at startup."""
-        startup = self.wrapper.get_class("Win32_StartupCommand")
-        return [wmi_object_to_dict(s) for s in startup]
+        startup = self.wrapper.get_class("Win32_StartupCommand", properties)
+        return objects_to_dicts(startup, properties)
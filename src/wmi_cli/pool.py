@@ -0,0 +1,201 @@
+"""
+Thread-aware WMI connection pool.
+
+COM objects belong to the apartment of the thread that created them, so a
+WMI connection cannot be shared between threads. The pool keeps one
+connection per (computer, namespace) for each thread, initializes COM the
+first time a thread asks for a connection and caps how many connections
+may be in use against a single host at once.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+def _connect(computer: str, namespace: str) -> Any:
+    import wmi
+    return wmi.WMI(computer=computer, namespace=namespace)
+
+
+def _co_initialize(multithreaded: bool = False):
+    import pythoncom
+    if multithreaded:
+        pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+    else:
+        pythoncom.CoInitialize()
+
+
+def _co_uninitialize():
+    import pythoncom
+    pythoncom.CoUninitialize()
+
+
+class WMIConnectionPool:
+    """Hands out per-thread WMI connections keyed by (computer, namespace)."""
+    
+    def __init__(
+        self,
+        max_connections_per_host: int = 8,
+        connect: Optional[Callable[[str, str], Any]] = None,
+        co_initialize: Optional[Callable[[bool], None]] = None,
+        co_uninitialize: Optional[Callable[[], None]] = None
+    ):
+        """
+        Initialize the pool.
+        
+        Args:
+            max_connections_per_host: Maximum number of connections to one
+                computer that may be in use concurrently
+            connect: Factory called as connect(computer, namespace)
+                (default: wmi.WMI)
+            co_initialize: Per-thread COM initializer, called with True for
+                the multithreaded apartment (default: pythoncom.CoInitialize
+                or CoInitializeEx(COINIT_MULTITHREADED))
+            co_uninitialize: Per-thread COM teardown (default:
+                pythoncom.CoUninitialize)
+        """
+        self.max_connections_per_host = max_connections_per_host
+        self._connect = connect or _connect
+        self._co_initialize = co_initialize or _co_initialize
+        self._co_uninitialize = co_uninitialize or _co_uninitialize
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self.connections_created = 0
+    
+    @staticmethod
+    def _host_key(computer: str) -> str:
+        return computer.lower()
+    
+    def _thread_connections(self) -> Dict[Tuple[str, str], Any]:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            self.initialize_thread()
+            connections = self._local.connections
+        return connections
+    
+    def initialize_thread(self, multithreaded: bool = False):
+        """
+        Initialize COM for the calling thread (idempotent).
+        
+        Args:
+            multithreaded: Join the multithreaded apartment instead of
+                creating a single-threaded one. Objects created in the MTA
+                may be used from any other MTA thread, which worker pools
+                that share results rely on.
+        """
+        if getattr(self._local, "connections", None) is not None:
+            return
+        try:
+            self._co_initialize(multithreaded)
+            self._local.com_initialized = True
+        except Exception:
+            # COM may already be initialized with a different threading model
+            self._local.com_initialized = False
+        self._local.connections = {}
+    
+    def release_thread(self):
+        """Drop the calling thread's connections and uninitialize COM."""
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            return
+        connections.clear()
+        self._local.connections = None
+        if getattr(self._local, "com_initialized", False):
+            self._local.com_initialized = False
+            self._co_uninitialize()
+    
+    @contextmanager
+    def thread_scope(self) -> Iterator["WMIConnectionPool"]:
+        """Initialize COM for the block and release the thread's connections after."""
+        self.initialize_thread()
+        try:
+            yield self
+        finally:
+            self.release_thread()
+    
+    def get_connection(self, computer: str = ".", namespace: str = "root\\cimv2") -> Any:
+        """
+        Get the calling thread's connection, creating it if needed.
+        
+        Args:
+            computer: Computer name or '.' for local machine
+            namespace: WMI namespace
+        
+        Returns:
+            WMI connection owned by the calling thread
+        """
+        connections = self._thread_connections()
+        key = (self._host_key(computer), namespace.lower())
+        connection = connections.get(key)
+        if connection is None:
+            connection = self._connect(computer, namespace)
+            connections[key] = connection
+            with self._lock:
+                self.connections_created += 1
+        return connection
+    
+    def discard(self, computer: str = ".", namespace: str = "root\\cimv2") -> bool:
+        """
+        Drop the calling thread's connection to a computer, if it has one.
+        
+        Returns:
+            True if a connection was dropped
+        """
+        connections = getattr(self._local, "connections", None)
+        if not connections:
+            return False
+        return connections.pop((self._host_key(computer), namespace.lower()), None) is not None
+    
+    def _host_limit(self, computer: str) -> threading.BoundedSemaphore:
+        key = self._host_key(computer)
+        with self._lock:
+            limit = self._host_limits.get(key)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self.max_connections_per_host)
+                self._host_limits[key] = limit
+            return limit
+    
+    def host_slot(self, computer: str = ".") -> threading.BoundedSemaphore:
+        """
+        Get the semaphore holding a host's concurrency slots.
+        
+        Use it as a context manager to hold one slot around a single call,
+        e.g. each round-trip of an enumeration that yields between batches.
+        """
+        return self._host_limit(computer)
+    
+    @contextmanager
+    def acquire(self, computer: str = ".", namespace: str = "root\\cimv2") -> Iterator[Any]:
+        """
+        Use a connection while holding one of the host's concurrency slots.
+        
+        Blocks while max_connections_per_host connections to the computer
+        are already in use by other threads.
+        """
+        with self._host_limit(computer):
+            yield self.get_connection(computer, namespace)
+
+
+_default_pool: Optional[WMIConnectionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> WMIConnectionPool:
+    """Get the process-wide pool shared by wrappers created without one."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            # WMI_CLI_RECORD / WMI_CLI_REPLAY switch every wrapper to a
+            # recording or replay backend
+            from .backends import backend_from_env
+            backend = backend_from_env()
+            _default_pool = backend.pool if backend is not None else WMIConnectionPool()
+        return _default_pool
+
+
+def set_default_pool(pool: Optional[WMIConnectionPool]):
+    """Replace the process-wide pool (None recreates it on next use)."""
+    global _default_pool
+    with _default_pool_lock:
+        _default_pool = pool
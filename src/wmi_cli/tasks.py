@@ -0,0 +1,155 @@
+"""
+Run independent tasks on a bounded set of worker threads with per-task timeouts.
+
+A COM call cannot be interrupted, so a task that overruns its timeout is
+abandoned rather than cancelled: its result is discarded, a replacement
+worker takes its place and the stuck worker exits whenever the call
+returns. Workers are daemon threads, so an abandoned call never keeps the
+process alive after the caller is done.
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+
+@dataclass
+class TaskResult:
+    """Outcome of one task."""
+    
+    name: str
+    ok: bool = False
+    value: Any = None
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    timed_out: bool = False
+
+
+def _worker(
+    tasks: "queue.Queue",
+    results: "queue.Queue",
+    started: Dict[int, float],
+    abandoned: Set[int],
+    initializer: Optional[Callable[[], None]],
+    finalizer: Optional[Callable[[], None]]
+):
+    try:
+        if initializer is not None:
+            initializer()
+        while True:
+            item = tasks.get()
+            if item is None:
+                return
+            index, func = item
+            started[index] = time.monotonic()
+            try:
+                value, error = func(), None
+            except Exception as e:
+                value, error = None, str(e) or e.__class__.__name__
+            results.put((index, value, error, time.monotonic()))
+            if index in abandoned:
+                # A replacement took this worker's place
+                return
+    finally:
+        if finalizer is not None:
+            finalizer()
+
+
+def run_bounded(
+    tasks: Iterable[Tuple[str, Callable[[], Any]]],
+    max_workers: int = 8,
+    timeout: Optional[float] = None,
+    initializer: Optional[Callable[[], None]] = None,
+    finalizer: Optional[Callable[[], None]] = None,
+    thread_name_prefix: str = "wmi-task"
+) -> Iterator[TaskResult]:
+    """
+    Run tasks concurrently and yield their outcomes as they complete.
+    
+    Failures and timeouts are reported as unsuccessful results and do not
+    stop the other tasks. Closing the iterator early leaves the tasks that
+    have not started unrun.
+    
+    Args:
+        tasks: (name, callable) pairs; each callable takes no arguments
+        max_workers: Maximum number of tasks running at once, not counting
+            abandoned ones
+        timeout: Seconds allowed per task, counted from when it starts
+            (None for no limit)
+        initializer: Called once on each worker thread before its first
+            task (e.g. to initialize COM)
+        finalizer: Called on each worker thread when it exits, including
+            abandoned workers once their call returns
+        thread_name_prefix: Name prefix of the worker threads
+    
+    Yields:
+        TaskResult for every task, in completion order
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return
+    task_queue: "queue.Queue" = queue.Queue()
+    results: "queue.Queue" = queue.Queue()
+    started: Dict[int, float] = {}
+    abandoned: Set[int] = set()
+    for index, (_, func) in enumerate(tasks):
+        task_queue.put((index, func))
+    workers = 0
+    
+    def spawn():
+        nonlocal workers
+        workers += 1
+        threading.Thread(
+            target=_worker,
+            args=(task_queue, results, started, abandoned, initializer, finalizer),
+            name=f"{thread_name_prefix}-{workers}",
+            daemon=True,
+        ).start()
+    
+    for _ in range(max(1, min(max_workers, len(tasks)))):
+        spawn()
+    outstanding = set(range(len(tasks)))
+    poll = None if timeout is None else min(0.1, timeout / 4)
+    try:
+        while outstanding:
+            try:
+                index, value, error, end = results.get(timeout=poll)
+            except queue.Empty:
+                pass
+            else:
+                # Results of abandoned tasks arrive late and are ignored
+                if index in outstanding:
+                    outstanding.discard(index)
+                    yield TaskResult(
+                        name=tasks[index][0],
+                        ok=error is None,
+                        value=value,
+                        elapsed=max(end - started.get(index, end), 0.0),
+                        error=error,
+                    )
+            if timeout is None:
+                continue
+            now = time.monotonic()
+            for index in sorted(outstanding):
+                start = started.get(index)
+                if start is not None and now - start > timeout:
+                    outstanding.discard(index)
+                    abandoned.add(index)
+                    if not task_queue.empty():
+                        spawn()
+                    yield TaskResult(
+                        name=tasks[index][0],
+                        elapsed=now - start,
+                        error=f"timed out after {timeout:g}s",
+                        timed_out=True,
+                    )
+    finally:
+        # Drop the tasks that never started and stop every idle worker
+        while True:
+            try:
+                task_queue.get_nowait()
+            except queue.Empty:
+                break
+        for _ in range(workers):
+            task_queue.put(None)
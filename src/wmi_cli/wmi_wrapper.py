@@ -1,127 +1,262 @@
 """
 Core WMI wrapper module for interacting with Windows Management Instrumentation.
 """
-import ctypes
-import sys
-from typing import Any, Dict, List, Optional, Union
-from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, Iterator, List, Optional, Union
 
-try:
-    import wmi
-    import pythoncom
-except ImportError as e:
-    print(f"Error: Required packages not installed. Please install wmi and pywin32: {e}")
-    sys.exit(1)
+from .cache import ResultCache
+from .convert import SchemaCache, get_default_schema_cache, object_to_dict
+from .wql import Query, wql_literal  # noqa: F401  (wql_literal is re-exported)
+from .pool import WMIConnectionPool, get_default_pool
+
+if TYPE_CHECKING:
+    from .backends import WMIBackend
+    from .frame import ResultFrame
+
+# IWbemServices::ExecQuery flags for semi-synchronous, forward-only enumeration
+WBEM_FLAG_RETURN_IMMEDIATELY = 0x10
+WBEM_FLAG_FORWARD_ONLY = 0x20
+# HRESULT of a path that names no instance
+WBEM_E_NOT_FOUND = 0x80041002
 
 
 class WMIWrapper:
     """Main wrapper class for WMI operations."""
     
-    _com_initialized = False
-    
-    def __init__(self, computer: str = ".", namespace: str = "root\\cimv2"):
+    def __init__(
+        self,
+        computer: str = ".",
+        namespace: str = "root\\cimv2",
+        cache: Optional[ResultCache] = None,
+        pool: Optional[WMIConnectionPool] = None,
+        schemas: Optional[SchemaCache] = None,
+        backend: Optional["WMIBackend"] = None
+    ):
         """
         Initialize WMI connection.
         
         Args:
             computer: Computer name or '.' for local machine
             namespace: WMI namespace (default: root\\cimv2)
+            cache: Optional result cache shared by query(), get_class() and
+                the get_* helpers
+            pool: Connection pool (default: the process-wide pool). COM is
+                initialized per thread by the pool, so a wrapper may be used
+                from any thread.
+            schemas: Cache of class property names (default: the
+                process-wide cache)
+            backend: Backend supplying the connections (e.g. a
+                ReplayBackend); uses the backend's pool when no pool is given
         """
         self.computer = computer
         self.namespace = namespace
-        self._connection: Optional[wmi.WMI] = None
-        
-        # Initialize COM once per class (not per instance)
-        if not WMIWrapper._com_initialized:
-            try:
-                pythoncom.CoInitialize()
-                WMIWrapper._com_initialized = True
-            except:
-                pass  # COM might already be initialized
+        self.cache = cache
+        self.pool = pool or (backend.pool if backend is not None else get_default_pool())
+        self.schemas = schemas if schemas is not None else get_default_schema_cache()
     
     def get_connection(self):
-        """Get or create WMI connection."""
-        if self._connection is None:
-            self._connection = wmi.WMI(computer=self.computer, namespace=self.namespace)
-        return self._connection
+        """Get the calling thread's WMI connection."""
+        return self.pool.get_connection(self.computer, self.namespace)
     
-    def query(self, wql_query: str) -> List[Any]:
+    def query(self, wql_query: Union[str, Query]) -> List[Any]:
         """
         Execute a WQL query.
         
+        With a cache, results of cacheable classes are DetachedObjects
+        (property values, no methods) whether or not the cache was hit;
+        other results are live WMI objects.
+        
         Args:
-            wql_query: WQL query string
+            wql_query: WQL query string or Query
             
         Returns:
             List of query results
         """
-        conn = self.get_connection()
-        return list(conn.query(wql_query))
+        wql_query = str(wql_query)
+        if self.cache is not None:
+            cached = self.cache.get(self.computer, self.namespace, wql_query)
+            if cached is not None:
+                return cached
+        
+        with self.pool.acquire(self.computer, self.namespace) as conn:
+            results = list(conn.query(wql_query))
+        if self.cache is not None:
+            return self.cache.put(self.computer, self.namespace, wql_query, results)
+        return results
+    
+    def iter_query(
+        self,
+        wql_query: Union[str, Query],
+        batch_size: int = 100,
+        limit: Optional[int] = None
+    ) -> Iterator[Any]:
+        """
+        Execute a WQL query and yield results as WMI returns them.
+        
+        The query runs semi-synchronously with a forward-only enumerator, so
+        objects are fetched from WMI in batches and never accumulated.
+        Results bypass the cache. A host slot of the pool is held only
+        while a batch is fetched, so a consumer that pauses or stops early
+        does not keep other queries to the host waiting.
+        
+        Args:
+            wql_query: WQL query string or Query
+            batch_size: Number of objects fetched from WMI per round-trip
+            limit: Stop enumerating after this many results (None for all)
+        
+        Yields:
+            Query results
+        """
+        wql_query = str(wql_query)
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        slot = self.pool.host_slot(self.computer)
+        for obj in _iter_results(self.get_connection(), wql_query, batch_size, slot):
+            yield obj
+            count += 1
+            if limit is not None and count >= limit:
+                return
+    
+    def iter_class(
+        self,
+        class_name: str,
+        properties: Optional[List[str]] = None,
+        batch_size: int = 100,
+        limit: Optional[int] = None,
+        **kwargs
+    ) -> Iterator[Any]:
+        """
+        Yield instances of a WMI class as WMI returns them.
+        
+        Args:
+            class_name: Name of the WMI class
+            properties: Properties to select (None for all)
+            batch_size: Number of objects fetched from WMI per round-trip
+            limit: Stop enumerating after this many results (None for all)
+            **kwargs: Filter parameters
+        
+        Yields:
+            Class instances
+        """
+        wql = build_select_query(class_name, properties, kwargs)
+        return self.iter_query(wql, batch_size=batch_size, limit=limit)
     
-    def get_class(self, class_name: str, **kwargs) -> List[Any]:
+    def query_frame(
+        self,
+        wql_query: Union[str, Query],
+        properties: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> "ResultFrame":
+        """
+        Execute a WQL query and return the results as typed columns.
+        
+        Objects are converted while they are enumerated, so no COM objects
+        are kept once the frame is built.
+        
+        Args:
+            wql_query: WQL query string or Query
+            properties: Columns to read (None for every property returned)
+            limit: Stop enumerating after this many results (None for all)
+        
+        Returns:
+            ResultFrame with one row per result
+        """
+        from .frame import ResultFrame
+        return ResultFrame.from_objects(self.iter_query(wql_query, limit=limit), properties)
+    
+    def get_class_frame(
+        self,
+        class_name: str,
+        properties: Optional[List[str]] = None,
+        **kwargs
+    ) -> "ResultFrame":
+        """
+        Get instances of a WMI class as typed columns.
+        
+        Args:
+            class_name: Name of the WMI class
+            properties: Properties to select (None for all)
+            **kwargs: Filter parameters
+        
+        Returns:
+            ResultFrame with one row per instance
+        """
+        wql = build_select_query(class_name, properties, kwargs)
+        return self.query_frame(wql, properties)
+    
+    def get_class(
+        self,
+        class_name: str,
+        properties: Optional[List[str]] = None,
+        **kwargs
+    ) -> List[Any]:
         """
         Get instances of a WMI class.
         
         Args:
             class_name: Name of the WMI class (e.g., 'Win32_Service')
+            properties: Properties to select (None for all). Only the listed
+                properties are marshalled across COM.
             **kwargs: Filter parameters
             
         Returns:
             List of class instances
         """
-        conn = self.get_connection()
-        wmi_class = getattr(conn, class_name)
-        return list(wmi_class(**kwargs))
+        return self.query(build_select_query(class_name, properties, kwargs))
     
-    def get_services(self, **filters) -> List[Any]:
+    def get_services(self, properties: Optional[List[str]] = None, **filters) -> List[Any]:
         """Get Windows services."""
-        return self.get_class("Win32_Service", **filters)
+        return self.get_class("Win32_Service", properties, **filters)
     
-    def get_processes(self, **filters) -> List[Any]:
+    def get_processes(self, properties: Optional[List[str]] = None, **filters) -> List[Any]:
         """Get running processes."""
-        return self.get_class("Win32_Process", **filters)
+        return self.get_class("Win32_Process", properties, **filters)
     
-    def get_operating_system(self) -> Any:
+    def get_operating_system(self, properties: Optional[List[str]] = None) -> Any:
         """Get operating system information."""
-        results = self.get_class("Win32_OperatingSystem")
+        results = self.get_class("Win32_OperatingSystem", properties)
         return results[0] if results else None
     
-    def get_computer_system(self) -> Any:
+    def get_computer_system(self, properties: Optional[List[str]] = None) -> Any:
         """Get computer system information."""
-        results = self.get_class("Win32_ComputerSystem")
+        results = self.get_class("Win32_ComputerSystem", properties)
         return results[0] if results else None
     
-    def get_logical_disks(self, **filters) -> List[Any]:
+    def get_logical_disks(self, properties: Optional[List[str]] = None, **filters) -> List[Any]:
         """Get logical disk drives."""
-        return self.get_class("Win32_LogicalDisk", **filters)
+        return self.get_class("Win32_LogicalDisk", properties, **filters)
     
-    def get_network_adapters(self, **filters) -> List[Any]:
+    def get_network_adapters(
+        self,
+        properties: Optional[List[str]] = None,
+        **filters
+    ) -> List[Any]:
         """Get network adapter configuration."""
-        return self.get_class("Win32_NetworkAdapterConfiguration", **filters)
+        return self.get_class("Win32_NetworkAdapterConfiguration", properties, **filters)
     
-    def get_bios(self) -> Any:
+    def get_bios(self, properties: Optional[List[str]] = None) -> Any:
         """Get BIOS information."""
-        results = self.get_class("Win32_BIOS")
+        results = self.get_class("Win32_BIOS", properties)
         return results[0] if results else None
     
-    def get_processor(self) -> List[Any]:
+    def get_processor(self, properties: Optional[List[str]] = None) -> List[Any]:
         """Get processor information."""
-        return self.get_class("Win32_Processor")
+        return self.get_class("Win32_Processor", properties)
     
-    def get_physical_memory(self) -> List[Any]:
+    def get_physical_memory(self, properties: Optional[List[str]] = None) -> List[Any]:
         """Get physical memory information."""
-        return self.get_class("Win32_PhysicalMemory")
+        return self.get_class("Win32_PhysicalMemory", properties)
     
     def list_classes(self) -> List[str]:
         """List all available WMI classes in the current namespace."""
-        conn = self.get_connection()
         # Query meta_class to get all available classes
         classes = []
         try:
-            for cls in conn.query("SELECT * FROM meta_class"):
-                class_name = str(cls.Path_.Class)
-                if class_name:
-                    classes.append(class_name)
+            with self.pool.acquire(self.computer, self.namespace) as conn:
+                for cls in conn.query("SELECT * FROM meta_class"):
+                    class_name = str(cls.Path_.Class)
+                    if class_name:
+                        classes.append(class_name)
         except Exception:
             # Fallback: return a list of common WMI classes
             classes = [
@@ -146,12 +281,12 @@ class WMIWrapper:
         Returns:
             List of property names
         """
-        conn = self.get_connection()
-        wmi_class = getattr(conn, class_name)
-        instances = list(wmi_class())
-        if instances:
-            return [prop for prop in dir(instances[0]) if not prop.startswith('_')]
-        return []
+        def load():
+            # The class definition lists its properties; no instances needed
+            with self.pool.acquire(self.computer, self.namespace) as conn:
+                return list(getattr(conn, class_name).properties)
+        
+        return list(self.schemas.get_or_load(self.computer, self.namespace, class_name, load))
     
     def call_method(self, instance: Any, method_name: str, *args, **kwargs) -> Any:
         """
@@ -168,6 +303,121 @@ class WMIWrapper:
         method = getattr(instance, method_name)
         return method(*args, **kwargs)
 
+    def exec_method(self, class_name: str, key: str, value: Any, method_name: str) -> Any:
+        """
+        Call a method without input parameters on an instance addressed by its key.
+        
+        SWbemServices.ExecMethod takes the object path, so the instance is
+        not queried first. Connections without a raw SWbemServices (e.g.
+        recording backends) look the instance up instead.
+        
+        Args:
+            class_name: Name of the WMI class
+            key: Key property (e.g. 'Name' for Win32_Service, 'Handle' for
+                Win32_Process)
+            value: Key value
+            method_name: Name of the method to call
+        
+        Returns:
+            The method's ReturnValue
+        
+        Raises:
+            ValueError: If no instance has that key
+        """
+        conn = self.get_connection()
+        services = getattr(conn, "_namespace", None)
+        if services is None or not hasattr(services, "ExecMethod"):
+            # Bypass the cache: methods need live objects
+            instances = list(self.iter_class(class_name, [key], **{key: value}))
+            if not instances:
+                raise ValueError(f"{class_name} with {key}={value!r} not found")
+            result = self.call_method(instances[0], method_name)
+            return result[0] if isinstance(result, tuple) and result else result
+        
+        path = f"{class_name}.{key}={_path_literal(value)}"
+        try:
+            return services.ExecMethod(path, method_name).ReturnValue
+        except Exception as e:
+            if _is_not_found(e):
+                raise ValueError(f"{class_name} with {key}={value!r} not found")
+            raise
+
+
+def _path_literal(value: Any) -> str:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _is_not_found(error: Exception) -> bool:
+    """Check a COM error (or a message) for WBEM_E_NOT_FOUND."""
+    codes = []
+    for arg in getattr(error, "args", ()):
+        # com_error args: (hresult, text, (..., scode), argerr)
+        items = arg if isinstance(arg, tuple) else (arg,)
+        codes.extend(item & 0xFFFFFFFF for item in items if isinstance(item, int))
+    return WBEM_E_NOT_FOUND in codes or "not found" in str(error).lower()
+
+
+def _iter_results(
+    conn: Any,
+    wql_query: str,
+    batch_size: int,
+    slot: ContextManager[Any]
+) -> Iterator[Any]:
+    """
+    Enumerate a query forward-only, pulling batch_size objects at a time.
+    
+    slot is held around each call into WMI and released before yielding.
+    """
+    namespace = getattr(conn, "_namespace", None)
+    if namespace is None:
+        # Connections without a raw SWbemServices only offer materialized queries
+        with slot:
+            results = list(conn.query(wql_query))
+        yield from results
+        return
+    
+    with slot:
+        object_set = namespace.ExecQuery(
+            wql_query, "WQL", WBEM_FLAG_RETURN_IMMEDIATELY | WBEM_FLAG_FORWARD_ONLY
+        )
+        enumerator = object_set._NewEnum()
+    while True:
+        with slot:
+            batch = enumerator.Next(batch_size)
+        if not batch:
+            break
+        for ole_object in batch:
+            yield _wmi_object(ole_object)
+
+
+def _wmi_object(ole_object: Any) -> Any:
+    # Only live connections have a raw namespace, so wmi is installed here
+    import wmi
+    return wmi._wmi_object(ole_object)
+
+
+def build_select_query(
+    class_name: str,
+    properties: Optional[List[str]] = None,
+    filters: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a (projected) WQL SELECT for a class.
+    
+    Args:
+        class_name: Name of the WMI class
+        properties: Properties to select (None for all)
+        filters: Equality filters joined with AND
+    
+    Returns:
+        WQL query string
+    """
+    return Query(class_name, properties).where(**(filters or {})).build()
+
 
 def is_admin() -> bool:
     """
@@ -176,6 +426,7 @@ def is_admin() -> bool:
     Returns:
         True if running as admin, False otherwise
     """
+    import ctypes
     try:
         return ctypes.windll.shell32.IsUserAnAdmin() != 0
     except Exception:
@@ -222,18 +473,4 @@ def wmi_object_to_dict(wmi_object: Any, properties: Optional[List[str]] = None)
     Returns:
         Dictionary representation of the object
     """
-    if properties is None:
-        properties = [prop for prop in dir(wmi_object) if not prop.startswith('_')]
-    
-    result = {}
-    for prop in properties:
-        try:
-            value = getattr(wmi_object, prop)
-            # Skip methods and special attributes
-            if callable(value):
-                continue
-            result[prop] = value
-        except Exception:
-            result[prop] = None
-    
-    return result
+    return object_to_dict(wmi_object, properties)
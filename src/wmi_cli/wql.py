@@ -0,0 +1,303 @@
+"""
+Typed WQL query builder.
+
+Builds SELECT statements whose filters run inside WMI instead of in Python:
+    
+    Query("Win32_Process").select("Name", "ProcessId").where(
+        Field("WorkingSetSize") > 100 * 1024 * 1024
+    )
+
+Names are validated and values are always rendered as quoted WQL literals,
+so user input never becomes part of the statement text.
+"""
+import datetime
+import re
+from typing import Any, Iterable, List, Optional, Sequence, Union
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Event queries address embedded objects, e.g. TargetInstance.State
+_PROPERTY_PATH = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+_DMTF = re.compile(r"^(\d{14})\.(\d{6})([+-])(\d{3})$")
+
+Value = Union[str, int, float, bool, datetime.datetime]
+
+
+def to_dmtf(value: datetime.datetime) -> str:
+    """
+    Format a datetime as a CIM datetime (yyyymmddHHMMSS.ffffff+UUU).
+    
+    Args:
+        value: Datetime; naive values are taken as local time
+    
+    Returns:
+        DMTF datetime string with the UTC offset in minutes
+    """
+    if value.tzinfo is None:
+        value = value.astimezone()
+    offset = int(value.utcoffset().total_seconds() // 60)
+    return value.strftime("%Y%m%d%H%M%S.%f") + f"{'-' if offset < 0 else '+'}{abs(offset):03d}"
+
+
+def parse_dmtf(text: Any) -> Optional[datetime.datetime]:
+    """
+    Parse a CIM datetime (e.g. TimeGenerated, LastBootUpTime).
+    
+    Args:
+        text: DMTF datetime string
+    
+    Returns:
+        Timezone-aware datetime, or None if text is not a complete DMTF datetime
+    """
+    match = _DMTF.match(str(text)) if text else None
+    if not match:
+        return None
+    digits, fraction, sign, minutes = match.groups()
+    offset = datetime.timedelta(minutes=int(minutes) * (-1 if sign == "-" else 1))
+    return datetime.datetime.strptime(digits + fraction, "%Y%m%d%H%M%S%f").replace(
+        tzinfo=datetime.timezone(offset)
+    )
+
+
+def wql_literal(value: Value) -> str:
+    """
+    Format a Python value as a WQL literal.
+    
+    Args:
+        value: Value to format (str, int, float, bool or datetime)
+    
+    Returns:
+        WQL literal (strings are quoted and escaped, datetimes are quoted
+        DMTF datetimes)
+    """
+    if isinstance(value, datetime.datetime):
+        return f"'{to_dmtf(value)}'"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def escape_like(text: str) -> str:
+    """Escape the LIKE wildcards (%, _ and [) in text so they match literally."""
+    return re.sub(r"([%_\[])", r"[\1]", text)
+
+
+def check_identifier(name: str) -> str:
+    """
+    Validate a class or property name.
+    
+    Args:
+        name: Identifier to check
+    
+    Returns:
+        The name unchanged
+    
+    Raises:
+        ValueError: If the name is not a valid WQL identifier
+    """
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid WQL identifier: {name!r}")
+    return name
+
+
+class Condition:
+    """A WHERE clause fragment; combine with &, | and ~."""
+    
+    def render(self) -> str:
+        raise NotImplementedError
+    
+    def __and__(self, other: "Condition") -> "Condition":
+        return _Junction("AND", [self, other])
+    
+    def __or__(self, other: "Condition") -> "Condition":
+        return _Junction("OR", [self, other])
+    
+    def __invert__(self) -> "Condition":
+        return _Not(self)
+    
+    def __str__(self) -> str:
+        return self.render()
+    
+    def __repr__(self) -> str:
+        return f"<Condition {self.render()}>"
+
+
+class _Comparison(Condition):
+    def __init__(self, name: str, op: str, value: Any):
+        self.name = name
+        self.op = op
+        self.value = value
+    
+    def render(self) -> str:
+        if self.value is None:
+            return f"{self.name} {self.op}"
+        if isinstance(self.value, Field):
+            return f"{self.name} {self.op} {self.value.name}"
+        return f"{self.name} {self.op} {wql_literal(self.value)}"
+
+
+class _Junction(Condition):
+    def __init__(self, op: str, parts: Sequence[Condition]):
+        self.op = op
+        self.parts: List[Condition] = []
+        for part in parts:
+            # Flatten a AND (b AND c) into a single level
+            if isinstance(part, _Junction) and part.op == op:
+                self.parts.extend(part.parts)
+            else:
+                self.parts.append(part)
+    
+    def render(self) -> str:
+        rendered = []
+        for part in self.parts:
+            text = part.render()
+            rendered.append(f"({text})" if isinstance(part, _Junction) else text)
+        return f" {self.op} ".join(rendered)
+
+
+class _Not(Condition):
+    def __init__(self, condition: Condition):
+        self.condition = condition
+    
+    def render(self) -> str:
+        return f"NOT ({self.condition.render()})"
+
+
+class Field:
+    """
+    A property of the queried class; comparisons build Conditions.
+    
+    Values are rendered as literals; comparing with another Field compares
+    the two properties (e.g. TargetInstance.State <> PreviousInstance.State).
+    """
+    
+    def __init__(self, name: str):
+        if not isinstance(name, str) or not _PROPERTY_PATH.match(name):
+            raise ValueError(f"Invalid WQL property: {name!r}")
+        self.name = name
+    
+    def __eq__(self, value: Value) -> Condition:  # type: ignore[override]
+        if value is None:
+            return self.is_null()
+        return _Comparison(self.name, "=", value)
+    
+    def __ne__(self, value: Value) -> Condition:  # type: ignore[override]
+        if value is None:
+            return self.is_not_null()
+        return _Comparison(self.name, "<>", value)
+    
+    def __lt__(self, value: Value) -> Condition:
+        return _Comparison(self.name, "<", value)
+    
+    def __le__(self, value: Value) -> Condition:
+        return _Comparison(self.name, "<=", value)
+    
+    def __gt__(self, value: Value) -> Condition:
+        return _Comparison(self.name, ">", value)
+    
+    def __ge__(self, value: Value) -> Condition:
+        return _Comparison(self.name, ">=", value)
+    
+    __hash__ = None  # type: ignore[assignment]
+    
+    def like(self, pattern: str) -> Condition:
+        """Match a LIKE pattern (% any run, _ one character, [] a set)."""
+        return _Comparison(self.name, "LIKE", str(pattern))
+    
+    def startswith(self, prefix: str) -> Condition:
+        """Match values beginning with prefix (taken literally)."""
+        return self.like(escape_like(prefix) + "%")
+    
+    def contains(self, text: str) -> Condition:
+        """Match values containing text (taken literally)."""
+        return self.like("%" + escape_like(text) + "%")
+    
+    def is_null(self) -> Condition:
+        return _Comparison(self.name, "IS NULL", None)
+    
+    def is_not_null(self) -> Condition:
+        return _Comparison(self.name, "IS NOT NULL", None)
+    
+    def isin(self, values: Iterable[Value]) -> Condition:
+        """Match any of values (WQL has no IN, so this expands to ORs)."""
+        values = list(values)
+        if not values:
+            raise ValueError(f"isin() needs at least one value for {self.name}")
+        if len(values) == 1:
+            return self == values[0]
+        return _Junction("OR", [self == value for value in values])
+
+
+def all_of(*conditions: Condition) -> Condition:
+    """Join conditions with AND."""
+    return conditions[0] if len(conditions) == 1 else _Junction("AND", conditions)
+
+
+def any_of(*conditions: Condition) -> Condition:
+    """Join conditions with OR."""
+    return conditions[0] if len(conditions) == 1 else _Junction("OR", conditions)
+
+
+class Query:
+    """A WQL SELECT statement."""
+    
+    def __init__(self, class_name: str, properties: Optional[Sequence[str]] = None):
+        """
+        Initialize the query.
+        
+        Args:
+            class_name: Name of the WMI class
+            properties: Properties to select (None for all)
+        """
+        self.class_name = check_identifier(class_name)
+        self.properties: Optional[List[str]] = None
+        self.conditions: List[Condition] = []
+        if properties:
+            self.select(*properties)
+    
+    def select(self, *properties: str) -> "Query":
+        """Select only the given properties (replaces any earlier selection)."""
+        if len(properties) == 1 and not isinstance(properties[0], str):
+            properties = tuple(properties[0])
+        self.properties = [check_identifier(name) for name in properties] or None
+        return self
+    
+    def where(self, *conditions: Condition, **equals: Value) -> "Query":
+        """
+        Add filters; all conditions, including earlier ones, are joined with AND.
+        
+        Args:
+            *conditions: Conditions built from Field
+            **equals: Property = value filters
+        
+        Returns:
+            The query, for chaining
+        """
+        self.conditions.extend(conditions)
+        self.conditions.extend(Field(name) == value for name, value in equals.items())
+        return self
+    
+    @property
+    def condition(self) -> Optional[Condition]:
+        """The combined WHERE condition, or None if unfiltered."""
+        if not self.conditions:
+            return None
+        return all_of(*self.conditions)
+    
+    def build(self) -> str:
+        """Render the WQL statement."""
+        columns = ", ".join(self.properties) if self.properties else "*"
+        wql = f"SELECT {columns} FROM {self.class_name}"
+        condition = self.condition
+        if condition is not None:
+            wql += f" WHERE {condition.render()}"
+        return wql
+    
+    def __str__(self) -> str:
+        return self.build()
+    
+    def __repr__(self) -> str:
+        return f"<Query {self.build()}>"
@@ -5,26 +5,243 @@ This module provides WMI functionality as agent tools using the @ai_function dec
 These tools allow the agent to interact with Windows Management Instrumentation.
 """
 
-from typing import Annotated, Optional, List
+import functools
+import json
+import os
+from typing import Annotated, Any, Dict, Optional, List
 from pydantic import Field
 from agent_framework import ai_function
-from .wmi_cli.wmi_wrapper import WMIWrapper, is_admin, format_bytes
-from .wmi_cli.modules import SystemMonitor, ProcessManager
+from .wmi_cli.async_wrapper import AsyncWMIWrapper
+from .wmi_cli.cache import ResultCache, SnapshotCache
+from .wmi_cli.catalog import SchemaCatalog
+from .wmi_cli.convert import detach_objects
+from .wmi_cli.frame import ResultFrame
+from .wmi_cli.wmi_wrapper import WMIWrapper, is_admin
+from .wmi_cli.modules import SystemMonitor, ProcessManager, ProcessSampler, NetworkSampler
+
+
+# Seconds a class snapshot is shared between tool calls. Snapshots are also
+# dropped at the start of every agent turn (see begin_turn).
+SNAPSHOT_TTL = 5.0
+
+# Classes the tools share snapshots of, with the union of the properties the
+# tools and SystemMonitor read from them. One query for the union serves
+# every narrower projection.
+_SNAPSHOT_PROPERTIES: Dict[str, List[str]] = {
+    "Win32_OperatingSystem": [
+        "Caption", "Version", "OSArchitecture", "FreePhysicalMemory", "LastBootUpTime",
+    ],
+    "Win32_ComputerSystem": [
+        "Name", "Manufacturer", "Model", "TotalPhysicalMemory", "NumberOfLogicalProcessors",
+    ],
+    "Win32_BIOS": ["Version", "SerialNumber"],
+    "Win32_Processor": [
+        "Name", "Manufacturer", "NumberOfCores", "NumberOfLogicalProcessors",
+        "MaxClockSpeed", "CurrentClockSpeed", "LoadPercentage",
+    ],
+    "Win32_Service": ["Name", "DisplayName", "State", "StartMode", "Status"],
+}
+
+
+class _SnapshotWrapper(WMIWrapper):
+    """
+    WMIWrapper whose get_class() shares short-lived snapshots between tools.
+    
+    Requests for a class in _SNAPSHOT_PROPERTIES with a subset of its
+    properties are served from one snapshot per (class, filters); concurrent
+    requests for the same snapshot wait for a single WMI round-trip. Any
+    other request takes the normal path.
+    """
+    
+    def __init__(self, snapshots: SnapshotCache, **kwargs):
+        super().__init__(**kwargs)
+        self.snapshots = snapshots
+    
+    def get_class(
+        self,
+        class_name: str,
+        properties: Optional[List[str]] = None,
+        **kwargs
+    ) -> List[Any]:
+        shared = _SNAPSHOT_PROPERTIES.get(class_name)
+        if shared is None or properties is None or not set(properties) <= set(shared):
+            return super().get_class(class_name, properties, **kwargs)
+        key = (self.computer, self.namespace, class_name, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return super().get_class(class_name, properties, **kwargs)
+        fetch = functools.partial(super().get_class, class_name, shared, **kwargs)
+        # Snapshots are shared across threads (async tools run on a thread
+        # pool), so they hold detached copies rather than COM objects
+        snapshot = self.snapshots.get(key, lambda: detach_objects(fetch()))
+        # Copy so callers cannot change the shared list
+        return list(snapshot)
 
 
 # Global WMI instances (initialized once)
+_snapshots = SnapshotCache(ttl=SNAPSHOT_TTL)
 _wrapper = None
 _system_mon = None
 _process_mgr = None
+_process_sampler = None
+_network_sampler = None
+_async_wrapper = None
+_catalog = None
 
 
 def _init_wmi():
     """Initialize WMI instances (called lazily on first use)"""
-    global _wrapper, _system_mon, _process_mgr
+    global _wrapper, _system_mon, _process_mgr, _process_sampler, _network_sampler
     if _wrapper is None:
-        _wrapper = WMIWrapper()
-        _system_mon = SystemMonitor()
-        _process_mgr = ProcessManager()
+        # Static classes (BIOS, computer system) are served from the cache
+        # for the rest of the session; the rest are shared within a turn
+        _wrapper = _SnapshotWrapper(_snapshots, cache=ResultCache())
+        _system_mon = SystemMonitor(wrapper=_wrapper)
+        _process_mgr = ProcessManager(wrapper=_wrapper)
+        _process_sampler = ProcessSampler(wrapper=_wrapper)
+        _network_sampler = NetworkSampler(wrapper=_wrapper)
+
+
+def begin_turn() -> int:
+    """
+    Drop the shared class snapshots so the next tool calls see fresh data.
+    
+    Called by the agent at the start of every turn.
+    
+    Returns:
+        Number of snapshots dropped
+    """
+    return _snapshots.invalidate()
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Get statistics of the tool caches.
+    
+    Returns:
+        Dictionary with 'snapshots' (shared class snapshots: hits, misses,
+        coalesced waits, ...) and 'results' (the wrapper's result cache)
+    """
+    stats = {"snapshots": _snapshots.stats()}
+    if _wrapper is not None and _wrapper.cache is not None:
+        stats["results"] = _wrapper.cache.stats()
+    return stats
+
+
+# --- Structured results ------------------------------------------------------
+#
+# Tools return compact JSON instead of prose: single objects as a JSON object,
+# lists as {"total", "offset", "fields", "rows": [[...]]} with "next_offset"
+# when more rows are available. Sizes carry their unit in the field name
+# (memory_mb, size_gb) so values stay numeric and sortable.
+
+# Largest tool result in bytes (roughly 4 bytes per token); list results are
+# cut to fit and continue at next_offset
+DEFAULT_OUTPUT_BUDGET = 4000
+_output_budget = int(os.getenv("WMI_TOOL_OUTPUT_BUDGET", DEFAULT_OUTPUT_BUDGET))
+
+_MB = 1024 ** 2
+_GB = 1024 ** 3
+
+# Parameter types shared by the list tools. Their JSON schemas are sent with
+# every model call, so only fields carries a description; offset, limit and
+# sort_by (whose defaults show the '-' prefix for descending) need none.
+FieldsParam = Annotated[str, Field(description="Comma-separated fields to return")]
+
+
+def set_output_budget(max_bytes: int):
+    """
+    Set the largest tool result the tools return.
+    
+    Args:
+        max_bytes: Size limit in bytes of the JSON text (about 4 bytes per token)
+    """
+    global _output_budget
+    if max_bytes < 256:
+        raise ValueError("Output budget must be at least 256 bytes")
+    _output_budget = max_bytes
+
+
+def get_output_budget() -> int:
+    """Get the current tool result size limit in bytes."""
+    return _output_budget
+
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _error(message: str, e: Exception) -> str:
+    return _dumps({"error": f"{message}: {e}"})
+
+
+def _scale(value: Any, unit: int) -> Optional[float]:
+    """Convert a byte count to MB/GB rounded to one decimal."""
+    if value in (None, ""):
+        return None
+    return round(int(value) / unit, 1)
+
+
+def _page(
+    frame: ResultFrame,
+    fields: str,
+    default_fields: List[str],
+    offset: int = 0,
+    limit: int = 20,
+    sort_by: str = "",
+    exact_total: bool = True,
+    **extra: Any
+) -> str:
+    """
+    Sort, select and page a frame into a budgeted JSON table.
+    
+    Args:
+        frame: All rows the tool can return
+        fields: Comma-separated fields requested by the model ('' for default_fields)
+        default_fields: Fields returned when none are requested
+        offset: Index of the first row
+        limit: Largest number of rows
+        sort_by: Field to sort by, '-' prefix for descending
+        exact_total: False when the frame was cut short (e.g. a lazily
+            enumerated query); the total is then left out
+        **extra: Additional top-level keys (e.g. applied filters)
+    
+    Returns:
+        JSON text no larger than the output budget (unless a single row is)
+    """
+    if not len(frame):
+        return _dumps({"total": 0, "offset": 0, "rows": [], **extra})
+    available = frame.columns
+    fields = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    fields = fields or [name for name in default_fields if name in available]
+    unknown = [name for name in fields if name not in available]
+    if sort_by:
+        descending = sort_by.startswith("-")
+        sort_by = sort_by.lstrip("-")
+        if sort_by not in available:
+            unknown.append(sort_by)
+    if unknown:
+        return _dumps({"error": f"Unknown field(s): {', '.join(unknown)}", "fields": available})
+    
+    total = len(frame)
+    if sort_by:
+        frame = frame.sort(sort_by, descending=descending)
+    offset = min(max(offset, 0), total)
+    end = min(offset + max(limit, 1), total)
+    rows = [list(row.values()) for row in frame.take(range(offset, end)).select(fields).rows()]
+    
+    payload = {"total": total, "offset": offset, "fields": fields, "rows": rows, **extra}
+    # Drop rows from the end until the result fits; every row costs its JSON
+    # text plus a separating comma
+    size = len(_dumps(payload)) + len(',"next_offset":') + len(str(total))
+    while size > _output_budget and len(rows) > 1:
+        size -= len(_dumps(rows.pop())) + 1
+    if offset + len(rows) < total:
+        payload["next_offset"] = offset + len(rows)
+    if not exact_total:
+        del payload["total"]
+    return _dumps(payload)
 
 
 # WMI Tool Functions decorated with @ai_function
@@ -34,23 +251,25 @@ def get_system_info() -> str:
     """Retrieves comprehensive system information."""
     try:
         _init_wmi()
-        os_info = _wrapper.get_operating_system()
-        cs_info = _wrapper.get_computer_system()
-        bios_info = _wrapper.get_bios()
-        
-        result = "System Information:\n"
-        result += f"  OS: {os_info.Caption} {os_info.Version}\n"
-        result += f"  Computer: {cs_info.Name}\n"
-        result += f"  Manufacturer: {cs_info.Manufacturer}\n"
-        result += f"  Model: {cs_info.Model}\n"
-        result += f"  Architecture: {os_info.OSArchitecture}\n"
-        result += f"  Memory: {format_bytes(int(cs_info.TotalPhysicalMemory))}\n"
-        result += f"  BIOS: {bios_info.Version if bios_info else 'N/A'}\n"
-        result += f"  Serial Number: {bios_info.SerialNumber if bios_info else 'N/A'}\n"
-        
-        return result
+        os_info = _wrapper.get_operating_system(["Caption", "Version", "OSArchitecture"])
+        cs_info = _wrapper.get_computer_system(
+            ["Name", "Manufacturer", "Model", "TotalPhysicalMemory"]
+        )
+        bios_info = _wrapper.get_bios(["Version", "SerialNumber"])
+        
+        return _dumps({
+            "os": os_info.Caption,
+            "version": os_info.Version,
+            "architecture": os_info.OSArchitecture,
+            "computer": cs_info.Name,
+            "manufacturer": cs_info.Manufacturer,
+            "model": cs_info.Model,
+            "memory_gb": _scale(cs_info.TotalPhysicalMemory, _GB),
+            "bios_version": bios_info.Version if bios_info else None,
+            "serial_number": bios_info.SerialNumber if bios_info else None,
+        })
     except Exception as e:
-        return f"Error getting system info: {str(e)}"
+        return _error("Error getting system info", e)
 
 
 @ai_function(description="Get memory usage information including total, used, and available memory")
@@ -60,15 +279,14 @@ def get_memory_info() -> str:
         _init_wmi()
         info = _system_mon.get_memory_info()
         
-        result = "Memory Information:\n"
-        result += f"  Total: {format_bytes(info['total_bytes'])}\n"
-        result += f"  Used: {format_bytes(info['used_bytes'])}\n"
-        result += f"  Free: {format_bytes(info['free_bytes'])}\n"
-        result += f"  Usage: {info['used_percentage']:.1f}%\n"
-        
-        return result
+        return _dumps({
+            "total_gb": _scale(info["total_bytes"], _GB),
+            "used_gb": _scale(info["used_bytes"], _GB),
+            "free_gb": _scale(info["free_bytes"], _GB),
+            "used_percent": round(info["used_percentage"], 1),
+        })
     except Exception as e:
-        return f"Error getting memory info: {str(e)}"
+        return _error("Error getting memory info", e)
 
 
 @ai_function(description="Get CPU usage and processor information")
@@ -77,26 +295,26 @@ def get_cpu_info() -> str:
     try:
         _init_wmi()
         # Use direct WMI query since get_cpu_info() returns schema, not data
-        cpu_list = _wrapper.query("SELECT * FROM Win32_Processor")
-        
-        if not cpu_list:
-            return "No CPU information available"
-        
-        cpu = cpu_list[0]
-        
-        result = "CPU Information:\n"
-        result += f"  Processor: {cpu.Name}\n"
-        result += f"  Manufacturer: {cpu.Manufacturer}\n"
-        result += f"  Cores: {cpu.NumberOfCores}\n"
-        result += f"  Logical Processors: {cpu.NumberOfLogicalProcessors}\n"
-        result += f"  Max Speed: {cpu.MaxClockSpeed} MHz\n"
-        result += f"  Current Speed: {cpu.CurrentClockSpeed} MHz\n"
-        if cpu.LoadPercentage is not None:
-            result += f"  Load: {cpu.LoadPercentage}%\n"
-        
-        return result
+        cpu_list = _wrapper.get_processor([
+            "Name", "Manufacturer", "NumberOfCores", "NumberOfLogicalProcessors",
+            "MaxClockSpeed", "CurrentClockSpeed", "LoadPercentage",
+        ])
+        
+        frame = ResultFrame.from_records(
+            {
+                "name": cpu.Name,
+                "manufacturer": cpu.Manufacturer,
+                "cores": cpu.NumberOfCores,
+                "logical_processors": cpu.NumberOfLogicalProcessors,
+                "max_clock_mhz": cpu.MaxClockSpeed,
+                "current_clock_mhz": cpu.CurrentClockSpeed,
+                "load_percent": cpu.LoadPercentage,
+            }
+            for cpu in cpu_list
+        )
+        return _page(frame, "", frame.columns)
     except Exception as e:
-        return f"Error getting CPU info: {str(e)}"
+        return _error("Error getting CPU info", e)
 
 
 @ai_function(description="Get disk drive information including size, free space, and usage")
@@ -105,24 +323,25 @@ def get_disk_info() -> str:
     try:
         _init_wmi()
         # Query logical disks directly (DriveType=3 means local disk)
-        disks = _wrapper.query("SELECT * FROM Win32_LogicalDisk WHERE DriveType=3")
+        disks = _wrapper.get_logical_disks(["Name", "Size", "FreeSpace", "FileSystem"], DriveType=3)
         
-        result = "Disk Drives:\n"
+        records = []
         for disk in disks:
             if disk.Size:
                 free_space = int(disk.FreeSpace) if disk.FreeSpace else 0
                 total_space = int(disk.Size)
-                used_pct = ((total_space - free_space) / total_space * 100) if total_space > 0 else 0
+                records.append({
+                    "drive": disk.Name,
+                    "file_system": disk.FileSystem,
+                    "size_gb": _scale(total_space, _GB),
+                    "free_gb": _scale(free_space, _GB),
+                    "used_percent": round((total_space - free_space) / total_space * 100, 1),
+                })
                 
-                result += f"  {disk.Name}:\n"
-                result += f"    Size: {format_bytes(total_space)}\n"
-                result += f"    Free: {format_bytes(free_space)}\n"
-                result += f"    Used: {used_pct:.1f}%\n"
-                result += f"    File System: {disk.FileSystem if disk.FileSystem else 'N/A'}\n"
-        
-        return result if result != "Disk Drives:\n" else "No disk information available"
+        frame = ResultFrame.from_records(records)
+        return _page(frame, "", frame.columns)
     except Exception as e:
-        return f"Error getting disk info: {str(e)}"
+        return _error("Error getting disk info", e)
 
 
 @ai_function(description="Get network adapter configuration and IP addresses")
@@ -131,24 +350,48 @@ def get_network_info() -> str:
     try:
         _init_wmi()
         # Query network adapters directly (IPEnabled=True means active adapters)
-        adapters = _wrapper.query("SELECT * FROM Win32_NetworkAdapterConfiguration WHERE IPEnabled=True")
-        
-        if not adapters:
-            return "No active network adapters found"
-        
-        result = "Network Adapters:\n"
-        for adapter in adapters:
-            result += f"  {adapter.Description}:\n"
-            result += f"    MAC: {adapter.MACAddress if adapter.MACAddress else 'N/A'}\n"
-            if adapter.IPAddress:
-                result += f"    IP: {', '.join(adapter.IPAddress)}\n"
-            if adapter.DefaultIPGateway:
-                result += f"    Gateway: {', '.join(adapter.DefaultIPGateway)}\n"
-            result += f"    DHCP Enabled: {'Yes' if adapter.DHCPEnabled else 'No'}\n"
-        
-        return result
+        adapters = _wrapper.get_network_adapters(
+            ["Description", "MACAddress", "IPAddress", "DefaultIPGateway", "DHCPEnabled"],
+            IPEnabled=True,
+        )
+        
+        frame = ResultFrame.from_records(
+            {
+                "adapter": adapter.Description,
+                "mac": adapter.MACAddress,
+                "ip": list(adapter.IPAddress or ()),
+                "gateway": list(adapter.DefaultIPGateway or ()),
+                "dhcp": bool(adapter.DHCPEnabled),
+            }
+            for adapter in adapters
+        )
+        return _page(frame, "", frame.columns)
     except Exception as e:
-        return f"Error getting network info: {str(e)}"
+        return _error("Error getting network info", e)
+
+
+@ai_function(description="Get network throughput (KB/s, packets/s, errors/s) per interface")
+def get_network_throughput() -> str:
+    """Measures per-interface network rates from raw counter deltas."""
+    try:
+        _init_wmi()
+        interfaces = _network_sampler.measure(interval=1.0)
+        
+        frame = ResultFrame.from_records(
+            {
+                "interface": iface["name"],
+                "received_kb_per_sec": _scale(iface["bytes_received_per_sec"], 1024),
+                "sent_kb_per_sec": _scale(iface["bytes_sent_per_sec"], 1024),
+                "packets_in_per_sec": iface["packets_received_per_sec"],
+                "packets_out_per_sec": iface["packets_sent_per_sec"],
+                "errors_per_sec": iface["errors_per_sec"],
+                "utilization_percent": iface["utilization_percent"],
+            }
+            for iface in interfaces
+        )
+        return _page(frame, "", frame.columns, sort_by="-received_kb_per_sec")
+    except Exception as e:
+        return _error("Error getting network throughput", e)
 
 
 @ai_function(description="Get system uptime since last boot")
@@ -158,55 +401,65 @@ def get_uptime() -> str:
         _init_wmi()
         uptime_info = _system_mon.get_uptime()
         
-        result = "System Uptime:\n"
-        result += f"  Last Boot: {uptime_info.get('last_boot_time', 'N/A')}\n"
-        result += f"  Uptime: {uptime_info.get('uptime_days', 0)} days, "
-        result += f"{uptime_info.get('uptime_hours', 0)} hours, "
-        result += f"{uptime_info.get('uptime_minutes', 0)} minutes\n"
-        
-        return result
+        return _dumps({
+            "last_boot": uptime_info["last_boot_time"],
+            "uptime": f"{uptime_info['uptime_days']}d {uptime_info['uptime_hours']}h "
+                      f"{uptime_info['uptime_minutes']}m",
+            "uptime_seconds": int(uptime_info["uptime_seconds"]),
+        })
     except Exception as e:
-        return f"Error getting uptime: {str(e)}"
+        return _error("Error getting uptime", e)
 
 
 @ai_function(description="Check if running with administrator privileges")
 def check_admin_privileges() -> str:
     """Checks if the current process has administrator privileges."""
     try:
-        if is_admin():
-            return "Running with Administrator privileges"
-        else:
-            return "NOT running with Administrator privileges. Some operations may be restricted."
+        admin = is_admin()
+        return _dumps({
+            "admin": admin,
+            "note": None if admin else "Some operations may be restricted",
+        })
     except Exception as e:
-        return f"Error checking admin privileges: {str(e)}"
+        return _error("Error checking admin privileges", e)
+
+
+_SERVICE_FIELDS = ["Name", "DisplayName", "State", "StartMode", "Status"]
+
+
+def _service_record(svc: Any) -> Dict[str, Any]:
+    return {
+        "name": svc.Name,
+        "display_name": svc.DisplayName,
+        "state": svc.State,
+        "start_mode": svc.StartMode,
+        "status": svc.Status,
+    }
 
 
 @ai_function(description="List Windows services with optional filtering")
 def list_services(
-    state: Annotated[Optional[str], Field(description="Filter by state: 'Running' or 'Stopped'")] = None
+    state: Annotated[str, Field(description="Filter by state: 'Running' or 'Stopped'")] = "",
+    fields: FieldsParam = "",
+    offset: int = 0,
+    limit: int = 50,
+    sort_by: str = "name",
 ) -> str:
     """Lists Windows services, optionally filtered by state."""
     try:
         _init_wmi()
-        # ServiceManager doesn't have get_services, use wrapper directly
-        if state:
-            query = f"SELECT Name, DisplayName, State, StartMode, Status FROM Win32_Service WHERE State = '{state}'"
-        else:
-            query = "SELECT Name, DisplayName, State, StartMode, Status FROM Win32_Service"
-        
-        services = _wrapper.query(query)
-        
-        result = f"Windows Services ({len(services)}):\n"
-        for i, svc in enumerate(services[:20], 1):  # Limit to first 20
-            result += f"  {i}. {svc.Name} - {svc.State}\n"
-            result += f"     Display: {svc.DisplayName}\n"
-        
-        if len(services) > 20:
-            result += f"\n  ... and {len(services) - 20} more services\n"
-        
-        return result
+        # The State filter runs inside WMI; snapshots are kept per filter
+        filters = {"State": state} if state else {}
+        services = [
+            _service_record(svc) for svc in _wrapper.get_services(_SERVICE_FIELDS, **filters)
+        ]
+        
+        frame = ResultFrame.from_records(
+            services, ["name", "display_name", "state", "start_mode", "status"]
+        )
+        return _page(frame, fields, ["name", "state", "start_mode"], offset, limit, sort_by)
     except Exception as e:
-        return f"Error listing services: {str(e)}"
+        return _error("Error listing services", e)
 
 
 @ai_function(description="Get status of a specific Windows service")
@@ -216,128 +469,175 @@ def get_service_status(
     """Gets the status of a specific Windows service."""
     try:
         _init_wmi()
-        # Query service directly using WMI
-        query = f"SELECT Name, DisplayName, State, StartMode, Status FROM Win32_Service WHERE Name = '{service_name}'"
-        services = _wrapper.query(query)
-        
+        # WMI looks the name up (case-insensitively) instead of enumerating every service
+        services = _wrapper.get_services(_SERVICE_FIELDS, Name=service_name)
         if services:
-            svc = services[0]
-            result = f"Service: {svc.Name}\n"
-            result += f"  Display Name: {svc.DisplayName}\n"
-            result += f"  State: {svc.State}\n"
-            result += f"  Start Mode: {svc.StartMode}\n"
-            result += f"  Status: {svc.Status}\n"
-            return result
-        else:
-            return f"Service '{service_name}' not found"
+            return _dumps(_service_record(services[0]))
+        return _dumps({"error": f"Service '{service_name}' not found"})
     except Exception as e:
-        return f"Error getting service status: {str(e)}"
+        return _error("Error getting service status", e)
 
 
 @ai_function(description="List running processes")
-def list_processes() -> str:
+def list_processes(
+    fields: FieldsParam = "",
+    offset: int = 0,
+    limit: int = 15,
+    sort_by: str = "-memory_mb",
+) -> str:
     """Lists currently running processes."""
     try:
         _init_wmi()
-        # Use get_high_memory_processes with min_memory_mb parameter (default 100MB)
-        # Lower the threshold to 0 to get all processes, then take top 15
-        processes = _process_mgr.get_high_memory_processes(min_memory_mb=0)
-        
-        if not processes:
-            return "No processes found"
-        
-        # Sort by memory and take top 15
-        processes_sorted = sorted(processes, key=lambda p: int(p.WorkingSetSize) if p.WorkingSetSize else 0, reverse=True)[:15]
-        
-        result = f"Running Processes (Top 15 by Memory):\n"
-        for i, proc in enumerate(processes_sorted, 1):
-            mem_bytes = int(proc.WorkingSetSize) if proc.WorkingSetSize else 0
-            mem_mb = mem_bytes / (1024 * 1024)
-            result += f"  {i}. {proc.Name} (PID: {proc.ProcessId})\n"
-            result += f"     Memory: {mem_mb:.1f} MB\n"
-        
-        return result
+        processes = _process_mgr.get_process_frame(
+            ["Name", "ProcessId", "ParentProcessId", "ThreadCount", "WorkingSetSize"]
+        )
+        
+        frame = ResultFrame.from_records(
+            {
+                "pid": proc["ProcessId"],
+                "name": proc["Name"],
+                "parent_pid": proc["ParentProcessId"],
+                "threads": proc["ThreadCount"],
+                "memory_mb": _scale(proc["WorkingSetSize"], _MB),
+            }
+            for proc in processes.rows()
+        )
+        return _page(frame, fields, ["pid", "name", "memory_mb"], offset, limit, sort_by)
     except Exception as e:
-        return f"Error listing processes: {str(e)}"
+        return _error("Error listing processes", e)
 
 
 @ai_function(description="Get process CPU and memory usage with performance metrics")
-def get_process_performance() -> str:
+def get_process_performance(
+    fields: FieldsParam = "",
+    offset: int = 0,
+    limit: int = 15,
+    sort_by: str = "-cpu_percent",
+) -> str:
     """Gets CPU and memory usage for top processes using performance counters."""
     try:
         _init_wmi()
         
-        # Query Win32_PerfFormattedData_PerfProc_Process for CPU percentages
-        perf_query = "SELECT Name, IDProcess, PercentProcessorTime, WorkingSet FROM Win32_PerfFormattedData_PerfProc_Process WHERE Name != '_Total' AND Name != 'Idle'"
-        perf_processes = _wrapper.query(perf_query)
-        
-        if not perf_processes:
-            return "No performance data available. This can happen if performance counters are disabled or need to be rebuilt."
-        
-        # Sort by CPU usage and take top 15
-        valid_procs = [p for p in perf_processes if p.PercentProcessorTime is not None and p.IDProcess != 0]
-        procs_sorted = sorted(valid_procs, key=lambda p: int(p.PercentProcessorTime) if p.PercentProcessorTime else 0, reverse=True)[:15]
-        
-        result = "Process Performance (Top 15 by CPU Usage):\n\n"
-        for i, proc in enumerate(procs_sorted, 1):
-            cpu_percent = int(proc.PercentProcessorTime) if proc.PercentProcessorTime else 0
-            mem_bytes = int(proc.WorkingSet) if proc.WorkingSet else 0
-            mem_mb = mem_bytes / (1024 * 1024)
-            pid = proc.IDProcess
-            
-            result += f"  {i}. {proc.Name} (PID: {pid})\n"
-            result += f"     CPU: {cpu_percent}%\n"
-            result += f"     Memory: {mem_mb:.1f} MB\n\n"
-        
-        return result
+        # CPU% from deltas of the raw counters; reuses the previous call's
+        # sample as the baseline when it is recent
+        stats = _process_sampler.measure(interval=1.0)
+        
+        if not stats:
+            return _dumps({
+                "error": "No performance data available. Performance counters may be disabled "
+                         "or need to be rebuilt; list_processes still reports memory usage."
+            })
+        
+        frame = ResultFrame.from_records(
+            {
+                "pid": proc["pid"],
+                "name": proc["name"],
+                "cpu_percent": None if proc["cpu_percent"] is None else round(proc["cpu_percent"], 1),
+                "memory_mb": _scale(proc["working_set"], _MB),
+                "private_mb": _scale(proc["private_bytes"], _MB),
+                "io_kb_per_sec": _scale(proc["io_bytes_per_sec"], 1024),
+                "threads": proc["threads"],
+                "handles": proc["handles"],
+            }
+            for proc in stats
+        )
+        return _page(frame, fields, ["pid", "name", "cpu_percent", "memory_mb"], offset, limit, sort_by)
     except Exception as e:
-        return f"Error getting process performance: {str(e)}\n\nNote: Performance counters may not be available. Try using 'list_processes' for memory-based process listing instead."
+        return _error("Error getting process performance", e)
 
 
 @ai_function(description="Execute a custom WQL query")
 def execute_wql_query(
-    query: Annotated[str, Field(description="WQL query to execute (e.g., 'SELECT * FROM Win32_Service')")]
+    query: Annotated[str, Field(description="WQL query, e.g. 'SELECT Name, State FROM Win32_Service'")],
+    fields: FieldsParam = "",
+    offset: int = 0,
+    limit: int = 10,
 ) -> str:
     """Executes a custom WQL query and returns results."""
     try:
         _init_wmi()
-        results = _wrapper.query(query)
-        
-        if not results:
-            return "Query returned no results"
-        
-        # Return first 5 results
-        result = f"Query Results ({len(results)} total, showing first 5):\n"
-        for i, item in enumerate(results[:5], 1):
-            result += f"\n  Result {i}:\n"
-            # Show first few properties
-            props = list(item.properties.keys())[:10]
-            for prop in props:
-                try:
-                    value = getattr(item, prop)
-                    if value is not None:
-                        result += f"    {prop}: {value}\n"
-                except:
-                    pass
-        
-        return result
+        problems = _validate_query(query)
+        if problems:
+            return _dumps({"error": "Invalid query", "problems": problems})
+        # Only enumerate one result past the requested page
+        fetch = offset + limit + 1
+        # Typed from the objects, so uint64 text becomes numbers but strings stay strings
+        frame = ResultFrame.from_objects(
+            _wrapper.iter_query(query, batch_size=min(fetch, 100), limit=fetch)
+        )
+        return _page(frame, fields, frame.columns, offset, limit, exact_total=False)
     except Exception as e:
-        return f"Error executing query: {str(e)}"
+        return _error("Error executing query", e)
 
 
-def get_wmi_tools() -> list:
+def _validate_query(query: str) -> List[str]:
+    """
+    Check a WQL query against the class catalog before running it.
+    
+    Misspelled classes and properties come back with suggestions instead of
+    a COM error; if the catalog itself cannot be read, the query is run
+    unchecked.
+    """
+    global _catalog
+    try:
+        if _catalog is None:
+            _catalog = SchemaCatalog(wrapper=_wrapper)
+        return _catalog.validate_query(query)
+    except Exception:
+        return []
+
+
+def _get_async_wrapper() -> AsyncWMIWrapper:
+    """Get the COM worker pool the async tools run on (created lazily)."""
+    global _async_wrapper
+    _init_wmi()
+    if _async_wrapper is None:
+        _async_wrapper = AsyncWMIWrapper(wrapper=_wrapper)
+    return _async_wrapper
+
+
+def _make_async_tool(tool):
+    """
+    Build an async @ai_function that runs a sync tool on a COM worker thread.
+    
+    The async tool keeps the name, description and parameters of the sync
+    one, so the agent can issue several tool calls concurrently without
+    blocking the event loop.
+    """
+    @functools.wraps(tool.func)
+    async def run_tool(*args, **kwargs) -> str:
+        return await _get_async_wrapper().run(tool, *args, **kwargs)
+    
+    return ai_function(name=tool.name, description=tool.description)(run_tool)
+
+
+_async_tools = None
+
+
+def get_wmi_tools(use_async: bool = False) -> list:
     """
     Returns a list of all WMI tool functions for the agent.
     
+    Args:
+        use_async: Return async versions of the tools that run WMI calls on
+            a COM-initialized thread pool
+    
     Returns:
         List of @ai_function decorated functions
     """
+    global _async_tools
+    if use_async:
+        if _async_tools is None:
+            _async_tools = [_make_async_tool(tool) for tool in get_wmi_tools()]
+        return list(_async_tools)
+    
     return [
         get_system_info,
         get_memory_info,
         get_cpu_info,
         get_disk_info,
         get_network_info,
+        get_network_throughput,
         get_uptime,
         check_admin_privileges,
         list_services,
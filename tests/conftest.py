@@ -0,0 +1,21 @@
+"""
+Shared test setup: the tests run against the in-process fake WMI service.
+"""
+import os
+import tempfile
+
+import pytest
+
+from benchmarks import fake_wmi
+
+fake_wmi.install()
+# Keep the class catalog out of the user's cache directory
+os.environ.setdefault("WMI_CLI_CATALOG_DIR", tempfile.mkdtemp(prefix="wmi-cli-catalog-"))
+
+
+@pytest.fixture(autouse=True)
+def fake():
+    """The fake WMI service, emptied before and after each test."""
+    fake_wmi.clear()
+    yield fake_wmi
+    fake_wmi.clear()
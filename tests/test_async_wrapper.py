@@ -0,0 +1,54 @@
+"""
+Tests for AsyncWMIWrapper against the latency-injecting fake.
+"""
+import asyncio
+import time
+
+from src.wmi_cli.async_wrapper import AsyncWMIWrapper
+from src.wmi_cli.convert import DetachedObject
+
+CLASSES = ["Win32_Processor", "Win32_LogicalDisk", "Win32_Service", "Win32_BIOS"]
+
+
+def gather(*calls):
+    async def run():
+        return await asyncio.gather(*calls)
+    return asyncio.run(run())
+
+
+def test_gathered_queries_overlap(fake):
+    for name in CLASSES:
+        fake.set_instances(name, [{"Name": f"{name} {i}"} for i in range(3)])
+    fake.set_latency(0.2)
+    wrapper = AsyncWMIWrapper(max_workers=len(CLASSES))
+    try:
+        start = time.perf_counter()
+        results = gather(*(wrapper.get_class(name) for name in CLASSES))
+        elapsed = time.perf_counter() - start
+    finally:
+        wrapper.close(wait=True)
+    
+    assert [len(rows) for rows in results] == [3] * len(CLASSES)
+    # Sequential calls would take 0.8 s
+    assert elapsed < 0.5
+    assert fake.stats.queries == len(CLASSES)
+
+
+def test_results_are_detached_on_the_worker(fake):
+    fake.set_instances("Win32_Service", [{"Name": "spooler", "State": "Running"}])
+    fake.set_instances("Win32_OperatingSystem", [{"Caption": "Fake Windows", "BuildNumber": "22631"}])
+    wrapper = AsyncWMIWrapper()
+    try:
+        services, os_info, bios = gather(
+            wrapper.query("SELECT Name, State FROM Win32_Service"),
+            wrapper.get_operating_system(),
+            wrapper.get_bios(),
+        )
+    finally:
+        wrapper.close(wait=True)
+    
+    assert all(isinstance(service, DetachedObject) for service in services)
+    assert services[0].State == "Running"
+    assert isinstance(os_info, DetachedObject)
+    assert os_info.Caption == "Fake Windows"
+    assert bios is None
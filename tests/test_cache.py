@@ -0,0 +1,75 @@
+"""
+Tests for ResultCache and the wrapper's use of it.
+"""
+import threading
+
+from src.wmi_cli.cache import ResultCache, normalize_wql
+from src.wmi_cli.convert import DetachedObject, property_types
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+BIOS = {"Manufacturer": "Fake", "SerialNumber": "0042", "ReleaseDate": "20240101000000.000000+000"}
+MEMORY = {"TotalPhysicalMemory": str(16 * 1024 ** 3), "NumberOfLogicalProcessors": 8}
+
+
+def query_on_thread(wrapper: WMIWrapper, wql: str):
+    results = []
+    worker = threading.Thread(target=lambda: results.extend(wrapper.query(wql)))
+    worker.start()
+    worker.join()
+    return results
+
+
+def test_cached_results_are_detached_from_com(fake):
+    fake.set_instances("Win32_BIOS", [BIOS])
+    wrapper = WMIWrapper(cache=ResultCache())
+    fetched = query_on_thread(wrapper, "SELECT * FROM Win32_BIOS")
+    queries = fake.stats.queries
+    cached = wrapper.query("select *  from win32_bios")
+    
+    assert fake.stats.queries == queries
+    # A miss returns the same detached copies a hit does
+    assert isinstance(fetched[0], DetachedObject)
+    assert isinstance(cached[0], DetachedObject)
+    assert cached is not fetched
+    assert cached[0].serialnumber == "0042"
+    assert {name: getattr(cached[0], name) for name in cached[0].properties} == BIOS
+
+
+def test_detached_results_keep_property_types(fake):
+    fake.set_instances("Win32_ComputerSystem", [MEMORY])
+    wrapper = WMIWrapper(cache=ResultCache())
+    wrapper.get_computer_system()
+    system = wrapper.get_computer_system()
+    
+    assert isinstance(system, DetachedObject)
+    assert property_types(system) == {
+        "TotalPhysicalMemory": "uint64", "NumberOfLogicalProcessors": "uint32",
+    }
+
+
+def test_uncacheable_classes_are_not_copied(fake):
+    fake.set_instances("Win32_Service", [{"Name": "svc"}])
+    cache = ResultCache()
+    wrapper = WMIWrapper(cache=cache)
+    services = wrapper.query("SELECT Name FROM Win32_Service")
+    
+    assert len(cache) == 0
+    assert fake.stats.attribute_reads == 0
+    assert not isinstance(services[0], DetachedObject)
+
+
+def test_entries_expire_with_their_class_ttl():
+    now = [0.0]
+    cache = ResultCache(clock=lambda: now[0])
+    cache.put(".", "root\\cimv2", "SELECT * FROM Win32_PerfRawData_Tcpip_TCPv4", [])
+    now[0] = 0.5
+    assert cache.get(".", "root\\cimv2", "SELECT * FROM Win32_PerfRawData_Tcpip_TCPv4") == []
+    now[0] = 1.5
+    assert cache.get(".", "root\\cimv2", "SELECT * FROM Win32_PerfRawData_Tcpip_TCPv4") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_normalize_wql_keeps_literals():
+    assert normalize_wql("SELECT  Name FROM Win32_Service WHERE Name = 'A  B'") == (
+        "select name from win32_service where name='A  B'"
+    )
@@ -0,0 +1,118 @@
+"""
+Tests for SchemaCatalog refresh, invalidation, search and query validation.
+"""
+import pytest
+
+from src.wmi_cli.catalog import SchemaCatalog
+from src.wmi_cli.convert import SchemaCache
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+
+@pytest.fixture
+def classes(fake):
+    fake.set_instances("Win32_OperatingSystem", [{"Version": "10.0.22631", "BuildNumber": "22631"}])
+    fake.set_instances("Win32_Process", fake.make_processes(3))
+    fake.set_keys("Win32_Process", ["Handle"])
+    fake.set_instances("Win32_DiskDrive", [{"DeviceID": "disk0", "Size": "1024"}])
+    fake.set_instances("Win32_LogicalDisk", [{"DeviceID": "C:", "FreeSpace": "512"}])
+    fake.set_instances("Win32_Service", [{"Name": "svc", "State": "Running"}])
+    return fake
+
+
+@pytest.fixture
+def open_catalog(tmp_path):
+    schemas = SchemaCache()
+    
+    def open_catalog(max_age=3600, computer="."):
+        wrapper = WMIWrapper(computer=computer)
+        return SchemaCatalog(
+            wrapper=wrapper, directory=str(tmp_path), max_age=max_age, schemas=schemas
+        )
+    open_catalog.schemas = schemas
+    return open_catalog
+
+
+def test_describe_reads_the_definition_once(classes, open_catalog):
+    info = open_catalog().describe("win32_process")
+    definitions = classes.stats.class_definitions
+    again = open_catalog().describe("Win32_Process")
+    
+    assert info.name == "Win32_Process"
+    assert info.keys == ["Handle"]
+    assert again == info
+    assert classes.stats.class_definitions == definitions
+    schema = open_catalog.schemas.get(".", "root\\cimv2", "Win32_Process")
+    assert schema == tuple(info.property_names)
+
+
+def test_refresh_adds_and_removes_classes(classes, open_catalog):
+    catalog = open_catalog()
+    catalog.describe("Win32_Service")
+    assert "Win32_Service" in catalog.list_classes()
+    
+    classes.set_instances("Win32_Service", [])
+    classes.set_instances("Win32_Battery", [{"Name": "battery"}])
+    counts = open_catalog(max_age=0).refresh()
+    
+    assert counts["added"] == 1 and counts["removed"] == 1
+    catalog = open_catalog()
+    assert "Win32_Battery" in catalog.list_classes()
+    assert not catalog.has_class("Win32_Service")
+    assert "win32_service" not in catalog._classes
+    assert open_catalog.schemas.get(".", "root\\cimv2", "Win32_Service") is None
+
+
+def test_fresh_index_is_not_enumerated_again(classes, open_catalog):
+    open_catalog().list_classes()
+    queries = classes.stats.queries
+    open_catalog().list_classes()
+    
+    # Only the OS build is read
+    assert classes.stats.queries == queries + 1
+
+
+def test_os_build_change_invalidates_cached_definitions(classes, open_catalog):
+    open_catalog().describe("Win32_Process")
+    classes.set_instances("Win32_OperatingSystem", [{"Version": "10.0.26100"}])
+    classes.set_instances("Win32_Process", [{"Handle": "4", "NewProperty": 1}])
+    catalog = open_catalog()
+    info = catalog.describe("Win32_Process")
+    
+    assert "NewProperty" in info.property_names
+    assert "NewProperty" in open_catalog.schemas.get(".", "root\\cimv2", "Win32_Process")
+    assert catalog.build == "10.0.26100"
+
+
+def test_schemas_are_kept_per_computer(classes, open_catalog):
+    open_catalog().describe("Win32_Process")
+    
+    assert open_catalog.schemas.get("SERVER1", "root\\cimv2", "Win32_Process") is None
+    open_catalog(computer="SERVER1").describe("Win32_Process")
+    assert open_catalog.schemas.get("server1", "root\\cimv2", "Win32_Process") is not None
+
+
+def test_search_ranks_prefix_matches_first(classes, open_catalog):
+    catalog = open_catalog()
+    
+    assert catalog.search("disk") == ["Win32_DiskDrive", "Win32_LogicalDisk"]
+    assert catalog.search("WIN32_", limit=2) == ["Win32_Process", "Win32_Service"]
+    assert catalog.search("nothing") == []
+
+
+def test_suggest_finds_misspelled_names(classes, open_catalog):
+    assert open_catalog().suggest("Win32_Proces") == ["Win32_Process"]
+    assert open_catalog().suggest("Foo") == []
+
+
+def test_validate_query(classes, open_catalog):
+    catalog = open_catalog()
+    
+    assert catalog.validate_query("SELECT Name, ProcessId FROM Win32_Process") == []
+    assert catalog.validate_query("SELECT * FROM Win32_Process WHERE Name = 'x'") == []
+    assert catalog.validate_query("SELECT * FROM __InstanceCreationEvent WITHIN 1") == []
+    assert catalog.validate_query("SELECT Name FROM Win32_Proces") == [
+        "Unknown class 'Win32_Proces' in root\\cimv2 (did you mean Win32_Process?)"
+    ]
+    assert catalog.validate_query("SELECT Name, ProcesId FROM Win32_Process") == [
+        "Unknown property 'ProcesId' of Win32_Process (did you mean ProcessId, ParentProcessId?)"
+    ]
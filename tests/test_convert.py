@@ -0,0 +1,32 @@
+"""
+Tests for the property converters and the table display built on them.
+"""
+from src.wmi_cli.convert import objects_to_columns, objects_to_dicts
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+
+def load_services(fake):
+    fake.set_instances("Win32_Service", [
+        {"Name": f"svc{i}", "State": "Running", "ProcessId": 100 + i} for i in range(5)
+    ])
+    fake.set_method("Win32_Service", "StartService", lambda values: (0,))
+    return WMIWrapper().query("SELECT * FROM Win32_Service")
+
+
+def test_converters_never_look_up_methods(fake):
+    services = load_services(fake)
+    
+    assert objects_to_dicts(services)[0] == {"Name": "svc0", "State": "Running", "ProcessId": 100}
+    assert objects_to_columns(services, ["Name"]) == {"Name": [f"svc{i}" for i in range(5)]}
+    assert fake.stats.method_lookups == 0
+
+
+def test_display_table_reads_properties_only(fake, capsys):
+    from src.wmi_cli.cli import _display_table
+    
+    _display_table(load_services(fake), "Services")
+    output = capsys.readouterr().out
+    
+    assert "ProcessId" in output and "svc4" in output
+    assert "StartService" not in output
+    assert fake.stats.method_lookups == 0
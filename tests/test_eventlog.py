@@ -0,0 +1,104 @@
+"""
+Tests for EventLogReader windows and tailing against the fake event log.
+"""
+import json
+
+import pytest
+
+from src.wmi_cli.modules import EventLogReader
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+
+@pytest.fixture(params=[False, True], ids=["newest-first", "oldest-first"])
+def log(request, fake):
+    log = fake.FakeEventLog(500, oldest_first=request.param)
+    fake.set_instances("Win32_NTLogEvent", log)
+    return log
+
+
+@pytest.fixture
+def reader():
+    return EventLogReader(wrapper=WMIWrapper())
+
+
+def records(events):
+    return sorted(event["RecordNumber"] for event in events)
+
+
+def test_after_record_does_not_depend_on_enumeration_order(log, reader):
+    events = list(reader.iter_events(after_record=450, properties=["Message"]))
+    
+    assert len(events) == 50
+    assert set(events[0]) == {"Message"}
+    assert records(reader.iter_events(after_record=450)) == list(range(451, 501))
+
+
+def test_time_window_does_not_depend_on_enumeration_order(log, reader):
+    since = log.time_of(400)
+    until = log.time_of(410)
+    events = list(reader.iter_events(since=since, until=until, properties=["RecordNumber"]))
+    
+    assert records(events) == list(range(400, 411))
+
+
+def test_bounds_with_event_type(log, reader):
+    events = reader.iter_events(
+        since=log.time_of(301), before_record=400, event_type=1, properties=["RecordNumber"]
+    )
+    assert records(events) == list(range(310, 400, 10))
+
+
+def test_lower_bounds_are_sent_as_wql(fake, log, reader):
+    list(reader.iter_events(after_record=490, since=log.time_of(480)))
+    assert fake.stats.objects == 10
+
+
+def test_naive_since_is_local_time(log, reader):
+    since = log.time_of(495).astimezone().replace(tzinfo=None)
+    assert records(reader.iter_events(since=since)) == list(range(495, 501))
+
+
+def test_tail_reads_new_records_oldest_first(log, reader):
+    events, cursor = reader.tail(since_record=480, event_type=1)
+    assert [event["RecordNumber"] for event in events] == [490, 500]
+    assert cursor == 500
+    
+    log.append(25)
+    events, cursor = reader.tail(since_record=cursor, max_events=10)
+    assert [event["RecordNumber"] for event in events] == list(range(501, 511))
+    assert cursor == 510
+    assert reader.tail(since_record=525) == ([], 525)
+
+
+def test_tail_restarts_after_the_log_was_cleared(log, reader):
+    log.clear()
+    log.append(3)
+    events, cursor = reader.tail(since_record=500)
+    
+    assert [event["RecordNumber"] for event in events] == [1, 2, 3]
+    assert cursor == 3
+
+
+def test_tail_cursor_skips_events_of_other_types(reader, fake):
+    fake.set_instances("Win32_NTLogEvent", fake.FakeEventLog(20))
+    events, cursor = reader.tail(since_record=10, event_type=2)
+    
+    assert [event["RecordNumber"] for event in events] == [15]
+    assert cursor == 20
+
+
+def test_cli_follow_without_record_number_column(fake):
+    from typer.testing import CliRunner
+    from src.wmi_cli.cli import app
+    
+    fake.set_instances("Win32_NTLogEvent", fake.FakeEventLog(500))
+    result = CliRunner().invoke(app, [
+        "events", "--limit", "3", "--follow", "--duration", "0", "--interval", "0",
+        "--properties", "TimeGenerated,Message", "--output-format", "jsonl",
+    ])
+    
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert len(lines) == 3
+    assert all(set(line) == {"TimeGenerated", "Message"} for line in lines)
+    assert "Following System after record 500" in result.output
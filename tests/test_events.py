@@ -0,0 +1,128 @@
+"""
+Tests for WMIEventWatcher coalescing and backpressure with QueueEventSource.
+"""
+import threading
+import time
+
+import pytest
+
+from src.wmi_cli.events import (
+    QueueEventSource,
+    WMIEventWatcher,
+    instance_event_query,
+    target_condition,
+)
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+
+def make_watcher(**kwargs) -> WMIEventWatcher:
+    return WMIEventWatcher(wrapper=WMIWrapper(), poll_interval=0.02, **kwargs)
+
+
+def wait_received(watcher: WMIEventWatcher, count: int, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while watcher.stats()["received"] < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert watcher.stats()["received"] == count
+
+
+def drain(watcher: WMIEventWatcher) -> list:
+    events = []
+    while True:
+        event = watcher.get(timeout=0.05)
+        if event is None:
+            return events
+        events.append(event)
+
+
+def test_events_for_one_instance_coalesce():
+    watcher = make_watcher()
+    source = watcher.add_source(QueueEventSource())
+    source.emit("modification", "Win32_Service", {"Name": "spooler", "State": "Stop Pending"},
+                previous={"Name": "spooler", "State": "Running"})
+    source.emit("modification", "Win32_Service", {"Name": "spooler", "State": "Stopped"})
+    source.emit("modification", "Win32_Service", {"Name": "w32time", "State": "Stopped"})
+    with watcher:
+        wait_received(watcher, 3)
+        events = drain(watcher)
+    
+    assert [event.data["Name"] for event in events] == ["spooler", "w32time"]
+    spooler = events[0]
+    assert spooler.count == 2
+    assert spooler.data["State"] == "Stopped"
+    assert spooler.changes() == {"State": ("Running", "Stopped")}
+    assert watcher.stats()["coalesced"] == 1
+
+
+def test_coalesce_window_holds_events_back():
+    watcher = make_watcher(coalesce_window=0.3)
+    source = watcher.add_source(QueueEventSource())
+    with watcher:
+        source.emit("modification", "Win32_Process", {"ProcessId": 4, "WorkingSetSize": 1})
+        wait_received(watcher, 1)
+        assert watcher.get(timeout=0.05) is None
+        source.emit("modification", "Win32_Process", {"ProcessId": 4, "WorkingSetSize": 2})
+        event = watcher.get(timeout=1.0)
+    
+    assert event.count == 2
+    assert event.data["WorkingSetSize"] == 2
+
+
+@pytest.mark.parametrize("overflow, kept", [
+    ("drop_oldest", [3, 4]),
+    ("drop_newest", [0, 1]),
+])
+def test_full_buffer_drops_events(overflow, kept):
+    watcher = make_watcher(max_pending=2, overflow=overflow)
+    source = watcher.add_source(QueueEventSource())
+    for pid in range(5):
+        source.emit("creation", "Win32_Process", {"ProcessId": pid})
+    with watcher:
+        wait_received(watcher, 5)
+        events = drain(watcher)
+    
+    assert [event.data["ProcessId"] for event in events] == kept
+    assert watcher.stats()["dropped"] == 3
+
+
+def test_block_overflow_stops_reading_until_consumed():
+    watcher = make_watcher(max_pending=2, overflow="block")
+    source = watcher.add_source(QueueEventSource())
+    for pid in range(5):
+        source.emit("creation", "Win32_Process", {"ProcessId": pid})
+    with watcher:
+        time.sleep(0.2)
+        # The reader is blocked on the third event
+        assert watcher.stats()["pending"] == 2
+        received = [watcher.get(timeout=1.0).data["ProcessId"] for _ in range(5)]
+    
+    assert received == [0, 1, 2, 3, 4]
+    assert watcher.stats()["dropped"] == 0
+
+
+def test_subscribers_receive_events_on_the_dispatcher():
+    watcher = make_watcher()
+    source = watcher.add_source(QueueEventSource())
+    seen = []
+    done = threading.Event()
+    
+    def callback(event):
+        seen.append(event.data["ProcessId"])
+        if len(seen) == 3:
+            done.set()
+    
+    watcher.subscribe(callback)
+    with watcher:
+        for pid in range(3):
+            source.emit("creation", "Win32_Process", {"ProcessId": pid})
+        assert done.wait(2.0)
+    
+    assert seen == [0, 1, 2]
+
+
+def test_instance_event_query_pushes_the_condition_into_wql():
+    wql = instance_event_query("Win32_Service", "modification", 2, target_condition(State="Stopped"))
+    assert wql == (
+        "SELECT * FROM __InstanceModificationEvent WITHIN 2 WHERE "
+        "TargetInstance ISA 'Win32_Service' AND TargetInstance.State = 'Stopped'"
+    )
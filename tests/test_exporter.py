@@ -0,0 +1,152 @@
+"""
+Tests for the OpenMetrics exporter, scraped over HTTP.
+"""
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.wmi_cli.exporter import CONTENT_TYPE, MetricFamily, MetricsExporter, render_openmetrics
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+
+def install_fixtures(fake):
+    fake.set_instances("Win32_ComputerSystem", [
+        {"TotalPhysicalMemory": str(16 * 1024 ** 3), "NumberOfLogicalProcessors": 8},
+    ])
+    fake.set_instances("Win32_OperatingSystem", [{"FreePhysicalMemory": "4000000"}])
+    fake.set_instances("Win32_LogicalDisk", [
+        {"DeviceID": "C:", "VolumeName": "OS", "FileSystem": "NTFS", "DriveType": 3,
+         "Size": str(500 * 1024 ** 3), "FreeSpace": str(100 * 1024 ** 3)},
+    ])
+    fake.set_instances("Win32_Service", [
+        {"Name": f"svc{i}", "State": "Running" if i % 3 else "Stopped", "StartMode": "Auto"}
+        for i in range(30)
+    ])
+    fake.set_instances("Win32_PerfRawData_PerfProc_Process", fake.make_perf_processes(50))
+    fake.set_instances("Win32_PerfRawData_Tcpip_NetworkInterface", fake.make_network_interfaces())
+
+
+@pytest.fixture
+def server(fake):
+    install_fixtures(fake)
+    exporter = MetricsExporter(wrapper=WMIWrapper(), refresh_interval=60, top_processes=5)
+    exporter.refresh()
+    server = exporter.make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield exporter, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def scrape(url: str):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.headers["Content-Type"], response.read().decode("utf-8")
+
+
+def test_scrape_returns_openmetrics(server):
+    exporter, url = server
+    content_type, body = scrape(url + "/metrics")
+    
+    assert content_type == CONTENT_TYPE
+    assert body.endswith("# EOF\n")
+    assert "wmi_memory_total_bytes 17179869184\n" in body
+    assert 'wmi_logical_disk_used_percent{volume="C:"} 80' in body
+    assert 'wmi_service_state{name="svc0",state="Stopped",start_mode="Auto"} 1' in body
+    assert 'wmi_exporter_collector_success{collector="network"} 1' in body
+    assert not exporter.errors
+
+
+def test_scrapes_are_served_from_the_snapshot(fake, server):
+    exporter, url = server
+    queries = fake.stats.queries
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        bodies = list(executor.map(lambda _: scrape(url + "/metrics")[1], range(40)))
+    
+    assert len(set(bodies)) == 1
+    assert fake.stats.queries == queries
+    assert exporter.refreshes == 1
+
+
+def test_unknown_path_is_404(server):
+    _, url = server
+    with pytest.raises(urllib.error.HTTPError) as error:
+        scrape(url + "/nope")
+    assert error.value.code == 404
+
+
+def test_failing_collector_is_reported(fake, server):
+    exporter, url = server
+    fake.set_instances("Win32_LogicalDisk", [])
+    exporter.collectors["disk"] = lambda: 1 / 0
+    exporter.refresh()
+    _, body = scrape(url + "/metrics")
+    
+    assert 'wmi_exporter_collector_success{collector="disk"} 0' in body
+    assert "disk" in exporter.errors
+
+
+class ContendedLock:
+    """A lock that counts the callers who found it held."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waiting = threading.Semaphore(0)
+    
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            return True
+        self.waiting.release()
+        return blocking and self._lock.acquire(True, timeout)
+    
+    def release(self):
+        self._lock.release()
+    
+    __enter__ = acquire
+    
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def test_concurrent_refreshes_share_one_collection(fake):
+    exporter = MetricsExporter(wrapper=WMIWrapper())
+    exporter._refresh_lock = lock = ContendedLock()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    
+    def slow_collector():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return [MetricFamily("slow", "Slow collector").add(len(calls))]
+    
+    exporter.collectors = {"slow": slow_collector}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(exporter.refresh)
+        started.wait(5)
+        joined = [executor.submit(exporter.refresh) for _ in range(3)]
+        for _ in joined:
+            assert lock.waiting.acquire(timeout=5)
+        release.set()
+        snapshots = {future.result() for future in [first, *joined]}
+    
+    assert len(calls) == 1
+    assert exporter.refreshes == 1
+    assert len(snapshots) == 1
+    # Once it is done, the next refresh collects again
+    exporter.refresh()
+    assert len(calls) == 2
+
+
+def test_render_escapes_labels():
+    family = MetricFamily("m", 'help "quoted"').add(1.5, name='a"b\\c')
+    assert render_openmetrics([family]) == (
+        "# TYPE m gauge\n"
+        '# HELP m help \\"quoted\\"\n'
+        'm{name="a\\"b\\\\c"} 1.5\n'
+        "# EOF\n"
+    )
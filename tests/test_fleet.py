@@ -0,0 +1,161 @@
+"""
+Tests for FleetQuery against a SimulatedBackend.
+"""
+import json
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+from src.wmi_cli.backends import SimulatedBackend
+from src.wmi_cli.fleet import FleetQuery, FleetRow, read_hosts_file
+from src.wmi_cli.pool import WMIConnectionPool, set_default_pool
+
+OS_ROWS = [{"Caption": "Fake Windows", "Version": "10.0.22631"}]
+
+
+def make_backend(**kwargs) -> SimulatedBackend:
+    return SimulatedBackend({"Win32_OperatingSystem": OS_ROWS}, **kwargs)
+
+
+def test_rows_are_tagged_with_their_host():
+    backend = make_backend()
+    fleet = FleetQuery(["a", "b", "c"], pool=backend.pool)
+    rows = fleet.collect("SELECT * FROM Win32_OperatingSystem")
+    
+    assert sorted(row.host for row in rows) == ["a", "b", "c"]
+    assert all(row.data == OS_ROWS[0] for row in rows)
+    assert len(fleet.summary.succeeded) == 3
+    assert not fleet.summary.failed
+
+
+def test_failures_are_reported_per_host():
+    backend = make_backend(failures={"bad": "The RPC server is unavailable."})
+    fleet = FleetQuery(["good", "bad"], pool=backend.pool)
+    rows = fleet.collect("SELECT * FROM Win32_OperatingSystem")
+    
+    assert [row.host for row in rows] == ["good"]
+    status = fleet.summary.statuses["bad"]
+    assert not status.ok
+    assert status.error == "The RPC server is unavailable."
+    assert not status.timed_out
+
+
+def test_slow_host_times_out_without_delaying_the_others():
+    backend = make_backend(latency=0.01, host_latency={"slow": 2.0})
+    fleet = FleetQuery(["slow", "a", "b"], pool=backend.pool, timeout=0.2)
+    start = time.monotonic()
+    rows = fleet.collect("SELECT * FROM Win32_OperatingSystem")
+    
+    assert time.monotonic() - start < 1.0
+    assert sorted(row.host for row in rows) == ["a", "b"]
+    status = fleet.summary.statuses["slow"]
+    assert status.timed_out
+    assert status.error == "timed out after 0.2s"
+
+
+def test_parallelism_is_bounded():
+    backend = make_backend(latency=0.1)
+    fleet = FleetQuery([f"host{i}" for i in range(6)], pool=backend.pool, max_workers=2)
+    start = time.monotonic()
+    fleet.collect("SELECT * FROM Win32_OperatingSystem")
+    
+    assert time.monotonic() - start >= 0.3
+    assert len(fleet.summary.succeeded) == 6
+
+
+def test_workers_release_their_connections_and_com():
+    backend = make_backend()
+    counts = {"init": 0, "uninit": 0}
+    apartments = set()
+    lock = threading.Lock()
+    
+    def co_initialize(multithreaded):
+        with lock:
+            counts["init"] += 1
+            apartments.add(multithreaded)
+    
+    def co_uninitialize():
+        with lock:
+            counts["uninit"] += 1
+    
+    discarded = []
+    
+    class RecordingPool(WMIConnectionPool):
+        def discard(self, computer=".", namespace="root\\cimv2"):
+            dropped = super().discard(computer, namespace)
+            discarded.append(dropped)
+            return dropped
+    
+    pool = RecordingPool(
+        connect=backend.connect, co_initialize=co_initialize, co_uninitialize=co_uninitialize
+    )
+    fleet = FleetQuery([f"host{i}" for i in range(8)], pool=pool, max_workers=3)
+    fleet.collect("SELECT * FROM Win32_OperatingSystem")
+    
+    assert discarded == [True] * 8
+    # Workers uninitialize COM as they exit, after the run has finished
+    deadline = time.monotonic() + 2.0
+    while counts["uninit"] < counts["init"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert counts["init"] == counts["uninit"] == 3
+    # Workers join the multithreaded apartment like the other worker pools
+    assert apartments == {True}
+
+
+def test_timed_out_host_does_not_block_process_exit():
+    script = textwrap.dedent("""
+        from src.wmi_cli.backends import SimulatedBackend
+        from src.wmi_cli.fleet import FleetQuery
+        backend = SimulatedBackend({"Win32_OperatingSystem": [{"Caption": "x"}]},
+                                   host_latency={"slow": 10.0})
+        fleet = FleetQuery(["slow", "fast"], pool=backend.pool, timeout=0.2)
+        rows = fleet.collect("SELECT * FROM Win32_OperatingSystem")
+        print(len(rows), fleet.summary.statuses["slow"].timed_out)
+    """)
+    start = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, timeout=30
+    )
+    
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["1", "True"]
+    assert time.monotonic() - start < 5.0
+
+
+def test_host_tag_wins_over_a_host_property():
+    row = FleetRow(host="srv1", data={"Host": "other", "Name": "x"})
+    assert row.to_dict() == {"host": "srv1", "Name": "x"}
+
+
+def test_read_hosts_file_skips_comments_and_duplicates(tmp_path):
+    path = tmp_path / "hosts.txt"
+    path.write_text("# fleet\nsrv1\nSRV1  # again\n\nsrv2\n", encoding="utf-8")
+    assert read_hosts_file(str(path)) == ["srv1", "srv2"]
+
+
+@pytest.fixture
+def simulated_pool():
+    backend = make_backend(failures={"bad": "Access is denied."})
+    set_default_pool(backend.pool)
+    yield backend.pool
+    set_default_pool(None)
+
+
+def test_fleet_query_command_streams_jsonl(tmp_path, simulated_pool):
+    from typer.testing import CliRunner
+    from src.wmi_cli.cli import app
+    
+    hosts = tmp_path / "hosts.txt"
+    hosts.write_text("srv1\nbad\n", encoding="utf-8")
+    result = CliRunner().invoke(app, [
+        "fleet-query", "SELECT * FROM Win32_OperatingSystem",
+        "--hosts", str(hosts), "--output-format", "jsonl",
+    ])
+    
+    assert result.exit_code == 0
+    lines = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert lines == [{"host": "srv1", **OS_ROWS[0]}]
@@ -0,0 +1,92 @@
+"""
+Tests for ResultFrame column typing.
+"""
+from src.wmi_cli.convert import property_types
+from src.wmi_cli.frame import ResultFrame
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+
+def test_untyped_numeric_text_stays_text():
+    frame = ResultFrame.from_records([
+        {"Handle": "1234", "SerialNumber": "123", "Code": "00451"},
+        {"Handle": "88", "SerialNumber": "0", "Code": "7"},
+    ])
+    
+    assert frame.dtypes == {"Handle": "str", "SerialNumber": "str", "Code": "str"}
+    assert frame.row(0) == {"Handle": "1234", "SerialNumber": "123", "Code": "00451"}
+
+
+def test_integer_typed_text_becomes_int():
+    frame = ResultFrame.from_records(
+        [{"Size": "500107862016", "Name": "C:"}, {"Size": None, "Name": "D:"}],
+        types={"Size": "uint64", "Name": "string"},
+    )
+    
+    assert frame.dtypes == {"Size": "int", "Name": "str"}
+    assert frame.column("Size") == [500107862016, None]
+    assert frame.where("Size", ">", "1000").column("Name") == ["C:"]
+
+
+def test_integer_typed_column_with_odd_text_stays_text():
+    frame = ResultFrame.from_records(
+        [{"Size": "0042"}, {"Size": str(2 ** 64 - 1)}], types={"Size": "uint64"}
+    )
+    assert frame.dtypes == {"Size": "str"}
+
+
+def test_native_ints_need_no_type():
+    frame = ResultFrame({"ThreadCount": [4, 12, None]})
+    assert frame.dtypes == {"ThreadCount": "int"}
+
+
+def test_frames_from_wmi_use_the_property_types(fake):
+    fake.set_instances("Win32_Process", [
+        {"Handle": str(pid), "ProcessId": pid, "Name": f"p{pid}.exe",
+         "WorkingSetSize": str(pid * 1024 * 1024)}
+        for pid in (4, 8, 1234)
+    ])
+    frame = WMIWrapper().get_class_frame(
+        "Win32_Process", ["Handle", "ProcessId", "Name", "WorkingSetSize"]
+    )
+    
+    assert frame.dtypes == {
+        "Handle": "str", "ProcessId": "int", "Name": "str", "WorkingSetSize": "int",
+    }
+    assert frame.top(1, "WorkingSetSize").column("Handle") == ["1234"]
+
+
+def test_declared_types_override_the_values(fake):
+    fake.set_instances("Win32_BIOS", [{"SerialNumber": "123", "ReleaseCount": "7"}])
+    fake.set_cim_types("Win32_BIOS", {"ReleaseCount": "sint64"})
+    bios = WMIWrapper().query("SELECT * FROM Win32_BIOS")[0]
+    
+    assert property_types(bios) == {"SerialNumber": "string", "ReleaseCount": "sint64"}
+    frame = WMIWrapper().query_frame("SELECT * FROM Win32_BIOS")
+    assert frame.row(0) == {"SerialNumber": "123", "ReleaseCount": 7}
+
+
+def test_objects_without_type_information():
+    class Plain:
+        Name = "x"
+    
+    assert property_types(Plain()) == {}
+    assert ResultFrame.from_objects([]).columns == []
+
+
+def test_replayed_frames_keep_the_recorded_types(fake, tmp_path):
+    from src.wmi_cli.backends import RecordingBackend, ReplayBackend
+    
+    fake.set_instances("Win32_LogicalDisk", [
+        {"DeviceID": "C:", "VolumeSerialNumber": "1234", "Size": "500107862016"},
+    ])
+    path = str(tmp_path / "session.json.gz")
+    with RecordingBackend(path) as recorder:
+        recorded = WMIWrapper(backend=recorder).query_frame("SELECT * FROM Win32_LogicalDisk")
+    replayed = WMIWrapper(backend=ReplayBackend(path, latency_scale=0)).query_frame(
+        "SELECT * FROM Win32_LogicalDisk"
+    )
+    
+    assert replayed.dtypes == recorded.dtypes == {
+        "DeviceID": "str", "VolumeSerialNumber": "str", "Size": "int",
+    }
+    assert replayed.to_dicts() == recorded.to_dicts()
@@ -0,0 +1,82 @@
+"""
+Tests for SnapshotCollector and the commands built on it.
+"""
+import subprocess
+import sys
+import textwrap
+import time
+
+from typer.testing import CliRunner
+
+from src.wmi_cli.cli import app
+from src.wmi_cli.inventory import SnapshotCollector, class_section
+
+
+def load_system(fake):
+    fake.set_instances("Win32_OperatingSystem", [{
+        "Caption": "Fake Windows", "Version": "10.0.22631", "OSArchitecture": "64-bit",
+    }])
+    fake.set_instances("Win32_BIOS", [{"Version": "1.0", "SerialNumber": "0000"}])
+
+
+def test_sections_are_merged_with_errors_reported(fake):
+    load_system(fake)
+    
+    def broken(wrapper):
+        raise RuntimeError("provider failure")
+    
+    collector = SnapshotCollector({
+        "operating_system": class_section("Win32_OperatingSystem", single=True),
+        "bios": class_section("Win32_BIOS", ["Version"], single=True),
+        "broken": broken,
+    })
+    snapshot = collector.collect()
+    
+    assert snapshot["sections"]["operating_system"]["Caption"] == "Fake Windows"
+    assert snapshot["sections"]["bios"] == {"Version": "1.0"}
+    assert snapshot["sections"]["broken"] is None
+    assert snapshot["errors"] == {"broken": "provider failure"}
+    assert collector.results["operating_system"].items == 1
+
+
+def test_timed_out_section_is_abandoned(fake):
+    load_system(fake)
+    collector = SnapshotCollector({
+        "slow": lambda wrapper: time.sleep(2.0),
+        "bios": class_section("Win32_BIOS", single=True),
+    }, timeout=0.2)
+    start = time.monotonic()
+    snapshot = collector.collect()
+    
+    assert time.monotonic() - start < 1.0
+    assert collector.results["slow"].timed_out
+    assert snapshot["errors"] == {"slow": "timed out after 0.2s"}
+    assert snapshot["sections"]["bios"]["Version"] == "1.0"
+
+
+def test_timed_out_section_does_not_block_process_exit():
+    script = textwrap.dedent("""
+        import time
+        from benchmarks import fake_wmi
+        fake_wmi.install()
+        from src.wmi_cli.inventory import SnapshotCollector
+        snapshot = SnapshotCollector({"slow": lambda wrapper: time.sleep(10)}, timeout=0.2).collect()
+        print(snapshot["errors"]["slow"])
+    """)
+    start = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, timeout=30
+    )
+    
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "timed out after 0.2s"
+    assert time.monotonic() - start < 5.0
+
+
+def test_system_info_without_computer_system_shows_na(fake):
+    load_system(fake)
+    result = CliRunner().invoke(app, ["system-info"])
+    
+    assert result.exit_code == 0, result.stdout
+    assert "Fake Windows" in result.stdout
+    assert "Computer Name" in result.stdout and "N/A" in result.stdout
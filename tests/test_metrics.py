@@ -0,0 +1,105 @@
+"""
+Tests for MetricsStore range queries and rollups, and MetricsRecorder.
+"""
+import pytest
+
+from src.wmi_cli.metrics import MetricsRecorder, MetricsStore
+from src.wmi_cli.modules import SystemMonitor
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+START = 1_700_000_000 - 1_700_000_000 % 3600  # on an hour boundary
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Two hours of 10 s samples: cpu counts up by one per sample, mem is constant."""
+    with MetricsStore(str(tmp_path / "metrics")) as store:
+        for index in range(720):
+            store.append({"cpu": float(index), "mem": 50.0}, START + index * 10)
+        yield store
+
+
+def test_raw_range_query(store):
+    points = store.query("cpu", START + 100, START + 150)
+    assert points == [(START + 100 + i * 10, 10.0 + i) for i in range(5)]
+    assert store.latest("cpu") == (START + 7190, 719.0)
+    assert store.series() == ["cpu", "mem"]
+
+
+@pytest.mark.parametrize("agg, first, last", [
+    ("mean", 2.5, 716.5),
+    ("min", 0.0, 714.0),
+    ("max", 5.0, 719.0),
+])
+def test_minute_rollups(store, agg, first, last):
+    points = store.query("cpu", step=60, agg=agg)
+    assert len(points) == 120
+    assert points[0] == (START, pytest.approx(first))
+    assert points[-1] == (START + 7140, pytest.approx(last))
+
+
+def test_hour_query_uses_rollups(store):
+    points = store.query("cpu", step=3600, agg="mean")
+    # The second hour is still open, so it is read from the minute rollups
+    assert points == [(START, pytest.approx(179.5)), (START + 3600, pytest.approx(539.5))]
+    assert store.query("mem", step=3600, agg="max") == [(START, 50.0), (START + 3600, 50.0)]
+
+
+def test_unaligned_range_mixes_resolutions(store):
+    points = store.query("cpu", START + 30, START + 7200, step=3600)
+    # Raw samples cover the head up to the first whole minute
+    expected = sum(range(3, 360)) / len(range(3, 360))
+    assert points[0] == (START, pytest.approx(expected))
+
+
+def test_store_reopens_with_its_history(tmp_path):
+    path = str(tmp_path / "metrics")
+    with MetricsStore(path) as store:
+        for index in range(90):
+            store.append({"cpu": 1.0}, START + index * 10)
+    with MetricsStore(path) as store:
+        store.append({"cpu": 3.0, "disk": 7.0}, START + 900)
+        assert store.query("cpu", step=60)[-1] == (START + 900, 3.0)
+        assert len(store.query("cpu")) == 91
+        assert store.query("disk") == [(START + 900, 7.0)]
+        # Rows written before a series existed have no value for it
+        assert store.query("disk", START, START + 10) == []
+
+
+def test_samples_must_not_go_backwards(store):
+    with pytest.raises(ValueError):
+        store.append({"cpu": 1.0}, START)
+
+
+def test_unknown_aggregate_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.query("cpu", step=60, agg="median")
+
+
+def test_recorder_samples_the_monitor(fake, tmp_path):
+    fake.set_instances("Win32_ComputerSystem", [{"TotalPhysicalMemory": str(16 * 1024 ** 3)}])
+    fake.set_instances("Win32_OperatingSystem", [{"FreePhysicalMemory": str(4 * 1024 ** 2)}])
+    monitor = SystemMonitor(wrapper=WMIWrapper())
+    with MetricsStore(str(tmp_path / "metrics")) as store:
+        recorder = MetricsRecorder(store, monitor, collectors={
+            "memory": lambda m: {"memory.used_percent": m.get_memory_info()["used_percentage"]},
+        })
+        recorder.record(START)
+        recorder.record(START + 10)
+        
+        assert recorder.samples == 2
+        assert store.query("memory.used_percent") == [(START, 75.0), (START + 10, 75.0)]
+
+
+def test_recorder_keeps_only_recent_errors(fake, tmp_path):
+    def failing(monitor):
+        raise RuntimeError("collector failed")
+    
+    with MetricsStore(str(tmp_path / "metrics")) as store:
+        recorder = MetricsRecorder(store, SystemMonitor(wrapper=WMIWrapper()),
+                                   collectors={"broken": failing}, max_errors=5)
+        for tick in range(20):
+            recorder.record(START + tick * 10)
+        
+        assert len(recorder.errors) == 5
+        assert recorder.error_counts == {"broken": 20}
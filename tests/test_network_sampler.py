@@ -0,0 +1,84 @@
+"""
+Tests for NetworkSampler rates and counter unwrapping.
+"""
+import pytest
+
+from src.wmi_cli.modules import NetworkSampler, _counter_delta
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+PERF_CLASS = "Win32_PerfRawData_Tcpip_NetworkInterface"
+ETHERNET = "Intel[R] Ethernet Connection"
+
+
+def sample_at(fake, sampler, elapsed, **kwargs):
+    fake.set_instances(PERF_CLASS, fake.make_network_interfaces(elapsed, **kwargs))
+    return {s["name"]: s for s in sampler.sample()}
+
+
+@pytest.mark.parametrize("bits", [32, 64])
+def test_counter_delta_unwraps_one_overflow(bits):
+    top = 1 << bits
+    assert _counter_delta(top - 100, top - 300, bits) == 200
+    assert _counter_delta(50, top - 150, bits) == 200
+    assert _counter_delta(0, top - 1, bits) == 1
+
+
+@pytest.mark.parametrize("bits", [32, 64])
+def test_counter_delta_treats_implausible_overflows_as_resets(bits):
+    half = 1 << (bits - 1)
+    # A small drop cannot be an overflow: the counter restarted from zero
+    assert _counter_delta(10, 1000, bits) == 10
+    assert _counter_delta(10, half - 1, bits) == 10
+    # Unwrapping to less than half the range is still an overflow
+    assert _counter_delta(0, half + 1, bits) == half - 1
+
+
+def test_counter_delta_missing_values_count_as_zero():
+    assert _counter_delta(500, None, 32) == 500
+    assert _counter_delta(None, None, 64) == 0
+
+
+def test_first_sample_has_no_rates(fake):
+    stats = sample_at(fake, NetworkSampler(wrapper=WMIWrapper()), 0.0)
+    
+    assert set(stats) == {ETHERNET, "Intel[R] Wi-Fi 6 AX201 160MHz"}
+    assert all(value is None for name, value in stats[ETHERNET].items()
+               if name not in ("name", "bandwidth"))
+    assert stats[ETHERNET]["bandwidth"] == 1_000_000_000
+
+
+def test_rates_from_counter_deltas(fake):
+    sampler = NetworkSampler(wrapper=WMIWrapper())
+    sample_at(fake, sampler, 10.0)
+    ethernet = sample_at(fake, sampler, 12.0)[ETHERNET]
+    
+    assert ethernet["bytes_received_per_sec"] == pytest.approx(1024 * 1024)
+    assert ethernet["bytes_sent_per_sec"] == pytest.approx(256 * 1024)
+    assert ethernet["packets_received_per_sec"] == pytest.approx(1000)
+    assert ethernet["errors_per_sec"] == pytest.approx(1)
+    assert ethernet["utilization_percent"] == pytest.approx(1280 * 1024 * 8 / 1e9 * 100)
+
+
+def test_wrapped_packet_counters_give_normal_rates(fake):
+    sampler = NetworkSampler(wrapper=WMIWrapper())
+    sample_at(fake, sampler, 0.0, start=2 ** 32 - 500)
+    ethernet = sample_at(fake, sampler, 2.0, start=2 ** 32 - 500)[ETHERNET]
+    
+    assert ethernet["packets_received_per_sec"] == pytest.approx(1000)
+    assert ethernet["packets_sent_per_sec"] == pytest.approx(1000)
+
+
+def test_reset_counters_restart_from_zero(fake):
+    sampler = NetworkSampler(wrapper=WMIWrapper())
+    sample_at(fake, sampler, 3600.0)
+    # The adapter was reset: every counter restarted, the timestamp did not
+    rows = fake.make_network_interfaces(2.0)
+    later = fake.make_network_interfaces(3602.0)
+    for row, now in zip(rows, later):
+        row["Timestamp_Sys100NS"] = now["Timestamp_Sys100NS"]
+    fake.set_instances(PERF_CLASS, rows)
+    ethernet = {s["name"]: s for s in sampler.sample()}[ETHERNET]
+    
+    assert ethernet["bytes_received_per_sec"] == pytest.approx(1024 * 1024)
+    assert ethernet["packets_received_per_sec"] == pytest.approx(1000)
+    assert ethernet["utilization_percent"] < 2
@@ -0,0 +1,161 @@
+"""
+Tests for WMIConnectionPool with injected connection and COM hooks.
+"""
+import threading
+import time
+
+import pytest
+
+from src.wmi_cli.pool import WMIConnectionPool
+
+
+class Hooks:
+    """Records the connections and COM calls the pool makes."""
+    
+    def __init__(self):
+        self.connected = []
+        self.initialized = []
+        self.uninitialized = []
+        self._lock = threading.Lock()
+    
+    def connect(self, computer, namespace):
+        with self._lock:
+            self.connected.append((threading.get_ident(), computer, namespace))
+        return object()
+    
+    def co_initialize(self, multithreaded):
+        self.initialized.append((threading.get_ident(), multithreaded))
+    
+    def co_uninitialize(self):
+        self.uninitialized.append(threading.get_ident())
+
+
+@pytest.fixture
+def hooks():
+    return Hooks()
+
+
+def make_pool(hooks, **kwargs):
+    return WMIConnectionPool(
+        connect=hooks.connect, co_initialize=hooks.co_initialize,
+        co_uninitialize=hooks.co_uninitialize, **kwargs
+    )
+
+
+def run_in_thread(func):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_connections_are_reused_per_thread(hooks):
+    pool = make_pool(hooks)
+    first = pool.get_connection("HostA", "root\\cimv2")
+    
+    assert pool.get_connection("hosta", "ROOT\\CIMV2") is first
+    assert pool.get_connection("HostA", "root\\wmi") is not first
+    other = run_in_thread(lambda: pool.get_connection("HostA", "root\\cimv2"))
+    assert other is not first
+    assert pool.connections_created == 3
+    assert len({ident for ident, _, _ in hooks.connected}) == 2
+
+
+def test_com_is_initialized_once_per_thread(hooks):
+    pool = make_pool(hooks)
+    pool.initialize_thread(True)
+    pool.initialize_thread()
+    pool.get_connection()
+    
+    assert hooks.initialized == [(threading.get_ident(), True)]
+
+
+def test_failed_com_initialization_is_not_undone(hooks):
+    def co_initialize(multithreaded):
+        raise OSError("RPC_E_CHANGED_MODE")
+    
+    pool = WMIConnectionPool(
+        connect=hooks.connect, co_initialize=co_initialize, co_uninitialize=hooks.co_uninitialize
+    )
+    pool.get_connection()
+    pool.release_thread()
+    
+    assert hooks.uninitialized == []
+
+
+def test_host_semaphore_caps_concurrent_use(hooks):
+    pool = make_pool(hooks, max_connections_per_host=2)
+    active = {"hosta": 0, "hostb": 0}
+    peak = {"hosta": 0, "hostb": 0}
+    lock = threading.Lock()
+    
+    def use(host):
+        key = host.lower()
+        with pool.thread_scope(), pool.acquire(host):
+            with lock:
+                active[key] += 1
+                peak[key] = max(peak[key], active[key])
+            time.sleep(0.05)
+            with lock:
+                active[key] -= 1
+    
+    threads = [threading.Thread(target=use, args=(host,))
+               for host in ["HostA", "hosta", "HostA", "HOSTA", "HostB", "HostB"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert peak == {"hosta": 2, "hostb": 2}
+
+
+def test_acquire_releases_the_slot_on_error(hooks):
+    pool = make_pool(hooks, max_connections_per_host=1)
+    with pytest.raises(RuntimeError):
+        with pool.acquire("HostA"):
+            raise RuntimeError("query failed")
+    
+    acquired = run_in_thread(lambda: pool._host_limit("HostA").acquire(timeout=1))
+    assert acquired
+
+
+def test_thread_scope_releases_connections_and_com(hooks):
+    pool = make_pool(hooks)
+    
+    def scoped():
+        with pool.thread_scope() as scoped_pool:
+            first = scoped_pool.get_connection("HostA")
+        # A new scope starts with a new connection
+        with pool.thread_scope():
+            second = pool.get_connection("HostA")
+        return first, second
+    
+    first, second = run_in_thread(scoped)
+    assert first is not second
+    assert len(hooks.initialized) == 2
+    assert len(hooks.uninitialized) == 2
+    assert pool.connections_created == 2
+
+
+def test_release_thread_without_connections_is_a_no_op(hooks):
+    pool = make_pool(hooks)
+    pool.release_thread()
+    
+    assert hooks.initialized == [] and hooks.uninitialized == []
+
+
+def test_discard_drops_only_the_named_connection(hooks):
+    pool = make_pool(hooks)
+    assert not pool.discard("HostA")
+    
+    first = pool.get_connection("HostA")
+    kept = pool.get_connection("HostB")
+    assert pool.discard("hosta")
+    assert not pool.discard("HostA")
+    
+    assert pool.get_connection("HostA") is not first
+    assert pool.get_connection("HostB") is kept
+    # Discarding does not touch COM or other threads
+    assert hooks.uninitialized == []
+    assert pool.connections_created == 3
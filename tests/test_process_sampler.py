@@ -0,0 +1,119 @@
+"""
+Tests for ProcessSampler rates computed from raw counter fixtures.
+"""
+import pytest
+
+from src.wmi_cli.modules import ProcessSampler
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+PERF_CLASS = "Win32_PerfRawData_PerfProc_Process"
+
+
+def make_sampler(**kwargs) -> ProcessSampler:
+    return ProcessSampler(wrapper=WMIWrapper(), cpu_count=1, **kwargs)
+
+
+def test_first_sample_has_no_rates(fake):
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(5))
+    stats = make_sampler().sample()
+    
+    assert len(stats) == 5
+    assert all(s["cpu_percent"] is None and s["io_bytes_per_sec"] is None for s in stats)
+    assert stats[1]["working_set"] == 2 * 1024 * 1024
+
+
+def test_rates_come_from_counter_deltas(fake):
+    sampler = make_sampler()
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(30, elapsed=0.0))
+    sampler.sample()
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(30, elapsed=2.0))
+    stats = {s["pid"]: s for s in sampler.sample()}
+    
+    for index in range(30):
+        s = stats[4 + index * 4]
+        # Process index uses index % 20 percent of a core and reads index KiB/s
+        assert s["cpu_percent"] == pytest.approx(index % 20)
+        assert s["io_read_bytes_per_sec"] == pytest.approx(index * 1024)
+        assert s["io_write_bytes_per_sec"] == 0
+
+
+def test_cpu_percent_is_normalized_by_processor_count(fake):
+    sampler = ProcessSampler(wrapper=WMIWrapper(), cpu_count=4)
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(20, elapsed=0.0))
+    sampler.sample()
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(20, elapsed=1.0))
+    stats = {s["pid"]: s for s in sampler.sample()}
+    
+    assert stats[4 + 12 * 4]["cpu_percent"] == pytest.approx(3.0)
+
+
+def test_total_and_idle_are_filtered_in_wql(fake):
+    rows = fake.make_perf_processes(3)
+    rows.append(dict(rows[0], Name="_Total", IDProcess=0))
+    rows.append(dict(rows[0], Name="Idle", IDProcess=0))
+    fake.set_instances(PERF_CLASS, rows)
+    
+    stats = make_sampler().sample()
+    
+    assert sorted(s["name"] for s in stats) == ["process0", "process1", "process2"]
+    assert fake.stats.objects == 3
+
+
+def test_exited_processes_are_forgotten(fake):
+    sampler = make_sampler()
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(3))
+    sampler.sample()
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(2, elapsed=1.0))
+    sampler.sample()
+    
+    assert sampler.get_history(4 + 2 * 4) == []
+    assert len(sampler.get_history(4)) == 2
+
+
+def test_top_sorts_by_key(fake):
+    sampler = make_sampler()
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(40, elapsed=0.0))
+    sampler.sample()
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(40, elapsed=1.0))
+    sampler.sample()
+    
+    assert [s["cpu_percent"] for s in sampler.top(2)] == pytest.approx([19, 19])
+    assert sampler.top(1, by="io")[0]["name"] == "process39"
+    with pytest.raises(ValueError):
+        sampler.top(1, by="disk")
+
+
+def test_renumbered_instance_names_keep_the_history(fake):
+    sampler = make_sampler()
+    rows = fake.make_perf_processes(3, elapsed=0.0)
+    for number, row in enumerate(rows):
+        row["Name"] = f"chrome#{number + 1}"
+    fake.set_instances(PERF_CLASS, rows)
+    sampler.sample()
+    
+    # chrome#1 exits: the others are renumbered but keep their PIDs
+    later = fake.make_perf_processes(3, elapsed=1.0)[1:]
+    later[0]["Name"], later[1]["Name"] = "chrome#1", "chrome"
+    fake.set_instances(PERF_CLASS, later)
+    stats = {s["pid"]: s for s in sampler.sample()}
+    
+    assert len(sampler.get_history(8)) == 2
+    assert stats[8]["cpu_percent"] == pytest.approx(1)
+    assert stats[12]["cpu_percent"] == pytest.approx(2)
+
+
+def test_reused_pid_starts_a_new_history(fake):
+    sampler = make_sampler()
+    fake.set_instances(PERF_CLASS, fake.make_perf_processes(3, elapsed=0.0))
+    sampler.sample()
+    
+    # PID 8 now belongs to a newer process with the same image name
+    rows = fake.make_perf_processes(3, elapsed=1.0)
+    rows[1]["ElapsedTime"] = str(int(rows[1]["ElapsedTime"]) + 5_000_000)
+    rows[1]["PercentProcessorTime"] = "0"
+    fake.set_instances(PERF_CLASS, rows)
+    stats = {s["pid"]: s for s in sampler.sample()}
+    
+    assert len(sampler.get_history(8)) == 1
+    assert stats[8]["cpu_percent"] is None
+    assert stats[12]["cpu_percent"] == pytest.approx(2)
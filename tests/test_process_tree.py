@@ -0,0 +1,119 @@
+"""
+Tests for ProcessTree and ProcessManager tree kills on large snapshots.
+"""
+from collections import deque
+
+import pytest
+
+from src.wmi_cli.modules import ProcessManager, ProcessTree
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+
+@pytest.fixture(scope="module")
+def rows():
+    from benchmarks import fake_wmi
+    return fake_wmi.make_process_tree(10_000, fanout=4, stale=0.01)
+
+
+@pytest.fixture(scope="module")
+def tree(rows):
+    return ProcessTree(rows)
+
+
+def naive_descendants(rows, pid):
+    """Breadth-first search over links whose parent was created first."""
+    created = {row["ProcessId"]: row["CreationDate"] for row in rows}
+    children = {}
+    for row in rows:
+        parent = row["ParentProcessId"]
+        if parent in created and created[parent] < row["CreationDate"]:
+            children.setdefault(parent, []).append(row["ProcessId"])
+    found, queue = set(), deque([pid])
+    while queue:
+        for child in children.get(queue.popleft(), ()):
+            found.add(child)
+            queue.append(child)
+    return found
+
+
+def test_reused_parent_pids_start_new_roots(rows, tree):
+    stale = [index for index in range(2, len(rows)) if index % 100 == 0]
+    
+    assert len(tree) == 10_000
+    assert tree.roots() == [4] + [rows[index]["ProcessId"] for index in stale]
+    assert all(tree.parent(rows[index]["ProcessId"]) is None for index in stale)
+
+
+@pytest.mark.parametrize("index", [0, 1, 7, 25, 100, 2_499])
+def test_descendants_match_a_naive_search(rows, tree, index):
+    pid = rows[index]["ProcessId"]
+    descendants = tree.descendants(pid)
+    
+    assert set(descendants) == naive_descendants(rows, pid)
+    assert len(descendants) == len(set(descendants))
+    # Parents come before their children
+    position = {child: i for i, child in enumerate(descendants)}
+    assert all(
+        position.get(tree.parent(child), -1) < position[child] for child in descendants
+    )
+
+
+def test_is_descendant_and_ancestors(rows, tree):
+    leaf = rows[-1]["ProcessId"]
+    ancestors = tree.ancestors(leaf)
+    
+    assert ancestors and tree.depth(leaf) == len(ancestors)
+    assert all(tree.is_descendant(leaf, pid) for pid in ancestors)
+    assert not tree.is_descendant(ancestors[0], leaf)
+    assert not tree.is_descendant(leaf, leaf)
+    # The stale process at index 100 is cut off from its former parent
+    assert not tree.is_descendant(rows[100]["ProcessId"], 4)
+
+
+def test_kill_tree_refuses_reused_pids(fake):
+    rows = fake.make_process_tree(50, fanout=2, stale=0)
+    manager = ProcessManager(wrapper=WMIWrapper())
+    terminated = fake.simulate_processes(rows)
+    tree = manager.get_process_tree()
+    target = rows[1]["ProcessId"]
+    expected = [target] + tree.descendants(target)
+    
+    # One descendant exits and its PID is reused before the kill
+    reused = expected[-1]
+    for row in rows:
+        if row["ProcessId"] == reused:
+            row["CreationDate"] = "20300101000000.000000+000"
+    results = manager.kill_tree(target, tree=tree)
+    
+    assert [result.pid for result in results] == expected
+    by_pid = {result.pid: result for result in results}
+    assert not by_pid[reused].ok
+    assert by_pid[reused].error == "PID reused by a newer process"
+    assert sorted(pid for _, pid in terminated) == sorted(expected[:-1])
+    assert all(by_pid[pid].ok for pid in expected[:-1])
+
+
+def run_ptree(*args):
+    from typer.testing import CliRunner
+    from src.wmi_cli.cli import app
+    return CliRunner().invoke(app, ["ptree", *args])
+
+
+def test_ptree_kill_needs_a_selection(fake):
+    terminated = fake.simulate_processes(fake.make_process_tree(20, stale=0))
+    result = run_ptree("--kill", "--yes")
+    
+    assert result.exit_code == 1
+    assert "--kill needs a PID or --name" in result.stdout
+    assert terminated == []
+
+
+def test_ptree_kill_ignores_depth(fake):
+    rows = fake.make_process_tree(40, fanout=2, stale=0)
+    subtree = ProcessTree(rows).descendants(8)
+    terminated = fake.simulate_processes(rows)
+    result = run_ptree("8", "--depth", "1", "--kill", "--yes", "--output-format", "json")
+    
+    assert result.exit_code == 0, result.stdout
+    assert sorted(pid for _, pid in terminated) == sorted([8] + subtree)
+    assert f"Terminated {len(subtree) + 1} processes" in result.stdout
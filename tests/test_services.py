@@ -0,0 +1,129 @@
+"""
+Tests for ServiceManager.apply against the simulated Service Control Manager.
+"""
+import time
+
+import pytest
+
+from src.wmi_cli.modules import ServiceManager
+
+
+@pytest.fixture
+def services(fake):
+    """Four running services; svc1 depends on svc0 and svc2 on svc1."""
+    def simulate(running=1.0, dependencies=None, **kwargs):
+        rows = fake.make_services(4, running=running)
+        if dependencies is None:
+            dependencies = {"svc1": ["svc0"], "svc2": ["svc1"]}
+        return fake.simulate_services(rows, dependencies, **kwargs)
+    return simulate
+
+
+def controls(machine, method=None):
+    return [name for _, name, sent in machine.controls if method in (None, sent)]
+
+
+def states(fake):
+    return {row["Name"]: row["State"] for row in fake._instances["win32_service"]}
+
+
+def apply(actions, **kwargs):
+    kwargs.setdefault("poll_interval", 0.01)
+    return ServiceManager().apply(actions, **kwargs)
+
+
+def test_restart_follows_dependency_order(fake, services):
+    machine = services(transition=0.02)
+    results = apply(dict.fromkeys(["svc0", "svc1", "svc2", "svc3"], "restart"))
+    
+    assert all(result.ok for result in results), results
+    chain = ["svc0", "svc1", "svc2"]
+    assert [name for name in controls(machine, "StopService") if name in chain] == chain[::-1]
+    assert [name for name in controls(machine, "StartService") if name in chain] == chain
+    for name in chain:
+        assert [method for _, sent, method in machine.controls if sent == name] == [
+            "StopService", "StartService"
+        ]
+    assert set(states(fake).values()) == {"Running"}
+    assert set(results[0].steps) == {"stop", "start"}
+
+
+def test_dependents_stop_before_their_dependency(fake, services):
+    machine = services(transition=0.02)
+    results = apply({"svc0": "stop", "svc1": "stop", "svc2": "stop"})
+    
+    assert all(result.ok for result in results), results
+    assert controls(machine) == ["svc2", "svc1", "svc0"]
+    # svc0 waited for both dependents to finish stopping
+    assert results[0].queued >= 2 * 0.02
+    assert states(fake) == {
+        "svc0": "Stopped", "svc1": "Stopped", "svc2": "Stopped", "svc3": "Running"
+    }
+
+
+def test_independent_services_are_controlled_together(fake, services):
+    machine = services(running=0.0, dependencies={}, transition=0.2)
+    start = time.perf_counter()
+    results = apply(dict.fromkeys(["svc0", "svc1", "svc2", "svc3"], "start"))
+    
+    assert all(result.ok for result in results), results
+    assert time.perf_counter() - start < 0.6
+    assert sorted(controls(machine)) == ["svc0", "svc1", "svc2", "svc3"]
+
+
+def test_circular_dependencies_are_reported(fake, services):
+    machine = services(dependencies={"svc0": ["svc1"], "svc1": ["svc0"]}, transition=0.01)
+    results = apply({"svc0": "restart", "svc1": "restart", "svc3": "stop"})
+    
+    assert [result.error for result in results[:2]] == ["Circular service dependency"] * 2
+    assert not results[0].ok and not results[1].ok
+    assert results[2].ok
+    assert controls(machine) == ["svc3"]
+
+
+def test_poll_timeout_with_backoff(fake, services):
+    services(running=0.0, dependencies={}, transition=30)
+    start = time.perf_counter()
+    result = apply({"svc0": "start"}, timeout=0.4, poll_interval=0.01, max_poll_interval=0.1)[0]
+    elapsed = time.perf_counter() - start
+    
+    assert not result.ok
+    assert result.return_value == 0
+    assert result.state == "Start Pending"
+    assert result.error == "Timed out after 0.4s waiting for Running"
+    assert 0.4 <= elapsed < 1.0
+    # Polling every 10 ms would take 40 polls; backing off to 100 ms needs far fewer
+    assert 3 <= result.polls <= 12
+
+
+def test_failed_steps_are_reported(fake, services):
+    rows = fake.make_services(4, running=0.0)
+    rows[3]["StartMode"] = "Disabled"
+    machine = fake.simulate_services(
+        rows, {"svc1": ["svc0"], "svc2": ["svc1"]}, transition=0.02, failing=["svc0"]
+    )
+    results = apply(dict.fromkeys(["svc2", "svc1", "svc0", "svc3", "nope"], "start"))
+    by_name = {result.name: result for result in results}
+    
+    assert not any(result.ok for result in results)
+    assert by_name["svc0"].error == "Service is Stopped after start"
+    assert by_name["svc1"].error == "Skipped because svc0 failed"
+    assert by_name["svc2"].error == "Skipped because svc1 failed"
+    assert by_name["svc3"].error == "Service Disabled (14)"
+    assert by_name["svc3"].return_value == 14
+    assert by_name["nope"].error == "Service not found"
+    assert sorted(controls(machine)) == ["svc0", "svc3"]
+
+
+def test_already_in_target_state_counts_as_done(fake, services):
+    services(running=0.5, dependencies={})
+    results = apply({"svc0": "start", "svc3": "stop"})
+    
+    assert [result.ok for result in results] == [True, True]
+    assert [result.return_value for result in results] == [10, 6]
+
+
+def test_invalid_action_is_rejected(fake, services):
+    services()
+    with pytest.raises(ValueError, match="Invalid action 'pause'"):
+        apply({"svc0": "pause"})
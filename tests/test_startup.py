@@ -0,0 +1,26 @@
+"""
+Import-time budget of the wmi-cli and wmi-agent entry points.
+
+Budgets are multiples of a bare interpreter's startup time on the same
+machine; see benchmarks/bench_startup.py for the scenarios.
+"""
+import pytest
+
+from benchmarks.bench_startup import SCENARIOS, check_startup
+
+pytest.importorskip("typer")
+
+
+@pytest.fixture(scope="module")
+def startup():
+    _, results = check_startup(runs=5)
+    return {result.label: result for result in results}
+
+
+@pytest.mark.parametrize("label", [scenario[0] for scenario in SCENARIOS])
+def test_startup_within_budget(startup, label):
+    result = startup[label]
+    assert not result.unexpected, f"{label} loaded {', '.join(result.unexpected)}"
+    assert result.import_ms <= result.budget, (
+        f"{label} spent {result.import_ms:.0f} ms importing (budget {result.budget:.0f} ms)"
+    )
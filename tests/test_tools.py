@@ -0,0 +1,114 @@
+"""
+Tests for the agent tools in src.wmi_tools against the fake WMI.
+"""
+import json
+
+import pytest
+
+from src import wmi_tools
+
+
+@pytest.fixture
+def services(fake):
+    rows = [
+        {"Name": f"svc{i}", "DisplayName": f"Service {i}",
+         "State": "Running" if i % 4 else "Stopped", "StartMode": "Auto", "Status": "OK"}
+        for i in range(40)
+    ]
+    fake.set_instances("Win32_Service", rows)
+    wmi_tools.begin_turn()
+    yield rows
+    wmi_tools.begin_turn()
+
+
+def test_list_services_filters_state_in_wmi(fake, services):
+    objects = fake.stats.objects
+    result = json.loads(wmi_tools.list_services(state="Stopped", limit=100))
+    
+    stopped = [row["Name"] for row in services if row["State"] == "Stopped"]
+    assert result["fields"] == ["name", "state", "start_mode"]
+    assert sorted(row[0] for row in result["rows"]) == sorted(stopped)
+    # Only the matching services were marshalled
+    assert fake.stats.objects - objects == len(stopped)
+
+
+def test_get_service_status_looks_the_name_up_in_wmi(fake, services):
+    objects = fake.stats.objects
+    result = json.loads(wmi_tools.get_service_status("SVC3"))
+    
+    assert result["name"] == "svc3"
+    assert result["state"] == "Running"
+    assert fake.stats.objects - objects == 1
+    assert "not found" in json.loads(wmi_tools.get_service_status("missing"))["error"]
+
+
+def test_repeated_calls_share_a_snapshot_per_filter(fake, services):
+    wmi_tools.list_services(state="Running")
+    wmi_tools.get_service_status("svc1")
+    queries = fake.stats.queries
+    wmi_tools.list_services(state="Running")
+    wmi_tools.get_service_status("svc1")
+    
+    assert fake.stats.queries == queries
+
+
+def test_snapshots_hold_no_com_objects(fake, services):
+    from src.wmi_cli.convert import DetachedObject
+    
+    wmi_tools._init_wmi()
+    snapshot = wmi_tools._wrapper.get_services(["Name", "State"])
+    assert snapshot and all(isinstance(svc, DetachedObject) for svc in snapshot)
+
+
+@pytest.fixture
+def budget():
+    previous = wmi_tools.get_output_budget()
+    wmi_tools.set_output_budget(1024)
+    yield 1024
+    wmi_tools.set_output_budget(previous)
+
+
+@pytest.fixture
+def frame():
+    from src.wmi_cli.frame import ResultFrame
+    
+    return ResultFrame({
+        "name": [f"process-with-a-long-name-{i:03}" for i in range(100)],
+        "pid": [(i * 37) % 100 for i in range(100)],
+    })
+
+
+def test_page_fits_the_output_budget(budget, frame):
+    text = wmi_tools._page(frame, "", ["name", "pid"], limit=100)
+    result = json.loads(text)
+    
+    assert len(text) <= budget
+    assert result["total"] == 100
+    assert result["fields"] == ["name", "pid"]
+    assert 1 < len(result["rows"]) < 100
+    assert result["next_offset"] == len(result["rows"])
+
+
+@pytest.mark.parametrize("sort_by", ["", "pid", "-name"])
+def test_following_next_offset_returns_every_row_once(budget, frame, sort_by):
+    rows, pages, offset = [], 0, 0
+    while offset is not None:
+        result = json.loads(wmi_tools._page(frame, "pid,name", [], offset=offset, limit=50,
+                                            sort_by=sort_by))
+        assert result["offset"] == offset
+        rows.extend(row[0] for row in result["rows"])
+        pages += 1
+        offset = result.get("next_offset")
+    
+    # The budget cuts pages below the limit
+    assert pages > 2
+    assert sorted(rows) == list(range(100))
+    if sort_by == "pid":
+        assert rows == list(range(100))
+
+
+def test_page_reports_unknown_fields(frame):
+    result = json.loads(wmi_tools._page(frame, "name,owner", [], sort_by="cpu"))
+    
+    assert result["error"] == "Unknown field(s): owner, cpu"
+    assert result["fields"] == ["name", "pid"]
@@ -0,0 +1,77 @@
+"""
+Tests for the WQL builder and the filters pushed into WMI.
+"""
+import datetime
+
+import pytest
+
+from src.wmi_cli.modules import ProcessManager, ServiceManager
+from src.wmi_cli.wmi_wrapper import WMIWrapper, build_select_query
+from src.wmi_cli.wql import Field, Query, any_of, parse_dmtf, to_dmtf, wql_literal
+
+
+def test_select_and_where_render_quoted_literals():
+    query = Query("Win32_Service", ["Name", "State"]).where(State="Running", StartMode="Auto")
+    assert query.build() == (
+        "SELECT Name, State FROM Win32_Service WHERE State = 'Running' AND StartMode = 'Auto'"
+    )
+
+
+def test_literals_are_escaped():
+    assert wql_literal("it's C:\\temp") == "'it\\'s C:\\\\temp'"
+    assert wql_literal(True) == "TRUE"
+    assert wql_literal(42) == "42"
+
+
+def test_conditions_combine_and_nest():
+    condition = (Field("WorkingSetSize") > 1024) & any_of(Field("Name") == "a", Field("Name") == "b")
+    assert condition.render() == "WorkingSetSize > 1024 AND (Name = 'a' OR Name = 'b')"
+    assert (~(Field("State") == "Stopped")).render() == "NOT (State = 'Stopped')"
+
+
+def test_isin_expands_to_or_and_like_helpers_escape_wildcards():
+    assert Field("ProcessId").isin([4, 8]).render() == "ProcessId = 4 OR ProcessId = 8"
+    assert Field("Name").startswith("100%_").render() == "Name LIKE '100[%][_]%'"
+    assert Field("Caption").is_null().render() == "Caption IS NULL"
+
+
+@pytest.mark.parametrize("name", ["Win32_Service; DROP", "1abc", "Name'", ""])
+def test_invalid_identifiers_are_rejected(name):
+    with pytest.raises(ValueError):
+        Query(name)
+    with pytest.raises(ValueError):
+        Query("Win32_Service", [name])
+
+
+def test_build_select_query_turns_filters_into_where():
+    assert build_select_query("Win32_Process", ["Name"], {"ProcessId": 4}) == (
+        "SELECT Name FROM Win32_Process WHERE ProcessId = 4"
+    )
+
+
+def test_dmtf_round_trip():
+    value = datetime.datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=datetime.timezone.utc)
+    assert to_dmtf(value) == "20240501123015.250000+000"
+    assert parse_dmtf(to_dmtf(value)) == value
+    assert parse_dmtf("not a date") is None
+
+
+def test_service_filters_run_inside_wmi(fake):
+    fake.set_instances("Win32_Service", fake.make_services(100, running=0.25))
+    services = ServiceManager(wrapper=WMIWrapper())
+    
+    running = services.list_services(["Name", "State"], State="Running")
+    
+    assert len(running) == 25
+    # Only the matching instances crossed the (fake) COM boundary
+    assert fake.stats.objects == 25
+
+
+def test_high_memory_filter_runs_inside_wmi(fake):
+    fake.set_instances("Win32_Process", fake.make_processes(200))
+    manager = ProcessManager(wrapper=WMIWrapper())
+    
+    rows = manager.get_high_memory_processes(min_memory_mb=150, properties=["Name"])
+    
+    assert len(rows) == fake.stats.objects
+    assert all(int(row.WorkingSetSize) > 150 * 1024 * 1024 for row in rows)
@@ -0,0 +1,35 @@
+"""
+Tests for WMIWrapper enumeration against the fake WMI service.
+"""
+import threading
+
+from src.wmi_cli.pool import WMIConnectionPool
+from src.wmi_cli.wmi_wrapper import WMIWrapper
+
+
+def query_on_thread(wrapper, wql):
+    results = []
+    worker = threading.Thread(target=lambda: results.extend(wrapper.query(wql)), daemon=True)
+    worker.start()
+    worker.join(timeout=2)
+    return results if not worker.is_alive() else None
+
+
+def test_iter_query_releases_the_host_slot_between_batches(fake):
+    fake.set_instances("Win32_Process", [{"Name": f"p{i}"} for i in range(10)])
+    wrapper = WMIWrapper(pool=WMIConnectionPool(max_connections_per_host=1))
+    rows = wrapper.iter_query("SELECT Name FROM Win32_Process", batch_size=4)
+    
+    # A suspended enumeration does not block other queries to the host
+    assert next(rows).Name == "p0"
+    assert len(query_on_thread(wrapper, "SELECT Name FROM Win32_Process")) == 10
+    assert [row.Name for row in rows] == [f"p{i}" for i in range(1, 10)]
+
+
+def test_iter_query_limit_stops_enumerating(fake):
+    fake.set_instances("Win32_Process", [{"Name": f"p{i}"} for i in range(10)])
+    wrapper = WMIWrapper(pool=WMIConnectionPool(max_connections_per_host=1))
+    
+    assert len(list(wrapper.iter_query("SELECT Name FROM Win32_Process", limit=3))) == 3
+    assert list(wrapper.iter_query("SELECT Name FROM Win32_Process", limit=0)) == []
+    assert wrapper.pool.host_slot().acquire(blocking=False)